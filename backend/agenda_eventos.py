@@ -0,0 +1,179 @@
+"""
+Agenda de eventos en memoria para validar inscripciones
+ExpoKossodo 2025
+
+/api/registro validaba cada inscripción con consultas: los eventos del
+usuario (JOIN con expokossodo_registro_eventos), fecha/hora de los eventos
+pedidos para detectar choques, un SELECT id ... WHERE id IN solo para
+confirmar que existen, y después dos SELECT más de esos mismos eventos para
+la respuesta y el email.
+
+La agenda (id → fecha, hora, sala, capacidad y datos de la charla) cambia
+solo cuando un administrador edita eventos u horarios, así que se carga una
+vez y se valida en Python:
+
+- Existencia de cada evento pedido.
+- Choque con los horarios (fecha, hora) en que el usuario ya está inscrito.
+- Dos charlas del mismo horario dentro de la misma selección.
+
+La capacidad no se decide acá: slots_ocupados cambia con cada inscripción y
+reservar_cupos la vuelve a leer bajo FOR UPDATE, que es la fuente de verdad.
+
+Coherencia entre workers: la agenda se recarga cuando cambia la versión
+compartida VERSION_CONTENIDO_EVENTOS (la incrementan los endpoints de
+administración) o pasa AGENDA_MAX_AGE segundos (cambios hechos fuera de la
+app). Un id desconocido fuerza una recarga, limitada a una cada
+AGENDA_RECARGA_MINIMA segundos para que ids inventados no la disparen en cada
+request.
+"""
+
+import os
+import threading
+import time
+
+from versiones_cache import VERSION_CONTENIDO_EVENTOS, version_actual
+
+
+def clave_horario(evento):
+    """(fecha, hora) como texto: dos eventos con la misma clave se superponen"""
+    fecha = evento['fecha']
+    fecha_str = fecha if isinstance(fecha, str) else fecha.strftime('%Y-%m-%d')
+    return fecha_str, str(evento['hora'])
+
+
+def normalizar_ids(evento_ids):
+    """IDs enteros sin repetir en el orden pedido, y los valores que no son IDs"""
+    ids = []
+    invalidos = []
+    for valor in evento_ids:
+        try:
+            evento_id = int(valor)
+        except (TypeError, ValueError):
+            invalidos.append(valor)
+            continue
+        if evento_id not in ids:
+            ids.append(evento_id)
+    return ids, invalidos
+
+
+class AgendaEventos:
+    """Mapa thread-safe id de evento → fila de expokossodo_eventos"""
+
+    def __init__(self, max_age_segundos=None, recarga_minima_segundos=None):
+        """
+        Args:
+            max_age_segundos (int): Recarga forzada para cambios hechos fuera de la app
+            recarga_minima_segundos (int): Mínimo entre recargas provocadas por ids desconocidos
+        """
+        self.max_age = max_age_segundos if max_age_segundos is not None else int(os.getenv('AGENDA_MAX_AGE', 300))
+        self.recarga_minima = (recarga_minima_segundos if recarga_minima_segundos is not None
+                               else int(os.getenv('AGENDA_RECARGA_MINIMA', 10)))
+        self._lock = threading.Lock()
+        self._eventos = {}
+        self._version = None
+        self._cargado_en = 0
+        self.stats = {'validaciones': 0, 'cargas': 0}
+
+    # --- Carga ---
+
+    def _vigente(self, version):
+        return (self._version == version and
+                time.time() - self._cargado_en < self.max_age)
+
+    def cargar(self, cursor):
+        """Cargar todos los eventos con el cursor (dictionary=True) de la request"""
+        version = version_actual(VERSION_CONTENIDO_EVENTOS)
+        inicio = time.time()
+        cursor.execute("SELECT * FROM expokossodo_eventos")
+        eventos = {row['id']: row for row in cursor.fetchall()}
+
+        with self._lock:
+            self._eventos = eventos
+            self._version = version
+            self._cargado_en = time.time()
+            self.stats['cargas'] += 1
+
+        print(f"[AGENDA] {len(eventos)} eventos cargados en {time.time() - inicio:.3f}s")
+
+    def asegurar(self, cursor):
+        """Recargar si cambió la versión o venció max_age (un os.stat cuando está vigente)"""
+        if not self._vigente(version_actual(VERSION_CONTENIDO_EVENTOS)):
+            self.cargar(cursor)
+
+    # --- Consultas ---
+
+    def validar(self, cursor, eventos_inscritos_ids, eventos_nuevos):
+        """
+        Clasificar los eventos pedidos sin consultar la base de datos (salvo recarga)
+
+        Args:
+            cursor: Cursor (dictionary=True) usado solo si hay que recargar
+            eventos_inscritos_ids (list): IDs en los que el usuario ya está inscrito
+            eventos_nuevos (list): IDs pedidos en esta request
+
+        Returns:
+            tuple: (eventos_validos, eventos_conflictivos, eventos_no_existentes)
+        """
+        self.asegurar(cursor)
+        ids, no_existentes = normalizar_ids(eventos_nuevos)
+
+        eventos = self._eventos
+        if any(evento_id not in eventos for evento_id in ids) and time.time() - self._cargado_en >= self.recarga_minima:
+            # Puede ser un evento creado en otro proceso después de la carga
+            self.cargar(cursor)
+            eventos = self._eventos
+        no_existentes += [evento_id for evento_id in ids if evento_id not in eventos]
+
+        # WHY: Conjunto de horarios ocupados; el de las inscripciones previas no cambia por request
+        inscritos = set(eventos_inscritos_ids)
+        ocupados = {clave_horario(eventos[evento_id]) for evento_id in inscritos if evento_id in eventos}
+        seleccionados = set()
+
+        eventos_validos = []
+        eventos_conflictivos = []
+        for evento_id in ids:
+            evento = eventos.get(evento_id)
+            if evento is None:
+                continue
+            fecha_str, hora_str = horario = clave_horario(evento)
+
+            if evento_id in inscritos:
+                motivo = 'Ya estás inscrito en esta charla'
+            elif horario in ocupados:
+                motivo = f'Conflicto de horario: ya tienes un evento registrado a las {hora_str} el {fecha_str}'
+            elif horario in seleccionados:
+                motivo = f'Conflicto de horario: seleccionaste otra charla a las {hora_str} el {fecha_str}'
+            else:
+                seleccionados.add(horario)
+                eventos_validos.append(evento_id)
+                continue
+
+            eventos_conflictivos.append({
+                'id': evento_id,
+                'titulo_charla': evento['titulo_charla'],
+                'sala': evento['sala'],
+                'fecha': fecha_str,
+                'hora': hora_str,
+                'motivo': motivo
+            })
+
+        self.stats['validaciones'] += 1
+        return eventos_validos, eventos_conflictivos, no_existentes
+
+    def detalles(self, evento_ids):
+        """Copias de las filas de los eventos pedidos, ordenadas por fecha y hora"""
+        eventos = self._eventos
+        filas = [dict(eventos[evento_id]) for evento_id in set(evento_ids) if evento_id in eventos]
+        return sorted(filas, key=lambda evento: (evento['fecha'], evento['hora']))
+
+    def evento(self, evento_id):
+        """Fila del evento o None si no está en la agenda"""
+        return self._eventos.get(evento_id)
+
+    def estadisticas(self):
+        return {
+            'eventos': len(self._eventos),
+            'horarios': len({clave_horario(evento) for evento in self._eventos.values()}),
+            'cargado_hace_segundos': round(time.time() - self._cargado_en, 1) if self._cargado_en else None,
+            **self.stats
+        }
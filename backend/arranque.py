@@ -0,0 +1,197 @@
+"""
+Arranque perezoso de servicios externos
+ExpoKossodo 2025
+
+Importar app.py hacía todo el trabajo de arranque en el import: un
+requests.get bloqueante (timeout 5 s) al /health del servicio de
+transcripción, import de cv2 y openai, creación del cliente de OpenAI y del
+pool MySQL (con sus conexiones) y carga del índice de QR. Con preload_app eso
+corre en el master antes de que exista un solo worker, y en el free tier de
+Render el /health del arranque en frío tardaba varios segundos; si Railway
+respondía lento, el arranque esperaba el timeout completo.
+
+Acá cada servicio es un handle que se construye en el primer uso:
+
+- ServicioPerezoso: construye el recurso la primera vez que se pide, una sola
+  vez por proceso (un recurso creado en el master no se reutiliza tras el
+  fork). Si la construcción falla se devuelve None y se reintenta pasado
+  ARRANQUE_REINTENTO_SEGUNDOS, en vez de quedar deshabilitado para siempre.
+- SondaDisponibilidad: consulta un /health en un hilo de fondo cada
+  `intervalo` segundos; leer .disponible nunca hace red.
+- precalentar(): corre tareas (pool, índice de QR) en un hilo de fondo del
+  worker, para que el primer escaneo no pague la carga sin frenar /health.
+"""
+
+import os
+import threading
+import time
+
+import requests
+
+REINTENTO_SEGUNDOS = float(os.getenv('ARRANQUE_REINTENTO_SEGUNDOS', 30))
+
+# Handles creados en este proceso, para /api/arranque/estado (solo los de subsistemas importados)
+_servicios = []
+
+
+class ServicioPerezoso:
+    """
+    Recurso construido en el primer uso, uno por proceso
+
+    Los atributos se delegan al recurso (servicio.beta.threads...) para que
+    el código que usaba el objeto directamente no cambie.
+    """
+
+    def __init__(self, nombre, construir, reintento_segundos=None):
+        self.nombre = nombre
+        self._construir = construir
+        self._reintento = REINTENTO_SEGUNDOS if reintento_segundos is None else reintento_segundos
+        self._lock = threading.Lock()
+        self._pid = None
+        self._recurso = None
+        self._ultimo_intento = None
+        self.error = None
+        self.segundos_carga = None
+        _servicios.append(self)
+
+    def obtener(self):
+        """El recurso, o None si no se pudo construir (se reintenta más tarde)"""
+        if self._pid == os.getpid():
+            return self._recurso
+        with self._lock:
+            if self._pid == os.getpid():
+                return self._recurso
+            if self._ultimo_intento is not None and time.monotonic() - self._ultimo_intento < self._reintento:
+                return None
+            self._ultimo_intento = time.monotonic()
+            inicio = time.perf_counter()
+            try:
+                recurso = self._construir()
+            except Exception as e:
+                self.error = str(e)
+                reintento = f", se reintenta en {self._reintento:.0f}s" if self._reintento != float('inf') else ""
+                print(f"[WARN] {self.nombre} no disponible{reintento}: {e}")
+                return None
+            self.segundos_carga = round(time.perf_counter() - inicio, 3)
+            self._recurso = recurso
+            self.error = None
+            self._pid = os.getpid()
+            print(f"[OK] {self.nombre} cargado en {self.segundos_carga}s (pid {self._pid})")
+            return recurso
+
+    @property
+    def cargado(self):
+        return self._pid == os.getpid() and self._recurso is not None
+
+    def __bool__(self):
+        return self.obtener() is not None
+
+    def __getattr__(self, nombre):
+        recurso = self.obtener()
+        if recurso is None:
+            raise RuntimeError(f"{self.nombre} no disponible: {self.error}")
+        return getattr(recurso, nombre)
+
+    def estado(self):
+        return {
+            'cargado': self.cargado,
+            'segundos_carga': self.segundos_carga,
+            'error': self.error
+        }
+
+
+class SondaDisponibilidad:
+    """
+    Disponibilidad de un servicio HTTP consultada en segundo plano
+
+    Hasta la primera respuesta el servicio se considera disponible: quien lo
+    usa ya maneja sus errores, y así no se pierden envíos durante el arranque.
+    """
+
+    def __init__(self, nombre, url, intervalo_segundos=60, timeout_segundos=5):
+        self.nombre = nombre
+        self.url = url
+        self.intervalo = intervalo_segundos
+        self.timeout = timeout_segundos
+        self._disponible = None
+        self._pid = None
+        self._hilo = None
+        self._lock = threading.Lock()
+        self.ultima_consulta = None
+        self.ultimo_error = None
+        _servicios.append(self)
+
+    def _iniciar(self):
+        if self._pid == os.getpid() and self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._hilo is not None and self._hilo.is_alive():
+                return
+            self._pid = os.getpid()
+            self._hilo = threading.Thread(target=self._bucle, name=f"sonda-{self.nombre}", daemon=True)
+            self._hilo.start()
+
+    def _bucle(self):
+        while True:
+            self.consultar()
+            time.sleep(self.intervalo)
+
+    def consultar(self):
+        """Consultar el /health ahora (bloqueante: solo desde el hilo de la sonda o un endpoint de diagnóstico)"""
+        try:
+            response = requests.get(self.url, timeout=self.timeout)
+            disponible = response.status_code == 200
+            self.ultimo_error = None if disponible else f"status {response.status_code}"
+        except Exception as e:
+            disponible = False
+            self.ultimo_error = str(e)
+        if disponible != self._disponible:
+            if disponible:
+                print(f"[OK] {self.nombre} conectado en: {self.url}")
+            else:
+                print(f"[WARN] {self.nombre} no disponible: {self.ultimo_error}")
+        self._disponible = disponible
+        self.ultima_consulta = time.time()
+        return disponible
+
+    @property
+    def disponible(self):
+        self._iniciar()
+        return self._disponible is not False
+
+    def estado(self):
+        return {
+            'disponible': self._disponible is not False,
+            'verificado': self._disponible is not None,
+            'ultima_consulta': self.ultima_consulta,
+            'error': self.ultimo_error
+        }
+
+
+def estado_servicios():
+    """Estado de cada handle registrado, sin forzar su carga"""
+    return {servicio.nombre: servicio.estado() for servicio in _servicios}
+
+
+_precalentado_pid = None
+_lock_precalentado = threading.Lock()
+
+
+def precalentar(*tareas):
+    """Correr las tareas una vez por proceso en un hilo de fondo (los errores solo se registran)"""
+    global _precalentado_pid
+    if _precalentado_pid == os.getpid():
+        return
+    with _lock_precalentado:
+        if _precalentado_pid == os.getpid():
+            return
+        _precalentado_pid = os.getpid()
+
+    def _correr():
+        for tarea in tareas:
+            try:
+                tarea()
+            except Exception as e:
+                print(f"[WARN] Precalentamiento {getattr(tarea, '__name__', tarea)} falló: {e}")
+
+    threading.Thread(target=_correr, name="precalentar", daemon=True).start()
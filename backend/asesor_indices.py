@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Asesor de índices: EXPLAIN de las consultas que emite cada endpoint caliente
+ExpoKossodo 2025
+
+Levanta la app con el test client de Flask contra una base MySQL local de
+prueba (nunca la de producción), recorre ESCENARIOS (los endpoints de
+registro, verificación, sala, leads y administración, con un asistente creado
+en la misma corrida), captura cada sentencia que pasa por el pool con sus
+parámetros y corre EXPLAIN de cada SELECT/UPDATE/DELETE distinto.
+
+Por endpoint reporta:
+
+- FULL SCAN: type ALL sobre una tabla; INDEX SCAN: recorrido completo de un índice.
+- FILESORT / TEMPORARY en Extra.
+
+y sugiere un índice compuesto: columnas comparadas por igualdad (o IN / JOIN),
+luego las de ORDER BY / GROUP BY y al final la primera de rango. Si sumando
+las columnas leídas de esa tabla no supera --max-columnas (y ninguna es
+TEXT/BLOB/JSON) lo propone como índice cubriente. Si ya existe un índice con
+esas columnas al inicio se indica su nombre en lugar del CREATE INDEX.
+
+Con tablas chicas el optimizador prefiere el full scan aunque haya índice: por
+eso se siembran --registros asistentes sintéticos y el reporte marca cuándo el
+scan tenía un índice candidato (possible_keys). Todo lo sembrado se elimina
+al terminar (salvo --conservar).
+
+Los índices aceptados se agregan como migración en migraciones.py.
+
+Uso:
+    python asesor_indices.py --inicializar               # crea el esquema y los eventos de ejemplo
+    python asesor_indices.py --registros 5000 --json reporte_indices.json
+    python asesor_indices.py --escenario registro --escenario sala_verificar
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+# La app no debe hablar con servicios reales durante el análisis
+os.environ.setdefault('EMAIL_MAX_INTENTOS', '1')
+
+HOSTS_LOCALES = {'127.0.0.1', 'localhost', '::1'}
+PREFIJO_CORREO = 'asesor-indices-'
+TIPOS_NO_INDEXABLES = {'tinytext', 'text', 'mediumtext', 'longtext', 'tinyblob', 'blob',
+                       'mediumblob', 'longblob', 'json'}
+PALABRAS_RESERVADAS = {'where', 'on', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'natural',
+                       'straight_join', 'group', 'order', 'limit', 'set', 'using', 'for', 'having',
+                       'union', 'and', 'or', 'as'}
+
+RE_TABLA = re.compile(r'\b(?:FROM|JOIN|UPDATE)\s+`?(expokossodo_\w+)`?(?:\s+(?:AS\s+)?`?(\w+)`?)?', re.I)
+RE_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+RE_ORDEN = re.compile(r'\b(?:ORDER|GROUP)\s+BY\s+(.+?)(?=\bLIMIT\b|\bHAVING\b|\bFOR\s+UPDATE\b|\bORDER\s+BY\b|\)|$)',
+                      re.I | re.S)
+
+# Consultas que no se alcanzan desde un endpoint sin efectos externos (jobs y scripts)
+CONSULTAS_SUELTAS = [
+    ('transcripcion_pendientes', """
+        SELECT id, consulta FROM expokossodo_consultas
+        WHERE uso_transcripcion = 1 AND (resumen IS NULL OR resumen = '')
+    """),
+    ('consolidar_duplicados', """
+        SELECT numero, COUNT(*) as cantidad, GROUP_CONCAT(id ORDER BY id) as ids
+        FROM expokossodo_registros
+        GROUP BY numero
+        HAVING COUNT(*) > 1
+    """),
+]
+
+
+def _correo_escenario():
+    return f"{PREFIJO_CORREO}escenario-{int(time.time())}@expokossodo.test"
+
+
+# (nombre, método, ruta, cuerpo JSON); ruta y cuerpo pueden depender del contexto de la corrida
+ESCENARIOS = [
+    ('eventos', 'GET', '/api/eventos', None),
+    ('evento_slug', 'GET', lambda c: f"/api/evento/{c['slug']}", None),
+    ('registro', 'POST', '/api/registro', lambda c: {
+        'nombres': 'Asesor Indices', 'correo': c['correo'], 'empresa': 'Kossodo', 'cargo': 'Analista',
+        'numero': '987654321', 'expectativas': '', 'eventos_seleccionados': [c['evento_id']]}),
+    ('registro_actualizacion', 'POST', '/api/registro', lambda c: {
+        'nombres': 'Asesor Indices', 'correo': c['correo'], 'empresa': 'Kossodo', 'cargo': 'Analista',
+        'numero': '987654321', 'expectativas': '', 'eventos_seleccionados': [c['evento_id_2']]}),
+    ('verificar_buscar', 'POST', '/api/verificar/buscar-usuario', lambda c: {'qr_code': c['qr_code']}),
+    ('verificar_cache', 'GET', '/api/verificar/obtener-todos-registros', None),
+    ('verificar_delta', 'GET', lambda c: f"/api/verificar/registros-delta?desde={c['desde']}", None),
+    ('verificar_eventos_usuario', 'GET', lambda c: f"/api/verificar/obtener-eventos-usuario/{c['registro_id']}", None),
+    ('verificar_confirmar', 'POST', '/api/verificar/confirmar-asistencia',
+     lambda c: {'registro_id': c['registro_id'], 'qr_code': c['qr_code']}),
+    ('sala_eventos', 'GET', '/api/verificar-sala/eventos', None),
+    ('sala_evento', 'GET', lambda c: f"/api/verificar-sala/evento/{c['evento_id']}", None),
+    ('sala_verificar', 'POST', '/api/verificar-sala/verificar', lambda c: {
+        'qr_code': c['qr_code'], 'evento_id': c['evento_id'], 'asesor_verificador': 'asesor-indices'}),
+    ('sala_asistentes', 'GET', lambda c: f"/api/verificar-sala/asistentes/{c['evento_id']}", None),
+    ('leads_cliente', 'POST', '/api/leads/cliente-por-qr', lambda c: {'qr_code': c['qr_code']}),
+    ('leads_guardar', 'POST', '/api/leads/guardar-consulta', lambda c: {
+        'registro_id': c['registro_id'], 'asesor_nombre': 'asesor-indices',
+        'consulta': 'Consulta del asesor de índices', 'uso_transcripcion': False}),
+    ('leads_historial', 'POST', '/api/leads/cliente-historial', lambda c: {'registro_id': c['registro_id']}),
+    ('admin_registros', 'GET', '/api/registros?limite=50', None),
+    ('admin_stats', 'GET', '/api/stats', None),
+    ('admin_eventos', 'GET', '/api/admin/eventos', None),
+]
+
+
+# --- Captura ---
+
+class Captura:
+    """Sentencias ejecutadas por el pool, agrupadas por escenario"""
+
+    def __init__(self):
+        self.escenario = None
+        self.sentencias = {}
+
+    def registrar(self, operacion, params):
+        from flask import has_request_context
+
+        escenario = self.escenario if has_request_context() and self.escenario else '(segundo plano)'
+        sql = operacion.decode() if isinstance(operacion, (bytes, bytearray)) else str(operacion)
+        clave = ' '.join(sql.split())
+        self.sentencias.setdefault(escenario, {}).setdefault(clave, (sql, params))
+
+    def instalar(self):
+        """Envolver CursorObservado.execute: todo cursor del pool pasa por ahí"""
+        import pool_bd
+
+        original = pool_bd.CursorObservado.execute
+        captura = self
+
+        def execute(cursor, operacion, *args, **kwargs):
+            captura.registrar(operacion, args[0] if args else kwargs.get('params'))
+            return original(cursor, operacion, *args, **kwargs)
+
+        pool_bd.CursorObservado.execute = execute
+
+
+# --- Análisis de SQL ---
+
+def tablas_de(sql):
+    """{alias o nombre: tabla} de las tablas expokossodo_* de la sentencia"""
+    tablas = {}
+    for tabla, alias in RE_TABLA.findall(sql):
+        if alias and alias.lower() not in PALABRAS_RESERVADAS:
+            tablas[alias] = tabla
+        tablas[tabla] = tabla
+    return tablas
+
+
+def _patron_columna(prefijo, columna, sin_prefijo):
+    if sin_prefijo:
+        return rf'(?:\b{prefijo}\.|(?<![\.\w]))`?{columna}`?\b'
+    return rf'\b{prefijo}\.`?{columna}`?\b'
+
+
+def sugerir_indice(sql, prefijo, tabla, columnas_tabla, max_columnas):
+    """
+    Columnas del índice sugerido para la tabla de la sentencia
+
+    Returns:
+        tuple: (columnas_clave, columnas_cubriente o None)
+    """
+    texto = RE_LITERAL.sub('?', sql)
+    unica = len(set(tablas_de(texto).values())) == 1
+    # Predicados: WHERE de un UPDATE (el SET es asignación), desde el primer FROM en el resto
+    separador = r'\bWHERE\b' if texto.lstrip()[:6].upper() == 'UPDATE' else r'\bFROM\b'
+    partes = re.split(separador, texto, maxsplit=1, flags=re.I)
+    cuerpo = partes[1] if len(partes) > 1 else ''
+
+    def usa(columna, patron, region):
+        return re.search(patron.replace('{col}', _patron_columna(prefijo, columna, unica)), region, re.I)
+
+    referenciadas = [c for c in columnas_tabla if re.search(_patron_columna(prefijo, c, unica), texto, re.I)]
+    # Igualdad contra otra columna (a.x = b.y) es de JOIN: solo guía el índice si no hay igualdad con valores
+    junta = [c for c in referenciadas
+             if usa(c, r'{col}\s*=\s*`?\w+`?\.', cuerpo) or usa(c, r'\w\.`?\w+`?\s*=\s*{col}', cuerpo)]
+    igualdad = [c for c in referenciadas
+                if c not in junta and (usa(c, r'{col}\s*(?:=|<=>|IN\s*\(|IS\s+NULL)', cuerpo)
+                                       or usa(c, r'(?<![<>!])=\s*{col}', cuerpo))] or junta
+    rango = [c for c in referenciadas
+             if c not in igualdad and (usa(c, r'{col}\s*(?:[<>]=?|BETWEEN\b|LIKE\b)', cuerpo)
+                                       or usa(c, r'[<>]=?\s*{col}', cuerpo))]
+    orden = []
+    for clausula in RE_ORDEN.findall(cuerpo):
+        for c in referenciadas:
+            if c not in igualdad and c not in orden and re.search(_patron_columna(prefijo, c, unica), clausula, re.I):
+                orden.append(c)
+
+    if 'id' in igualdad:
+        return ['id'], None  # Búsqueda por PK
+
+    # InnoDB agrega la PK a cada índice secundario: 'id' no hace falta en la clave ni para cubrir
+    claves = [c for c in igualdad + orden + rango[:1] if columnas_tabla[c] not in TIPOS_NO_INDEXABLES]
+    indexable = [c for c in claves if c != 'id']
+    if not indexable:
+        return claves, None  # Sin predicado o solo ORDER BY id: el orden de la PK
+    resto = [c for c in referenciadas if c not in indexable and c != 'id']
+    cubriente = indexable + resto
+    if (len(cubriente) > max_columnas or any(columnas_tabla[c] in TIPOS_NO_INDEXABLES for c in resto)
+            or texto.lstrip()[:6].upper() != 'SELECT'):
+        cubriente = None
+    return indexable, cubriente
+
+
+# --- Esquema ---
+
+class Esquema:
+    """Columnas e índices de la base analizada (INFORMATION_SCHEMA, con cache)"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._columnas = {}
+        self._indices = {}
+
+    def columnas(self, tabla):
+        if tabla not in self._columnas:
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                ORDER BY ORDINAL_POSITION
+            """, (tabla,))
+            self._columnas[tabla] = {nombre: tipo.lower() for nombre, tipo in cursor.fetchall()}
+            cursor.close()
+        return self._columnas[tabla]
+
+    def indices(self, tabla):
+        if tabla not in self._indices:
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                SELECT INDEX_NAME, COLUMN_NAME FROM INFORMATION_SCHEMA.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                ORDER BY INDEX_NAME, SEQ_IN_INDEX
+            """, (tabla,))
+            indices = {}
+            for nombre, columna in cursor.fetchall():
+                indices.setdefault(nombre, []).append(columna)
+            self._indices[tabla] = indices
+            cursor.close()
+        return self._indices[tabla]
+
+    def indice_existente(self, tabla, columnas):
+        """Nombre de un índice que empieza por esas columnas, o None"""
+        for nombre, columnas_indice in self.indices(tabla).items():
+            if columnas_indice[:len(columnas)] == columnas:
+                return nombre
+        return None
+
+
+# --- EXPLAIN ---
+
+def explicar(connection, esquema, sql, params, max_columnas):
+    """Hallazgos del EXPLAIN de una sentencia ([] si el plan usa índices)"""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("EXPLAIN " + sql, params or ())
+        plan = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    tablas = tablas_de(RE_LITERAL.sub('?', sql))
+    hallazgos = []
+    for fila in plan:
+        tipo = (fila.get('type') or '').upper()
+        extra = fila.get('Extra') or ''
+        problemas = []
+        if tipo == 'ALL':
+            problemas.append('FULL SCAN')
+        elif tipo == 'INDEX':
+            problemas.append('INDEX SCAN')
+        if 'Using filesort' in extra:
+            problemas.append('FILESORT')
+        if 'Using temporary' in extra:
+            problemas.append('TEMPORARY')
+        if not problemas:
+            continue
+
+        alias = fila.get('table')
+        tabla = tablas.get(alias)
+        hallazgo = {
+            'problemas': problemas,
+            'tabla': tabla or alias,
+            'filas': fila.get('rows'),
+            'possible_keys': fila.get('possible_keys'),
+            'key': fila.get('key'),
+            'extra': extra,
+            'indice': None,
+            'cubriente': False,
+            'existente': None,
+        }
+        if tabla:
+            claves, cubriente = sugerir_indice(sql, alias, tabla, esquema.columnas(tabla), max_columnas)
+            if claves:
+                columnas = cubriente or claves
+                hallazgo['existente'] = esquema.indice_existente(tabla, claves)
+                hallazgo['cubriente'] = cubriente is not None
+                nombre = f"idx_{tabla.replace('expokossodo_', '')}_{'_'.join(columnas)}"[:64]
+                hallazgo['indice'] = f"CREATE INDEX {nombre} ON {tabla} ({', '.join(columnas)})"
+        hallazgos.append(hallazgo)
+    return hallazgos
+
+
+# --- Datos sintéticos ---
+
+def sembrar(connection, cantidad, evento_ids):
+    """Asistentes sintéticos (números repetidos para GROUP BY), inscripciones y consultas"""
+    from nucleo import generar_texto_qr
+
+    cursor = connection.cursor()
+    try:
+        registros = []
+        for i in range(cantidad):
+            numero = str(900000000 + i % max(cantidad // 2, 1))
+            registros.append((f"Asesor {i}", f"{PREFIJO_CORREO}{i}@expokossodo.test", 'Kossodo', 'Analista',
+                              numero, generar_texto_qr(f"Asesor {i}", numero, 'Analista', 'Kossodo') + str(i)))
+        for inicio in range(0, cantidad, 500):
+            cursor.executemany("""
+                INSERT INTO expokossodo_registros (nombres, correo, empresa, cargo, numero, qr_code, qr_generado_at)
+                VALUES (%s, %s, %s, %s, %s, %s, NOW())
+            """, registros[inicio:inicio + 500])
+
+        cursor.execute("SELECT id FROM expokossodo_registros WHERE correo LIKE %s", (PREFIJO_CORREO + '%',))
+        ids = [fila[0] for fila in cursor.fetchall()]
+        if evento_ids:
+            relaciones = [(registro_id, evento_ids[(registro_id + k) % len(evento_ids)])
+                          for registro_id in ids for k in (0, 7)]
+            cursor.executemany("""
+                INSERT IGNORE INTO expokossodo_registro_eventos (registro_id, evento_id) VALUES (%s, %s)
+            """, relaciones)
+        cursor.executemany("""
+            INSERT INTO expokossodo_consultas (registro_id, asesor_nombre, consulta, uso_transcripcion)
+            VALUES (%s, 'asesor-indices', 'Consulta sintética', %s)
+        """, [(registro_id, registro_id % 2) for registro_id in ids[::4]])
+        connection.commit()
+        print(f"[OK] {len(ids)} asistentes sintéticos sembrados")
+    finally:
+        cursor.close()
+
+
+def limpiar(connection):
+    """Eliminar todo lo creado por la corrida y reconciliar los contadores que tocó"""
+    import contadores_eventos
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute("DELETE FROM expokossodo_registros WHERE correo LIKE %s", (PREFIJO_CORREO + '%',))
+        eliminados = cursor.rowcount
+        connection.commit()
+    finally:
+        cursor.close()
+    contadores_eventos.reconciliar(connection)
+    print(f"[OK] {eliminados} registros del asesor eliminados")
+
+
+# --- Corrida ---
+
+def ejecutar_escenarios(cliente, captura, contexto, seleccion):
+    """Recorrer los escenarios con el test client; devuelve {nombre: status}"""
+    estados = {}
+    for nombre, metodo, ruta, cuerpo in ESCENARIOS:
+        if seleccion and nombre not in seleccion:
+            continue
+        try:
+            ruta = ruta(contexto) if callable(ruta) else ruta
+            cuerpo = cuerpo(contexto) if callable(cuerpo) else cuerpo
+        except KeyError as e:
+            print(f"[WARN] Escenario {nombre} omitido: falta {e} en el contexto")
+            continue
+
+        captura.escenario = nombre
+        respuesta = cliente.open(ruta, method=metodo, json=cuerpo)
+        captura.escenario = None
+        estados[nombre] = (metodo, ruta, respuesta.status_code)
+
+        datos = respuesta.get_json(silent=True) or {}
+        if nombre == 'registro' and datos.get('registro_id'):
+            contexto['registro_id'] = datos['registro_id']
+            contexto['qr_code'] = datos.get('qr_code')
+        if respuesta.status_code >= 400:
+            print(f"[WARN] {nombre}: {metodo} {ruta} → {respuesta.status_code}")
+    return estados
+
+
+def contexto_inicial(connection):
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT id, slug, fecha, hora FROM expokossodo_eventos
+            WHERE slots_ocupados < slots_disponibles
+            ORDER BY fecha, hora, sala
+        """)
+        eventos = cursor.fetchall()
+        cursor.execute("SELECT NOW() AS ahora")
+        ahora = cursor.fetchone()['ahora']
+    finally:
+        cursor.close()
+
+    contexto = {'correo': _correo_escenario(), 'desde': ahora.isoformat(), 'evento_ids': [e['id'] for e in eventos]}
+    if eventos:
+        primero = eventos[0]
+        contexto['evento_id'] = primero['id']
+        if primero.get('slug'):
+            contexto['slug'] = primero['slug']
+        # Otro horario: la actualización del registro no debe chocar con la primera inscripción
+        otro = next((e for e in eventos if (e['fecha'], e['hora']) != (primero['fecha'], primero['hora'])), None)
+        if otro:
+            contexto['evento_id_2'] = otro['id']
+    return contexto
+
+
+def imprimir_reporte(estados, resultados):
+    pendientes = 0
+    for escenario, sentencias in resultados.items():
+        metodo, ruta, status = estados.get(escenario, ('', '', ''))
+        print(f"\n=== {escenario} {metodo} {ruta} {f'[{status}]' if status else ''}".rstrip() + " ===")
+        if not sentencias:
+            print("  (sin consultas a la BD)")
+        for sentencia in sentencias:
+            resumen = ' '.join(sentencia['sql'].split())[:110]
+            if sentencia.get('error'):
+                print(f"  [ERROR] EXPLAIN falló ({sentencia['error']}): {resumen}")
+                continue
+            if not sentencia['hallazgos']:
+                continue
+            print(f"  {resumen}")
+            for h in sentencia['hallazgos']:
+                print(f"    [{'/'.join(h['problemas'])}] {h['tabla']} filas={h['filas']} "
+                      f"key={h['key']} possible_keys={h['possible_keys']}")
+                if h['existente']:
+                    print(f"      índice existente {h['existente']}: el optimizador prefirió el scan (¿tabla chica?)")
+                elif h['indice']:
+                    pendientes += 1
+                    print(f"      sugerido{' (cubriente)' if h['cubriente'] else ''}: {h['indice']};")
+                else:
+                    print("      sin predicado indexable: lectura completa esperada")
+    return pendientes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN de las consultas por endpoint y sugerencia de índices")
+    parser.add_argument('--host', default=os.getenv('ASESOR_DB_HOST', '127.0.0.1'))
+    parser.add_argument('--puerto', type=int, default=int(os.getenv('ASESOR_DB_PORT', 3306)))
+    parser.add_argument('--usuario', default=os.getenv('ASESOR_DB_USER', 'root'))
+    parser.add_argument('--password', default=os.getenv('ASESOR_DB_PASSWORD', ''))
+    parser.add_argument('--base', default=os.getenv('ASESOR_DB_NAME', 'expokossodo_asesor'))
+    parser.add_argument('--permitir-remoto', action='store_true', help='Aceptar un host que no es local')
+    parser.add_argument('--inicializar', action='store_true', help='Crear la base y correr init_database()')
+    parser.add_argument('--registros', type=int, default=2000, help='Asistentes sintéticos a sembrar')
+    parser.add_argument('--escenario', action='append', help='Correr solo estos escenarios (repetible)')
+    parser.add_argument('--max-columnas', type=int, default=5, help='Máximo de columnas de un índice cubriente')
+    parser.add_argument('--json', help='Guardar el reporte completo en este archivo')
+    parser.add_argument('--conservar', action='store_true', help='No eliminar los datos sintéticos')
+    args = parser.parse_args()
+
+    if args.host not in HOSTS_LOCALES and not args.permitir_remoto:
+        print(f"[ERROR] {args.host} no es local: el asesor siembra y borra datos (usar --permitir-remoto)")
+        sys.exit(1)
+
+    import mysql.connector
+
+    config = {'host': args.host, 'port': args.puerto, 'user': args.usuario, 'password': args.password,
+              'autocommit': True, 'connection_timeout': 10}
+    try:
+        if args.inicializar:
+            connection = mysql.connector.connect(**config)
+            cursor = connection.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{args.base}`")
+            cursor.close()
+            connection.close()
+        connection = mysql.connector.connect(database=args.base, **config)
+    except mysql.connector.Error as e:
+        print(f"[ERROR] No se pudo conectar a la base de prueba: {e}")
+        sys.exit(1)
+
+    import app
+    import nucleo
+
+    # load_dotenv(override=True) de nucleo puede traer la BD y el SMTP reales del .env
+    nucleo.DB_CONFIG.update(database=args.base, **{k: v for k, v in config.items() if k != 'autocommit'})
+    os.environ.update(EMAIL_HOST='127.0.0.1', EMAIL_PORT='1', TRANSCRIPCION_API_URL='http://127.0.0.1:1')
+
+    if args.inicializar and not nucleo.init_database():
+        print("[ERROR] init_database() falló")
+        sys.exit(1)
+
+    captura = Captura()
+    captura.instalar()
+    esquema = Esquema(connection)
+    contexto = contexto_inicial(connection)
+    if not contexto['evento_ids']:
+        print("[WARN] No hay eventos con cupo: los escenarios de registro y sala quedan fuera (usar --inicializar)")
+
+    try:
+        if args.registros:
+            sembrar(connection, args.registros, contexto['evento_ids'])
+        for tabla in ('expokossodo_registros', 'expokossodo_registro_eventos', 'expokossodo_consultas'):
+            cursor = connection.cursor()
+            cursor.execute(f"ANALYZE TABLE {tabla}")
+            cursor.fetchall()
+            cursor.close()
+
+        inicio = time.time()
+        estados = ejecutar_escenarios(app.app.test_client(), captura, contexto, set(args.escenario or []))
+        print(f"[INFO] {len(estados)} escenarios en {time.time() - inicio:.2f}s")
+
+        sentencias = dict(captura.sentencias)
+        if not args.escenario:
+            for nombre, sql in CONSULTAS_SUELTAS:
+                sentencias[nombre] = {' '.join(sql.split()): (sql, None)}
+
+        resultados = {}
+        for escenario, por_clave in sentencias.items():
+            resultados[escenario] = []
+            for sql, params in por_clave.values():
+                if sql.lstrip()[:6].upper() not in ('SELECT', 'UPDATE', 'DELETE') or 'expokossodo_' not in sql:
+                    continue
+                entrada = {'sql': sql, 'hallazgos': []}
+                try:
+                    entrada['hallazgos'] = explicar(connection, esquema, sql, params, args.max_columnas)
+                except mysql.connector.Error as e:
+                    entrada['error'] = e.msg
+                resultados[escenario].append(entrada)
+    finally:
+        if not args.conservar:
+            limpiar(connection)
+        connection.close()
+
+    pendientes = imprimir_reporte(estados, resultados)
+    sugeridos = sorted({h['indice'] for s in resultados.values() for e in s for h in e['hallazgos']
+                        if h['indice'] and not h['existente']})
+    print(f"\n[INFO] {sum(len(s) for s in resultados.values())} sentencias analizadas, "
+          f"{pendientes} hallazgos con índice sugerido")
+    for indice in sugeridos:
+        print(f"  {indice};")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump({'generado': datetime.now().isoformat(), 'base': args.base,
+                       'escenarios': {k: list(v) for k, v in estados.items()}, 'resultados': resultados,
+                       'sugeridos': sugeridos}, archivo, ensure_ascii=False, indent=2, default=str)
+        print(f"[OK] Reporte guardado en {args.json}")
+
+    if sugeridos:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
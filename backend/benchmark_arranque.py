@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque: costo de importar app.py y tiempo hasta el primer /health
+ExpoKossodo 2025
+
+Mide en procesos nuevos (como un arranque en frío de Render):
+
+- importtime: python -X importtime -c "import app"; tiempo total del import y
+  los módulos con mayor tiempo acumulado.
+- primera respuesta: segundos desde el inicio del proceso hasta que /health
+  responde 200, con el test client de Flask (--servidor flask) o levantando
+  gunicorn con gunicorn_config.py (--servidor gunicorn).
+
+Por defecto TRANSCRIPCION_API_URL apunta a un socket local que acepta la
+conexión y nunca responde (servicio de transcripción lento): antes el import
+esperaba el timeout completo del health check; ahora la sonda corre en
+segundo plano. --transcripcion-real usa la URL configurada.
+
+Falla (exit 2) si /health no responde 200 o tarda más que --limite-segundos.
+
+Uso:
+    python benchmark_arranque.py
+    python benchmark_arranque.py --servidor gunicorn --puerto 5055
+    python benchmark_arranque.py --top 25 --limite-segundos 3
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+SCRIPT_PRIMERA_RESPUESTA = """
+import json, time
+inicio = time.perf_counter()
+import app
+importado = time.perf_counter()
+respuesta = app.app.test_client().get('/health')
+print(json.dumps({'import_s': importado - inicio, 'health_s': time.perf_counter() - inicio,
+                  'status': respuesta.status_code}))
+"""
+
+
+def servicio_colgado():
+    """Socket que acepta conexiones y nunca responde"""
+    servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    servidor.bind(('127.0.0.1', 0))
+    servidor.listen(16)
+    return servidor, f"http://127.0.0.1:{servidor.getsockname()[1]}"
+
+
+def medir_importtime(entorno, top):
+    inicio = time.perf_counter()
+    resultado = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=DIRECTORIO,
+                               env=entorno, capture_output=True, text=True)
+    total = time.perf_counter() - inicio
+    if resultado.returncode != 0:
+        print(f"[ERROR] import app falló:\n{resultado.stderr[-2000:]}")
+        return None
+
+    modulos = []
+    for linea in resultado.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        # Solo imports de primer nivel (sin sangría): lo que app.py pide directamente
+        if not nombre.startswith('   '):
+            modulos.append((int(acumulado), nombre.strip()))
+
+    print(f"\n[BENCH] importtime: proceso completo {total:.2f}s")
+    for acumulado, nombre in sorted(modulos, reverse=True)[:top]:
+        print(f"  {acumulado / 1e6:7.3f}s  {nombre}")
+    return total
+
+
+def primera_respuesta_flask(entorno):
+    resultado = subprocess.run([sys.executable, '-c', SCRIPT_PRIMERA_RESPUESTA], cwd=DIRECTORIO,
+                               env=entorno, capture_output=True, text=True)
+    if resultado.returncode != 0:
+        print(f"[ERROR] El proceso de prueba falló:\n{resultado.stderr[-2000:]}")
+        return None, None
+    datos = json.loads(resultado.stdout.strip().splitlines()[-1])
+    print(f"\n[BENCH] Primera respuesta (test client): import {datos['import_s']:.2f}s | "
+          f"/health {datos['health_s']:.2f}s (status {datos['status']})")
+    return datos['health_s'], datos['status']
+
+
+def primera_respuesta_gunicorn(entorno, puerto, espera_maxima):
+    entorno = dict(entorno, PORT=str(puerto))
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', 'app:app'],
+                               cwd=DIRECTORIO, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    status = None
+    try:
+        while time.perf_counter() - inicio < espera_maxima and proceso.poll() is None:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/health", timeout=1) as respuesta:
+                    status = respuesta.status
+                    break
+            except OSError:
+                time.sleep(0.05)
+        segundos = time.perf_counter() - inicio
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=30)
+
+    if status is None:
+        print(f"[ERROR] gunicorn no respondió /health en {espera_maxima:.0f}s")
+        return None, None
+    print(f"\n[BENCH] Primera respuesta (gunicorn, puerto {puerto}): /health {segundos:.2f}s (status {status})")
+    return segundos, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo de importar app.py y tiempo hasta el primer /health")
+    parser.add_argument('--servidor', choices=['flask', 'gunicorn'], default='flask')
+    parser.add_argument('--puerto', type=int, default=5055)
+    parser.add_argument('--top', type=int, default=15, help='Módulos a mostrar por tiempo acumulado')
+    parser.add_argument('--limite-segundos', type=float, default=3.0, help='Máximo aceptable hasta el primer /health')
+    parser.add_argument('--transcripcion-real', action='store_true', help='No simular un servicio de transcripción colgado')
+    args = parser.parse_args()
+
+    entorno = dict(os.environ)
+    servidor = None
+    if not args.transcripcion_real:
+        servidor, url = servicio_colgado()
+        entorno['TRANSCRIPCION_API_URL'] = url
+        print(f"[INFO] Servicio de transcripción simulado sin respuesta en {url}")
+
+    try:
+        if medir_importtime(entorno, args.top) is None:
+            sys.exit(1)
+        if args.servidor == 'gunicorn':
+            segundos, status = primera_respuesta_gunicorn(entorno, args.puerto, max(30, args.limite_segundos * 5))
+        else:
+            segundos, status = primera_respuesta_flask(entorno)
+    finally:
+        if servidor is not None:
+            servidor.close()
+
+    if segundos is None:
+        sys.exit(1)
+    dentro_del_limite = status == 200 and segundos <= args.limite_segundos
+    print(f"  Límite {args.limite_segundos:.1f}s | Arranque aceptable: {'SI' if dentro_del_limite else 'NO'}")
+    if not dentro_del_limite:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
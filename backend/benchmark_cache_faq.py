@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark: caché de preguntas frecuentes del chat (exacta + similitud)
+ExpoKossodo 2025
+
+Reproduce una secuencia de preguntas de apertura contra sesiones_chat en un
+SQLite temporal, como lo haría /api/chat: si la caché no responde, se
+"consulta al asistente" (respuesta simulada) y se guarda la respuesta.
+
+Reporta, por umbral de similitud:
+- tasa de aciertos exactos y por similitud (corridas del asistente evitadas)
+- aciertos incorrectos (solo con preguntas sintéticas, que traen la intención
+  esperada; en logs reales se listan pares para revisar a mano)
+- latencia de la búsqueda en caché (p50/p95)
+
+Uso:
+    python benchmark_cache_faq.py                          # preguntas sintéticas
+    python benchmark_cache_faq.py --log preguntas.jsonl    # log real ({"message": ...} por línea)
+    python benchmark_cache_faq.py --log preguntas.txt --umbrales 0.7,0.78,0.85
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import sesiones_chat
+
+INTENCIONES = {
+    'ubicacion_sala_{n}': [
+        "¿Dónde es la sala {n}?", "donde queda la sala {n}", "Dónde está la sala {n}?",
+        "ubicacion de la sala {n}", "¿Cómo llego a la sala {n}?", "sala {n} donde es"
+    ],
+    'hora_inicio': [
+        "¿A qué hora empieza el evento?", "a que hora empieza el evento", "A qué hora inicia la expo?",
+        "hora de inicio del evento", "¿Cuándo empieza el evento?", "a q hora empieza"
+    ],
+    'inscripcion': [
+        "¿Cómo me inscribo a las charlas?", "como me inscribo en las charlas", "Cómo inscribirme a una charla",
+        "quiero inscribirme a las charlas", "¿Dónde me registro para las charlas?", "como me registro"
+    ],
+    'estacionamiento': [
+        "¿Hay estacionamiento?", "hay estacionamiento?", "¿Dónde puedo estacionar?",
+        "estacionamiento del evento", "tienen parqueo?", "donde queda el estacionamiento"
+    ],
+    'direccion': [
+        "¿Cuál es la dirección del evento?", "direccion del evento", "¿Dónde es el evento?",
+        "donde se realiza la expo", "cual es la direccion", "ubicación del evento"
+    ],
+    'costo': [
+        "¿El evento tiene costo?", "es gratis el evento?", "¿Cuánto cuesta la entrada?",
+        "cuanto cuesta", "la entrada es gratuita?", "tiene costo la inscripcion"
+    ],
+    'certificado': [
+        "¿Dan certificado?", "dan certificado de asistencia?", "¿Entregan constancia de las charlas?",
+        "certificado de participacion", "hay certificados?", "como obtengo mi certificado"
+    ],
+}
+
+
+def generar_sinteticas(cantidad):
+    """Preguntas con intención conocida, con ruido (mayúsculas, tildes, signos, tipeo)"""
+    plantillas = []
+    for intencion, variantes in INTENCIONES.items():
+        for n in ([1, 2, 3, 4] if '{n}' in intencion else [None]):
+            for variante in variantes:
+                plantillas.append((intencion.format(n=n), variante.format(n=n)))
+
+    preguntas = []
+    for _ in range(cantidad):
+        intencion, texto = random.choice(plantillas)
+        ruido = random.random()
+        if ruido < 0.2:
+            texto = texto.upper()
+        elif ruido < 0.4:
+            texto = texto.replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
+        elif ruido < 0.5:
+            texto = texto.strip('¿?') + '??'
+        elif ruido < 0.75:
+            # Error de tipeo: falta una letra en una palabra larga
+            palabras = texto.split()
+            largas = [i for i, palabra in enumerate(palabras) if len(palabra) > 5]
+            if largas:
+                i = random.choice(largas)
+                j = random.randrange(1, len(palabras[i]) - 1)
+                palabras[i] = palabras[i][:j] + palabras[i][j + 1:]
+                texto = ' '.join(palabras)
+        preguntas.append((intencion, texto))
+    return preguntas
+
+
+def cargar_log(ruta):
+    preguntas = []
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            linea = linea.strip()
+            if not linea:
+                continue
+            if ruta.endswith('.jsonl'):
+                linea = json.loads(linea).get('message', '')
+            preguntas.append((None, linea))
+    return preguntas
+
+
+def reproducir(preguntas, umbral):
+    ruta = os.path.join(tempfile.mkdtemp(prefix='bench_faq_'), 'chat.sqlite3')
+    almacen = sesiones_chat.AlmacenChat(ruta)
+    almacen.indice.umbral = umbral
+    almacen.max_respuestas = 10 ** 6
+
+    latencias = []
+    incorrectos = []
+    intencion_por_respuesta = {}
+    for intencion, texto in preguntas:
+        inicio = time.perf_counter()
+        respuesta = almacen.respuesta_cacheada(texto)
+        latencias.append(time.perf_counter() - inicio)
+
+        if respuesta is None:
+            # Simula la corrida del asistente y guarda la respuesta como lo hace /api/chat
+            respuesta = f"respuesta #{len(intencion_por_respuesta)} ({texto})"
+            intencion_por_respuesta[respuesta] = (intencion, texto)
+            almacen.guardar_respuesta(texto, respuesta)
+        elif intencion is not None and intencion_por_respuesta[respuesta][0] != intencion:
+            incorrectos.append((texto, intencion_por_respuesta[respuesta][1]))
+        elif intencion is None and len(incorrectos) < 15:
+            # Log real: sin intención esperada, se muestran pares para revisión manual
+            original = intencion_por_respuesta[respuesta][1]
+            if sesiones_chat.normalizar_pregunta(original) != sesiones_chat.normalizar_pregunta(texto):
+                incorrectos.append((texto, original))
+    return almacen.stats, latencias, incorrectos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la caché de preguntas frecuentes del chat")
+    parser.add_argument('--log', help='Log de preguntas (.txt una por línea o .jsonl con "message")')
+    parser.add_argument('--n', type=int, default=3000, help='Preguntas sintéticas a generar')
+    parser.add_argument('--umbrales', default='0.70,0.78,0.85,1.01', help='Umbrales de similitud a comparar')
+    parser.add_argument('--semilla', type=int, default=2025)
+    args = parser.parse_args()
+
+    random.seed(args.semilla)
+    if args.log:
+        try:
+            preguntas = cargar_log(args.log)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] No se pudo leer el log ({e})")
+            sys.exit(1)
+    else:
+        preguntas = generar_sinteticas(args.n)
+    print(f"[INFO] {len(preguntas)} preguntas ({'log ' + args.log if args.log else 'sintéticas'})")
+
+    for umbral in (float(u) for u in args.umbrales.split(',')):
+        stats, latencias, incorrectos = reproducir(preguntas, umbral)
+        total = len(preguntas)
+        aciertos = stats['hits_exactos'] + stats['hits_similares']
+        latencias.sort()
+        p50 = latencias[total // 2] * 1e6
+        p95 = latencias[int(total * 0.95) - 1] * 1e6
+
+        etiqueta = "solo exacta" if umbral > 1 else f"umbral {umbral:.2f}"
+        print(f"\n[BENCH] {etiqueta}")
+        print(f"  Aciertos: {aciertos}/{total} ({aciertos / total * 100:.1f}%) | "
+              f"exactos {stats['hits_exactos']} | similares {stats['hits_similares']} | "
+              f"corridas del asistente {stats['misses']}")
+        print(f"  Búsqueda en caché: p50 {p50:.0f} us | p95 {p95:.0f} us")
+        if args.log:
+            for texto, original in incorrectos[:5]:
+                print(f"  [REVISAR] '{texto}' -> respuesta de '{original}'")
+        else:
+            print(f"  Aciertos incorrectos: {len(incorrectos)}")
+            for texto, original in incorrectos[:3]:
+                print(f"    '{texto}' -> respuesta de '{original}'")
+
+
+if __name__ == '__main__':
+    main()
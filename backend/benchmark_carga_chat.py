@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga: latencia de escaneos con sesiones de chat en curso
+ExpoKossodo 2025
+
+Con workers sync, un /api/chat esperando al asistente de OpenAI ocupaba un
+worker completo durante segundos y los escaneos de QR quedaban en cola
+detrás. Esta prueba mide la latencia de /api/verificar/buscar-usuario contra
+un servidor levantado con gunicorn_config.py:
+
+1. base:       solo escaneos
+2. con chats:  los mismos escaneos mientras N chats (12 por defecto) se
+               mantienen en vuelo todo el tiempo
+
+Se compara p50/p95/max de ambas fases. Con gthread o gevent el p95 con chats
+debe quedar cerca del base; con sync crece hasta el tiempo de un chat.
+
+Requiere OPENAI_API_KEY/OPENAI_ASSISTANT_ID en el servidor (si no, /api/chat
+responde al instante y la prueba no ejerce la espera). --ruta-lenta permite
+usar otro endpoint lento, p. ej. /api/verificar/whatsapp-proxy.
+
+Uso:
+    GUNICORN_WORKER_CLASS=gevent gunicorn app:app --config gunicorn_config.py
+    python benchmark_carga_chat.py --url http://localhost:5000
+    python benchmark_carga_chat.py --chats 24 --duracion 30 --umbral-ms 300
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+import requests
+
+
+def obtener_qr(url):
+    """Tomar un QR real del caché de verificación"""
+    respuesta = requests.get(f"{url}/api/verificar/obtener-todos-registros", timeout=60)
+    respuesta.raise_for_status()
+    for registro in respuesta.json().get('registros', []):
+        if registro.get('qr_code'):
+            return registro['qr_code']
+    return None
+
+
+def escanear(url, qr, detener, latencias, errores, lock):
+    sesion = requests.Session()
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        try:
+            respuesta = sesion.post(f"{url}/api/verificar/buscar-usuario", json={'qr_code': qr}, timeout=60)
+            ok = respuesta.status_code == 200
+        except requests.RequestException:
+            ok = False
+        with lock:
+            latencias.append(time.perf_counter() - inicio)
+            if not ok:
+                errores[0] += 1
+
+
+def chatear(url, ruta, cuerpo, detener, resultados, lock):
+    sesion = requests.Session()
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        try:
+            respuesta = sesion.post(f"{url}{ruta}", json=cuerpo, timeout=180)
+            clave = respuesta.status_code
+        except requests.RequestException as e:
+            clave = type(e).__name__
+        with lock:
+            resultados.setdefault(clave, []).append(time.perf_counter() - inicio)
+
+
+def fase(nombre, args, qr, chats):
+    detener = threading.Event()
+    lock = threading.Lock()
+    latencias, errores, resultados_chat = [], [0], {}
+
+    hilos_chat = [threading.Thread(target=chatear, daemon=True,
+                                   args=(args.url, args.ruta_lenta, {'message': args.mensaje},
+                                         detener, resultados_chat, lock))
+                  for _ in range(chats)]
+    for hilo in hilos_chat:
+        hilo.start()
+    if chats:
+        # Dar tiempo a que los chats lleguen al servidor y queden esperando
+        time.sleep(args.calentamiento)
+
+    hilos_scan = [threading.Thread(target=escanear, daemon=True,
+                                   args=(args.url, qr, detener, latencias, errores, lock))
+                  for _ in range(args.escaneadores)]
+    for hilo in hilos_scan:
+        hilo.start()
+    time.sleep(args.duracion)
+    detener.set()
+    for hilo in hilos_scan:
+        hilo.join()
+
+    latencias.sort()
+    n = len(latencias)
+    p50 = latencias[n // 2] * 1000 if n else 0
+    p95 = latencias[max(0, int(n * 0.95) - 1)] * 1000 if n else 0
+    maximo = latencias[-1] * 1000 if n else 0
+
+    print(f"\n[BENCH] {nombre}: {args.escaneadores} escaneadores, {chats} chats en vuelo, {args.duracion}s")
+    print(f"  Escaneos: {n} ({n / args.duracion:.1f}/s) | errores {errores[0]}")
+    print(f"  Latencia: p50 {p50:.1f} ms | p95 {p95:.1f} ms | max {maximo:.1f} ms")
+    if chats:
+        with lock:
+            for clave, tiempos in sorted(resultados_chat.items(), key=lambda item: str(item[0])):
+                print(f"  Chats {clave}: {len(tiempos)} completados, promedio {sum(tiempos) / len(tiempos):.1f}s")
+    return p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de escaneos con chats en curso")
+    parser.add_argument('--url', default='http://localhost:5000', help='Servidor a probar')
+    parser.add_argument('--qr', help='QR a escanear (por defecto uno real del servidor)')
+    parser.add_argument('--chats', type=int, default=12, help='Sesiones de chat simultáneas')
+    parser.add_argument('--escaneadores', type=int, default=4, help='Clientes escaneando en paralelo')
+    parser.add_argument('--duracion', type=float, default=20, help='Segundos de medición por fase')
+    parser.add_argument('--calentamiento', type=float, default=2, help='Espera tras lanzar los chats')
+    parser.add_argument('--ruta-lenta', default='/api/chat', help='Endpoint lento a mantener en vuelo')
+    parser.add_argument('--mensaje', default='¿Qué charlas hay sobre cromatografía?')
+    parser.add_argument('--umbral-ms', type=float, default=500, help='p95 máximo aceptado con chats')
+    args = parser.parse_args()
+
+    try:
+        qr = args.qr or obtener_qr(args.url)
+    except requests.RequestException as e:
+        print(f"[ERROR] No se pudo contactar al servidor {args.url}: {e}")
+        sys.exit(1)
+    if not qr:
+        print("[ERROR] No hay registros con QR para escanear (usar --qr)")
+        sys.exit(1)
+
+    p95_base = fase("Base", args, qr, 0)
+    p95_chats = fase("Con chats", args, qr, args.chats)
+
+    if p95_base:
+        print(f"\n[INFO] p95 con chats / base: x{p95_chats / p95_base:.1f}")
+    if p95_chats > args.umbral_ms:
+        print(f"[ERROR] p95 con chats {p95_chats:.1f} ms supera el umbral de {args.umbral_ms:.0f} ms")
+        sys.exit(2)
+    print(f"[OK] Escaneos dentro del umbral ({p95_chats:.1f} ms <= {args.umbral_ms:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
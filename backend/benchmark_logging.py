@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark de costo del logging por request en los endpoints de escaneo
+ExpoKossodo 2025
+
+Simula una ráfaga de escaneos (buscar-usuario y verificar-sala) y mide cuánto
+tiempo agrega el logging al hilo del request, comparando:
+
+- legacy:       log_request_info anterior (tres print() por request, incluido
+                str(request.get_json())[:100])
+- estructurado: logs_estructurados (un registro JSON por request, encolado y
+                escrito por el QueueListener, con muestreo de rutas de escaneo)
+
+La salida va a un pipe que otro hilo drena, como el stdout capturado por
+gunicorn. --lectura-kbps limita la velocidad de ese lector para simular un
+colector de logs lento: con el camino legacy el request termina esperando al
+pipe lleno, con el estructurado solo se llena la cola.
+
+Reporta p50/p99 por request y verifica que todos los registros encolados
+lleguen a la salida (o queden contados como descartados).
+
+Uso:
+    python benchmark_logging.py
+    python benchmark_logging.py --n 20000 --lectura-kbps 256
+    python benchmark_logging.py --modo estructurado --muestreo ""
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+import logs_estructurados
+
+RUTAS = (
+    ('/api/verificar/buscar-usuario', 'buscar_usuario_por_qr'),
+    ('/api/verificar-sala/verificar', 'verificar_acceso_sala'),
+)
+
+
+class SalidaDrenada:
+    """Pipe de salida con un hilo lector (opcionalmente lento) que cuenta líneas"""
+
+    def __init__(self, lectura_kbps):
+        lectura, escritura = os.pipe()
+        self.archivo = os.fdopen(escritura, 'w', buffering=1, encoding='utf-8')
+        self._lectura = lectura
+        self._pausa_por_bloque = 4096 / (lectura_kbps * 1024) if lectura_kbps > 0 else 0
+        self.lineas = 0
+        self._hilo = threading.Thread(target=self._drenar, daemon=True)
+        self._hilo.start()
+
+    def _drenar(self):
+        while True:
+            bloque = os.read(self._lectura, 4096)
+            if not bloque:
+                return
+            self.lineas += bloque.count(b'\n')
+            if self._pausa_por_bloque:
+                time.sleep(self._pausa_por_bloque)
+
+    def cerrar(self):
+        self.archivo.close()
+        self._hilo.join()
+        os.close(self._lectura)
+
+
+def generar_requests(n):
+    requests = []
+    for i in range(n):
+        ruta, endpoint = random.choice(RUTAS)
+        cuerpo = {'qr_code': f"ABC|{i:08d}|Gerente de Operaciones|Empresa Demo S.A.C.|{1700000000 + i}"}
+        if endpoint == 'verificar_acceso_sala':
+            cuerpo.update({'evento_id': random.randint(1, 60), 'asesor_verificador': 'Asesor Sala 3'})
+        status = 200 if random.random() > 0.05 else random.choice((403, 404))
+        requests.append((ruta, endpoint, json.dumps(cuerpo), status))
+    return requests
+
+
+def ejecutar_legacy(requests, salida):
+    latencias = []
+    anterior = sys.stdout
+    sys.stdout = salida.archivo
+    try:
+        for ruta, _, cuerpo, _ in requests:
+            inicio = time.perf_counter()
+            print(f"[REQ] POST {ruta} from 190.12.34.56")
+            print(f"   Origin: https://expokossodo.grupokossodo.com")
+            print(f"   Body preview: {str(json.loads(cuerpo))[:100]}...")
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        sys.stdout = anterior
+    return latencias, 3 * len(requests)
+
+
+def ejecutar_estructurado(requests, salida, muestreo):
+    manejador = logs_estructurados.configurar_logging(destino=logging.StreamHandler(salida.archivo))
+    registro = logs_estructurados.RegistroRequests(logging.getLogger('expokossodo.requests'), muestreo)
+    latencias = []
+    for ruta, endpoint, cuerpo, status in requests:
+        inicio = time.perf_counter()
+        # El cuerpo ya no se parsea para loguear: el endpoint lo lee una sola vez
+        registro.registrar(ruta, status, metodo='POST', endpoint=endpoint, duracion_ms=1.2, viajes_bd=2,
+                           ip='190.12.34.56', origin='https://expokossodo.grupokossodo.com',
+                           request_id=uuid.uuid4().hex)
+        latencias.append(time.perf_counter() - inicio)
+    manejador.detener()
+    print(f"  Registrados: {registro.stats['registrados']} | Omitidos por muestreo: "
+          f"{registro.stats['omitidos_por_muestreo']} | Descartados por cola llena: {manejador.descartados}")
+    return latencias, registro.stats['registrados'] - manejador.descartados
+
+
+def ejecutar(modo, requests, args):
+    salida = SalidaDrenada(args.lectura_kbps)
+    print(f"\n[BENCH] Modo {modo}: {len(requests)} requests, lector a "
+          f"{f'{args.lectura_kbps} KB/s' if args.lectura_kbps > 0 else 'velocidad libre'}")
+    if modo == 'legacy':
+        latencias, esperadas = ejecutar_legacy(requests, salida)
+    else:
+        latencias, esperadas = ejecutar_estructurado(requests, salida, args.muestreo)
+    salida.cerrar()
+
+    latencias.sort()
+    n = len(latencias)
+    p50 = latencias[n // 2] * 1e6
+    p99 = latencias[max(0, int(n * 0.99) - 1)] * 1e6
+    print(f"  Costo por request: p50 {p50:.1f} us | p99 {p99:.1f} us | max {latencias[-1] * 1e6:.1f} us "
+          f"| total {sum(latencias) * 1000:.1f} ms")
+    completo = salida.lineas == esperadas
+    print(f"  Líneas escritas: {salida.lineas} | esperadas: {esperadas} | Salida completa: {'SI' if completo else 'NO'}")
+    return completo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo del logging por request en endpoints de escaneo")
+    parser.add_argument('--modo', choices=['legacy', 'estructurado', 'ambos'], default='ambos')
+    parser.add_argument('--n', type=int, default=5000, help='Requests simulados')
+    parser.add_argument('--lectura-kbps', type=float, default=0, help='Velocidad del lector de logs (0 = sin límite)')
+    parser.add_argument('--muestreo', default=None, help='LOG_MUESTREO a usar (por defecto el de la app)')
+    parser.add_argument('--semilla', type=int, default=2025)
+    args = parser.parse_args()
+
+    random.seed(args.semilla)
+    requests = generar_requests(args.n)
+    modos = ['legacy', 'estructurado'] if args.modo == 'ambos' else [args.modo]
+    resultados = {modo: ejecutar(modo, requests, args) for modo in modos}
+
+    if not all(resultados.values()):
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: parser_qr.parsear_qr vs validar_formato_qr original
+ExpoKossodo 2025
+
+Compara el parser de una pasada con regex compilada (con y sin caché LRU)
+contra la implementación original carácter a carácter, sobre 100k QR reales
+de expokossodo_registros, separados en formato con pipes y formato compacto.
+También verifica que ambos parsers den el mismo resultado para cada QR.
+
+Uso:
+    python benchmark_parser_qr.py                 # QR reales desde la BD (.env)
+    python benchmark_parser_qr.py --sinteticos    # Sin BD: QR generados
+    python benchmark_parser_qr.py --n 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from parser_qr import parsear_qr, _parsear_qr_cacheado
+
+
+# Copia literal de la implementación anterior (app.py) para comparar
+def validar_formato_qr_legacy(qr_text):
+    """
+    Validar que el texto QR tenga el formato correcto
+    Soporta tanto formato antiguo (con pipes) como nuevo (sin separadores)
+    
+    Args:
+        qr_text (str): Texto QR a validar
+    
+    Returns:
+        dict: {valid: bool, parsed: dict o None}
+    """
+    try:
+        if not qr_text or not isinstance(qr_text, str):
+            return {"valid": False, "parsed": None}
+        
+        # Detectar si es formato antiguo (con pipes) o nuevo (sin separadores)
+        if '|' in qr_text:
+            # FORMATO ANTIGUO: 3LETRAS|DNI|CARGO|EMPRESA|TIMESTAMP
+            parts = qr_text.split('|')
+            
+            if len(parts) != 5:
+                return {"valid": False, "parsed": None}
+            
+            tres_letras, numero, cargo, empresa, timestamp = parts
+            
+            # Validaciones básicas
+            if len(tres_letras) != 3 or not tres_letras.isalpha():
+                return {"valid": False, "parsed": None}
+            
+            if not numero or not cargo or not empresa:
+                return {"valid": False, "parsed": None}
+            
+            # Validar timestamp
+            try:
+                timestamp_int = int(timestamp)
+            except ValueError:
+                return {"valid": False, "parsed": None}
+            
+            parsed_data = {
+                "tres_letras": tres_letras,
+                "numero": numero,
+                "cargo": cargo,
+                "empresa": empresa,
+                "timestamp": timestamp_int
+            }
+            
+        else:
+            # FORMATO NUEVO: 3letras + numeros + 3letras + 3letras + timestamp
+            # Ejemplo: asd51938101013asaatu1756243863
+            
+            # Validar longitud mínima (3 + al_menos_6_digitos + 3 + 3 + al_menos_10_timestamp = 25)
+            if len(qr_text) < 25:
+                return {"valid": False, "parsed": None}
+            
+            # Extraer las primeras 3 letras del nombre
+            tres_letras = qr_text[:3]
+            if not tres_letras.isalpha():
+                return {"valid": False, "parsed": None}
+            
+            # El resto del string después de las 3 primeras letras
+            resto = qr_text[3:]
+            
+            # Encontrar donde terminan los números (DNI)
+            numeros_dni = ""
+            pos = 0
+            while pos < len(resto) and resto[pos].isdigit():
+                numeros_dni += resto[pos]
+                pos += 1
+            
+            if len(numeros_dni) < 6:  # DNI debe tener al menos 6 dígitos
+                return {"valid": False, "parsed": None}
+            
+            # Después del DNI vienen 6 letras (3 cargo + 3 empresa) seguido del timestamp
+            resto_despues_dni = resto[pos:]
+            
+            if len(resto_despues_dni) < 16:  # 6 letras + al menos 10 dígitos timestamp
+                return {"valid": False, "parsed": None}
+            
+            # Extraer las siguientes 6 letras
+            seis_letras = resto_despues_dni[:6]
+            if not seis_letras.isalpha():
+                return {"valid": False, "parsed": None}
+            
+            # Las primeras 3 son del cargo, las siguientes 3 de la empresa
+            tres_letras_cargo = seis_letras[:3]
+            tres_letras_empresa = seis_letras[3:6]
+            
+            # El resto es el timestamp
+            timestamp_str = resto_despues_dni[6:]
+            if not timestamp_str.isdigit():
+                return {"valid": False, "parsed": None}
+                
+            try:
+                timestamp_int = int(timestamp_str)
+            except ValueError:
+                return {"valid": False, "parsed": None}
+            
+            parsed_data = {
+                "tres_letras": tres_letras,
+                "numero": numeros_dni,
+                "cargo": tres_letras_cargo,  # En el nuevo formato solo tenemos 3 letras
+                "empresa": tres_letras_empresa,  # En el nuevo formato solo tenemos 3 letras
+                "timestamp": timestamp_int
+            }
+        
+        return {"valid": True, "parsed": parsed_data}
+        
+    except Exception as e:
+        print(f"Error validando QR: {e}")
+        return {"valid": False, "parsed": None}
+
+
+def cargar_qr_reales():
+    """Obtener los qr_code existentes desde la base de datos"""
+    import mysql.connector
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    connection = mysql.connector.connect(
+        host=os.getenv('DB_HOST'),
+        database=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        port=int(os.getenv('DB_PORT', 3306)),
+        connection_timeout=10
+    )
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT qr_code FROM expokossodo_registros
+            WHERE qr_code IS NOT NULL AND qr_code != ''
+        """)
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def generar_qr_sinteticos(cantidad):
+    """QR con la misma forma que generar_texto_qr (compacto) y el formato antiguo (pipes), sin BD"""
+    letras = 'abcdefghijklmnopqrstuvwxyz'
+    qrs = []
+    for i in range(cantidad):
+        tres = ''.join(random.choice(letras) for _ in range(3))
+        dni = str(random.randint(10000000, 999999999))
+        ts = str(1750000000 + i)
+        if i % 5 == 0:
+            qrs.append(f"{tres.upper()}|{dni}|Jefe de ventas|EMPRESA SAC|{ts}")
+        else:
+            cargo = ''.join(random.choice(letras) for _ in range(3))
+            empresa = ''.join(random.choice(letras) for _ in range(3))
+            qrs.append(f"{tres}{dni}{cargo}{empresa}{ts}")
+    return qrs
+
+
+def expandir(qrs, cantidad):
+    """Repetir la muestra hasta alcanzar la cantidad pedida (los escaneos se repiten en la vida real)"""
+    if not qrs:
+        return []
+    return [qrs[i % len(qrs)] for i in range(cantidad)]
+
+
+def medir(nombre, funcion, qrs):
+    inicio = time.perf_counter()
+    for qr in qrs:
+        funcion(qr)
+    total = time.perf_counter() - inicio
+    por_qr_us = (total / len(qrs)) * 1e6 if qrs else 0
+    print(f"  {nombre:<32} {total * 1000:9.1f} ms   {por_qr_us:7.3f} us/QR")
+    return total
+
+
+def comparar(nombre_formato, qrs):
+    print(f"\n[BENCH] Formato {nombre_formato}: {len(qrs)} QR ({len(set(qrs))} únicos)")
+    if not qrs:
+        print("  (sin datos)")
+        return
+
+    # Paridad de resultados
+    diferencias = 0
+    for qr in set(qrs):
+        original = validar_formato_qr_legacy(qr)
+        nuevo = parsear_qr(qr)
+        nuevo_dict = {"valid": nuevo is not None, "parsed": nuevo.to_dict() if nuevo else None}
+        if original != nuevo_dict:
+            diferencias += 1
+            if diferencias <= 5:
+                print(f"  [DIFF] {qr!r}: {original} != {nuevo_dict}")
+    print(f"  Paridad: {'OK' if diferencias == 0 else f'{diferencias} diferencias'}")
+
+    t_legacy = medir("validar_formato_qr (original)", validar_formato_qr_legacy, qrs)
+    t_regex = medir("regex sin caché", _parsear_qr_cacheado.__wrapped__, qrs)
+    _parsear_qr_cacheado.cache_clear()
+    t_frio = medir("parsear_qr (caché fría)", parsear_qr, qrs)
+    t_caliente = medir("parsear_qr (caché caliente)", parsear_qr, qrs)
+
+    print(f"  Speedup regex: x{t_legacy / t_regex:.1f} | con caché caliente: x{t_legacy / t_caliente:.1f} | caché fría: x{t_legacy / t_frio:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del parser de QR")
+    parser.add_argument('--n', type=int, default=100000, help='QR por formato')
+    parser.add_argument('--sinteticos', action='store_true', help='No usar la BD')
+    parser.add_argument('--unicos', type=int, default=5000, help='Asistentes distintos en modo sintético')
+    args = parser.parse_args()
+
+    if args.sinteticos:
+        qrs = generar_qr_sinteticos(args.unicos)
+        print(f"[INFO] {len(qrs)} QR sintéticos generados")
+    else:
+        try:
+            qrs = cargar_qr_reales()
+            print(f"[INFO] {len(qrs)} QR reales cargados desde expokossodo_registros")
+        except Exception as e:
+            print(f"[ERROR] No se pudo leer la BD ({e}). Usa --sinteticos")
+            sys.exit(1)
+
+    con_pipes = expandir([q for q in qrs if '|' in q], args.n)
+    compactos = expandir([q for q in qrs if '|' not in q], args.n)
+
+    comparar("con pipes", con_pipes)
+    comparar("compacto", compactos)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmark: plantillas precompiladas de email vs armado con f-strings
+ExpoKossodo 2025
+
+Renderiza 10k emails de confirmación (y de actualización) con:
+- el armado anterior: formatear la plantilla completa en cada mensaje y
+  concatenar (+=) un fragmento por charla
+- plantillas_email: partes precompiladas + fragmentos cacheados por charla
+
+Reporta tiempo y memoria asignada por mensaje (tracemalloc) y verifica que
+ambos produzcan exactamente el mismo HTML.
+
+Uso:
+    python benchmark_plantillas_email.py                 # charlas sintéticas
+    python benchmark_plantillas_email.py --bd            # charlas reales (.env)
+    python benchmark_plantillas_email.py --n 20000 --mime
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import plantillas_email as plantillas
+
+
+def armar_legacy_confirmacion(user_data, selected_events):
+    """Mismo trabajo que el f-string original: plantilla completa + += por charla"""
+    eventos_html = ""
+    for evento in selected_events:
+        eventos_html += plantillas._HTML_EVENTO_CONFIRMACION.format(**evento)
+    return plantillas._HTML_SHELL_CONFIRMACION.format(
+        **plantillas._valores_usuario(user_data, selected_events, eventos_html)
+    )
+
+
+def armar_legacy_actualizacion(user_data, all_events, agregados, previos):
+    eventos_html = ""
+    for evento in [e for e in all_events if e['id'] in agregados]:
+        eventos_html += plantillas._HTML_EVENTO_NUEVO.format(**evento)
+    for evento in [e for e in all_events if e['id'] in previos]:
+        eventos_html += plantillas._HTML_EVENTO_ANTERIOR.format(**evento)
+    return plantillas._HTML_SHELL_ACTUALIZACION.format(
+        **plantillas._valores_usuario(user_data, all_events, eventos_html)
+    )
+
+
+def cargar_eventos_reales():
+    import mysql.connector
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    connection = mysql.connector.connect(
+        host=os.getenv('DB_HOST'),
+        database=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        port=int(os.getenv('DB_PORT', 3306)),
+        connection_timeout=10
+    )
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT id, titulo_charla, expositor, pais, fecha, hora, sala FROM expokossodo_eventos")
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def generar_eventos_sinteticos(cantidad=60):
+    salas = ['sala1', 'sala2', 'sala3', 'sala4']
+    horas = ['09:00-09:45', '10:30-11:15', '12:00-12:45', '14:00-14:45', '15:30-16:15']
+    return [{
+        'id': i + 1,
+        'titulo_charla': f"Charla {i + 1}: Innovación en equipos de laboratorio",
+        'expositor': f"Expositor {i + 1}",
+        'pais': random.choice(['Perú', 'Chile', 'Alemania', 'España']),
+        'fecha': datetime.date(2025, 9, 2 + i % 3),
+        'hora': horas[i % len(horas)],
+        'sala': salas[i % len(salas)]
+    } for i in range(cantidad)]
+
+
+def generar_trabajos(eventos, cantidad):
+    trabajos = []
+    for i in range(cantidad):
+        user_data = {
+            'nombres': f"Asistente {i}",
+            'correo': f"asistente{i}@empresa.com",
+            'empresa': f"Empresa {i % 300}",
+            'cargo': 'Jefe de laboratorio',
+            'numero': str(900000000 + i)
+        }
+        seleccion = random.sample(eventos, min(len(eventos), random.randint(1, 6)))
+        ids = [e['id'] for e in seleccion]
+        corte = random.randint(0, len(ids))
+        trabajos.append((user_data, seleccion, ids[:corte], ids[corte:]))
+    return trabajos
+
+
+def medir(nombre, funcion, trabajos):
+    # Tiempo sin tracemalloc (lo distorsiona) y memoria en una segunda pasada
+    inicio = time.perf_counter()
+    total_bytes = 0
+    for trabajo in trabajos:
+        total_bytes += len(funcion(trabajo))
+    total = time.perf_counter() - inicio
+
+    muestra = trabajos[:1000]
+    tracemalloc.start()
+    antes, _ = tracemalloc.get_traced_memory()
+    for trabajo in muestra:
+        funcion(trabajo)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    n = len(trabajos)
+    print(f"  {nombre:<28} {total * 1000:9.1f} ms   {total / n * 1e6:7.1f} us/email   "
+          f"pico {(pico - antes) / 1024:7.1f} KB   {total_bytes / n / 1024:5.1f} KB HTML/email")
+    return total
+
+
+def construir_mime(html, qr_png):
+    from email.mime.image import MIMEImage
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart()
+    msg['Subject'] = "Confirmación de Registro - ExpoKossodo 2025"
+    msg.attach(MIMEText(html, 'html'))
+    if qr_png:
+        msg.attach(MIMEImage(qr_png))
+    return msg.as_string()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de plantillas de email")
+    parser.add_argument('--n', type=int, default=10000, help='Emails a renderizar')
+    parser.add_argument('--bd', action='store_true', help='Usar charlas reales de la BD')
+    parser.add_argument('--mime', action='store_true', help='Incluir armado MIME completo')
+    args = parser.parse_args()
+
+    if args.bd:
+        try:
+            eventos = cargar_eventos_reales()
+        except Exception as e:
+            print(f"[ERROR] No se pudo leer la BD ({e})")
+            sys.exit(1)
+    else:
+        eventos = generar_eventos_sinteticos()
+    print(f"[INFO] {len(eventos)} charlas, {args.n} emails")
+
+    trabajos = generar_trabajos(eventos, args.n)
+
+    # Paridad
+    diferencias = 0
+    for user_data, seleccion, agregados, previos in trabajos[:500]:
+        if armar_legacy_confirmacion(user_data, seleccion) != plantillas.renderizar_email_confirmacion(user_data, seleccion):
+            diferencias += 1
+        if (armar_legacy_actualizacion(user_data, seleccion, agregados, previos) !=
+                plantillas.renderizar_email_actualizacion(user_data, seleccion, agregados, previos)):
+            diferencias += 1
+    print(f"[INFO] Paridad HTML: {'OK' if diferencias == 0 else f'{diferencias} diferencias'}")
+
+    print("\n[BENCH] Confirmación")
+    t_legacy = medir("f-string + concatenación", lambda t: armar_legacy_confirmacion(t[0], t[1]), trabajos)
+    plantillas._fragmento_evento.cache_clear()
+    t_nuevo = medir("plantillas precompiladas", lambda t: plantillas.renderizar_email_confirmacion(t[0], t[1]), trabajos)
+    print(f"  Speedup: x{t_legacy / t_nuevo:.1f}")
+
+    print("\n[BENCH] Actualización")
+    t_legacy = medir("f-string + concatenación", lambda t: armar_legacy_actualizacion(*t), trabajos)
+    t_nuevo = medir("plantillas precompiladas", lambda t: plantillas.renderizar_email_actualizacion(*t), trabajos)
+    print(f"  Speedup: x{t_legacy / t_nuevo:.1f}")
+
+    if args.mime:
+        qr_png = None
+        try:
+            import io
+            import qrcode
+            buffer = io.BytesIO()
+            qrcode.make("abc12345678jefemp1750000000").save(buffer, format='PNG')
+            qr_png = buffer.getvalue()
+        except ImportError:
+            print("[WARN] qrcode no instalado, MIME sin adjunto QR")
+        print("\n[BENCH] Mensaje MIME completo (confirmación)")
+        medir("plantillas + MIME", lambda t: construir_mime(plantillas.renderizar_email_confirmacion(t[0], t[1]), qr_png), trabajos)
+
+    print(f"\n[INFO] Caché de fragmentos: {plantillas.estadisticas_cache()}")
+
+
+if __name__ == '__main__':
+    main()
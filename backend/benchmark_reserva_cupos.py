@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrencia: reserva de cupos de /api/registro
+ExpoKossodo 2025
+
+Crea un evento temporal con 60 cupos y cientos de registros temporales, y los
+inscribe a todos al mismo tiempo desde muchas conexiones en paralelo:
+
+- legacy:   lectura de slots_ocupados + SELECT/INSERT/UPDATE por evento (flujo anterior)
+- atomico:  reserva_cupos.reservar_cupos + vincular_eventos en una transacción
+
+Al final verifica que slots_ocupados no supere los cupos y que coincida con
+las relaciones insertadas. Todo lo creado se elimina al terminar.
+
+Uso:
+    python benchmark_reserva_cupos.py                     # ambos modos, 300 registros
+    python benchmark_reserva_cupos.py --modo atomico --n 500 --concurrencia 100
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import mysql.connector
+from dotenv import load_dotenv
+
+from reserva_cupos import reservar_cupos, vincular_eventos, RESERVADO
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST'),
+    'database': os.getenv('DB_NAME'),
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'port': int(os.getenv('DB_PORT', 3306)),
+    'autocommit': True,
+    'connection_timeout': 30
+}
+
+PREFIJO_CORREO = 'bench-reserva-'
+
+
+def conectar():
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+def preparar_datos(cantidad, cupos):
+    """Crear el evento y los registros temporales del benchmark"""
+    connection = conectar()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO expokossodo_eventos
+            (fecha, hora, sala, titulo_charla, expositor, pais, slots_disponibles, slots_ocupados, disponible)
+            VALUES ('2099-01-01', '00:00-00:45', 'bench', 'Benchmark reserva de cupos', 'bench', 'bench', %s, 0, FALSE)
+        """, (cupos,))
+        evento_id = cursor.lastrowid
+
+        valores = [(f"Bench {i}", f"{PREFIJO_CORREO}{evento_id}-{i}@expokossodo.test",
+                    'bench', 'bench', '000000') for i in range(cantidad)]
+        cursor.executemany("""
+            INSERT INTO expokossodo_registros (nombres, correo, empresa, cargo, numero)
+            VALUES (%s, %s, %s, %s, %s)
+        """, valores)
+
+        cursor.execute("SELECT id FROM expokossodo_registros WHERE correo LIKE %s ORDER BY id",
+                       (f"{PREFIJO_CORREO}{evento_id}-%",))
+        registro_ids = [row[0] for row in cursor.fetchall()]
+        return evento_id, registro_ids
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def limpiar_datos(evento_id):
+    connection = conectar()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("DELETE FROM expokossodo_registro_eventos WHERE evento_id = %s", (evento_id,))
+        cursor.execute("DELETE FROM expokossodo_registros WHERE correo LIKE %s",
+                       (f"{PREFIJO_CORREO}{evento_id}-%",))
+        cursor.execute("DELETE FROM expokossodo_eventos WHERE id = %s", (evento_id,))
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def inscribir_legacy(cursor, connection, registro_id, evento_id):
+    """Flujo anterior de crear_registro: validar leyendo y luego incrementar sin bloqueo"""
+    cursor.execute("SELECT slots_disponibles, slots_ocupados FROM expokossodo_eventos WHERE id = %s",
+                   (evento_id,))
+    evento = cursor.fetchone()
+    if evento['slots_ocupados'] >= evento['slots_disponibles']:
+        return False
+
+    cursor.execute("""
+        SELECT 1 FROM expokossodo_registro_eventos
+        WHERE registro_id = %s AND evento_id = %s
+        LIMIT 1
+    """, (registro_id, evento_id))
+    if cursor.fetchone():
+        return False
+
+    cursor.execute("INSERT INTO expokossodo_registro_eventos (registro_id, evento_id) VALUES (%s, %s)",
+                   (registro_id, evento_id))
+    cursor.execute("UPDATE expokossodo_eventos SET slots_ocupados = slots_ocupados + 1 WHERE id = %s",
+                   (evento_id,))
+    connection.commit()
+    return True
+
+
+def inscribir_atomico(cursor, connection, registro_id, evento_id):
+    """Flujo nuevo: reserva bloqueante + UPDATE condicional + INSERT IGNORE"""
+    connection.start_transaction()
+    try:
+        reserva = reservar_cupos(cursor, [evento_id], registro_id)
+        reservado = reserva[evento_id]['estado'] == RESERVADO
+        if reservado:
+            vincular_eventos(cursor, registro_id, [evento_id])
+        connection.commit()
+        return reservado
+    except Exception:
+        connection.rollback()
+        raise
+
+
+def ejecutar(modo, cantidad, cupos, concurrencia):
+    evento_id, registro_ids = preparar_datos(cantidad, cupos)
+    inscribir = inscribir_atomico if modo == 'atomico' else inscribir_legacy
+    lotes = [registro_ids[i::concurrencia] for i in range(concurrencia)]
+    resultados = {'ok': 0, 'rechazados': 0, 'errores': 0, 'latencias': []}
+    lock = threading.Lock()
+
+    def trabajador(lote, barrera):
+        connection = conectar()
+        cursor = connection.cursor(dictionary=True, buffered=True)
+        try:
+            barrera.wait()
+            for registro_id in lote:
+                inicio = time.perf_counter()
+                try:
+                    ok = inscribir(cursor, connection, registro_id, evento_id)
+                    clave = 'ok' if ok else 'rechazados'
+                except mysql.connector.Error as e:
+                    print(f"  [ERROR] registro {registro_id}: {e}")
+                    clave = 'errores'
+                with lock:
+                    resultados[clave] += 1
+                    resultados['latencias'].append(time.perf_counter() - inicio)
+        finally:
+            cursor.close()
+            connection.close()
+
+    try:
+        lotes = [lote for lote in lotes if lote]
+        barrera = threading.Barrier(len(lotes))
+        hilos = [threading.Thread(target=trabajador, args=(lote, barrera)) for lote in lotes]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        total = time.perf_counter() - inicio
+
+        connection = conectar()
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT slots_ocupados, slots_disponibles FROM expokossodo_eventos WHERE id = %s",
+                       (evento_id,))
+        evento = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) AS total FROM expokossodo_registro_eventos WHERE evento_id = %s",
+                       (evento_id,))
+        relaciones = cursor.fetchone()['total']
+        cursor.close()
+        connection.close()
+
+        latencias = sorted(resultados['latencias'])
+        p50 = latencias[len(latencias) // 2] * 1000 if latencias else 0
+        p95 = latencias[int(len(latencias) * 0.95) - 1] * 1000 if latencias else 0
+        sobreventa = evento['slots_ocupados'] > evento['slots_disponibles'] or relaciones > evento['slots_disponibles']
+
+        print(f"\n[BENCH] Modo {modo}: {cantidad} inscripciones, {len(hilos)} conexiones, {cupos} cupos")
+        print(f"  Tiempo total: {total:.2f}s | p50 {p50:.1f} ms | p95 {p95:.1f} ms")
+        print(f"  Aceptadas: {resultados['ok']} | Rechazadas: {resultados['rechazados']} | Errores: {resultados['errores']}")
+        print(f"  slots_ocupados: {evento['slots_ocupados']}/{evento['slots_disponibles']} | relaciones: {relaciones}")
+        print(f"  Sobreventa: {'SI' if sobreventa else 'NO'} | Contador consistente: {'SI' if relaciones == evento['slots_ocupados'] else 'NO'}")
+        return not sobreventa
+    finally:
+        limpiar_datos(evento_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de concurrencia de reserva de cupos")
+    parser.add_argument('--modo', choices=['atomico', 'legacy', 'ambos'], default='ambos')
+    parser.add_argument('--n', type=int, default=300, help='Inscripciones simultáneas')
+    parser.add_argument('--cupos', type=int, default=60, help='Cupos del evento de prueba')
+    parser.add_argument('--concurrencia', type=int, default=50, help='Conexiones en paralelo')
+    args = parser.parse_args()
+
+    modos = ['legacy', 'atomico'] if args.modo == 'ambos' else [args.modo]
+    try:
+        resultados = {modo: ejecutar(modo, args.n, args.cupos, args.concurrencia) for modo in modos}
+    except mysql.connector.Error as e:
+        print(f"[ERROR] No se pudo ejecutar el benchmark contra la BD: {e}")
+        sys.exit(1)
+
+    if 'atomico' in resultados and not resultados['atomico']:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
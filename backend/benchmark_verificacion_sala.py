@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latencia: verificación de ingreso a sala por escaneo
+ExpoKossodo 2025
+
+Crea un evento temporal con registros inscritos y escanea sus QR contra una
+BD MySQL local (o la configurada en DB_*), comparando:
+
+- legacy:   SELECT usuario + SELECT inscripción + SELECT ingreso previo +
+            START TRANSACTION/INSERT/UPDATE/COMMIT (flujo anterior)
+- directo:  ingresos_sala.verificar_ingreso (consulta unida + un INSERT IGNORE
+            en autocommit; total_presentes lo suma el trigger)
+
+Esperado por escaneo: legacy 7 viajes al registrar; directo 2 al registrar y
+1 en los rechazos (no inscrito, ya registrado).
+
+Una fracción de los escaneos (--repetidos) vuelve a pasar un QR ya
+registrado, como pasa en la puerta cuando alguien sale y vuelve a entrar.
+--latencia-red-ms suma una espera por viaje a la BD para simular la red entre
+Render y la BD: con MySQL local la diferencia se ve casi solo en viajes.
+
+Reporta p50/p99 por escaneo, viajes a la BD por escaneo y verifica que
+total_presentes coincida con los ingresos insertados (solo en directo: con el
+trigger de la migración 11 el UPDATE manual del flujo legacy cuenta doble).
+La BD debe tener las migraciones aplicadas. Todo lo creado se elimina al
+terminar.
+
+Uso:
+    docker run -d -p 3306:3306 -e MYSQL_ROOT_PASSWORD=bench -e MYSQL_DATABASE=expokossodo mysql:8
+    DB_HOST=127.0.0.1 DB_USER=root DB_PASSWORD=bench DB_NAME=expokossodo python benchmark_verificacion_sala.py
+    python benchmark_verificacion_sala.py --modo directo --n 2000 --latencia-red-ms 2
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import mysql.connector
+from dotenv import load_dotenv
+
+import ingresos_sala
+
+load_dotenv()
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST'),
+    'database': os.getenv('DB_NAME'),
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'port': int(os.getenv('DB_PORT', 3306)),
+    'autocommit': True,
+    'connection_timeout': 30
+}
+
+PREFIJO_CORREO = 'bench-sala-'
+
+
+def conectar():
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+class CursorMedido:
+    """Cursor que cuenta viajes a la BD y opcionalmente simula la latencia de red"""
+
+    def __init__(self, cursor, latencia):
+        self._cursor = cursor
+        self.latencia = latencia
+        self.viajes = 0
+
+    def viaje(self):
+        self.viajes += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+
+    def execute(self, operacion, params=None):
+        self.viaje()
+        return self._cursor.execute(operacion, params)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+def preparar_datos(cantidad):
+    """Crear el evento, los registros con QR y sus inscripciones"""
+    connection = conectar()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO expokossodo_eventos
+            (fecha, hora, sala, titulo_charla, expositor, pais, slots_disponibles, slots_ocupados, disponible)
+            VALUES ('2099-01-01', '00:00-00:45', 'bench', 'Benchmark verificación de sala', 'bench', 'bench', %s, %s, FALSE)
+        """, (cantidad, cantidad))
+        evento_id = cursor.lastrowid
+
+        valores = [(f"Bench {i}", f"{PREFIJO_CORREO}{evento_id}-{i}@expokossodo.test",
+                    'bench', 'bench', '000000', '[]', f"BENCH|{evento_id}|{i}") for i in range(cantidad)]
+        cursor.executemany("""
+            INSERT INTO expokossodo_registros (nombres, correo, empresa, cargo, numero, eventos_seleccionados, qr_code)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, valores)
+
+        cursor.execute("""
+            INSERT INTO expokossodo_registro_eventos (registro_id, evento_id)
+            SELECT id, %s FROM expokossodo_registros WHERE correo LIKE %s
+        """, (evento_id, f"{PREFIJO_CORREO}{evento_id}-%"))
+        return evento_id, [fila[-1] for fila in valores]
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def reiniciar_ingresos(evento_id):
+    connection = conectar()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("DELETE FROM expokossodo_asistencias_por_sala WHERE evento_id = %s", (evento_id,))
+        cursor.execute("UPDATE expokossodo_eventos SET total_presentes = 0 WHERE id = %s", (evento_id,))
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def limpiar_datos(evento_id):
+    connection = conectar()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("DELETE FROM expokossodo_asistencias_por_sala WHERE evento_id = %s", (evento_id,))
+        cursor.execute("DELETE FROM expokossodo_registro_eventos WHERE evento_id = %s", (evento_id,))
+        cursor.execute("DELETE FROM expokossodo_registros WHERE correo LIKE %s",
+                       (f"{PREFIJO_CORREO}{evento_id}-%",))
+        cursor.execute("DELETE FROM expokossodo_eventos WHERE id = %s", (evento_id,))
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def verificar_legacy(cursor, connection, qr_code, evento_id):
+    """Flujo anterior de verificar_acceso_sala (con el usuario leído de la BD)"""
+    cursor.execute("SELECT id, nombres, empresa, cargo FROM expokossodo_registros WHERE qr_code = %s", (qr_code,))
+    usuario = cursor.fetchone()
+    if not usuario:
+        return ingresos_sala.USUARIO_NO_ENCONTRADO
+
+    cursor.execute("""
+        SELECT e.titulo_charla, e.hora, e.sala
+        FROM expokossodo_eventos e
+        INNER JOIN expokossodo_registro_eventos re ON e.id = re.evento_id
+        WHERE e.id = %s AND re.registro_id = %s
+    """, (evento_id, usuario['id']))
+    if not cursor.fetchone():
+        return ingresos_sala.NO_INSCRITO
+
+    cursor.execute("""
+        SELECT id, fecha_ingreso
+        FROM expokossodo_asistencias_por_sala
+        WHERE registro_id = %s AND evento_id = %s
+    """, (usuario['id'], evento_id))
+    if cursor.fetchone():
+        return ingresos_sala.YA_REGISTRADO
+
+    cursor.viaje()
+    connection.start_transaction()
+    cursor.execute("""
+        INSERT INTO expokossodo_asistencias_por_sala
+        (registro_id, evento_id, qr_escaneado, asesor_verificador, ip_verificacion, notas)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, (usuario['id'], evento_id, qr_code, 'bench', '127.0.0.1', ''))
+    cursor.execute("UPDATE expokossodo_eventos SET total_presentes = total_presentes + 1 WHERE id = %s",
+                   (evento_id,))
+    cursor.viaje()
+    connection.commit()
+    return ingresos_sala.REGISTRADO
+
+
+def verificar_directo(cursor, connection, qr_code, evento_id):
+    estado, _ = ingresos_sala.verificar_ingreso(cursor, qr_code, evento_id, 'bench', '127.0.0.1')
+    return estado
+
+
+def ejecutar(modo, evento_id, escaneos, latencia):
+    reiniciar_ingresos(evento_id)
+    verificar = verificar_directo if modo == 'directo' else verificar_legacy
+    connection = conectar()
+    # buffered: el flujo legacy no drena resultados (en la app lo hacían los bucles de nextset)
+    cursor = CursorMedido(connection.cursor(dictionary=True, buffered=modo == 'legacy'), latencia)
+    latencias = []
+    estados = {}
+    try:
+        for qr_code in escaneos:
+            viajes_antes = cursor.viajes
+            inicio = time.perf_counter()
+            try:
+                estado = verificar(cursor, connection, qr_code, evento_id)
+            except mysql.connector.Error as e:
+                print(f"  [ERROR] {qr_code}: {e}")
+                connection.rollback()
+                estado = 'error'
+            latencias.append(time.perf_counter() - inicio)
+            estados.setdefault(estado, []).append(cursor.viajes - viajes_antes)
+
+        cursor.execute("SELECT total_presentes FROM expokossodo_eventos WHERE id = %s", (evento_id,))
+        presentes = cursor.fetchone()['total_presentes']
+        cursor.execute("SELECT COUNT(*) AS total FROM expokossodo_asistencias_por_sala WHERE evento_id = %s",
+                       (evento_id,))
+        ingresos = cursor.fetchone()['total']
+    finally:
+        cursor.close()
+        connection.close()
+
+    latencias.sort()
+    n = len(latencias)
+    p50 = latencias[n // 2] * 1000
+    p99 = latencias[max(0, int(n * 0.99) - 1)] * 1000
+
+    print(f"\n[BENCH] Modo {modo}: {n} escaneos, latencia de red simulada {latencia * 1000:.1f} ms")
+    print(f"  Latencia por escaneo: p50 {p50:.2f} ms | p99 {p99:.2f} ms | max {latencias[-1] * 1000:.2f} ms")
+    for estado, viajes in sorted(estados.items()):
+        print(f"  {estado}: {len(viajes)} escaneos | {sum(viajes) / len(viajes):.1f} viajes a la BD por escaneo")
+    if modo == 'legacy':
+        print(f"  total_presentes: {presentes} | ingresos: {ingresos} | (legacy suma a mano y el trigger también)")
+        return True
+    consistente = presentes == ingresos == len(estados.get(ingresos_sala.REGISTRADO, []))
+    print(f"  total_presentes: {presentes} | ingresos: {ingresos} | Contador consistente: {'SI' if consistente else 'NO'}")
+    return consistente
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia por escaneo de la verificación de sala")
+    parser.add_argument('--modo', choices=['directo', 'legacy', 'ambos'], default='ambos')
+    parser.add_argument('--n', type=int, default=1000, help='Registros inscritos en el evento de prueba')
+    parser.add_argument('--repetidos', type=float, default=0.2, help='Fracción de escaneos repetidos')
+    parser.add_argument('--latencia-red-ms', type=float, default=0, help='Espera simulada por viaje a la BD')
+    parser.add_argument('--semilla', type=int, default=2025)
+    args = parser.parse_args()
+
+    random.seed(args.semilla)
+    modos = ['legacy', 'directo'] if args.modo == 'ambos' else [args.modo]
+    try:
+        evento_id, qr_codes = preparar_datos(args.n)
+    except mysql.connector.Error as e:
+        print(f"[ERROR] No se pudo preparar el benchmark en la BD: {e}")
+        sys.exit(1)
+
+    escaneos = list(qr_codes)
+    escaneos += random.choices(qr_codes, k=int(args.n * args.repetidos))
+    random.shuffle(escaneos)
+
+    try:
+        resultados = {modo: ejecutar(modo, evento_id, escaneos, args.latencia_red_ms / 1000) for modo in modos}
+    except mysql.connector.Error as e:
+        print(f"[ERROR] No se pudo ejecutar el benchmark contra la BD: {e}")
+        sys.exit(1)
+    finally:
+        limpiar_datos(evento_id)
+
+    if 'directo' in resultados and not resultados['directo']:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Índice de similitud para preguntas frecuentes del chat
+ExpoKossodo 2025
+
+La mayoría del tráfico de /api/chat son unas pocas decenas de preguntas
+(horarios, salas, inscripción) escritas de mil formas: "¿Dónde queda la sala
+3?", "donde esta la sala 3", "ubicación sala 3". La caché exacta de
+sesiones_chat solo acierta si el texto normalizado es idéntico; este índice
+encuentra la pregunta cacheada más parecida:
+
+1. normalizar_pregunta(): minúsculas, sin tildes ni eñes (como
+   prepare_text_for_thermal_printer), sin signos y sin palabras vacías.
+2. Cada pregunta se representa con trigramas de caracteres por palabra
+   (tolera errores de tipeo y plurales) ponderados con TF-IDF.
+3. Similitud coseno contra las preguntas cacheadas, vía índice invertido.
+
+Los números se comparan aparte y deben coincidir exactamente: "sala 3" y
+"sala 4" se parecen mucho en trigramas pero tienen respuestas distintas.
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+PALABRAS_VACIAS = frozenset("""
+    a al algo algun alguna algunas alguno algunos ante como con cual cuales de del
+    el en entre es esta este esto ese esa eso ha hay la las le les lo los me mi mis
+    muy o para pero por que quien se ser si sin sobre son su sus te tu tus un una
+    uno unos unas y ya yo favor hola buenas buenos dias tardes noches gracias
+    quisiera quiero queria puedes podrias puede podria saber decir dime q
+    queda quedan estan encuentra ubica ubicado ubicada
+""".split())
+
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+_NUMERO = re.compile(r"^\d+$")
+
+
+def normalizar_pregunta(texto):
+    """Texto canónico de la pregunta: minúsculas, sin tildes, signos ni palabras vacías"""
+    texto = unicodedata.normalize('NFD', (texto or '').lower())
+    texto = ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
+    palabras = _NO_ALFANUMERICO.sub(' ', texto).split()
+    significativas = [p for p in palabras if p not in PALABRAS_VACIAS]
+    # Una pregunta formada solo por palabras vacías ("¿qué hay?") se conserva tal cual
+    return ' '.join(significativas or palabras)
+
+
+def _rasgos(normalizada):
+    """Trigramas de caracteres por palabra (con bordes) y conjunto de números"""
+    rasgos = Counter()
+    numeros = set()
+    for palabra in normalizada.split():
+        if _NUMERO.match(palabra):
+            numeros.add(palabra)
+        marcada = f" {palabra} "
+        for i in range(len(marcada) - 2):
+            rasgos[marcada[i:i + 3]] += 1
+    return rasgos, frozenset(numeros)
+
+
+class IndiceFAQ:
+    """Búsqueda de la pregunta cacheada más parecida por coseno TF-IDF de trigramas"""
+
+    def __init__(self, umbral=0.78):
+        """
+        Args:
+            umbral (float): Similitud mínima (0-1) para reutilizar una respuesta
+        """
+        self.umbral = umbral
+        self._entradas = []          # [(clave, vector normalizado, números)]
+        self._invertido = defaultdict(list)
+        self._idf = {}
+        self._idf_maximo = 1.0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def reconstruir(self, claves):
+        """
+        Indexar las preguntas cacheadas
+
+        Args:
+            claves (iterable): Preguntas ya normalizadas con normalizar_pregunta()
+        """
+        documentos = [(clave, *_rasgos(clave)) for clave in claves]
+        frecuencia = Counter()
+        for _, rasgos, _ in documentos:
+            frecuencia.update(rasgos.keys())
+        total = len(documentos)
+        self._idf = {rasgo: math.log((1 + total) / (1 + df)) + 1 for rasgo, df in frecuencia.items()}
+        self._idf_maximo = max(self._idf.values(), default=1.0)
+
+        self._entradas = []
+        self._invertido = defaultdict(list)
+        for clave, rasgos, numeros in documentos:
+            vector = self._vectorizar(rasgos)
+            posicion = len(self._entradas)
+            self._entradas.append((clave, vector, numeros))
+            for rasgo in vector:
+                self._invertido[rasgo].append(posicion)
+
+    def _vectorizar(self, rasgos):
+        # Rasgos fuera del vocabulario pesan como los más raros: restan similitud
+        vector = {rasgo: cantidad * self._idf.get(rasgo, self._idf_maximo) for rasgo, cantidad in rasgos.items()}
+        norma = math.sqrt(sum(peso * peso for peso in vector.values())) or 1.0
+        return {rasgo: peso / norma for rasgo, peso in vector.items()}
+
+    def buscar(self, normalizada):
+        """
+        Pregunta cacheada más parecida
+
+        Returns:
+            tuple | None: (clave, similitud) si supera el umbral
+        """
+        if not self._entradas or not normalizada:
+            return None
+        rasgos, numeros = _rasgos(normalizada)
+        vector = self._vectorizar(rasgos)
+
+        puntajes = defaultdict(float)
+        for rasgo, peso in vector.items():
+            for posicion in self._invertido.get(rasgo, ()):
+                puntajes[posicion] += peso * self._entradas[posicion][1][rasgo]
+
+        mejor = None
+        for posicion, similitud in puntajes.items():
+            clave, _, numeros_entrada = self._entradas[posicion]
+            if numeros_entrada != numeros or similitud < self.umbral:
+                continue
+            if mejor is None or similitud > mejor[1]:
+                mejor = (clave, similitud)
+        return mejor
@@ -0,0 +1,269 @@
+"""
+Canal de ingresos a sala en vivo (Server-Sent Events)
+ExpoKossodo 2025
+
+Las tablets de verificación refrescaban la lista de asistentes volviendo a
+pedir /api/verificar-sala/asistentes después de cada escaneo, y los paneles
+de ocupación sondeaban cada pocos segundos. Con este canal cada cliente abre
+un EventSource y recibe solo los ingresos nuevos de su charla o sala.
+
+Cada worker de gunicorn tiene un único hilo lector que sigue la tabla
+expokossodo_asistencias_por_sala (por id creciente) y reparte cada ingreso a
+las colas de sus suscriptores. Así una sola consulta atiende a todos los
+clientes conectados a ese worker, y los ingresos registrados por otros
+workers también llegan. Para no consultar la BD en vacío, los endpoints que
+registran un ingreso llaman a notificar(), que incrementa la versión
+compartida 'checkins' (versiones_cache): el lector la revisa con un os.stat y
+solo consulta cuando cambia, o cada CHECKINS_SONDEO_BD_SEGUNDOS como respaldo
+para cambios hechos fuera de la app.
+
+Los ids autoincrementales se asignan al insertar pero se confirman en otro
+orden, así que el lector relee una ventana de ids recientes y descarta los
+que ya repartió.
+
+Configuración (variables de entorno):
+- CHECKINS_SONDEO_SEGUNDOS      revisión de la versión compartida (0.25)
+- CHECKINS_SONDEO_BD_SEGUNDOS   consulta de respaldo sin cambios (5)
+- CHECKINS_MAX_SUSCRIPTORES     streams abiertos por worker (con gthread, la
+                                mitad de GUNICORN_THREADS; con gevent, 200)
+
+Con gthread cada stream abierto ocupa un hilo del worker durante minutos, así
+que el máximo nunca supera la mitad de los hilos: el resto queda para los
+escaneos y demás requests. Pasado el máximo el stream responde 503 con
+Retry-After y el cliente vuelve al sondeo.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from concurrencia import gevent_activo
+from versiones_cache import incrementar_version, version_actual
+
+VERSION_CHECKINS = 'checkins'
+
+# Ids recientes que se releen en cada consulta por confirmaciones fuera de orden
+VENTANA_IDS = 100
+LOTE_MAXIMO = 500
+
+SQL_CHECKINS = """
+    SELECT aps.id, aps.evento_id, aps.registro_id, aps.fecha_ingreso,
+           r.nombres, r.empresa, r.cargo,
+           e.sala, e.titulo_charla, e.total_registrados, e.total_presentes
+    FROM expokossodo_asistencias_por_sala aps
+    INNER JOIN expokossodo_registros r ON r.id = aps.registro_id
+    INNER JOIN expokossodo_eventos e ON e.id = aps.evento_id
+    WHERE aps.id > %s {filtro}
+    ORDER BY aps.id
+    LIMIT {limite}
+"""
+
+
+def max_suscriptores_por_worker():
+    """Streams SSE que puede tener abiertos un worker sin agotar sus hilos"""
+    configurado = os.getenv('CHECKINS_MAX_SUSCRIPTORES')
+    if gevent_activo():
+        # Un stream es un greenlet; el límite real lo pone worker_connections
+        return int(configurado or 200)
+    limite_hilos = max(1, int(os.getenv('GUNICORN_THREADS', 32)) // 2)
+    if configurado:
+        return max(1, min(int(configurado), limite_hilos))
+    return limite_hilos
+
+
+def _serializar(row):
+    row['fecha_ingreso'] = row['fecha_ingreso'].isoformat() if row['fecha_ingreso'] else None
+    return row
+
+
+class Suscripcion:
+    """Cola acotada de ingresos para un cliente, con su filtro por evento o sala"""
+
+    def __init__(self, evento_id=None, sala=None, capacidad=100):
+        self.evento_id = evento_id
+        self.sala = sala
+        self.desbordada = False
+        self._cola = queue.Queue(maxsize=capacidad)
+
+    def acepta(self, checkin):
+        if self.evento_id is not None and checkin['evento_id'] != self.evento_id:
+            return False
+        if self.sala is not None and checkin['sala'] != self.sala:
+            return False
+        return True
+
+    def entregar(self, checkin):
+        try:
+            self._cola.put_nowait(checkin)
+            return True
+        except queue.Full:
+            # Cliente lento: se le pide recargar en vez de acumular memoria
+            self.desbordada = True
+            return False
+
+    def esperar(self, timeout):
+        """Siguiente ingreso o None si no llegó ninguno en 'timeout' segundos"""
+        try:
+            return self._cola.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class CanalCheckins:
+    """Reparte los ingresos a sala confirmados a los streams SSE de este worker"""
+
+    def __init__(self, get_db_connection):
+        """
+        Args:
+            get_db_connection (callable): Devuelve una conexión del pool o None
+        """
+        self._get_db_connection = get_db_connection
+        self.intervalo = float(os.getenv('CHECKINS_SONDEO_SEGUNDOS', 0.25))
+        self.intervalo_bd = float(os.getenv('CHECKINS_SONDEO_BD_SEGUNDOS', 5))
+        self.max_suscriptores = max_suscriptores_por_worker()
+        self._suscriptores = set()
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo = None
+        self._pid = None
+        self._ultimo_id = None
+        self._repartidos = deque(maxlen=VENTANA_IDS * 5)
+        self.stats = {'consultas': 0, 'repartidos': 0, 'desbordes': 0, 'rechazados': 0}
+
+    # --- Suscriptores ---
+
+    def suscribir(self, evento_id=None, sala=None):
+        """
+        Registrar un stream nuevo
+
+        Returns:
+            Suscripcion | None: None si el worker ya tiene el máximo de streams abiertos
+        """
+        with self._lock:
+            if len(self._suscriptores) >= self.max_suscriptores:
+                self.stats['rechazados'] += 1
+                return None
+            suscripcion = Suscripcion(evento_id, sala)
+            self._suscriptores.add(suscripcion)
+            self._iniciar_lector()
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            self._suscriptores.discard(suscripcion)
+
+    def notificar(self):
+        """Avisar a los lectores de todos los workers que hay un ingreso confirmado (llamar tras el commit)"""
+        incrementar_version(VERSION_CHECKINS)
+        self._despertar.set()
+
+    def pendientes_desde(self, ultimo_id, evento_id=None, sala=None):
+        """Ingresos posteriores a ultimo_id (reconexión con Last-Event-ID)"""
+        filtro, parametros = '', [ultimo_id]
+        if evento_id is not None:
+            filtro += ' AND aps.evento_id = %s'
+            parametros.append(evento_id)
+        if sala is not None:
+            filtro += ' AND e.sala = %s'
+            parametros.append(sala)
+
+        connection = self._get_db_connection()
+        if not connection:
+            return []
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(SQL_CHECKINS.format(filtro=filtro, limite=LOTE_MAXIMO), parametros)
+            return [_serializar(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            connection.close()
+
+    # --- Lector ---
+
+    def _iniciar_lector(self):
+        """Arrancar el lector en este proceso (con preload_app los hilos no sobreviven al fork)"""
+        if self._pid == os.getpid() and self._hilo is not None and self._hilo.is_alive():
+            return
+        self._pid = os.getpid()
+        self._ultimo_id = None
+        self._repartidos.clear()
+        self._hilo = threading.Thread(target=self._leer, name="checkins-lector", daemon=True)
+        self._hilo.start()
+
+    def _consultar(self):
+        connection = self._get_db_connection()
+        if not connection:
+            return []
+        cursor = connection.cursor(dictionary=True)
+        try:
+            if self._ultimo_id is None:
+                # Los clientes cargan el estado inicial por REST; solo se reparten ingresos nuevos,
+                # así que los de la ventana actual se marcan como ya repartidos
+                cursor.execute("""
+                    SELECT id FROM expokossodo_asistencias_por_sala
+                    WHERE id > (SELECT COALESCE(MAX(id), 0) - %s FROM expokossodo_asistencias_por_sala)
+                    ORDER BY id
+                """, (VENTANA_IDS,))
+                ids = [row['id'] for row in cursor.fetchall()]
+                self._repartidos.extend(ids)
+                self._ultimo_id = ids[-1] if ids else 0
+                return []
+            cursor.execute(SQL_CHECKINS.format(filtro='', limite=LOTE_MAXIMO),
+                           (max(0, self._ultimo_id - VENTANA_IDS),))
+            self.stats['consultas'] += 1
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _repartir(self, filas):
+        with self._lock:
+            suscriptores = list(self._suscriptores)
+        for row in filas:
+            if row['id'] in self._repartidos:
+                continue
+            self._repartidos.append(row['id'])
+            self._ultimo_id = max(self._ultimo_id, row['id'])
+            checkin = _serializar(row)
+            for suscripcion in suscriptores:
+                if suscripcion.acepta(checkin) and not suscripcion.desbordada:
+                    if not suscripcion.entregar(checkin):
+                        self.stats['desbordes'] += 1
+            self.stats['repartidos'] += 1
+
+    def _leer(self):
+        version = None
+        ultima_consulta = 0
+        while True:
+            with self._lock:
+                if not self._suscriptores:
+                    # Sin clientes no se sigue la tabla; el próximo suscriptor lo reinicia
+                    self._hilo = None
+                    return
+
+            actual = version_actual(VERSION_CHECKINS)
+            if actual != version or time.time() - ultima_consulta >= self.intervalo_bd:
+                version = actual
+                ultima_consulta = time.time()
+                try:
+                    filas = self._consultar()
+                    self._repartir(filas)
+                    if len(filas) >= LOTE_MAXIMO:
+                        # Quedan ingresos por leer: consultar de nuevo sin esperar a otra versión
+                        version = None
+                except Exception as e:
+                    print(f"[CHECKINS] Error leyendo ingresos: {e}")
+
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+
+    def estadisticas(self):
+        return {
+            "suscriptores": len(self._suscriptores),
+            "max_suscriptores": self.max_suscriptores,
+            "lector_activo": self._hilo is not None and self._hilo.is_alive(),
+            "ultimo_id": self._ultimo_id,
+            **self.stats
+        }
@@ -0,0 +1,217 @@
+"""
+Cola de envío de emails con workers y sesiones SMTP persistentes
+ExpoKossodo 2025
+
+Antes, cada registro lanzaba un threading.Thread propio y cada email abría su
+propia conexión SMTP (conexión + STARTTLS + login) para un solo mensaje. En
+ráfagas de registro eso eran cientos de hilos y de logins simultáneos, y el
+proveedor de correo terminaba limitándonos.
+
+Ahora los emails pasan por una cola acotada atendida por un número fijo de
+workers. Cada worker mantiene una sesión SMTP autenticada y la reutiliza para
+muchos mensajes; la cierra si queda inactiva y la reabre al llegar trabajo.
+Los errores transitorios (desconexión, timeouts, respuestas 4xx) se
+reintentan con backoff exponencial; los 5xx se dan por fallidos. El reintento
+no duerme al worker: queda en una lista de diferidos con su hora mínima y el
+worker sigue con la cola, así un proveedor que nos limita no frena los demás
+emails durante todo el backoff.
+
+Configuración (variables de entorno):
+- EMAIL_QUEUE_WORKERS       workers por proceso (2)
+- EMAIL_QUEUE_MAXSIZE       emails en espera antes de rechazar (1000)
+- EMAIL_MAX_INTENTOS        intentos de envío por email (4)
+- EMAIL_BACKOFF_SEGUNDOS    espera base entre reintentos (2)
+- EMAIL_SMTP_IDLE_SEGUNDOS  inactividad tras la que se cierra la sesión (60)
+"""
+
+import heapq
+import itertools
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+from collections import deque
+
+
+class ColaEmail:
+    """Cola acotada de emails con un pool fijo de workers SMTP"""
+
+    def __init__(self, workers=None, maxsize=None, max_intentos=None, backoff_segundos=None):
+        self.num_workers = workers or int(os.getenv('EMAIL_QUEUE_WORKERS', 2))
+        self.max_intentos = max_intentos or int(os.getenv('EMAIL_MAX_INTENTOS', 4))
+        self.backoff = backoff_segundos if backoff_segundos is not None else float(os.getenv('EMAIL_BACKOFF_SEGUNDOS', 2))
+        self.idle = float(os.getenv('EMAIL_SMTP_IDLE_SEGUNDOS', 60))
+        self._cola = queue.Queue(maxsize=maxsize or int(os.getenv('EMAIL_QUEUE_MAXSIZE', 1000)))
+        self._lock = threading.Lock()
+        self._hilos = []
+        self._pid = None
+        self._latencias = deque(maxlen=500)
+        # Reintentos pendientes: heap de (no_antes, secuencia, trabajo)
+        self._diferidos = []
+        self._secuencia = itertools.count()
+        self.stats = {
+            'encolados': 0, 'enviados': 0, 'fallidos': 0,
+            'reintentos': 0, 'rechazados': 0, 'logins': 0
+        }
+
+    # --- Workers ---
+
+    def _iniciar_workers(self):
+        """Arrancar los workers en este proceso (con preload_app los hilos no sobreviven al fork)"""
+        with self._lock:
+            if self._pid == os.getpid() and all(hilo.is_alive() for hilo in self._hilos):
+                return
+            self._pid = os.getpid()
+            self._hilos = [hilo for hilo in self._hilos if hilo.is_alive()]
+            for i in range(len(self._hilos), self.num_workers):
+                hilo = threading.Thread(target=self._trabajador, name=f"email-worker-{i}", daemon=True)
+                hilo.start()
+                self._hilos.append(hilo)
+
+    def _abrir_sesion(self):
+        servidor = smtplib.SMTP(
+            os.getenv('EMAIL_HOST', 'smtp.gmail.com'),
+            int(os.getenv('EMAIL_PORT', 587)),
+            timeout=30
+        )
+        servidor.starttls()
+        servidor.login(os.getenv('EMAIL_USER'), os.getenv('EMAIL_PASSWORD'))
+        self._contar('logins')
+        return servidor
+
+    def _contar(self, clave):
+        # Los workers y los requests actualizan stats desde hilos distintos
+        with self._lock:
+            self.stats[clave] += 1
+
+    @staticmethod
+    def _cerrar_sesion(servidor):
+        if servidor is None:
+            return
+        try:
+            servidor.quit()
+        except Exception:
+            try:
+                servidor.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _es_transitorio(error):
+        """Errores que vale la pena reintentar"""
+        if isinstance(error, smtplib.SMTPResponseException):
+            return 400 <= error.smtp_code < 500
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return all(400 <= codigo < 500 for codigo, _ in error.recipients.values())
+        return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+    def _siguiente(self):
+        """Próximo trabajo: un reintento vencido o, si no hay, el siguiente de la cola (None si no llegó nada)"""
+        with self._lock:
+            if self._diferidos and self._diferidos[0][0] <= time.time():
+                return heapq.heappop(self._diferidos)[2]
+            # No esperar en la cola más allá del próximo reintento
+            espera = self._diferidos[0][0] - time.time() if self._diferidos else self.idle
+        try:
+            construir_mensaje, descripcion, encolado_en = self._cola.get(timeout=min(self.idle, max(espera, 0.05)))
+        except queue.Empty:
+            return None
+        self._cola.task_done()
+        return construir_mensaje, descripcion, encolado_en, 1, None
+
+    def _diferir(self, trabajo, espera):
+        with self._lock:
+            heapq.heappush(self._diferidos, (time.time() + espera, next(self._secuencia), trabajo))
+
+    def _trabajador(self):
+        servidor = None
+        ultimo_uso = time.time()
+        while True:
+            trabajo = self._siguiente()
+            if trabajo is None:
+                if servidor is not None and time.time() - ultimo_uso >= self.idle:
+                    # Sin trabajo: liberar la sesión para que el proveedor no la corte a medias
+                    self._cerrar_sesion(servidor)
+                    servidor = None
+                continue
+
+            construir_mensaje, descripcion, encolado_en, intento, mensaje = trabajo
+            ultimo_uso = time.time()
+            try:
+                if mensaje is None:
+                    mensaje = construir_mensaje()
+                if mensaje is None:
+                    self._contar('fallidos')
+                    print(f"[EMAIL] No se pudo construir el email para {descripcion}")
+                    continue
+
+                try:
+                    if servidor is None:
+                        servidor = self._abrir_sesion()
+                    servidor.send_message(mensaje)
+                    self._contar('enviados')
+                    self._latencias.append(time.time() - encolado_en)
+                    print(f"[EMAIL] Enviado a {descripcion} (intento {intento})")
+                except Exception as e:
+                    # La sesión puede haber quedado en un estado inválido: reabrirla
+                    self._cerrar_sesion(servidor)
+                    servidor = None
+                    if intento >= self.max_intentos or not self._es_transitorio(e):
+                        self._contar('fallidos')
+                        print(f"[EMAIL] Error enviando a {descripcion}: {e}")
+                        continue
+                    espera = self.backoff * (2 ** (intento - 1)) * (1 + random.random() * 0.25)
+                    self._contar('reintentos')
+                    print(f"[EMAIL] Reintento {intento}/{self.max_intentos - 1} para {descripcion} en {espera:.1f}s: {e}")
+                    self._diferir((construir_mensaje, descripcion, encolado_en, intento + 1, mensaje), espera)
+            except Exception as e:
+                self._contar('fallidos')
+                print(f"[EMAIL] Error procesando email para {descripcion}: {e}")
+
+    # --- API pública ---
+
+    def encolar(self, construir_mensaje, descripcion=''):
+        """
+        Agregar un email a la cola sin bloquear al llamador
+
+        Args:
+            construir_mensaje (callable): Devuelve el MIMEMultipart a enviar (o None si falla);
+                se ejecuta en el worker, fuera del request
+            descripcion (str): Destinatario o referencia para los logs
+
+        Returns:
+            bool: False si la cola está llena y el email se descartó
+        """
+        self._iniciar_workers()
+        try:
+            self._cola.put_nowait((construir_mensaje, descripcion, time.time()))
+        except queue.Full:
+            self._contar('rechazados')
+            print(f"[EMAIL] Cola llena ({self._cola.maxsize}), email descartado para {descripcion}")
+            return False
+        self._contar('encolados')
+        return True
+
+    def estadisticas(self):
+        """Profundidad de la cola, latencias (encolado → enviado) y contadores"""
+        latencias = sorted(self._latencias)
+        with self._lock:
+            stats = dict(self.stats)
+            diferidos = len(self._diferidos)
+
+        def percentil(p):
+            if not latencias:
+                return None
+            return round(latencias[min(len(latencias) - 1, int(len(latencias) * p))] * 1000, 1)
+
+        return {
+            "profundidad": self._cola.qsize(),
+            "capacidad": self._cola.maxsize,
+            "reintentos_pendientes": diferidos,
+            "workers": self.num_workers,
+            "workers_vivos": sum(1 for hilo in self._hilos if hilo.is_alive()),
+            "latencia_ms": {"p50": percentil(0.5), "p95": percentil(0.95), "max": percentil(1.0)},
+            **stats
+        }
@@ -0,0 +1,31 @@
+"""
+Modo de concurrencia del proceso: hilos (sync/gthread) o gevent
+ExpoKossodo 2025
+
+Con GUNICORN_WORKER_CLASS=gevent, gunicorn_config.py parchea la librería
+estándar (socket, ssl, time.sleep, threading, queue) antes de importar la
+app: cada request es un greenlet y las esperas de red (OpenAI, webhook de
+WhatsApp, FTP, MySQL en modo puro) ceden el control a los demás requests.
+
+Lo que no pasa por sockets de Python -cámara con OpenCV, extensiones en C-
+sigue bloqueando el hub de gevent entero. Esas llamadas deben ir por
+ejecutar_bloqueante(), que en modo gevent las corre en el pool de hilos
+nativos del hub y en modo hilos las llama directamente.
+"""
+
+
+def gevent_activo():
+    """True si el proceso corre con la librería estándar parcheada por gevent"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('socket')
+
+
+def ejecutar_bloqueante(funcion, *args, **kwargs):
+    """Ejecutar una llamada que bloquea fuera del hub de gevent (o directo en modo hilos)"""
+    if gevent_activo():
+        import gevent
+        return gevent.get_hub().threadpool.apply(funcion, args, kwargs)
+    return funcion(*args, **kwargs)
@@ -12,11 +12,11 @@ Fecha: 2025-01-02
 
 import mysql.connector
 from mysql.connector import Error
-import json
 import os
 from datetime import datetime
 from dotenv import load_dotenv
 import sys
+from inscripciones import recalcular_total_eventos
 
 # Cargar variables de entorno
 load_dotenv()
@@ -163,24 +163,16 @@ class ConsolidadorRegistros:
         self.cursor.execute(query)
         return self.cursor.fetchall()
         
-    def consolidar_eventos(self, eventos_arrays):
-        """Consolida múltiples arrays de eventos en uno único"""
-        eventos_unicos = set()
-        
-        for eventos_json in eventos_arrays:
-            if eventos_json:
-                try:
-                    if isinstance(eventos_json, str):
-                        eventos = json.loads(eventos_json)
-                    else:
-                        eventos = eventos_json
-                        
-                    if isinstance(eventos, list):
-                        eventos_unicos.update(eventos)
-                except (json.JSONDecodeError, TypeError) as e:
-                    self.log(f"  ⚠️ Error parseando eventos: {e}", "WARN")
-                    
-        return sorted(list(eventos_unicos))
+    def consolidar_eventos(self, ids_list):
+        """Eventos únicos del grupo según expokossodo_registro_eventos (única fuente de inscripciones)"""
+        ids_str = ','.join(map(str, ids_list))
+        self.cursor.execute(f"""
+            SELECT DISTINCT evento_id
+            FROM expokossodo_registro_eventos
+            WHERE registro_id IN ({ids_str})
+            ORDER BY evento_id
+        """)
+        return [row['evento_id'] for row in self.cursor.fetchall()]
         
     def consolidar_grupo(self, grupo):
         """Consolida un grupo de registros duplicados"""
@@ -207,9 +199,7 @@ class ConsolidadorRegistros:
         correo_consolidado = ', '.join(correos_unicos)
         
         # Consolidar eventos
-        eventos_arrays = [registro['eventos_seleccionados'] for registro in registros]
-        eventos_consolidados = self.consolidar_eventos(eventos_arrays)
-        eventos_json = json.dumps(eventos_consolidados)
+        eventos_consolidados = self.consolidar_eventos(ids)
         
         # Determinar confirmado y asistencia
         confirmado = any(registro['confirmado'] for registro in registros)
@@ -230,7 +220,6 @@ class ConsolidadorRegistros:
                     UPDATE expokossodo_registros 
                     SET 
                         correo = %s,
-                        eventos_seleccionados = %s,
                         confirmado = %s,
                         asistencia_general_confirmada = %s
                     WHERE id = %s
@@ -238,7 +227,6 @@ class ConsolidadorRegistros:
                 
                 self.cursor.execute(update_query, (
                     correo_consolidado,
-                    eventos_json,
                     confirmado,
                     asistencia_confirmada,
                     id_principal
@@ -248,6 +236,7 @@ class ConsolidadorRegistros:
                 
                 # Actualizar relaciones
                 self.actualizar_relaciones(id_principal, ids_eliminar)
+                recalcular_total_eventos(self.cursor, [id_principal])
                 
                 # Eliminar registros duplicados
                 if ids_eliminar:
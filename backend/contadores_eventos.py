@@ -0,0 +1,167 @@
+"""
+Contadores por evento de inscritos y presentes
+ExpoKossodo 2025
+
+Las tablets de verificación por sala consultan seguido cuántos inscritos y
+presentes tiene cada charla. Calcularlo con COUNT(DISTINCT) sobre un doble
+LEFT JOIN (inscripciones x asistencias por evento) era la consulta más pesada
+del panel. Ahora expokossodo_eventos guarda total_registrados y
+total_presentes. total_registrados lo incrementan, en la misma transacción,
+los endpoints que insertan inscripciones; total_presentes lo suma el trigger
+trg_asistencias_presentes por cada ingreso insertado (migración 11).
+
+Si algo modifica las tablas por fuera de la app (scripts de consolidación,
+borrados en cascada) los contadores pueden desviarse; reconciliar() los
+compara con los conteos reales y corrige las diferencias.
+
+Las columnas las crea la migración 5 de migraciones.py, que start.sh aplica
+antes de arrancar gunicorn: sin ellas reservar_cupos, el ingreso a sala y los
+endpoints de verificación fallan con "Unknown column" (ver README_ENV.md,
+"Esquema de la base de datos").
+
+Uso como job:
+    python contadores_eventos.py              # reporta y corrige
+    python contadores_eventos.py --solo-revisar
+"""
+
+import argparse
+import os
+
+CAMPOS_CONTADOR = ('total_registrados', 'total_presentes')
+
+
+def incrementar(cursor, evento_id, **incrementos):
+    """
+    Sumar a los contadores de un evento (llamar dentro de la transacción del INSERT)
+
+    Ejemplo:
+        incrementar(cursor, evento_id, total_registrados=1)
+    """
+    asignaciones = []
+    valores = []
+    for campo, cantidad in incrementos.items():
+        if campo not in CAMPOS_CONTADOR:
+            raise ValueError(f"Contador desconocido: {campo}")
+        asignaciones.append(f"{campo} = {campo} + %s")
+        valores.append(cantidad)
+
+    cursor.execute(f"""
+        UPDATE expokossodo_eventos
+        SET {', '.join(asignaciones)}
+        WHERE id = %s
+    """, valores + [evento_id])
+
+
+def reconciliar(connection, corregir=True):
+    """
+    Comparar los contadores con los conteos reales y corregir la deriva
+
+    Los eventos se bloquean (FOR UPDATE) antes de contar: una inscripción o un
+    ingreso en curso termina antes o espera a que se corrija, así la corrección
+    nunca pisa un incremento concurrente.
+
+    Returns:
+        list: Eventos con diferencias [{id, campo, contador, real}]
+    """
+    cursor = connection.cursor(dictionary=True)
+    try:
+        connection.start_transaction()
+        diferencias = reconciliar_en_transaccion(cursor, corregir)
+        if corregir:
+            connection.commit()
+        else:
+            connection.rollback()
+        return diferencias
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def reconciliar_en_transaccion(cursor, corregir=True):
+    """
+    Cuerpo de reconciliar() dentro de una transacción que abre y confirma quien llama
+
+    La usa la migración que crea los contadores: la carga inicial se confirma
+    junto con el registro de la versión.
+
+    Args:
+        cursor: Cursor (dictionary=True) de la conexión con la transacción abierta
+    """
+    cursor.execute("""
+        SELECT id, total_registrados, total_presentes
+        FROM expokossodo_eventos
+        ORDER BY id
+        FOR UPDATE
+    """)
+    contadores = {row['id']: row for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT evento_id, COUNT(*) AS total
+        FROM expokossodo_registro_eventos
+        GROUP BY evento_id
+    """)
+    registrados = {row['evento_id']: row['total'] for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT evento_id, COUNT(*) AS total
+        FROM expokossodo_asistencias_por_sala
+        GROUP BY evento_id
+    """)
+    presentes = {row['evento_id']: row['total'] for row in cursor.fetchall()}
+
+    diferencias = []
+    for evento_id, fila in contadores.items():
+        reales = {
+            'total_registrados': registrados.get(evento_id, 0),
+            'total_presentes': presentes.get(evento_id, 0)
+        }
+        cambios = {campo: real for campo, real in reales.items() if fila[campo] != real}
+        for campo, real in cambios.items():
+            diferencias.append({'id': evento_id, 'campo': campo, 'contador': fila[campo], 'real': real})
+
+        if cambios and corregir:
+            cursor.execute(f"""
+                UPDATE expokossodo_eventos
+                SET {', '.join(f'{campo} = %s' for campo in cambios)}
+                WHERE id = %s
+            """, list(cambios.values()) + [evento_id])
+
+    return diferencias
+
+
+def main():
+    import mysql.connector
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Reconciliar contadores de inscritos y presentes por evento")
+    parser.add_argument('--solo-revisar', action='store_true', help='Reportar diferencias sin corregirlas')
+    args = parser.parse_args()
+
+    load_dotenv()
+    connection = mysql.connector.connect(
+        host=os.getenv('DB_HOST'),
+        database=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        port=int(os.getenv('DB_PORT', 3306)),
+        autocommit=True,
+        connection_timeout=10
+    )
+    try:
+        diferencias = reconciliar(connection, corregir=not args.solo_revisar)
+    finally:
+        connection.close()
+
+    if not diferencias:
+        print("[OK] Contadores consistentes")
+        return
+    for d in diferencias:
+        print(f"[DIFF] Evento {d['id']} {d['campo']}: contador={d['contador']} real={d['real']}")
+    print(f"[{'INFO' if args.solo_revisar else 'OK'}] {len(diferencias)} diferencias "
+          f"{'encontradas' if args.solo_revisar else 'corregidas'}")
+
+
+if __name__ == '__main__':
+    main()
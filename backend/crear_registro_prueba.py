@@ -11,6 +11,7 @@ import time
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import get_db_connection, generar_texto_qr
+from inscripciones import sumar_total_eventos
 
 def crear_registro_prueba():
     """Crear un registro de prueba con QR válido"""
@@ -57,8 +58,8 @@ def crear_registro_prueba():
         # Insertar registro
         cursor.execute("""
             INSERT INTO expokossodo_registros 
-            (nombres, correo, empresa, cargo, numero, expectativas, eventos_seleccionados, qr_code, qr_generado_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())
+            (nombres, correo, empresa, cargo, numero, expectativas, qr_code, qr_generado_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
         """, (
             datos_prueba['nombres'],
             datos_prueba['correo'],
@@ -66,7 +67,6 @@ def crear_registro_prueba():
             datos_prueba['cargo'],
             datos_prueba['numero'],
             datos_prueba['expectativas'],
-            '[]',  # Sin eventos seleccionados para la prueba
             qr_text
         ))
         
@@ -90,6 +90,8 @@ def crear_registro_prueba():
                     SET slots_ocupados = slots_ocupados + 1
                     WHERE id = %s
                 """, (evento['id'],))
+            
+            sumar_total_eventos(cursor, registro_id, len(eventos))
         
         connection.commit()
         
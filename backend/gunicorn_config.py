@@ -3,9 +3,26 @@ import multiprocessing
 
 # Configuración del servidor
 bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
-workers = min(multiprocessing.cpu_count() * 2 + 1, 3)  # Limitar a 3 workers máximo para free tier
-worker_class = 'sync'  # Usar sync worker class (no gevent/eventlet)
-worker_connections = 1000
+workers = int(os.getenv('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 3)))  # Limitar a 3 workers máximo para free tier
+# Con DB_POOL_SIZE=auto el pool de cada worker se dimensiona con esta cantidad (pool_bd.tamano_pool)
+os.environ.setdefault('GUNICORN_WORKERS', str(workers))
+# gthread: cada request ocupa un hilo, no el proceso completo. Los streams SSE
+# (/api/verificar-sala/stream) quedan abiertos minutos y con workers sync cada
+# tablet conectada bloquearía un worker entero.
+# gevent: cada request es un greenlet; las esperas de red (chat con OpenAI,
+# webhook de WhatsApp, FTP) no ocupan hilos. worker_connections limita los
+# requests simultáneos por worker.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 32))
+# canal_checkins limita los streams SSE abiertos a la mitad de estos hilos
+os.environ.setdefault('GUNICORN_THREADS', str(threads))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+if worker_class == 'gevent':
+    # Parchear antes de que preload_app importe app.py: el pool MySQL, los
+    # locks y los sockets creados al importar deben ser cooperativos
+    from gevent import monkey
+    monkey.patch_all()
 
 # Timeouts
 timeout = 120  # Aumentar timeout a 120 segundos
@@ -17,7 +34,9 @@ max_requests = 1000
 max_requests_jitter = 50
 
 # Logging
-accesslog = '-'
+# El log de acceso lo reemplaza el registro estructurado por request de la app (logs_estructurados.py);
+# GUNICORN_ACCESSLOG='-' lo vuelve a activar
+accesslog = os.getenv('GUNICORN_ACCESSLOG') or None
 errorlog = '-'
 loglevel = 'info'
 capture_output = True
@@ -0,0 +1,259 @@
+"""
+Índice en memoria QR → asistente para los endpoints de escaneo
+ExpoKossodo 2025
+
+Cada escaneo en puerta (verificación general, verificación por sala y leads)
+resolvía el QR con un SELECT contra expokossodo_registros en el host remoto.
+Este módulo carga los datos de identificación de los asistentes una sola vez
+y los sirve desde memoria; los escaneos ya no pagan ese viaje a MySQL.
+
+Solo se indexan datos de identificación (id, nombres, correo, empresa, cargo,
+numero, fecha_registro). Los estados que cambian durante el evento
+(asistencia general, ingresos a sala) se siguen leyendo de la base de datos.
+
+Coherencia entre workers de gunicorn:
+- Un QR que no está en el índice se busca en la base de datos y se agrega
+  (read-through), así un registro creado en otro worker se encuentra igual.
+- El índice se recarga completo en segundo plano cuando supera su TTL
+  (QR_INDEX_TTL_SECONDS, 300s por defecto) para recoger ediciones de datos.
+"""
+
+import os
+import threading
+import time
+
+# Columnas cacheadas por asistente (todas inmutables durante un escaneo)
+CAMPOS_INDICE = ('id', 'nombres', 'correo', 'empresa', 'cargo', 'numero', 'fecha_registro')
+
+_SELECT_BASE = """
+    SELECT id, nombres, correo, empresa, cargo, numero, fecha_registro, qr_code
+    FROM expokossodo_registros
+"""
+
+
+class IndiceQR:
+    """Índice thread-safe de asistentes indexado por qr_code"""
+
+    def __init__(self, obtener_conexion, ttl_segundos=None):
+        """
+        Args:
+            obtener_conexion (callable): Devuelve una conexión MySQL o None
+            ttl_segundos (int): Segundos antes de recargar el índice completo
+        """
+        self._obtener_conexion = obtener_conexion
+        self._ttl = ttl_segundos if ttl_segundos is not None else int(os.getenv('QR_INDEX_TTL_SECONDS', 300))
+        self._por_qr = {}
+        self._qr_por_id = {}
+        self._lock = threading.Lock()
+        self._recargando = False
+        self._cargado_en = None
+        self.stats = {'hits': 0, 'misses': 0, 'cargas': 0}
+
+    # --- Carga ---
+
+    def cargar(self):
+        """Cargar (o recargar) todos los asistentes con QR desde la base de datos"""
+        connection = self._obtener_conexion()
+        if not connection:
+            print("[QR-INDEX] Sin conexión, índice no cargado")
+            self._marcar_intento()
+            return False
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            inicio = time.time()
+            cursor.execute(_SELECT_BASE + " WHERE qr_code IS NOT NULL AND qr_code != ''")
+            por_qr = {}
+            qr_por_id = {}
+            for row in cursor.fetchall():
+                qr_code = row.pop('qr_code')
+                por_qr[qr_code] = row
+                qr_por_id[row['id']] = qr_code
+
+            with self._lock:
+                self._por_qr = por_qr
+                self._qr_por_id = qr_por_id
+                self._cargado_en = time.time()
+                self.stats['cargas'] += 1
+
+            print(f"[QR-INDEX] {len(por_qr)} asistentes indexados en {time.time() - inicio:.3f}s")
+            return True
+        except Exception as e:
+            print(f"[QR-INDEX] Error cargando índice: {e}")
+            self._marcar_intento()
+            return False
+        finally:
+            cursor.close()
+            connection.close()
+
+    def cargar_si_falta(self):
+        """Cargar el índice solo si todavía no se intentó (precalentamiento del worker)"""
+        if self._cargado_en is None:
+            return self.cargar()
+        return True
+
+    def _marcar_intento(self):
+        """Tras una carga fallida, esperar al TTL antes de reintentar (mientras tanto read-through)"""
+        if self._cargado_en is None:
+            self._cargado_en = time.time()
+
+    def _recargar_en_background(self):
+        """Lanzar una recarga completa sin bloquear el escaneo actual"""
+        with self._lock:
+            if self._recargando:
+                return
+            self._recargando = True
+
+        def _tarea():
+            try:
+                self.cargar()
+            finally:
+                with self._lock:
+                    self._recargando = False
+
+        threading.Thread(target=_tarea, daemon=True).start()
+
+    def _buscar_en_db(self, qr_code):
+        """Resolver un QR que no está en el índice con una consulta puntual"""
+        connection = self._obtener_conexion()
+        if not connection:
+            return None
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(_SELECT_BASE + " WHERE qr_code = %s LIMIT 1", (qr_code,))
+            row = cursor.fetchone()
+            if row:
+                row.pop('qr_code', None)
+            return row
+        except Exception as e:
+            print(f"[QR-INDEX] Error buscando QR en base de datos: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _buscar_varios_en_db(self, qr_codes):
+        """Resolver varios QR ausentes del índice con una sola consulta"""
+        connection = self._obtener_conexion()
+        if not connection:
+            return {}
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            placeholders = ','.join(['%s'] * len(qr_codes))
+            cursor.execute(_SELECT_BASE + f" WHERE qr_code IN ({placeholders})", list(qr_codes))
+            return {row.pop('qr_code'): row for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"[QR-INDEX] Error buscando QRs en base de datos: {e}")
+            return {}
+        finally:
+            cursor.close()
+            connection.close()
+
+    # --- Lectura ---
+
+    def buscar(self, qr_code):
+        """
+        Obtener los datos de identificación del asistente dueño del QR
+
+        Returns:
+            dict: Copia de los datos del asistente, o None si el QR no existe
+        """
+        if not qr_code:
+            return None
+
+        if self._cargado_en is None:
+            self.cargar()
+        elif time.time() - self._cargado_en > self._ttl:
+            self._recargar_en_background()
+
+        registro = self._por_qr.get(qr_code)
+        if registro is not None:
+            self.stats['hits'] += 1
+            return dict(registro)
+
+        self.stats['misses'] += 1
+        registro = self._buscar_en_db(qr_code)
+        if registro is None:
+            return None
+
+        self.registrar(qr_code, registro)
+        return dict(registro)
+
+    def buscar_varios(self, qr_codes):
+        """
+        Resolver un lote de QR (los ausentes del índice van a la BD en una sola consulta)
+
+        Returns:
+            dict: {qr_code: copia de los datos del asistente} solo para los QR existentes
+        """
+        qr_codes = {qr for qr in qr_codes if qr}
+        if not qr_codes:
+            return {}
+
+        if self._cargado_en is None:
+            self.cargar()
+        elif time.time() - self._cargado_en > self._ttl:
+            self._recargar_en_background()
+
+        encontrados = {}
+        faltantes = []
+        for qr_code in qr_codes:
+            registro = self._por_qr.get(qr_code)
+            if registro is not None:
+                encontrados[qr_code] = dict(registro)
+            else:
+                faltantes.append(qr_code)
+        self.stats['hits'] += len(encontrados)
+        self.stats['misses'] += len(faltantes)
+
+        if faltantes:
+            for qr_code, registro in self._buscar_varios_en_db(faltantes).items():
+                self.registrar(qr_code, registro)
+                encontrados[qr_code] = dict(registro)
+        return encontrados
+
+    # --- Escritura (llamar después del commit) ---
+
+    def registrar(self, qr_code, datos):
+        """Agregar o actualizar el asistente asociado a un QR (los campos ausentes se conservan)"""
+        if not qr_code or not datos or datos.get('id') is None:
+            return
+
+        with self._lock:
+            qr_anterior = self._qr_por_id.get(datos['id'])
+            registro = dict(self._por_qr.get(qr_anterior, {})) if qr_anterior else {}
+            registro.update({campo: datos[campo] for campo in CAMPOS_INDICE if campo in datos})
+            for campo in CAMPOS_INDICE:
+                registro.setdefault(campo, None)
+
+            if qr_anterior and qr_anterior != qr_code:
+                self._por_qr.pop(qr_anterior, None)
+            self._por_qr[qr_code] = registro
+            self._qr_por_id[registro['id']] = qr_code
+
+    def actualizar_por_id(self, registro_id, **campos):
+        """Actualizar campos de un asistente ya indexado, identificado por su id"""
+        with self._lock:
+            qr_code = self._qr_por_id.get(registro_id)
+            if not qr_code or qr_code not in self._por_qr:
+                return False
+
+            registro = dict(self._por_qr[qr_code])
+            for campo, valor in campos.items():
+                if campo in CAMPOS_INDICE and campo != 'id':
+                    registro[campo] = valor
+            self._por_qr[qr_code] = registro
+            return True
+
+    def estadisticas(self):
+        """Resumen del estado del índice para diagnóstico"""
+        return {
+            "total": len(self._por_qr),
+            "hits": self.stats['hits'],
+            "misses": self.stats['misses'],
+            "cargas": self.stats['cargas'],
+            "edad_segundos": round(time.time() - self._cargado_en, 1) if self._cargado_en else None,
+            "ttl_segundos": self._ttl
+        }
@@ -0,0 +1,224 @@
+"""
+Registro de ingresos a sala: escaneo individual y lotes de escáneres sin conexión
+ExpoKossodo 2025
+
+verificar_ingreso() atiende cada escaneo de /api/verificar-sala/verificar en
+a lo más dos viajes a la BD (antes eran siete: usuario, inscripción, ingreso
+previo, START TRANSACTION, INSERT, UPDATE y COMMIT):
+
+1. Una consulta que une registro (por qr_code), evento, inscripción e ingreso
+   previo y decide si el escaneo procede. Los rechazos terminan acá.
+2. Si procede, un INSERT IGNORE en autocommit. total_presentes lo suma el
+   trigger trg_asistencias_presentes (migración 11) dentro de la misma
+   sentencia, así que ingreso y contador son atómicos sin abrir una
+   transacción. La clave única (registro_id, evento_id) resuelve la carrera
+   de dos verificadores con el mismo QR: el segundo INSERT no inserta filas y
+   el trigger no se dispara.
+
+Ninguna sentencia deja una transacción abierta en la conexión del pool.
+
+Cuando la red del recinto se cae, las tablets de verificación siguen
+escaneando y guardan los QR en cola; al volver la conexión suben todo junto.
+Reenviarlos uno por uno a /api/verificar-sala/verificar eran 3 consultas y un
+commit por escaneo, y los ingresos quedaban con la hora de la subida.
+
+registrar_ingresos_lote() procesa el lote con un número fijo de sentencias,
+sin importar cuántos escaneos traiga:
+
+1. Un SELECT de las inscripciones (registro_id, evento_id) del lote.
+2. Un INSERT IGNORE multi-fila de los ingresos inscritos, con la hora real del
+   escaneo como fecha_ingreso. La clave única (registro_id, evento_id) descarta
+   los que ya habían ingresado.
+3. Solo si se descartó una parte: un SELECT por rango de id para distinguir lo
+   insertado de lo que ya existía. Un INSERT multi-fila reserva sus ids
+   consecutivos, así que las filas nuevas están entre lastrowid y lastrowid +
+   filas - 1. Se confirman con fecha_ingreso y verificador del lote, por si
+   otro verificador registró el mismo ingreso al mismo tiempo. La columna
+   notas (visible para el personal) no se toca.
+
+total_presentes lo suma el trigger por cada fila insertada.
+
+La conexión del pool trabaja con autocommit, así que quien llama debe abrir la
+transacción (connection.start_transaction()) y hacer commit después.
+"""
+
+from datetime import datetime
+
+REGISTRADO = 'registrado'
+YA_REGISTRADO = 'ya_registrado'
+NO_INSCRITO = 'no_inscrito'
+USUARIO_NO_ENCONTRADO = 'usuario_no_encontrado'
+QR_INVALIDO = 'qr_invalido'
+DUPLICADO_EN_LOTE = 'duplicado_en_lote'
+DATOS_INCOMPLETOS = 'datos_incompletos'
+
+NO_EXISTE = 'no_existe'
+
+SQL_VERIFICAR_INGRESO = """
+    SELECT r.id, r.nombres, r.empresa, r.cargo,
+           e.id AS evento_id, e.titulo_charla, e.hora, e.sala,
+           re.id IS NOT NULL AS inscrito,
+           a.fecha_ingreso
+    FROM expokossodo_registros r
+    LEFT JOIN expokossodo_eventos e ON e.id = %s
+    LEFT JOIN expokossodo_registro_eventos re
+        ON re.registro_id = r.id AND re.evento_id = e.id
+    LEFT JOIN expokossodo_asistencias_por_sala a
+        ON a.registro_id = r.id AND a.evento_id = e.id
+    WHERE r.qr_code = %s
+    ORDER BY r.id
+    LIMIT 1
+"""
+
+# rowcount es 1 si el INSERT IGNORE insertó y 0 si la clave única lo descartó
+SQL_REGISTRAR_INGRESO = """
+    INSERT IGNORE INTO expokossodo_asistencias_por_sala
+    (registro_id, evento_id, qr_escaneado, asesor_verificador, ip_verificacion, notas)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+# Tolerancia para relojes de tablets adelantados antes de descartar la hora del escaneo
+TOLERANCIA_FUTURO_SEGUNDOS = 300
+
+
+def fecha_escaneo(valor, ahora=None):
+    """
+    Hora local (naive, como el resto de fechas de la app) de un escaneo offline
+
+    Acepta epoch en segundos o milisegundos (Date.now() del navegador) e ISO
+    8601 con o sin zona. Un valor ausente, inválido o en el futuro se
+    reemplaza por la hora actual.
+
+    Returns:
+        tuple: (datetime, bool) con la fecha y si se usó la hora del escaneo
+    """
+    ahora = ahora or datetime.now()
+    fecha = None
+    try:
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            segundos = valor / 1000 if valor > 1e11 else valor
+            fecha = datetime.fromtimestamp(segundos)
+        elif isinstance(valor, str) and valor.strip():
+            fecha = datetime.fromisoformat(valor.strip().replace('Z', '+00:00'))
+            if fecha.tzinfo is not None:
+                fecha = fecha.astimezone().replace(tzinfo=None)
+    except (ValueError, OverflowError, OSError):
+        fecha = None
+
+    if fecha is None or (fecha - ahora).total_seconds() > TOLERANCIA_FUTURO_SEGUNDOS:
+        return ahora, False
+    return fecha.replace(microsecond=0), True
+
+
+def verificar_ingreso(cursor, qr_code, evento_id, asesor_verificador, ip_verificacion, notas=''):
+    """
+    Verificar y registrar el ingreso de un asistente a la sala de un evento
+
+    Usa la conexión en autocommit: el INSERT (con el contador que suma el
+    trigger) se confirma solo y no queda ninguna transacción abierta.
+
+    Args:
+        cursor: Cursor (dictionary=True) de una conexión del pool
+        qr_code (str): QR escaneado (ya validado con parsear_qr)
+        evento_id (int): Evento de la sala
+
+    Returns:
+        tuple: (estado, datos) con estado REGISTRADO, YA_REGISTRADO, NO_INSCRITO,
+        NO_EXISTE o USUARIO_NO_ENCONTRADO y datos la fila de la consulta (o None)
+    """
+    cursor.execute(SQL_VERIFICAR_INGRESO, (evento_id, qr_code))
+    # fetchall consume el resultado completo: sin "Unread result found" ni bucles de nextset()
+    filas = cursor.fetchall()
+    datos = filas[0] if filas else None
+    if not datos:
+        return USUARIO_NO_ENCONTRADO, None
+    if datos['evento_id'] is None:
+        return NO_EXISTE, datos
+    if not datos['inscrito']:
+        return NO_INSCRITO, datos
+    if datos['fecha_ingreso'] is not None:
+        return YA_REGISTRADO, datos
+
+    cursor.execute(SQL_REGISTRAR_INGRESO, (
+        datos['id'], evento_id, qr_code, asesor_verificador, ip_verificacion, notas
+    ))
+    insertado = cursor.rowcount == 1
+    return (REGISTRADO if insertado else YA_REGISTRADO), datos
+
+
+def _pares_sql(pares):
+    placeholders = ','.join(['(%s,%s)'] * len(pares))
+    valores = [valor for par in pares for valor in par]
+    return placeholders, valores
+
+
+def registrar_ingresos_lote(cursor, ingresos, asesor_verificador, ip_verificacion):
+    """
+    Registrar los ingresos de un lote dentro de la transacción abierta
+
+    Args:
+        cursor: Cursor (dictionary=True) de una conexión con transacción abierta
+        ingresos (list): [{registro_id, evento_id, qr_code, fecha_ingreso}] sin pares repetidos
+        asesor_verificador (str): Verificador que subió el lote
+        ip_verificacion (str): IP de la tablet
+
+    Returns:
+        dict: {(registro_id, evento_id): REGISTRADO, YA_REGISTRADO o NO_INSCRITO}
+    """
+    if not ingresos:
+        return {}
+
+    pares = [(ingreso['registro_id'], ingreso['evento_id']) for ingreso in ingresos]
+    placeholders, valores = _pares_sql(pares)
+    cursor.execute(f"""
+        SELECT registro_id, evento_id
+        FROM expokossodo_registro_eventos
+        WHERE (registro_id, evento_id) IN ({placeholders})
+    """, valores)
+    inscritos = {(fila['registro_id'], fila['evento_id']) for fila in cursor.fetchall()}
+
+    resultado = {par: NO_INSCRITO for par in pares}
+    por_insertar = [ingreso for ingreso in ingresos
+                    if (ingreso['registro_id'], ingreso['evento_id']) in inscritos]
+    if not por_insertar:
+        return resultado
+
+    # Segundos exactos: TIMESTAMP redondea las fracciones y la verificación compara fechas
+    fechas = {(ingreso['registro_id'], ingreso['evento_id']): ingreso['fecha_ingreso'].replace(microsecond=0)
+              for ingreso in por_insertar}
+    filas = ','.join(['(%s, %s, %s, %s, %s, %s)'] * len(por_insertar))
+    valores = []
+    for ingreso in por_insertar:
+        valores.extend([
+            ingreso['registro_id'], ingreso['evento_id'], ingreso['qr_code'],
+            fechas[(ingreso['registro_id'], ingreso['evento_id'])], asesor_verificador, ip_verificacion
+        ])
+    cursor.execute(f"""
+        INSERT IGNORE INTO expokossodo_asistencias_por_sala
+        (registro_id, evento_id, qr_escaneado, fecha_ingreso, asesor_verificador, ip_verificacion)
+        VALUES {filas}
+    """, valores)
+
+    if cursor.rowcount == len(por_insertar):
+        insertados = set(fechas)
+    elif cursor.rowcount > 0:
+        # ids reservados juntos por el INSERT: las filas nuevas del lote caen en este rango
+        primero = cursor.lastrowid
+        cursor.execute("""
+            SELECT registro_id, evento_id, fecha_ingreso, asesor_verificador
+            FROM expokossodo_asistencias_por_sala
+            WHERE id BETWEEN %s AND %s
+        """, (primero, primero + len(por_insertar) - 1))
+        insertados = {
+            (fila['registro_id'], fila['evento_id']) for fila in cursor.fetchall()
+            if fechas.get((fila['registro_id'], fila['evento_id'])) == fila['fecha_ingreso']
+            and fila['asesor_verificador'] == asesor_verificador
+        }
+    else:
+        insertados = set()
+
+    # total_presentes lo suma el trigger por cada fila insertada
+    for par in inscritos:
+        resultado[par] = REGISTRADO if par in insertados else YA_REGISTRADO
+
+    return resultado
@@ -0,0 +1,223 @@
+"""
+Inscripciones registro-evento con una sola fuente de verdad
+ExpoKossodo 2025
+
+Las inscripciones de cada asistente vivían en dos lugares que había que
+mantener sincronizados: la columna JSON expokossodo_registros.eventos_seleccionados
+(crear_registro la leía con json.loads, la combinaba con list(set(...)) y la
+reescribía con json.dumps) y la tabla expokossodo_registro_eventos. El cache
+de los verificadores además volvía a parsear el JSON de cada asistente solo
+para contar sus charlas.
+
+Ahora expokossodo_registro_eventos es la única fuente de verdad:
+
+- expokossodo_registros.total_eventos es un contador que incrementa, en la
+  misma transacción, quien inserta inscripciones (vincular_eventos y el
+  agregado manual desde la sala), igual que los contadores por evento de
+  contadores_eventos.
+- La columna eventos_seleccionados queda por compatibilidad con datos y
+  scripts viejos, pero la app ya no la escribe. Los endpoints que la devuelven
+  la arman desde la tabla de relación (SQL_EVENTOS_SELECCIONADOS), con el
+  mismo texto JSON que parsea el frontend.
+
+migrar() (migración 9 de migraciones.py) agrega total_eventos y copia a la
+tabla de relación las inscripciones que estaban únicamente en el JSON. Corre
+hasta que la migración queda registrada y después nunca más: desde entonces
+el JSON no se mantiene y no es fuente.
+reconciliar_total_eventos() corrige la deriva del contador (borrados en
+cascada al eliminar eventos, scripts externos).
+
+Uso como job:
+    python inscripciones.py              # aplica migraciones pendientes y corrige total_eventos
+    python inscripciones.py --solo-revisar
+"""
+
+import argparse
+import json
+import os
+
+import migraciones
+
+# Lista de eventos del registro `r` como texto JSON ("[3, 7]"), NULL si no tiene inscripciones
+SQL_EVENTOS_SELECCIONADOS = """(
+    SELECT CONCAT('[', GROUP_CONCAT(re.evento_id ORDER BY re.evento_id SEPARATOR ', '), ']')
+    FROM expokossodo_registro_eventos re
+    WHERE re.registro_id = r.id
+)"""
+
+
+def ids_agrupados(valor):
+    """IDs de un GROUP_CONCAT(evento_id) ('3,7' → [3, 7]; None → [])"""
+    if not valor:
+        return []
+    if isinstance(valor, (bytes, bytearray)):
+        valor = valor.decode()
+    return [int(evento_id) for evento_id in valor.split(',')]
+
+
+def sumar_total_eventos(cursor, registro_id, cantidad):
+    """Sumar inscripciones nuevas al contador del registro (dentro de la transacción del INSERT)"""
+    if not cantidad:
+        return
+    cursor.execute("""
+        UPDATE expokossodo_registros
+        SET total_eventos = total_eventos + %s
+        WHERE id = %s
+    """, (cantidad, registro_id))
+
+
+def recalcular_total_eventos(cursor, registro_ids):
+    """Fijar total_eventos con el conteo real de los registros indicados"""
+    if not registro_ids:
+        return
+    placeholders = ','.join(['%s'] * len(registro_ids))
+    cursor.execute(f"""
+        UPDATE expokossodo_registros r
+        SET r.total_eventos = (
+            SELECT COUNT(*) FROM expokossodo_registro_eventos re WHERE re.registro_id = r.id
+        )
+        WHERE r.id IN ({placeholders})
+    """, list(registro_ids))
+
+
+def recalcular_todos_total_eventos(cursor):
+    """Cargar total_eventos de todos los registros con su conteo real (migración, transacción de quien llama)"""
+    cursor.execute("""
+        UPDATE expokossodo_registros r
+        LEFT JOIN (
+            SELECT registro_id, COUNT(*) AS total
+            FROM expokossodo_registro_eventos
+            GROUP BY registro_id
+        ) re ON re.registro_id = r.id
+        SET r.total_eventos = COALESCE(re.total, 0)
+    """)
+    return cursor.rowcount
+
+
+def reconciliar_total_eventos(connection, corregir=True):
+    """
+    Comparar total_eventos con las inscripciones reales y corregir la deriva
+
+    Solo se bloquean (FOR UPDATE) los registros con diferencias; una
+    inscripción en curso sobre ellos termina antes o espera a la corrección.
+
+    Returns:
+        list: Registros con diferencias [{id, contador, real}]
+    """
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT r.id, r.total_eventos AS contador, COUNT(re.evento_id) AS `real`
+            FROM expokossodo_registros r
+            LEFT JOIN expokossodo_registro_eventos re ON re.registro_id = r.id
+            GROUP BY r.id
+            HAVING contador <> `real`
+        """)
+        diferencias = cursor.fetchall()
+        if not diferencias or not corregir:
+            return diferencias
+
+        ids = [fila['id'] for fila in diferencias]
+        placeholders = ','.join(['%s'] * len(ids))
+        connection.start_transaction()
+        try:
+            cursor.execute(f"SELECT id FROM expokossodo_registros WHERE id IN ({placeholders}) FOR UPDATE", ids)
+            cursor.fetchall()
+            recalcular_total_eventos(cursor, ids)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        return diferencias
+    finally:
+        cursor.close()
+
+
+def migrar(connection):
+    """
+    Agregar total_eventos y pasar a la tabla de relación las inscripciones que solo estaban en el JSON
+
+    aplicar() repite la migración hasta registrarla, así que cada paso es
+    idempotente: la copia corre aunque la columna ya exista (un intento
+    anterior pudo crearla y fallar después, el ALTER se confirma solo) y usa
+    INSERT IGNORE. El JSON se lee en Python: JSON_TABLE no existe en MySQL 5.7
+    ni en MariaDB anterior a 10.6.
+
+    Returns:
+        int: Inscripciones copiadas desde eventos_seleccionados
+    """
+    cursor = connection.cursor()
+    try:
+        if not migraciones.agregar_columna(cursor, 'expokossodo_registros', 'total_eventos', 'INT NOT NULL DEFAULT 0'):
+            print("[INFO] Columna 'total_eventos' ya existe")
+
+        cursor.execute("SELECT id FROM expokossodo_eventos")
+        eventos = {fila[0] for fila in cursor.fetchall()}
+        cursor.execute("""
+            SELECT id, eventos_seleccionados FROM expokossodo_registros
+            WHERE eventos_seleccionados IS NOT NULL
+        """)
+        pares = []
+        for registro_id, valor in cursor.fetchall():
+            try:
+                evento_ids = json.loads(valor)
+            except (TypeError, ValueError):
+                print(f"[WARN] eventos_seleccionados inválido en registro {registro_id}, se omite")
+                continue
+            if not isinstance(evento_ids, list):
+                continue
+            # Solo eventos que existen (la FK rechazaría el resto)
+            pares.extend((registro_id, evento_id) for evento_id in evento_ids
+                         if isinstance(evento_id, int) and evento_id in eventos)
+
+        copiadas = 0
+        for inicio in range(0, len(pares), 1000):
+            cursor.executemany("""
+                INSERT IGNORE INTO expokossodo_registro_eventos (registro_id, evento_id)
+                VALUES (%s, %s)
+            """, pares[inicio:inicio + 1000])
+            copiadas += max(cursor.rowcount, 0)
+        connection.commit()
+        print(f"[OK] {copiadas} inscripciones copiadas desde eventos_seleccionados a expokossodo_registro_eventos")
+        return copiadas
+    finally:
+        cursor.close()
+
+
+def main():
+    import mysql.connector
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Aplicar migraciones pendientes y reconciliar total_eventos")
+    parser.add_argument('--solo-revisar', action='store_true', help='Reportar diferencias de total_eventos sin corregirlas')
+    args = parser.parse_args()
+
+    load_dotenv()
+    connection = mysql.connector.connect(
+        host=os.getenv('DB_HOST'),
+        database=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        port=int(os.getenv('DB_PORT', 3306)),
+        autocommit=True,
+        connection_timeout=10
+    )
+    try:
+        if not args.solo_revisar:
+            # Solo si la migración 9 sigue pendiente: después el JSON ya no es fuente
+            migraciones.aplicar(connection)
+        diferencias = reconciliar_total_eventos(connection, corregir=not args.solo_revisar)
+    finally:
+        connection.close()
+
+    if not diferencias:
+        print("[OK] total_eventos consistente")
+        return
+    for d in diferencias[:20]:
+        print(f"[DIFF] Registro {d['id']} total_eventos: contador={d['contador']} real={d['real']}")
+    print(f"[{'INFO' if args.solo_revisar else 'OK'}] {len(diferencias)} diferencias "
+          f"{'encontradas' if args.solo_revisar else 'corregidas'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Logging estructurado y asíncrono
+ExpoKossodo 2025
+
+log_request_info hacía tres print() por request, incluido
+str(request.get_json())[:100] (serializa el cuerpo completo para mostrar 100
+caracteres), y gunicorn (capture_output) escribía cada línea de forma
+síncrona en el hilo del request. En un pico de escaneos el log competía con
+la atención de los propios escaneos.
+
+Este módulo deja un único registro por request, en JSON, y saca la escritura
+del camino del request:
+
+- QueueHandler no bloqueante: el request solo encola el LogRecord; un
+  QueueListener por worker formatea y escribe en segundo plano. Si la cola se
+  llena se descartan registros (y se cuentan) en vez de frenar requests.
+- Cada registro lleva request_id (X-Request-ID del cliente o uno generado), que
+  también vuelve en la respuesta para cruzar logs del frontend y del backend.
+- Rutas ruidosas muestreadas: por defecto se registra 1 de cada 10 escaneos
+  exitosos; 4xx y 5xx se registran siempre.
+
+Configuración (variables de entorno):
+- LOG_LEVEL       nivel mínimo (INFO)
+- LOG_FORMATO     json o texto (json)
+- LOG_MUESTREO    tasas por ruta, "ruta:tasa,..." (escaneos a 0.1, /metrics a 0)
+- LOG_COLA_MAX    registros en espera antes de descartar (10000)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+
+MUESTREO_POR_DEFECTO = (
+    '/api/verificar/buscar-usuario:0.1,'
+    '/api/verificar-sala/verificar:0.1,'
+    '/api/verificar/confirmar-asistencia:0.1,'
+    '/metrics:0,'
+    '/api/health:0'
+)
+
+# Atributos estándar de LogRecord: lo demás (extra=...) se emite como campo del JSON
+_ATRIBUTOS_RECORD = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def _leer_muestreo(texto):
+    tasas = {}
+    for par in (texto or '').split(','):
+        ruta, _, tasa = par.strip().rpartition(':')
+        if ruta:
+            try:
+                tasas[ruta] = max(0.0, min(1.0, float(tasa)))
+            except ValueError:
+                print(f"[WARN] LOG_MUESTREO inválido para {ruta}: {tasa}")
+    return tasas
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro con los campos pasados en extra"""
+
+    def format(self, record):
+        datos = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        for clave, valor in record.__dict__.items():
+            if clave not in _ATRIBUTOS_RECORD and not clave.startswith('_'):
+                datos[clave] = valor
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class FormatoTexto(logging.Formatter):
+    """Formato legible para desarrollo local: mensaje + campos clave=valor"""
+
+    def format(self, record):
+        texto = super().format(record)
+        campos = ' '.join(f"{clave}={valor}" for clave, valor in record.__dict__.items()
+                          if clave not in _ATRIBUTOS_RECORD and not clave.startswith('_'))
+        return f"{texto} {campos}" if campos else texto
+
+
+class FiltroRequestId(logging.Filter):
+    """Agregar el request_id del request en curso a cada registro"""
+
+    def __init__(self, obtener_request_id):
+        super().__init__()
+        self.obtener_request_id = obtener_request_id
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            request_id = self.obtener_request_id()
+            if request_id:
+                record.request_id = request_id
+        return True
+
+
+class ManejadorCola(logging.handlers.QueueHandler):
+    """
+    QueueHandler que nunca bloquea y arranca su QueueListener en cada proceso
+
+    Con preload_app el listener del master no sobrevive al fork: cada worker
+    crea su cola y su hilo escritor la primera vez que registra algo.
+    """
+
+    def __init__(self, destino, capacidad):
+        super().__init__(queue.Queue(capacidad))
+        self.destino = destino
+        self.capacidad = capacidad
+        self.descartados = 0
+        self._pid = None
+        self._listener = None
+
+    def _asegurar_listener(self):
+        if self._pid == os.getpid():
+            return
+        self.acquire()
+        try:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.capacidad)
+            self._listener = logging.handlers.QueueListener(self.queue, self.destino, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.detener)
+        finally:
+            self.release()
+
+    def prepare(self, record):
+        # Formatear el mensaje acá es lo que hace QueueHandler; los argumentos ya no se necesitan
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_text = None
+        if record.exc_info:
+            record.exc_text = self.destino.formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+    def emit(self, record):
+        self._asegurar_listener()
+        super().emit(record)
+
+    def detener(self):
+        """Vaciar la cola al terminar el worker"""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+
+
+class RegistroRequests:
+    """Un registro por request, con muestreo por ruta y nivel según el status"""
+
+    def __init__(self, logger, muestreo=None):
+        self.logger = logger
+        self.tasas = _leer_muestreo(muestreo if muestreo is not None else os.getenv('LOG_MUESTREO', MUESTREO_POR_DEFECTO))
+        self.stats = {'registrados': 0, 'omitidos_por_muestreo': 0}
+
+    def registrar(self, ruta, status, **campos):
+        if status >= 500:
+            nivel = logging.ERROR
+        elif status >= 400:
+            nivel = logging.WARNING
+        else:
+            nivel = logging.INFO
+            tasa = self.tasas.get(ruta, 1.0)
+            if tasa < 1.0 and random.random() >= tasa:
+                self.stats['omitidos_por_muestreo'] += 1
+                return
+        if not self.logger.isEnabledFor(nivel):
+            return
+        self.stats['registrados'] += 1
+        self.logger.log(nivel, "request", extra={'ruta': ruta, 'status': status, **campos})
+
+
+def configurar_logging(obtener_request_id=lambda: None, destino=None):
+    """
+    Reemplazar los handlers del logger raíz por la cola asíncrona
+
+    Returns:
+        ManejadorCola: para consultar descartados
+    """
+    nivel = getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO)
+    salida = destino or logging.StreamHandler(sys.stdout)
+    if os.getenv('LOG_FORMATO', 'json').lower() == 'texto':
+        salida.setFormatter(FormatoTexto('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    else:
+        salida.setFormatter(FormatoJSON())
+
+    manejador = ManejadorCola(salida, int(os.getenv('LOG_COLA_MAX', 10000)))
+    manejador.addFilter(FiltroRequestId(obtener_request_id))
+
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(manejador)
+    raiz.setLevel(nivel)
+    return manejador
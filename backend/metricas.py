@@ -0,0 +1,330 @@
+"""
+Métricas en formato Prometheus agregadas entre workers de gunicorn
+ExpoKossodo 2025
+
+Hasta ahora la única medición era log_execution_time (un print al empezar y
+otro al terminar, en tres endpoints). Este módulo registra en memoria:
+
+- latencia de cada request por endpoint, método y status (histograma);
+- duración de cada consulta a la BD, etiquetada como "VERBO tabla";
+- viajes a la BD por request (histograma por endpoint);
+- profundidad de las tareas de fondo (cola de emails, transcripciones y
+  capturas de foto en curso) y estado del pool de conexiones.
+
+Cada worker tiene su propia memoria, así que vuelca su registro a un archivo
+JSON por pid en METRICAS_DIR (como versiones_cache, sin servicios extra) cada
+METRICAS_VOLCADO_SEGUNDOS. /metrics suma los archivos de todos los workers:
+
+- contadores e histogramas se suman siempre; los de workers que ya murieron
+  (max_requests los recicla) se acumulan en acumulado.json para que no bajen;
+- los gauges solo cuentan para workers vivos.
+
+Configuración (variables de entorno):
+- METRICAS_DIR                directorio de los archivos por worker (tmp/expokossodo_metricas)
+- METRICAS_VOLCADO_SEGUNDOS   cada cuánto vuelca cada worker (5)
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from functools import lru_cache, wraps
+
+try:
+    import fcntl
+except ImportError:  # Windows (desarrollo local): sin plegado de workers muertos
+    fcntl = None
+
+METRICAS_DIR = os.getenv('METRICAS_DIR', os.path.join(tempfile.gettempdir(), 'expokossodo_metricas'))
+VOLCADO_SEGUNDOS = float(os.getenv('METRICAS_VOLCADO_SEGUNDOS', 5))
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKETS_CONSULTA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+BUCKETS_VIAJES = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+ARCHIVO_ACUMULADO = 'acumulado.json'
+
+_SQL_VERBO = re.compile(r"^\s*(\w+)")
+_SQL_TABLA = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+`?(\w+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def etiqueta_consulta(sql):
+    """Etiqueta de baja cardinalidad para una consulta: 'SELECT expokossodo_eventos'"""
+    verbo = _SQL_VERBO.match(sql or '')
+    verbo = verbo.group(1).upper() if verbo else 'OTRO'
+    tabla = _SQL_TABLA.search(sql or '')
+    return f"{verbo} {tabla.group(1)}" if tabla else verbo
+
+
+def _clave(nombre, etiquetas):
+    return nombre, tuple(sorted(etiquetas.items()))
+
+
+class RegistroMetricas:
+    """Contadores, gauges e histogramas del proceso, volcados a disco para agregarlos"""
+
+    def __init__(self, directorio=None):
+        self.directorio = directorio or METRICAS_DIR
+        self._lock = threading.Lock()
+        self._definiciones = {}
+        self._contadores = {}
+        self._gauges = {}
+        self._histogramas = {}
+        self._recolectores = []
+        self._pid = None
+        self._hilo = None
+
+    # --- Definición ---
+
+    def definir(self, nombre, tipo, ayuda, buckets=None):
+        """Declarar una métrica (tipo: counter, gauge o histogram)"""
+        self._definiciones[nombre] = {'tipo': tipo, 'ayuda': ayuda, 'buckets': list(buckets or ())}
+
+    def agregar_recolector(self, recolector):
+        """Función que actualiza gauges justo antes de cada volcado (p. ej. profundidad de colas)"""
+        self._recolectores.append(recolector)
+
+    # --- Registro ---
+
+    def incrementar(self, nombre, cantidad=1, **etiquetas):
+        self._asegurar_volcado()
+        clave = _clave(nombre, etiquetas)
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + cantidad
+
+    def fijar(self, nombre, valor, **etiquetas):
+        self._asegurar_volcado()
+        with self._lock:
+            self._gauges[_clave(nombre, etiquetas)] = valor
+
+    def sumar(self, nombre, delta, **etiquetas):
+        """Sumar a un gauge (tareas en curso)"""
+        self._asegurar_volcado()
+        clave = _clave(nombre, etiquetas)
+        with self._lock:
+            self._gauges[clave] = self._gauges.get(clave, 0) + delta
+
+    def observar(self, nombre, valor, **etiquetas):
+        self._asegurar_volcado()
+        buckets = self._definiciones[nombre]['buckets']
+        clave = _clave(nombre, etiquetas)
+        with self._lock:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                # [conteo por bucket..., +Inf, suma]
+                histograma = self._histogramas[clave] = [0] * (len(buckets) + 1) + [0.0]
+            for posicion, limite in enumerate(buckets):
+                if valor <= limite:
+                    histograma[posicion] += 1
+                    break
+            else:
+                histograma[len(buckets)] += 1
+            histograma[-1] += valor
+
+    def tarea_en_curso(self, nombre):
+        """Decorador: gauge expokossodo_tareas_en_curso{tarea=nombre} mientras corre la función"""
+        def decorador(funcion):
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                self.sumar('expokossodo_tareas_en_curso', 1, tarea=nombre)
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self.sumar('expokossodo_tareas_en_curso', -1, tarea=nombre)
+            return envoltura
+        return decorador
+
+    # --- Volcado por worker ---
+
+    def _asegurar_volcado(self):
+        """Arrancar el hilo de volcado en este proceso (con preload_app los hilos no sobreviven al fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Proceso hijo: lo heredado del master ya está contado allá
+                self._contadores, self._gauges, self._histogramas = {}, {}, {}
+            self._pid = os.getpid()
+            self._hilo = threading.Thread(target=self._bucle_volcado, name='metricas-volcado', daemon=True)
+            self._hilo.start()
+
+    def _bucle_volcado(self):
+        while True:
+            time.sleep(VOLCADO_SEGUNDOS)
+            try:
+                self.volcar()
+            except Exception as e:
+                print(f"[METRICAS] Error volcando métricas: {e}")
+
+    def _serializar(self):
+        for recolector in self._recolectores:
+            try:
+                recolector()
+            except Exception as e:
+                print(f"[METRICAS] Error en recolector {getattr(recolector, '__name__', recolector)}: {e}")
+        with self._lock:
+            return {
+                'contadores': [[nombre, list(etiquetas), valor] for (nombre, etiquetas), valor in self._contadores.items()],
+                'gauges': [[nombre, list(etiquetas), valor] for (nombre, etiquetas), valor in self._gauges.items()],
+                'histogramas': [[nombre, list(etiquetas), list(valores)]
+                                for (nombre, etiquetas), valores in self._histogramas.items()]
+            }
+
+    def volcar(self):
+        """Escribir el registro de este worker (reemplazo atómico del archivo)"""
+        if self._pid != os.getpid():
+            return
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = os.path.join(self.directorio, f"{self._pid}.json")
+        # Temporal por hilo: el hilo de volcado y /metrics pueden volcar a la vez
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(self._serializar(), archivo)
+        os.replace(temporal, ruta)
+
+    # --- Agregación y exportación ---
+
+    @staticmethod
+    def _vivo(pid):
+        if os.name == 'nt':
+            # En Windows os.kill(pid, 0) terminaría el proceso
+            return True
+        try:
+            os.kill(pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+
+    @staticmethod
+    def _leer(ruta):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _sumar_en(total, datos, con_gauges=True):
+        for nombre, etiquetas, valor in datos.get('contadores', ()):
+            clave = (nombre, tuple(map(tuple, etiquetas)))
+            total['contadores'][clave] = total['contadores'].get(clave, 0) + valor
+        for nombre, etiquetas, valores in datos.get('histogramas', ()):
+            clave = (nombre, tuple(map(tuple, etiquetas)))
+            actual = total['histogramas'].get(clave)
+            total['histogramas'][clave] = valores if actual is None else [a + b for a, b in zip(actual, valores)]
+        if con_gauges:
+            for nombre, etiquetas, valor in datos.get('gauges', ()):
+                clave = (nombre, tuple(map(tuple, etiquetas)))
+                total['gauges'][clave] = total['gauges'].get(clave, 0) + valor
+
+    def _plegar_muertos(self, muertos):
+        """Pasar contadores e histogramas de workers muertos a acumulado.json y borrar sus archivos"""
+        ruta_acumulado = os.path.join(self.directorio, ARCHIVO_ACUMULADO)
+        with open(os.path.join(self.directorio, 'acumulado.lock'), 'w') as candado:
+            fcntl.flock(candado, fcntl.LOCK_EX)
+            total = {'contadores': {}, 'gauges': {}, 'histogramas': {}}
+            self._sumar_en(total, self._leer(ruta_acumulado) or {})
+            plegados = []
+            for ruta in muertos:
+                datos = self._leer(ruta)
+                if datos is not None:
+                    self._sumar_en(total, datos, con_gauges=False)
+                    plegados.append(ruta)
+            temporal = f"{ruta_acumulado}.tmp"
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                json.dump({
+                    'contadores': [[n, list(e), v] for (n, e), v in total['contadores'].items()],
+                    'histogramas': [[n, list(e), v] for (n, e), v in total['histogramas'].items()]
+                }, archivo)
+            os.replace(temporal, ruta_acumulado)
+            for ruta in plegados:
+                os.remove(ruta)
+
+    def agregar(self):
+        """Sumar los registros de todos los workers del host"""
+        self._asegurar_volcado()
+        self.volcar()
+        archivos = {}
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith('.json') and nombre[:-5].isdigit():
+                archivos[int(nombre[:-5])] = os.path.join(self.directorio, nombre)
+
+        muertos = [ruta for pid, ruta in archivos.items() if not self._vivo(pid)]
+        if muertos and fcntl is not None:
+            self._plegar_muertos(muertos)
+        else:
+            muertos = []
+
+        total = {'contadores': {}, 'gauges': {}, 'histogramas': {}}
+        self._sumar_en(total, self._leer(os.path.join(self.directorio, ARCHIVO_ACUMULADO)) or {})
+        for pid, ruta in archivos.items():
+            if ruta in muertos:
+                continue
+            datos = self._leer(ruta)
+            if datos is not None:
+                self._sumar_en(total, datos, con_gauges=self._vivo(pid))
+        return total, len(archivos) - len(muertos)
+
+    def exportar(self):
+        """Texto en formato de exposición de Prometheus (0.0.4)"""
+        total, workers = self.agregar()
+        total['gauges'][('expokossodo_workers_reportando', ())] = workers
+
+        series = {}
+        for tipo in ('contadores', 'gauges', 'histogramas'):
+            for (nombre, etiquetas), valor in total[tipo].items():
+                series.setdefault(nombre, []).append((etiquetas, valor))
+
+        lineas = []
+        for nombre in sorted(series):
+            definicion = self._definiciones.get(nombre, {'tipo': 'gauge', 'ayuda': nombre, 'buckets': []})
+            lineas.append(f"# HELP {nombre} {definicion['ayuda']}")
+            lineas.append(f"# TYPE {nombre} {definicion['tipo']}")
+            for etiquetas, valor in sorted(series[nombre]):
+                if definicion['tipo'] == 'histogram':
+                    acumulado = 0
+                    limites = [*definicion['buckets'], '+Inf']
+                    for limite, cantidad in zip(limites, valor):
+                        acumulado += cantidad
+                        lineas.append(f"{nombre}_bucket{_etiquetas(etiquetas, le=limite)} {acumulado}")
+                    lineas.append(f"{nombre}_sum{_etiquetas(etiquetas)} {valor[-1]}")
+                    lineas.append(f"{nombre}_count{_etiquetas(etiquetas)} {acumulado}")
+                else:
+                    lineas.append(f"{nombre}{_etiquetas(etiquetas)} {valor}")
+        return '\n'.join(lineas) + '\n'
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def _etiquetas(etiquetas, **extra):
+    pares = list(etiquetas) + list(extra.items())
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in pares) + '}'
+
+
+# Registro del proceso y métricas conocidas
+registro = RegistroMetricas()
+registro.definir('expokossodo_http_request_segundos', 'histogram',
+                 'Latencia de requests por endpoint, método y status', BUCKETS_LATENCIA)
+registro.definir('expokossodo_http_requests_total', 'counter', 'Requests atendidos por endpoint y status')
+registro.definir('expokossodo_db_consulta_segundos', 'histogram',
+                 'Duración de consultas a la BD por tipo de consulta', BUCKETS_CONSULTA)
+registro.definir('expokossodo_db_viajes_por_request', 'histogram',
+                 'Viajes a la BD (consultas, commits, rollbacks) por request', BUCKETS_VIAJES)
+registro.definir('expokossodo_tareas_en_curso', 'gauge', 'Tareas de fondo en curso por tipo')
+registro.definir('expokossodo_cola_email_profundidad', 'gauge', 'Emails esperando en la cola')
+registro.definir('expokossodo_db_pool_conexiones', 'gauge', 'Conexiones del pool por estado')
+registro.definir('expokossodo_db_pool_eventos', 'gauge',
+                 'Esperas, agotamientos y fugas del pool desde que arrancó cada worker vivo')
+registro.definir('expokossodo_sse_suscriptores', 'gauge', 'Tablets conectadas a streams de ingresos')
+registro.definir('expokossodo_workers_reportando', 'gauge', 'Workers con métricas vigentes')
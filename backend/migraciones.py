@@ -0,0 +1,348 @@
+"""
+Migraciones versionadas del esquema
+ExpoKossodo 2025
+
+init_database aplicaba los cambios de esquema en cada arranque con bloques
+try/except alrededor de ALTER TABLE, CREATE INDEX y CREATE TRIGGER, y decidía
+si el objeto ya existía por el texto del error. Eran unas veinte sentencias
+DDL por arranque contra el host remoto, y un error real (permisos, lock de
+metadatos) quedaba impreso entre los "[INFO] ... ya existe".
+
+Ahora cada cambio es una migración numerada en MIGRACIONES. aplicar():
+
+- toma un lock con nombre (GET_LOCK) para que dos procesos no migren a la vez;
+- lee expokossodo_migraciones y corre solo las pendientes, en orden;
+- registra cada una al terminar. Si una falla se detiene ahí (las siguientes
+  pueden depender de ella) y la próxima corrida la reintenta.
+
+Una migración que agrega columnas derivadas (contadores) también las carga:
+abre una transacción después del DDL y aplicar() registra la versión dentro
+de ella, así la carga y el registro se confirman o se descartan juntos.
+
+Los pasos consultan INFORMATION_SCHEMA antes de crear columnas, índices o
+triggers: una base creada con los bloques anteriores ya tiene casi todo, y en
+la primera corrida esas versiones solo se registran.
+
+En producción las aplica start.sh (python migraciones.py || exit 1) antes de
+exec gunicorn; init_database() también las aplica al correr app.py.
+
+Para agregar un cambio de esquema: una función nueva al final de MIGRACIONES
+con el siguiente número de versión. Nunca renumerar ni editar una migración
+ya desplegada.
+
+Uso:
+    python migraciones.py            # aplicar pendientes
+    python migraciones.py --estado   # listar aplicadas y pendientes
+"""
+
+import argparse
+import os
+import time
+
+import contadores_eventos
+
+TABLA_MIGRACIONES = 'expokossodo_migraciones'
+NOMBRE_LOCK = 'expokossodo_migraciones'
+ESPERA_LOCK_SEGUNDOS = int(os.getenv('MIGRACIONES_ESPERA_LOCK', 60))
+
+
+# --- Pasos idempotentes ---
+
+def columna_existe(cursor, tabla, columna):
+    cursor.execute("""
+        SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (tabla, columna))
+    return cursor.fetchone() is not None
+
+
+def indice_existe(cursor, tabla, indice):
+    cursor.execute("""
+        SELECT 1 FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        LIMIT 1
+    """, (tabla, indice))
+    return cursor.fetchone() is not None
+
+
+def trigger_existe(cursor, trigger):
+    cursor.execute("""
+        SELECT 1 FROM INFORMATION_SCHEMA.TRIGGERS
+        WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME = %s
+    """, (trigger,))
+    return cursor.fetchone() is not None
+
+
+def agregar_columna(cursor, tabla, columna, definicion):
+    """ALTER TABLE ... ADD COLUMN solo si la columna no existe (True si la agregó)"""
+    if columna_existe(cursor, tabla, columna):
+        return False
+    cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+    print(f"[OK] Columna '{columna}' agregada a {tabla}")
+    return True
+
+
+def crear_indice(cursor, tabla, indice, columnas):
+    """CREATE INDEX solo si no existe un índice con ese nombre (True si lo creó)"""
+    if indice_existe(cursor, tabla, indice):
+        return False
+    cursor.execute(f"CREATE INDEX {indice} ON {tabla} ({columnas})")
+    print(f"[OK] Índice '{indice}' creado en {tabla}")
+    return True
+
+
+# --- Migraciones ---
+
+def _eventos_contenido(connection, cursor):
+    agregar_columna(cursor, 'expokossodo_eventos', 'descripcion', 'TEXT AFTER pais')
+    agregar_columna(cursor, 'expokossodo_eventos', 'imagen_url', 'VARCHAR(500) AFTER descripcion')
+    agregar_columna(cursor, 'expokossodo_eventos', 'post', 'VARCHAR(500) AFTER imagen_url')
+
+
+def _eventos_disponible(connection, cursor):
+    agregar_columna(cursor, 'expokossodo_eventos', 'disponible', 'BOOLEAN DEFAULT TRUE AFTER slots_ocupados')
+
+
+def _eventos_slug(connection, cursor):
+    agregar_columna(cursor, 'expokossodo_eventos', 'slug', 'VARCHAR(255) UNIQUE AFTER titulo_charla')
+    crear_indice(cursor, 'expokossodo_eventos', 'idx_slug', 'slug')
+
+
+def _eventos_marca(connection, cursor):
+    agregar_columna(cursor, 'expokossodo_eventos', 'marca_id', """INT AFTER imagen_url,
+        ADD CONSTRAINT fk_evento_marca
+        FOREIGN KEY (marca_id) REFERENCES expokossodo_marcas(id)
+        ON DELETE SET NULL""")
+
+
+def _eventos_contadores(connection, cursor):
+    for columna in contadores_eventos.CAMPOS_CONTADOR:
+        agregar_columna(cursor, 'expokossodo_eventos', columna, 'INT NOT NULL DEFAULT 0')
+
+    # Las columnas nacen en 0: se cargan con los conteos reales antes de que la app las lea.
+    # La transacción queda abierta y aplicar() registra la versión dentro de ella.
+    connection.start_transaction()
+    cursor_dict = connection.cursor(dictionary=True)
+    try:
+        diferencias = contadores_eventos.reconciliar_en_transaccion(cursor_dict)
+    finally:
+        cursor_dict.close()
+    print(f"[OK] Contadores por evento cargados ({len(diferencias)} valores corregidos)")
+
+
+def _consultas_uso_transcripcion(connection, cursor):
+    agregar_columna(cursor, 'expokossodo_consultas', 'uso_transcripcion', 'BOOLEAN DEFAULT FALSE')
+
+
+def _registros_qr(connection, cursor):
+    agregar_columna(cursor, 'expokossodo_registros', 'qr_code', 'VARCHAR(500) AFTER eventos_seleccionados')
+    agregar_columna(cursor, 'expokossodo_registros', 'qr_generado_at', 'TIMESTAMP NULL AFTER qr_code')
+    agregar_columna(cursor, 'expokossodo_registros', 'asistencia_general_confirmada',
+                    'BOOLEAN DEFAULT FALSE AFTER qr_generado_at')
+    agregar_columna(cursor, 'expokossodo_registros', 'fecha_asistencia_general',
+                    'TIMESTAMP NULL AFTER asistencia_general_confirmada')
+    crear_indice(cursor, 'expokossodo_registros', 'idx_qr_code', 'qr_code')
+
+
+def _registros_sync_incremental(connection, cursor):
+    """Seguimiento de cambios para el sync incremental de verificadores (actualizado_en + tombstones)"""
+    agregar_columna(cursor, 'expokossodo_registros', 'actualizado_en', """TIMESTAMP(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)""")
+    crear_indice(cursor, 'expokossodo_registros', 'idx_actualizado_en', 'actualizado_en')
+
+    # Tombstones: ids de registros eliminados (los llena un trigger, también para scripts externos)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS expokossodo_registros_eliminados (
+            registro_id INT PRIMARY KEY,
+            eliminado_en TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            INDEX idx_eliminado_en (eliminado_en)
+        )
+    """)
+    if not trigger_existe(cursor, 'trg_registros_eliminados'):
+        cursor.execute("""
+            CREATE TRIGGER trg_registros_eliminados
+            AFTER DELETE ON expokossodo_registros
+            FOR EACH ROW
+                INSERT INTO expokossodo_registros_eliminados (registro_id)
+                VALUES (OLD.id)
+                ON DUPLICATE KEY UPDATE eliminado_en = CURRENT_TIMESTAMP(6)
+        """)
+        print("[OK] Trigger 'trg_registros_eliminados' creado")
+
+
+def _registros_total_eventos(connection, cursor):
+    import inscripciones  # inscripciones importa los pasos de este módulo
+    inscripciones.migrar(connection)
+
+    # total_eventos nace en 0: cargarlo en la transacción que registra la versión
+    connection.start_transaction()
+    actualizados = inscripciones.recalcular_todos_total_eventos(cursor)
+    print(f"[OK] total_eventos cargado ({actualizados} registros actualizados)")
+
+
+def _indices_consultas_calientes(connection, cursor):
+    """Índices para predicados frecuentes sin soporte (ver asesor_indices.py)"""
+    # consolidar_registros_duplicados agrupa por numero
+    crear_indice(cursor, 'expokossodo_registros', 'idx_numero', 'numero')
+    # /api/eventos: WHERE disponible = TRUE ORDER BY fecha, hora, sala (sin filesort)
+    crear_indice(cursor, 'expokossodo_eventos', 'idx_disponible_agenda', 'disponible, fecha, hora, sala')
+    # /api/transcripcion/procesar-pendientes: WHERE uso_transcripcion = 1 AND resumen vacío
+    crear_indice(cursor, 'expokossodo_consultas', 'idx_uso_transcripcion', 'uso_transcripcion')
+
+
+def _asistencias_trigger_presentes(connection, cursor):
+    """total_presentes por trigger: el escaneo de sala queda en un solo INSERT en autocommit"""
+    if not trigger_existe(cursor, 'trg_asistencias_presentes'):
+        cursor.execute("""
+            CREATE TRIGGER trg_asistencias_presentes
+            AFTER INSERT ON expokossodo_asistencias_por_sala
+            FOR EACH ROW
+                UPDATE expokossodo_eventos
+                SET total_presentes = total_presentes + 1
+                WHERE id = NEW.evento_id
+        """)
+        print("[OK] Trigger 'trg_asistencias_presentes' creado")
+
+    # Un worker anterior pudo sumar a mano mientras se creaba el trigger: corregir en la transacción de la versión
+    connection.start_transaction()
+    cursor_dict = connection.cursor(dictionary=True)
+    try:
+        contadores_eventos.reconciliar_en_transaccion(cursor_dict)
+    finally:
+        cursor_dict.close()
+
+
+def _asistencias_limpiar_token_lote(connection, cursor):
+    """Quitar de notas la marca interna que escribían los lotes offline ("Lote offline <hex>")"""
+    cursor.execute("""
+        UPDATE expokossodo_asistencias_por_sala
+        SET notas = NULL
+        WHERE notas REGEXP '^Lote offline [0-9a-f]{12}$'
+    """)
+    print(f"[OK] {cursor.rowcount} ingresos de lotes offline sin marca interna en notas")
+
+
+# (version, nombre, función(connection, cursor)) en orden de aplicación
+MIGRACIONES = [
+    (1, 'eventos: descripcion, imagen_url y post', _eventos_contenido),
+    (2, 'eventos: disponible', _eventos_disponible),
+    (3, 'eventos: slug e idx_slug', _eventos_slug),
+    (4, 'eventos: marca_id con FK a marcas', _eventos_marca),
+    (5, 'eventos: contadores de inscritos y presentes', _eventos_contadores),
+    (6, 'consultas: uso_transcripcion', _consultas_uso_transcripcion),
+    (7, 'registros: columnas QR e idx_qr_code', _registros_qr),
+    (8, 'registros: actualizado_en, tombstones y trigger', _registros_sync_incremental),
+    (9, 'registros: total_eventos desde registro_eventos', _registros_total_eventos),
+    (10, 'índices de consultas calientes', _indices_consultas_calientes),
+    (11, 'asistencias: trigger de total_presentes', _asistencias_trigger_presentes),
+    (12, 'asistencias: notas sin el token de lotes offline', _asistencias_limpiar_token_lote),
+]
+
+
+# --- Ejecución ---
+
+def _crear_tabla_migraciones(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLA_MIGRACIONES} (
+            version INT PRIMARY KEY,
+            nombre VARCHAR(200) NOT NULL,
+            aplicada_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            segundos DECIMAL(10, 3)
+        )
+    """)
+
+
+def versiones_aplicadas(cursor):
+    _crear_tabla_migraciones(cursor)
+    cursor.execute(f"SELECT version FROM {TABLA_MIGRACIONES}")
+    return {fila[0] for fila in cursor.fetchall()}
+
+
+def aplicar(connection):
+    """
+    Aplicar las migraciones pendientes en orden
+
+    Returns:
+        tuple: (versiones aplicadas en esta corrida, True si no quedó ninguna pendiente)
+    """
+    cursor = connection.cursor(buffered=True)
+    aplicadas = []
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (NOMBRE_LOCK, ESPERA_LOCK_SEGUNDOS))
+        if cursor.fetchone()[0] != 1:
+            print(f"[WARN] Otro proceso está migrando; se omiten las migraciones (espera {ESPERA_LOCK_SEGUNDOS}s)")
+            return aplicadas, False
+
+        try:
+            ya_aplicadas = versiones_aplicadas(cursor)
+            for version, nombre, migrar in MIGRACIONES:
+                if version in ya_aplicadas:
+                    continue
+                inicio = time.perf_counter()
+                try:
+                    # El DDL se confirma solo; si la migración abrió una transacción (carga de
+                    # datos) el registro de la versión se confirma junto con ella
+                    migrar(connection, cursor)
+                    segundos = time.perf_counter() - inicio
+                    cursor.execute(f"""
+                        INSERT INTO {TABLA_MIGRACIONES} (version, nombre, segundos)
+                        VALUES (%s, %s, %s)
+                    """, (version, nombre, round(segundos, 3)))
+                    connection.commit()
+                except Exception as e:
+                    if connection.in_transaction:
+                        connection.rollback()
+                    print(f"[ERROR] Migración {version} ({nombre}) falló: {e}")
+                    return aplicadas, False
+                aplicadas.append(version)
+                print(f"[OK] Migración {version} aplicada: {nombre} ({segundos:.2f}s)")
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (NOMBRE_LOCK,))
+
+        if not aplicadas:
+            print(f"[OK] Esquema al día ({len(MIGRACIONES)} migraciones aplicadas)")
+        return aplicadas, True
+    finally:
+        cursor.close()
+
+
+def main():
+    import mysql.connector
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Aplicar o listar las migraciones del esquema")
+    parser.add_argument('--estado', action='store_true', help='Listar aplicadas y pendientes sin aplicar nada')
+    args = parser.parse_args()
+
+    load_dotenv()
+    connection = mysql.connector.connect(
+        host=os.getenv('DB_HOST'),
+        database=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        port=int(os.getenv('DB_PORT', 3306)),
+        autocommit=True,
+        connection_timeout=10
+    )
+    try:
+        if args.estado:
+            cursor = connection.cursor()
+            try:
+                ya_aplicadas = versiones_aplicadas(cursor)
+            finally:
+                cursor.close()
+            for version, nombre, _ in MIGRACIONES:
+                print(f"  [{'x' if version in ya_aplicadas else ' '}] {version:3d}  {nombre}")
+            pendientes = len([v for v, _, _ in MIGRACIONES if v not in ya_aplicadas])
+            print(f"[INFO] {pendientes} migraciones pendientes")
+            return
+        _, completas = aplicar(connection)
+    finally:
+        connection.close()
+
+    if not completas:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,845 @@
+"""
+Núcleo compartido por los blueprints
+ExpoKossodo 2025
+
+Configuración de la BD y pool de conexiones, índice de QR, snapshots
+versionados, canal de check-ins, generación de QR, inicialización del esquema y
+helpers de eventos que usan varios subsistemas. No importa dependencias
+pesadas de ningún subsistema (OpenAI, OpenCV, plantillas de email): cada
+blueprint de rutas/ importa las suyas.
+"""
+
+from flask import request, g, has_request_context, current_app
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+import os
+from dotenv import load_dotenv
+from functools import wraps, lru_cache
+import io
+import time
+import re
+import json
+import threading
+import logging
+from indice_qr import IndiceQR
+from parser_qr import parsear_qr
+from versiones_cache import SnapshotVersionado
+import contadores_eventos
+import inscripciones
+import migraciones
+from canal_checkins import CanalCheckins
+from concurrencia import gevent_activo
+from pool_bd import crear_pool
+import metricas
+import arranque
+
+logger = logging.getLogger(__name__)
+
+# Cargar variables de entorno desde .env
+load_dotenv(override=True)  # Forzar recarga de variables
+
+# Imprimir configuración de DB para debug
+print(f"[INFO] Conectando a DB_HOST: {os.getenv('DB_HOST')}")
+
+# Configuración de la base de datos con timeouts
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST'),
+    'database': os.getenv('DB_NAME'),
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'port': int(os.getenv('DB_PORT', 3306)),
+    'connection_timeout': 10,
+    'autocommit': True
+}
+
+# La extensión C del conector no usa sockets de Python: con gevent bloquearía el proceso
+if gevent_activo():
+    DB_CONFIG['use_pure'] = True
+    print("[INFO] Modo gevent: conector MySQL en Python puro")
+
+def contexto_conexion():
+    """Quién pide una conexión del pool: (request dueño, endpoint) para medir retención y fugas"""
+    if has_request_context():
+        if 'propietario_conexiones' not in g:
+            g.propietario_conexiones = object()
+        return g.propietario_conexiones, request.endpoint or request.path
+    return None, threading.current_thread().name
+
+def observar_consulta(sql, segundos):
+    """Duración de cada viaje a la BD y conteo de viajes del request en curso"""
+    metricas.registro.observar('expokossodo_db_consulta_segundos', segundos,
+                               consulta=metricas.etiqueta_consulta(sql))
+    if has_request_context():
+        g.viajes_bd = g.get('viajes_bd', 0) + 1
+
+# Pool de conexiones (espera una conexión libre en vez de fallar al agotarse). Se crea con
+# la primera conexión pedida en cada worker; si la BD no responde se reintenta más tarde
+connection_pool = arranque.ServicioPerezoso(
+    'Pool de conexiones', lambda: crear_pool(DB_CONFIG, contexto=contexto_conexion, observador=observar_consulta)
+)
+
+# --- CONEXIÓN A LA BASE DE DATOS ---
+def get_db_connection():
+    """Obtener conexión del pool"""
+    try:
+        pool = connection_pool.obtener()
+        if pool:
+            connection = pool.get_connection()
+            if connection.is_connected():
+                return connection
+            else:
+                print("[ERROR] Conexión no está activa")
+                connection.close()  # Devolverla al pool para no perder el cupo
+                return None
+        else:
+            # Fallback a conexión directa si no hay pool
+            print("[WARN] Usando conexión directa (sin pool)")
+            connection = mysql.connector.connect(**DB_CONFIG)
+            return connection
+    except PoolError as e:
+        # Pool agotado: el 500 que ve el cliente viene del tamaño del pool, no de la BD
+        print(f"[ERROR] Pool de conexiones agotado ({request.endpoint if has_request_context() else 'fondo'}): {e}")
+        return None
+    except Error as e:
+        print(f"[ERROR] Error obteniendo conexión: {e}")
+        return None
+
+def desvincular_conexion(connection):
+    """Conexión que una respuesta en streaming cierra al terminar: el teardown no debe recuperarla"""
+    if connection_pool.cargado:
+        connection_pool.obtener().desvincular(connection)
+
+# Índice en memoria QR → asistente compartido por los endpoints de escaneo
+indice_qr = IndiceQR(get_db_connection)
+
+# Respuesta serializada de /api/eventos; se invalida al cambiar eventos, horarios o cupos
+snapshot_eventos = SnapshotVersionado('eventos', max_age_segundos=int(os.getenv('EVENTOS_CACHE_MAX_AGE', 300)))
+
+# Padrón compacto para verificadores offline; se invalida al crear o editar registros, inscripciones o asistencia
+snapshot_registros = SnapshotVersionado('registros', max_age_segundos=int(os.getenv('REGISTROS_SNAPSHOT_MAX_AGE', 120)))
+
+# Ingresos a sala en vivo para los streams SSE (el lector arranca con el primer suscriptor)
+canal_checkins = CanalCheckins(get_db_connection)
+SSE_LATIDO_SEGUNDOS = 15
+SSE_DURACION_MAXIMA = int(os.getenv('SSE_DURACION_MAXIMA', 300))
+
+def evento_sse(evento, datos, evento_id=None):
+    """Formatear un evento Server-Sent Events con datos JSON"""
+    prefijo = f"id: {evento_id}\n" if evento_id is not None else ""
+    return f"{prefijo}event: {evento}\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n"
+
+# Decorador para medir tiempo de ejecución
+def log_execution_time(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start_time = time.time()
+        endpoint = request.endpoint if request else func.__name__
+        
+        try:
+            result = func(*args, **kwargs)
+            execution_time = time.time() - start_time
+            
+            if execution_time > 5:
+                logger.warning("consulta lenta", extra={'endpoint': endpoint, 'duracion_s': round(execution_time, 2)})
+            
+            return result
+        except Exception:
+            execution_time = time.time() - start_time
+            logger.exception("error en endpoint", extra={'endpoint': endpoint, 'duracion_s': round(execution_time, 2)})
+            raise
+    
+    return wrapper
+
+# ===== FUNCIONES DE GENERACIÓN QR =====
+
+def generar_texto_qr(nombres, numero, cargo, empresa):
+    """
+    Generar texto QR con formato simplificado: 
+    {3_letras_nombre}{numeros_dni}{3_letras_cargo}{3_letras_empresa}{timestamp}
+    Todo en minúsculas, sin caracteres especiales, sin separadores
+    
+    Args:
+        nombres (str): Nombre completo del usuario
+        numero (str): Número de documento/DNI 
+        cargo (str): Cargo del usuario
+        empresa (str): Empresa del usuario
+    
+    Returns:
+        str: Texto QR formateado sin caracteres especiales
+    """
+    try:
+        # Función auxiliar para limpiar texto: quitar tildes y caracteres especiales
+        def limpiar_texto(texto):
+            if not texto:
+                return 'xxx'
+            # Convertir a minúsculas
+            texto = texto.lower()
+            # Reemplazar vocales con tildes
+            texto = texto.replace('á', 'a').replace('é', 'e').replace('í', 'i')
+            texto = texto.replace('ó', 'o').replace('ú', 'u').replace('ñ', 'n')
+            texto = texto.replace('à', 'a').replace('è', 'e').replace('ì', 'i')
+            texto = texto.replace('ò', 'o').replace('ù', 'u')
+            texto = texto.replace('ä', 'a').replace('ë', 'e').replace('ï', 'i')
+            texto = texto.replace('ö', 'o').replace('ü', 'u')
+            # Mantener solo letras
+            texto = re.sub(r'[^a-z]', '', texto)
+            return texto if texto else 'xxx'
+        
+        # 1. Obtener primeras 3 letras del PRIMER NOMBRE
+        partes_nombre = nombres.strip().split() if nombres else []
+        primer_nombre = partes_nombre[0] if partes_nombre else 'xxx'
+        tres_letras_nombre = limpiar_texto(primer_nombre)[:3].ljust(3, 'x')
+        
+        # 2. Extraer solo números del DNI/número
+        solo_numeros = re.sub(r'[^0-9]', '', str(numero))
+        if not solo_numeros:
+            solo_numeros = '000000'  # Valor por defecto si no hay números
+        
+        # 3. Obtener primeras 3 letras del cargo
+        tres_letras_cargo = limpiar_texto(cargo)[:3].ljust(3, 'x')
+        
+        # 4. Obtener primeras 3 letras de la empresa
+        tres_letras_empresa = limpiar_texto(empresa)[:3].ljust(3, 'x')
+        
+        # 5. Generar timestamp único en segundos
+        timestamp = str(int(time.time()))
+        
+        # Crear texto QR todo junto sin separadores
+        qr_text = f"{tres_letras_nombre}{solo_numeros}{tres_letras_cargo}{tres_letras_empresa}{timestamp}"
+        
+        return qr_text
+        
+    except Exception as e:
+        print(f"Error generando texto QR: {e}")
+        return None
+
+@lru_cache(maxsize=256)
+def generar_imagen_qr(qr_text):
+    """
+    Generar imagen QR a partir del texto (cacheada: un re-registro reutiliza el PNG)
+    
+    Args:
+        qr_text (str): Texto para convertir en QR
+    
+    Returns:
+        bytes: Imagen QR en formato PNG como bytes
+    """
+    # qrcode (y PIL) solo se importan donde se generan imágenes: registro e impresión
+    import qrcode
+
+    try:
+        # Configurar generador QR
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=10,
+            border=4,
+        )
+        
+        # Agregar datos y generar
+        qr.add_data(qr_text)
+        qr.make(fit=True)
+        
+        # Crear imagen
+        img = qr.make_image(fill_color="black", back_color="white")
+        
+        # Convertir a bytes
+        img_buffer = io.BytesIO()
+        img.save(img_buffer, format='PNG')
+        img_bytes = img_buffer.getvalue()
+        
+        return img_bytes
+        
+    except Exception as e:
+        print(f"Error generando imagen QR: {e}")
+        return None
+
+def validar_formato_qr(qr_text):
+    """
+    Validar que el texto QR tenga el formato correcto
+    Soporta tanto formato antiguo (con pipes) como nuevo (sin separadores)
+    
+    Se mantiene por compatibilidad; los endpoints usan parsear_qr directamente
+    (ver parser_qr.py) para evitar construir un dict por escaneo.
+    
+    Args:
+        qr_text (str): Texto QR a validar
+    
+    Returns:
+        dict: {valid: bool, parsed: dict o None}
+    """
+    parsed = parsear_qr(qr_text)
+    if parsed is None:
+        return {"valid": False, "parsed": None}
+    return {"valid": True, "parsed": parsed.to_dict()}
+
+def generate_slug(titulo_charla):
+    """Generar slug URL-friendly desde titulo_charla"""
+    import re
+    import unicodedata
+    
+    if not titulo_charla:
+        return None
+    
+    # Normalizar unicode y remover acentos
+    slug = unicodedata.normalize('NFKD', titulo_charla)
+    slug = slug.encode('ascii', 'ignore').decode('ascii')
+    
+    # Convertir a minúsculas
+    slug = slug.lower()
+    
+    # Reemplazar espacios y caracteres especiales con guiones
+    slug = re.sub(r'[^a-z0-9\-]', '-', slug)
+    
+    # Remover guiones múltiples
+    slug = re.sub(r'-+', '-', slug)
+    
+    # Remover guiones al inicio y final
+    slug = slug.strip('-')
+    
+    # Limitar longitud a 200 caracteres
+    if len(slug) > 200:
+        # Cortar en última palabra completa
+        slug = slug[:200]
+        last_dash = slug.rfind('-')
+        if last_dash > 100:  # Solo cortar si no es muy corto
+            slug = slug[:last_dash]
+    
+    return slug if slug else 'evento-sin-titulo'
+
+def ensure_unique_slug(cursor, base_slug, evento_id=None):
+    """Asegurar que el slug sea único, agregando números si es necesario"""
+    original_slug = base_slug
+    counter = 1
+    
+    while True:
+        # Verificar si el slug ya existe (excluyendo el evento actual si estamos editando)
+        if evento_id:
+            cursor.execute(
+                "SELECT id FROM expokossodo_eventos WHERE slug = %s AND id != %s", 
+                (base_slug, evento_id)
+            )
+        else:
+            cursor.execute(
+                "SELECT id FROM expokossodo_eventos WHERE slug = %s", 
+                (base_slug,)
+            )
+        
+        existing = cursor.fetchone()
+        
+        if not existing:
+            return base_slug
+        
+        # Si existe, intentar con número
+        counter += 1
+        base_slug = f"{original_slug}-{counter}"
+        
+        # Evitar loops infinitos
+        if counter > 1000:
+            import time
+            base_slug = f"{original_slug}-{int(time.time())}"
+            break
+    
+    return base_slug
+
+def populate_existing_slugs():
+    """Poblar slugs para eventos existentes que no los tengan"""
+    connection = get_db_connection()
+    if not connection:
+        return False
+    
+    cursor = connection.cursor()
+    
+    try:
+        # Obtener eventos sin slug
+        cursor.execute("SELECT id, titulo_charla FROM expokossodo_eventos WHERE slug IS NULL OR slug = ''")
+        eventos_sin_slug = cursor.fetchall()
+        
+        print(f"[LOG] Procesando {len(eventos_sin_slug)} eventos sin slug...")
+        
+        for evento in eventos_sin_slug:
+            # Acceso por índice (id=0, titulo_charla=1)
+            evento_id = evento[0]
+            titulo_charla = evento[1]
+            
+            if not evento_id or not titulo_charla:
+                continue
+            
+            # Generar slug base
+            base_slug = generate_slug(titulo_charla)
+            
+            # Asegurar unicidad
+            final_slug = ensure_unique_slug(cursor, base_slug, evento_id)
+            
+            # Actualizar en base de datos
+            cursor.execute(
+                "UPDATE expokossodo_eventos SET slug = %s WHERE id = %s",
+                (final_slug, evento_id)
+            )
+            
+            print(f"[OK] Evento {evento_id}: '{titulo_charla}' → '{final_slug}'")
+        
+        connection.commit()
+        print(f"🎯 {len(eventos_sin_slug)} slugs generados exitosamente")
+        return True
+        
+    except Error as e:
+        print(f"[ERROR] Error poblando slugs: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+def init_database():
+    """Inicializar tablas de la base de datos"""
+    connection = get_db_connection()
+    if not connection:
+        return False
+    
+    cursor = connection.cursor()
+    
+    try:
+        # Tabla de eventos (charlas por día/hora/sala)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expokossodo_eventos (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                fecha DATE NOT NULL,
+                hora VARCHAR(20) NOT NULL,
+                sala VARCHAR(50) NOT NULL,
+                titulo_charla VARCHAR(200) NOT NULL,
+                expositor VARCHAR(100) NOT NULL,
+                pais VARCHAR(50) NOT NULL,
+                descripcion TEXT,
+                imagen_url VARCHAR(500),
+                slots_disponibles INT DEFAULT 60,
+                slots_ocupados INT DEFAULT 0,
+                rubro JSON,
+                disponible BOOLEAN DEFAULT TRUE,
+                marca_id INT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_fecha_hora (fecha, hora),
+                INDEX idx_sala (sala),
+                INDEX idx_rubro ((CAST(rubro AS CHAR(100)))),
+                FOREIGN KEY (marca_id) REFERENCES expokossodo_marcas(id) ON DELETE SET NULL
+            )
+        """)
+        
+        # Nueva tabla para marcas patrocinadoras
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expokossodo_marcas (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                marca VARCHAR(100) NOT NULL UNIQUE,
+                expositor VARCHAR(100),
+                logo VARCHAR(500),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                INDEX idx_marca (marca)
+            )
+        """)
+        
+        # Poblar marcas por defecto si no existen
+        marcas_default = [
+            ('CAMAG', 'Ing. Eliezer Ceniviva', 'https://i.ibb.co/YFYknC9N/camag-color.webp'),
+            ('EVIDENT', 'Mario Esteban Muñoz', 'https://i.ibb.co/RpHJ7W0C/evident-color.webp'),
+            ('ESCO', None, 'https://i.ibb.co/wFCJ2RK3/esco-color.webp'),
+            ('VACUUBRAND', 'Dr. Roberto Friztler', 'https://i.ibb.co/8nCL3Ksb/vacubrand-color.webp'),
+            ('SARTORIUS', 'Lic. Mónica Klarreich', 'https://i.ibb.co/pYPPZ6m/sartorius-color.webp'),
+            ('LAUDA', 'Andre Sautchuk', 'https://i.ibb.co/GfrzYHYS/lauda-color.webp'),
+            ('BINDER', 'PhD. Fernando Vargas', 'https://i.ibb.co/JR51wysn/binder-color.webp'),
+            ('VELP', 'Pablo Scarpin', 'https://i.ibb.co/tVn3sdB/velp-color.webp'),
+            ('CHEM', None, 'https://i.ibb.co/LXZ02Zb3/chem-color.webp'),
+            ('AMS', None, 'https://i.ibb.co/Z16k8Xcy/ams-color.webp'),
+            ('KOSSODO', 'Qco. James Rojas Sanchez', None),
+            ('KOSSOMET', 'Jhonny Quispe', None)
+        ]
+        
+        for marca, expositor, logo in marcas_default:
+            cursor.execute("""
+                INSERT IGNORE INTO expokossodo_marcas (marca, expositor, logo) 
+                VALUES (%s, %s, %s)
+            """, (marca, expositor, logo))
+        
+        # Nueva tabla para gestionar horarios
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expokossodo_horarios (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                horario VARCHAR(20) NOT NULL UNIQUE,
+                activo BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                INDEX idx_horario (horario),
+                INDEX idx_activo (activo)
+            )
+        """)
+        
+        # Insertar horarios por defecto si no existen
+        horarios_default = ['15:00-15:45', '16:00-16:45', '17:00-17:45', '18:00-18:45', '19:00-19:45']
+        for horario in horarios_default:
+            cursor.execute("""
+                INSERT IGNORE INTO expokossodo_horarios (horario, activo) 
+                VALUES (%s, %s)
+            """, (horario, True))
+        
+        # ===== NUEVA TABLA: INFORMACIÓN POR FECHA =====
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expokossodo_fecha_info (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                fecha DATE NOT NULL UNIQUE,
+                rubro VARCHAR(100) NOT NULL,
+                titulo_dia VARCHAR(200) NOT NULL,
+                descripcion TEXT,
+                ponentes_destacados JSON,
+                marcas_patrocinadoras JSON,
+                paises_participantes JSON,
+                imagen_url VARCHAR(500),
+                activo BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                INDEX idx_fecha (fecha),
+                INDEX idx_activo (activo),
+                INDEX idx_rubro (rubro)
+            )
+        """)
+
+        # Insertar información por defecto de fechas
+        fechas_info_default = [
+            {
+                'fecha': '2024-07-22',
+                'rubro': 'Inteligencia Artificial y Diagnóstico',
+                'titulo_dia': 'Día 1 - IA Revolucionando la Medicina',
+                'descripcion': 'Explora cómo la inteligencia artificial está transformando el diagnóstico médico y la atención al paciente.',
+                'ponentes_destacados': '["Dr. María González", "Dr. Hiroshi Tanaka", "Prof. Chen Wei"]',
+                'marcas_patrocinadoras': '["TechMed Solutions", "AI Healthcare", "MedTech Innovations"]',
+                'paises_participantes': '["España", "Japón", "China", "Estados Unidos"]',
+                'imagen_url': 'https://images.unsplash.com/photo-1559757148-5c350d0d3c56?ixlib=rb-4.0.3&auto=format&fit=crop&w=1200&q=80'
+            },
+            {
+                'fecha': '2024-07-23',
+                'rubro': 'Biotecnología y Medicina Regenerativa',
+                'titulo_dia': 'Día 2 - Innovación Biotecnológica',
+                'descripcion': 'Descubre las últimas innovaciones en biotecnología, terapias génicas y medicina regenerativa.',
+                'ponentes_destacados': '["Dr. John Smith", "Dr. Sarah Johnson", "Dr. Pierre Dubois"]',
+                'marcas_patrocinadoras': '["BioTech Labs", "RegenerativeMed", "GenTherapy Corp"]',
+                'paises_participantes': '["Estados Unidos", "Reino Unido", "Francia", "Alemania"]',
+                'imagen_url': 'https://images.unsplash.com/photo-1532187863486-abf9dbad1b69?ixlib=rb-4.0.3&auto=format&fit=crop&w=1200&q=80'
+            },
+            {
+                'fecha': '2024-07-24',
+                'rubro': 'Telemedicina y Salud Digital',
+                'titulo_dia': 'Día 3 - Transformación Digital en Salud',
+                'descripcion': 'Conoce cómo la telemedicina y las tecnologías digitales están democratizando el acceso a la salud.',
+                'ponentes_destacados': '["Dra. Ana Rodríguez", "Dr. Kim Jong-Su", "Dra. Camila Silva"]',
+                'marcas_patrocinadoras': '["TeleMed Global", "HealthTech Solutions", "Digital Care"]',
+                'paises_participantes': '["México", "Corea del Sur", "Brasil", "Canadá"]',
+                'imagen_url': 'https://images.unsplash.com/photo-1576091160399-112ba8d25d1f?ixlib=rb-4.0.3&auto=format&fit=crop&w=1200&q=80'
+            },
+            {
+                'fecha': '2024-07-25',
+                'rubro': 'Especialidades Médicas Avanzadas',
+                'titulo_dia': 'Día 4 - Medicina Especializada del Futuro',
+                'descripcion': 'Explora los avances en cardiología, neurociencia, oncología y otras especialidades médicas.',
+                'ponentes_destacados': '["Dr. Raj Patel", "Dr. Lars Anderson", "Dr. Ahmed Hassan"]',
+                'marcas_patrocinadoras': '["CardioTech", "NeuroScience Pro", "OncoMed Innovations"]',
+                'paises_participantes': '["India", "Suecia", "Egipto", "Australia"]',
+                'imagen_url': 'https://images.unsplash.com/photo-1559757175-0eb30cd8c063?ixlib=rb-4.0.3&auto=format&fit=crop&w=1200&q=80'
+            }
+        ]
+
+        for fecha_info in fechas_info_default:
+            cursor.execute("""
+                INSERT IGNORE INTO expokossodo_fecha_info 
+                (fecha, rubro, titulo_dia, descripcion, ponentes_destacados, marcas_patrocinadoras, paises_participantes, imagen_url, activo)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                fecha_info['fecha'],
+                fecha_info['rubro'], 
+                fecha_info['titulo_dia'],
+                fecha_info['descripcion'],
+                fecha_info['ponentes_destacados'],
+                fecha_info['marcas_patrocinadoras'],
+                fecha_info['paises_participantes'],
+                fecha_info['imagen_url'],
+                True
+            ))
+        
+        # Tabla de registros de usuarios
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expokossodo_registros (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                nombres VARCHAR(100) NOT NULL,
+                correo VARCHAR(100) NOT NULL,
+                empresa VARCHAR(100) NOT NULL,
+                cargo VARCHAR(100) NOT NULL,
+                numero VARCHAR(20) NOT NULL,
+                expectativas TEXT,
+                eventos_seleccionados JSON,
+                fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                confirmado BOOLEAN DEFAULT FALSE,
+                INDEX idx_correo (correo)
+            )
+        """)
+        
+        # Tabla de relación registro-evento (para mejor control)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expokossodo_registro_eventos (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                registro_id INT NOT NULL,
+                evento_id INT NOT NULL,
+                fecha_seleccion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (registro_id) REFERENCES expokossodo_registros(id) ON DELETE CASCADE,
+                FOREIGN KEY (evento_id) REFERENCES expokossodo_eventos(id) ON DELETE CASCADE,
+                UNIQUE KEY unique_registro_evento (registro_id, evento_id)
+            )
+        """)
+        
+        # ===== NUEVAS TABLAS PARA SISTEMA QR Y VERIFICACIÓN =====
+        
+        # Tabla de asistencias generales
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expokossodo_asistencias_generales (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                registro_id INT NOT NULL,
+                qr_escaneado VARCHAR(500) NOT NULL,
+                fecha_escaneo TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                verificado_por VARCHAR(100) DEFAULT 'Sistema',
+                ip_verificacion VARCHAR(45),
+                FOREIGN KEY (registro_id) REFERENCES expokossodo_registros(id) ON DELETE CASCADE,
+                INDEX idx_registro_fecha (registro_id, fecha_escaneo),
+                INDEX idx_qr_escaneado (qr_escaneado)
+            )
+        """)
+        
+        # Tabla de asistencias por sala específica
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expokossodo_asistencias_por_sala (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                registro_id INT NOT NULL,
+                evento_id INT NOT NULL,
+                qr_escaneado VARCHAR(500) NOT NULL,
+                fecha_ingreso TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                asesor_verificador VARCHAR(100) NOT NULL,
+                ip_verificacion VARCHAR(45),
+                notas TEXT,
+                FOREIGN KEY (registro_id) REFERENCES expokossodo_registros(id) ON DELETE CASCADE,
+                FOREIGN KEY (evento_id) REFERENCES expokossodo_eventos(id) ON DELETE CASCADE,
+                UNIQUE KEY unique_registro_evento_ingreso (registro_id, evento_id),
+                INDEX idx_evento_fecha (evento_id, fecha_ingreso),
+                INDEX idx_qr_escaneado (qr_escaneado)
+            )
+        """)
+
+        # Tabla de consultas/leads de asesores
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expokossodo_consultas (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                registro_id INT NOT NULL,
+                asesor_nombre VARCHAR(100) NOT NULL,
+                consulta TEXT NOT NULL,
+                uso_transcripcion BOOLEAN DEFAULT FALSE,
+                fecha_consulta TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (registro_id) REFERENCES expokossodo_registros(id) ON DELETE CASCADE,
+                INDEX idx_registro_fecha (registro_id, fecha_consulta),
+                INDEX idx_asesor (asesor_nombre)
+            )
+        """)
+        
+        connection.commit()
+        print("[OK] Tablas y columnas QR creadas exitosamente")
+        
+        # Columnas, índices y triggers agregados después de crear las tablas (solo las pendientes)
+        migraciones.aplicar(connection)
+        
+        # Alinear contadores de inscritos/presentes con los datos reales
+        try:
+            diferencias = contadores_eventos.reconciliar(connection)
+            print(f"[OK] Contadores de eventos reconciliados ({len(diferencias)} diferencias corregidas)")
+        except Error as e:
+            print(f"Error reconciliando contadores de eventos: {e}")
+        
+        try:
+            diferencias = inscripciones.reconciliar_total_eventos(connection)
+            print(f"[OK] total_eventos de registros reconciliado ({len(diferencias)} diferencias corregidas)")
+        except Error as e:
+            print(f"Error reconciliando total_eventos: {e}")
+        
+        # Verificar si ya hay datos de ejemplo
+        cursor.execute("SELECT COUNT(*) FROM expokossodo_eventos")
+        count = cursor.fetchone()[0]
+        
+        if count == 0:
+            populate_sample_data(cursor, connection)
+        
+        # Poblar slugs para eventos existentes que no los tengan
+        print("[INFO] Verificando slugs de eventos existentes...")
+        
+        return True
+        
+    except Error as e:
+        print(f"Error creando tablas: {e}")
+        return False
+    finally:
+        cursor.close()
+        connection.close()
+
+def populate_sample_data(cursor, connection):
+    """Poblar la base de datos con datos de ejemplo"""
+    try:
+        fechas = ['2024-07-22', '2024-07-23', '2024-07-24', '2024-07-25']
+        horarios = ['15:00-15:45', '16:00-16:45', '17:00-17:45', '18:00-18:45', '19:00-19:45']
+        salas = ['sala1', 'sala2', 'sala3', 'sala4']
+        
+        # Datos de ejemplo para las charlas con descripciones
+        charlas_data = [
+            {
+                "titulo": "Inteligencia Artificial en la Medicina", 
+                "expositor": "Dr. María González", 
+                "pais": "España",
+                "descripcion": "## Revolucionando el Diagnóstico Médico\n\nExplora cómo la **inteligencia artificial** está transformando la medicina moderna. Esta presentación aborda:\n\n### Tecnologías Emergentes\n- **Machine Learning** en diagnóstico por imagen\n- Algoritmos de **análisis predictivo**\n- **Redes neuronales** para detección temprana\n\n### Casos de Éxito\n[OK] Detección de cáncer con **95% de precisión**\n[OK] Diagnóstico de enfermedades cardíacas\n[OK] Análisis automatizado de radiografías\n\n### Impacto en el Futuro\nConoce cómo la IA reducirá tiempos de diagnóstico y mejorará la precisión médica en los próximos años.",
+                "imagen_url": "https://images.unsplash.com/photo-1559757148-5c350d0d3c56?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"
+            },
+            {
+                "titulo": "Innovación en Biotecnología", 
+                "expositor": "Dr. John Smith", 
+                "pais": "Estados Unidos",
+                "descripcion": "## El Futuro de la Biotecnología\n\nUna inmersión profunda en las **innovaciones biotecnológicas** que están cambiando la medicina:\n\n### Terapias Génicas\n- **CRISPR-Cas9** y edición genética\n- Terapias personalizadas\n- Tratamiento de enfermedades raras\n\n### Medicina Regenerativa\n- Células madre y **tissue engineering**\n- Bioimpresión 3D de órganos\n- Medicina personalizada\n\n### Casos Prácticos\n🔬 Desarrollo de nuevos medicamentos\n🧬 Terapias contra el cáncer\n💊 Fármacos biotecnológicos innovadores",
+                "imagen_url": "https://images.unsplash.com/photo-1532187863486-abf9dbad1b69?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"
+            },
+            {
+                "titulo": "Telemedicina y Futuro", 
+                "expositor": "Dra. Ana Rodríguez", 
+                "pais": "México",
+                "descripcion": "## Transformación Digital en Salud\n\nDescubre cómo la **telemedicina** está revolucionando la atención médica:\n\n### Tecnologías Actuales\n- Consultas virtuales en tiempo real\n- Monitoreo remoto de pacientes\n- **IoT médico** y wearables\n\n### Beneficios Clave\n[OK] **Accesibilidad** universal a la atención médica\n[OK] Reducción de costos operativos\n[OK] Atención 24/7 desde cualquier lugar\n\n### Casos de Implementación\n📱 Apps móviles de diagnóstico\n🏥 Hospitales virtuales\n📊 Plataformas de seguimiento de pacientes",
+                "imagen_url": "https://images.unsplash.com/photo-1576091160399-112ba8d25d1f?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"
+            },
+            {
+                "titulo": "Robótica Médica Avanzada", 
+                "expositor": "Prof. Chen Wei", 
+                "pais": "China",
+                "descripcion": "## Robots en el Quirófano\n\nExplora las últimas innovaciones en **robótica médica** y cirugía asistida:\n\n### Sistemas Robóticos\n- **Da Vinci Surgical System**\n- Robots de rehabilitación\n- Asistentes quirúrgicos autónomos\n\n### Ventajas Quirúrgicas\n🎯 **Precisión milimétrica** en procedimientos\n⚡ Reducción de tiempo operatorio\n🩹 Mínima invasión y recuperación rápida\n\n### Futuro de la Cirugía\nConoce cómo la robótica permitirá cirugías remotas y procedimientos completamente automatizados.",
+                "imagen_url": "https://images.unsplash.com/photo-1559757175-0eb30cd8c063?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"
+            },
+            {
+                "titulo": "Genómica Personalizada", 
+                "expositor": "Dr. Pierre Dubois", 
+                "pais": "Francia",
+                "descripcion": "## Medicina de Precisión Genética\n\nDescubre cómo la **genómica personalizada** está revolucionando los tratamientos médicos:\n\n### Secuenciación del ADN\n- **Análisis genómico completo**\n- Identificación de mutaciones\n- Predisposición a enfermedades\n\n### Tratamientos Personalizados\n💊 Farmacogenómica y dosificación precisa\n🧬 Terapias génicas específicas\n📊 Medicina predictiva y preventiva\n\n### Aplicaciones Clínicas\n[OK] Oncología personalizada\n[OK] Enfermedades hereditarias\n[OK] Medicina preventiva basada en genes",
+                "imagen_url": "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"
+            },
+            {"titulo": "Cirugía Mínimamente Invasiva", "expositor": "Dr. Giuseppe Rossi", "pais": "Italia", "descripcion": "## Técnicas Quirúrgicas Avanzadas\n\nDescubre las últimas innovaciones en **cirugía mínimamente invasiva**:\n\n- Laparoscopía avanzada\n- Técnicas endoscópicas\n- Recuperación acelerada\n\n[OK] Menor dolor postoperatorio\n[OK] Cicatrices mínimas\n[OK] Hospitalización reducida", "imagen_url": "https://images.unsplash.com/photo-1559757175-0eb30cd8c063?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Diagnóstico por Imagen IA", "expositor": "Dr. Hiroshi Tanaka", "pais": "Japón", "descripcion": "## Radiología Inteligente\n\n**Inteligencia artificial** aplicada al diagnóstico por imagen:\n\n- Detección automática de anomalías\n- Análisis de resonancias magnéticas\n- Interpretación de tomografías\n\n🎯 **Precisión diagnóstica del 98%**", "imagen_url": "https://images.unsplash.com/photo-1559757148-5c350d0d3c56?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Medicina Regenerativa", "expositor": "Dr. Sarah Johnson", "pais": "Reino Unido", "descripcion": "## Regeneración de Tejidos\n\nExplora el futuro de la **medicina regenerativa**:\n\n- Terapia con células madre\n- Ingeniería de tejidos\n- Bioimpresión 3D\n\n🔬 Casos de éxito en regeneración ósea y cartilaginosa", "imagen_url": "https://images.unsplash.com/photo-1532187863486-abf9dbad1b69?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Farmacología Digital", "expositor": "Dr. Hans Mueller", "pais": "Alemania", "descripcion": "## Medicamentos Inteligentes\n\n**Farmacología digital** y medicina personalizada:\n\n- Dosificación precisa por IA\n- Monitoreo de adherencia\n- Efectos secundarios predictivos\n\n💊 Optimización de tratamientos farmacológicos", "imagen_url": "https://images.unsplash.com/photo-1576091160550-2173dba999ef?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Salud Mental Digital", "expositor": "Dra. Camila Silva", "pais": "Brasil", "descripcion": "## Psiquiatría del Futuro\n\nInnovaciones en **salud mental digital**:\n\n- Terapia virtual inmersiva\n- Apps de bienestar mental\n- Análisis predictivo de crisis\n\n🧠 Detección temprana de trastornos mentales", "imagen_url": "https://images.unsplash.com/photo-1576091160399-112ba8d25d1f?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Oncología de Precisión", "expositor": "Dr. Ahmed Hassan", "pais": "Egipto", "descripcion": "## Tratamiento Personalizado del Cáncer\n\n**Oncología de precisión** basada en genómica:\n\n- Perfiles genéticos tumorales\n- Inmunoterapias personalizadas\n- Biomarcadores predictivos\n\n🎯 Terapias dirigidas con mayor eficacia", "imagen_url": "https://images.unsplash.com/photo-1559757148-5c350d0d3c56?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Cardiopatías del Futuro", "expositor": "Dr. Raj Patel", "pais": "India", "descripcion": "## Cardiología Innovadora\n\nAvances en **tratamiento cardiovascular**:\n\n- Stents inteligentes\n- Marcapasos sin cables\n- Válvulas cardíacas bioimprimidas\n\n❤️ Prevención y tratamiento de cardiopatías", "imagen_url": "https://images.unsplash.com/photo-1559757175-0eb30cd8c063?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Neurociencia Computacional", "expositor": "Dr. Lars Anderson", "pais": "Suecia", "descripcion": "## Cerebro y Computación\n\n**Neurociencia computacional** aplicada:\n\n- Interfaces cerebro-computadora\n- Modelos neuronales avanzados\n- Estimulación cerebral profunda\n\n🧠 Tratamiento de enfermedades neurológicas", "imagen_url": "https://images.unsplash.com/photo-1559757148-5c350d0d3c56?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Pediatría Innovadora", "expositor": "Dra. Sophie Martin", "pais": "Canadá", "descripcion": "## Medicina Pediátrica Avanzada\n\nInnovaciones en **atención pediátrica**:\n\n- Diagnóstico prenatal avanzado\n- Terapias génicas pediátricas\n- Dispositivos médicos infantiles\n\n👶 Mejores resultados en salud infantil", "imagen_url": "https://images.unsplash.com/photo-1576091160550-2173dba999ef?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Geriatría y Tecnología", "expositor": "Dr. Antonio Costa", "pais": "Portugal", "descripcion": "## Envejecimiento Saludable\n\n**Tecnología** aplicada al cuidado geriátrico:\n\n- Monitoreo domiciliario\n- Asistentes virtuales para mayores\n- Detección de caídas automática\n\n🏠 Independencia y calidad de vida", "imagen_url": "https://images.unsplash.com/photo-1576091160399-112ba8d25d1f?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Medicina de Emergencia", "expositor": "Dr. Kim Jong-Su", "pais": "Corea del Sur", "descripcion": "## Emergencias Médicas Digitales\n\n**Tecnología** en medicina de urgencias:\n\n- Triaje automatizado\n- Diagnóstico rápido por IA\n- Telemedicina de emergencia\n\n⚡ Respuesta rápida y efectiva", "imagen_url": "https://images.unsplash.com/photo-1532187863486-abf9dbad1b69?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Rehabilitación Virtual", "expositor": "Dr. Olga Petrov", "pais": "Rusia", "descripcion": "## Fisioterapia del Futuro\n\n**Realidad virtual** en rehabilitación:\n\n- Terapias inmersivas\n- Gamificación de ejercicios\n- Seguimiento de progreso\n\n🎮 Recuperación más rápida y motivante", "imagen_url": "https://images.unsplash.com/photo-1576091160550-2173dba999ef?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Nutrición Personalizada", "expositor": "Dra. Elena Popov", "pais": "Bulgaria", "descripcion": "## Dietas Genéticamente Personalizadas\n\n**Nutrigenómica** y alimentación:\n\n- Dietas basadas en ADN\n- Análisis de micronutrientes\n- Prevención de enfermedades\n\n🍎 Alimentación optimizada para cada persona", "imagen_url": "https://images.unsplash.com/photo-1576091160399-112ba8d25d1f?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Medicina Deportiva", "expositor": "Dr. Mark Thompson", "pais": "Australia", "descripcion": "## Rendimiento y Recuperación\n\n**Medicina deportiva** de alta tecnología:\n\n- Análisis biomecánico\n- Prevención de lesiones\n- Recuperación acelerada\n\n🏃‍♂️ Optimización del rendimiento atlético", "imagen_url": "https://images.unsplash.com/photo-1559757175-0eb30cd8c063?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"},
+            {"titulo": "Biosensores Médicos", "expositor": "Dr. Yuki Nakamura", "pais": "Japón", "descripcion": "## Monitoreo Continuo de Salud\n\n**Biosensores** y wearables médicos:\n\n- Parches inteligentes\n- Lentes de contacto con sensores\n- Implantes monitoreables\n\n📊 Datos de salud en tiempo real", "imagen_url": "https://images.unsplash.com/photo-1532187863486-abf9dbad1b69?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80"}
+        ]
+        
+        eventos = []
+        charla_index = 0
+        
+        for fecha in fechas:
+            for hora in horarios:
+                for sala in salas:
+                    charla = charlas_data[charla_index % len(charlas_data)]
+                    eventos.append((
+                        fecha, hora, sala,
+                        charla["titulo"],
+                        charla["expositor"],
+                        charla["pais"],
+                        charla.get("descripcion", "Descripción no disponible"),
+                        charla.get("imagen_url", None),
+                        60, 0  # slots_disponibles, slots_ocupados
+                    ))
+                    charla_index += 1
+        
+        cursor.executemany("""
+            INSERT INTO expokossodo_eventos 
+            (fecha, hora, sala, titulo_charla, expositor, pais, descripcion, imagen_url, slots_disponibles, slots_ocupados)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, eventos)
+        
+        connection.commit()
+        print("[OK] Datos de ejemplo insertados exitosamente")
+        
+    except Error as e:
+        print(f"Error insertando datos de ejemplo: {e}")
+
+def construir_eventos_por_fecha():
+    """Consultar y serializar los eventos organizados por fecha (cuerpo de /api/eventos)"""
+    connection = None
+    cursor = None
+    
+    try:
+        connection = get_db_connection()
+        if not connection:
+            raise ConnectionError("Error de conexión a la base de datos")
+        
+        cursor = connection.cursor(dictionary=True)
+        
+        # Optimización: usar índices y limitar campos
+        query_start = time.time()
+        # Consulta simplificada sin joins complejos  
+        cursor.execute("""
+            SELECT 
+                e.id, e.titulo_charla, e.expositor, e.sala, e.hora, e.fecha,
+                e.disponible, e.pais, e.descripcion, e.imagen_url, e.post,
+                e.slots_disponibles, e.slots_ocupados
+            FROM expokossodo_eventos e
+            WHERE e.disponible = TRUE
+            ORDER BY e.fecha, e.hora, e.sala
+        """)
+        eventos = cursor.fetchall()
+        query_time = time.time() - query_start
+        print(f"[SEARCH] Query /api/eventos tomó {query_time:.3f}s, {len(eventos)} eventos encontrados")
+        
+        # Organizar por fecha
+        eventos_por_fecha = {}
+        for evento in eventos:
+            fecha_str = evento['fecha'].strftime('%Y-%m-%d')
+            if fecha_str not in eventos_por_fecha:
+                eventos_por_fecha[fecha_str] = {}
+            
+            hora = evento['hora']
+            if hora not in eventos_por_fecha[fecha_str]:
+                eventos_por_fecha[fecha_str][hora] = []
+            
+            eventos_por_fecha[fecha_str][hora].append({
+                'id': evento['id'],
+                'sala': evento['sala'],
+                'titulo_charla': evento.get('titulo_charla', ''),
+                'expositor': evento.get('expositor', ''),
+                'pais': evento.get('pais', ''),
+                'descripcion': evento.get('descripcion', ''),
+                'imagen_url': evento.get('imagen_url', ''),
+                'post': evento.get('post', ''),
+                'slots_disponibles': evento['slots_disponibles'],
+                'slots_ocupados': evento['slots_ocupados'],
+                'disponible': (
+                    evento.get('disponible', True) and 
+                    evento['slots_ocupados'] < evento['slots_disponibles']
+                ),
+                'marca_id': evento.get('marca_id'),
+                'marca_nombre': evento.get('marca_nombre'),
+                'marca_logo': evento.get('marca_logo'),
+                'marca_expositor': evento.get('marca_expositor'),
+                'slug': evento.get('slug', '')
+            })
+        
+        return current_app.json.dumps(eventos_por_fecha)
+        
+    finally:
+        if cursor:
+            cursor.close()
+        if connection and connection.is_connected():
+            connection.close()
+            print("[LOCK] Conexión cerrada para /api/eventos")
+
@@ -0,0 +1,83 @@
+"""
+Parser de códigos QR de ExpoKossodo con caché LRU
+ExpoKossodo 2025
+
+Reemplaza el recorrido carácter a carácter de validar_formato_qr por una sola
+pasada de una expresión regular compilada (una por formato). El resultado es
+un ParsedQR inmutable (tupla con __slots__ vacío) y queda en una caché LRU
+acotada indexada por el texto del QR, así un mismo QR escaneado en puerta,
+sala y leads se parsea una sola vez por worker.
+
+Formatos soportados:
+- Antiguo (con pipes):   3LETRAS|DNI|CARGO|EMPRESA|TIMESTAMP
+- Nuevo (sin separador): 3letras + dni(>=6 dígitos) + 3letras cargo + 3letras empresa + timestamp(>=10 dígitos)
+"""
+
+import os
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# [^\W\d_] = letra (equivalente a str.isalpha() para los QR generados por el sistema)
+_QR_PIPES_RE = re.compile(r'([^\W\d_]{3})\|([^|]+)\|([^|]+)\|([^|]+)\|(\s*[+-]?\d+\s*)')
+_QR_COMPACTO_RE = re.compile(r'([^\W\d_]{3})(\d{6,})([^\W\d_]{3})([^\W\d_]{3})(\d{10,})')
+
+QR_PARSE_CACHE_SIZE = int(os.getenv('QR_PARSE_CACHE_SIZE', 32768))
+
+
+class ParsedQR(namedtuple('_ParsedQRBase', 'tres_letras numero cargo empresa timestamp formato')):
+    """Datos extraídos de un QR válido (tupla inmutable, sin __dict__)"""
+
+    __slots__ = ()
+
+    def to_dict(self):
+        """Mismo diccionario que devolvía validar_formato_qr en 'parsed'"""
+        return {
+            "tres_letras": self.tres_letras,
+            "numero": self.numero,
+            "cargo": self.cargo,
+            "empresa": self.empresa,
+            "timestamp": self.timestamp
+        }
+
+
+@lru_cache(maxsize=QR_PARSE_CACHE_SIZE)
+def _parsear_qr_cacheado(qr_text):
+    if '|' in qr_text:
+        match = _QR_PIPES_RE.fullmatch(qr_text)
+        formato = 'pipes'
+    else:
+        match = _QR_COMPACTO_RE.fullmatch(qr_text)
+        formato = 'compacto'
+
+    if match is None:
+        return None
+
+    tres_letras, numero, cargo, empresa, timestamp = match.groups()
+    return ParsedQR(tres_letras, numero, cargo, empresa, int(timestamp), formato)
+
+
+def parsear_qr(qr_text):
+    """
+    Parsear y validar un texto QR
+
+    Args:
+        qr_text (str): Texto QR escaneado
+
+    Returns:
+        ParsedQR: Datos del QR, o None si el formato no es válido
+    """
+    if not qr_text or not isinstance(qr_text, str):
+        return None
+    return _parsear_qr_cacheado(qr_text)
+
+
+def estadisticas_cache():
+    """Hits/misses de la caché LRU de QR parseados"""
+    info = _parsear_qr_cacheado.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "tamano": info.currsize,
+        "maximo": info.maxsize
+    }
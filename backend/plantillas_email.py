@@ -0,0 +1,613 @@
+"""
+Plantillas precompiladas de los emails de registro
+ExpoKossodo 2025
+
+Los emails de confirmación y actualización se armaban con un f-string de
+~16KB por mensaje y concatenando (+=) un fragmento HTML por charla. Aquí el
+HTML estático se compila una sola vez al importar: cada plantilla queda como
+una lista de partes literales y campos, y el mensaje final se arma con un solo
+''.join. El fragmento de cada charla se cachea por su id y su contenido
+(título, expositor, país, fecha, hora, sala), así que editar una charla genera
+un fragmento nuevo sin invalidaciones manuales.
+
+El HTML resultante es idéntico al de los f-strings originales.
+"""
+
+from functools import lru_cache
+from string import Formatter
+
+EMAIL_FRAGMENT_CACHE_SIZE = 2048
+
+# Variantes de fragmento por charla
+CONFIRMACION = 'confirmacion'
+NUEVA = 'nueva'
+ANTERIOR = 'anterior'
+
+
+class PlantillaCompilada:
+    """Texto con campos {nombre} separado una vez en partes literales y campos"""
+
+    def __init__(self, texto):
+        self.literales = []
+        self.campos = []
+        for literal, campo, _, _ in Formatter().parse(texto):
+            self.literales.append(literal)
+            self.campos.append(campo)
+
+    def renderizar(self, valores):
+        """
+        Armar el texto final
+
+        Args:
+            valores (dict): Valor de cada campo (se convierte con str())
+        """
+        partes = []
+        for literal, campo in zip(self.literales, self.campos):
+            partes.append(literal)
+            if campo is not None:
+                partes.append(str(valores[campo]))
+        return ''.join(partes)
+
+
+@lru_cache(maxsize=EMAIL_FRAGMENT_CACHE_SIZE)
+def _fragmento_evento(variante, evento_id, titulo_charla, expositor, pais, fecha, hora, sala):
+    return _FRAGMENTOS[variante].renderizar({
+        'titulo_charla': titulo_charla,
+        'expositor': expositor,
+        'pais': pais,
+        'fecha': fecha,
+        'hora': hora,
+        'sala': sala
+    })
+
+
+def fragmento_evento(evento, variante=CONFIRMACION):
+    """HTML de una charla para la agenda del email (cacheado por id y contenido)"""
+    return _fragmento_evento(
+        variante,
+        evento['id'],
+        evento['titulo_charla'],
+        evento['expositor'],
+        evento['pais'],
+        evento['fecha'],
+        evento['hora'],
+        evento['sala']
+    )
+
+
+def _fechas_eventos(eventos):
+    return ', '.join(sorted(set([
+        evento['fecha'].strftime('%d/%m/%Y') if hasattr(evento['fecha'], 'strftime') else str(evento['fecha'])
+        for evento in eventos
+    ])))
+
+
+def _valores_usuario(user_data, eventos, eventos_html):
+    return {
+        'nombres': user_data['nombres'],
+        'correo': user_data['correo'],
+        'empresa': user_data['empresa'],
+        'cargo': user_data['cargo'],
+        'numero': user_data['numero'],
+        'total_eventos': len(eventos),
+        'eventos_html': eventos_html,
+        'fechas': _fechas_eventos(eventos)
+    }
+
+
+def renderizar_email_confirmacion(user_data, selected_events):
+    """HTML del email de confirmación de registro"""
+    eventos_html = ''.join(fragmento_evento(evento, CONFIRMACION) for evento in selected_events)
+    return _SHELL_CONFIRMACION.renderizar(_valores_usuario(user_data, selected_events, eventos_html))
+
+
+def renderizar_email_actualizacion(user_data, all_events, eventos_agregados_ids, eventos_previos_ids):
+    """HTML del email de actualización: primero las charlas nuevas (con badge), luego las anteriores"""
+    eventos_nuevos = [e for e in all_events if e['id'] in eventos_agregados_ids]
+    eventos_anteriores = [e for e in all_events if e['id'] in eventos_previos_ids]
+    eventos_html = ''.join(
+        [fragmento_evento(evento, NUEVA) for evento in eventos_nuevos] +
+        [fragmento_evento(evento, ANTERIOR) for evento in eventos_anteriores]
+    )
+    return _SHELL_ACTUALIZACION.renderizar(_valores_usuario(user_data, all_events, eventos_html))
+
+
+def estadisticas_cache():
+    """Hits/misses de la caché de fragmentos por charla"""
+    info = _fragmento_evento.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "tamano": info.currsize,
+        "maximo": info.maxsize
+    }
+
+
+# --- Plantillas (HTML estático) ---
+
+_HTML_SHELL_CONFIRMACION = """
+        <!DOCTYPE html>
+        <html lang="es">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Confirmación ExpoKossodo 2025</title>
+            <!--[if mso]>
+            <noscript>
+                <xml>
+                    <o:OfficeDocumentSettings>
+                        <o:PixelsPerInch>96</o:PixelsPerInch>
+                    </o:OfficeDocumentSettings>
+                </xml>
+            </noscript>
+            <![endif]-->
+        </head>
+        <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%); line-height: 1.6;">
+            
+            <!-- Main Container -->
+            <table width="100%" cellpadding="0" cellspacing="0" style="background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%); min-height: 100vh;">
+                <tr>
+                    <td align="center" style="padding: 40px 20px;">
+                        
+                        <!-- Email Content Container -->
+                        <table width="600" cellpadding="0" cellspacing="0" style="max-width: 600px; background: white; border-radius: 20px; box-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04); overflow: hidden;">
+                            
+                            <!-- Header with Gradient -->
+                            <tr>
+                                <td style="background: linear-gradient(135deg, #01295c 0%, #1d2236 100%); padding: 40px 30px; text-align: center;">
+                                                                                                              <!-- Logo -->
+                                     <img src="https://www.kossomet.com/AppUp/default/Expokossodo_logo_blanco_trans.png" alt="ExpoKossodo 2025" style="width: 200px; height: auto; margin-bottom: 30px;">
+                                     
+                                     <!-- Title -->
+                                     <h1 style="margin: 0; font-size: 32px; font-weight: 700; color: white; margin-bottom: 8px;">
+                                         ¡Registro Confirmado!
+                                     </h1>
+                                     <p style="margin: 0; font-size: 18px; color: rgba(255, 255, 255, 0.8); font-weight: 400;">
+                                         Te esperamos en ExpoKossodo 2025
+                                     </p>
+                                </td>
+                            </tr>
+                            
+                            <!-- Main Content -->
+                            <tr>
+                                <td style="padding: 40px 30px;">
+                                    
+                                    <!-- Greeting -->
+                                    <h2 style="margin: 0 0 20px 0; font-size: 24px; font-weight: 600; color: #1f2937;">
+                                        Hola {nombres},
+                                    </h2>
+                                    <p style="margin: 0 0 30px 0; font-size: 16px; color: #6b7280; line-height: 1.6;">
+                                        Tu registro ha sido confirmado exitosamente. Aquí tienes todos los detalles de tu participación:
+                                    </p>
+                                    
+                                    <!-- Participant Data Card -->
+                                    <table width="100%" cellpadding="0" cellspacing="0" style="margin-bottom: 30px;">
+                                        <tr>
+                                            <td style="background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 100%); padding: 25px; border-radius: 12px; border-left: 4px solid #6cb79a;">
+                                                <h3 style="margin: 0 0 15px 0; font-size: 18px; font-weight: 600; color: #1f2937;">
+                                                    📋 Datos del Participante
+                                                </h3>
+                                                <table width="100%" cellpadding="0" cellspacing="0">
+                                                    <tr>
+                                                        <td style="padding: 5px 0; font-size: 14px; color: #374151;"><strong>Nombre:</strong> {nombres}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 5px 0; font-size: 14px; color: #374151;"><strong>Email:</strong> {correo}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 5px 0; font-size: 14px; color: #374151;"><strong>Empresa:</strong> {empresa}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 5px 0; font-size: 14px; color: #374151;"><strong>Cargo:</strong> {cargo}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 5px 0; font-size: 14px; color: #374151;"><strong>Teléfono:</strong> {numero}</td>
+                                                    </tr>
+                                                </table>
+                                            </td>
+                                        </tr>
+                                    </table>
+                                    
+                                                                         <!-- Selected Events Section - Estilo del frontend -->
+                                     <table width="100%" cellpadding="0" cellspacing="0" style="margin-bottom: 30px;">
+                                         <tr>
+                                             <td style="background: linear-gradient(135deg, #01295c 0%, #1d2236 100%); padding: 25px; border-radius: 16px;">
+                                                 <h3 style="margin: 0 0 20px 0; font-size: 20px; font-weight: 700; color: white;">
+                                                     Eventos Seleccionados ({total_eventos})
+                                                 </h3>
+                                                 <table width="100%" cellpadding="0" cellspacing="0">
+                {eventos_html}
+                                                 </table>
+                                             </td>
+                                         </tr>
+                                     </table>
+                                    
+                                                                         <!-- Important Information - Diseño minimalista -->
+                                     <table width="100%" cellpadding="0" cellspacing="0" style="margin-bottom: 30px;">
+                                         <tr>
+                                             <td style="background: white; padding: 25px; border-radius: 16px; border: 2px solid #6cb79a; box-shadow: 0 4px 6px rgba(108, 183, 154, 0.1);">
+                                                 <div style="display: flex; align-items: center; margin-bottom: 20px;">
+                                                     <div style="width: 40px; height: 40px; background: #6cb79a; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 15px;">
+                                                         <svg width="20" height="20" fill="#ffffff" viewBox="0 0 24 24">
+                                                             <path d="M12 2C8.13 2 5 5.13 5 9c0 5.25 7 13 7 13s7-7.75 7-13c0-3.87-3.13-7-7-7zm0 9.5c-1.38 0-2.5-1.12-2.5-2.5s1.12-2.5 2.5-2.5 2.5 1.12 2.5 2.5-1.12 2.5-2.5 2.5z"/>
+                                                         </svg>
+                </div>
+                                                     <h3 style="margin: 0; font-size: 18px; font-weight: 700; color: #1f2937;">
+                                                         Información Importante
+                                                     </h3>
+                </div>
+                                                 <table width="100%" cellpadding="0" cellspacing="0">
+                                                     <tr><td style="padding: 8px 0; font-size: 14px; color: #374151; border-bottom: 1px solid #f3f4f6;"><strong>Fechas de tus eventos:</strong> {fechas}</td></tr>
+                                                     <tr><td style="padding: 8px 0; font-size: 14px; color: #374151; border-bottom: 1px solid #f3f4f6;">
+                                                         <strong>Ubicación:</strong> Oficinas de Kossodo Jr. Chota 1161, Cercado de Lima<br>
+                                                         <a href="https://maps.app.goo.gl/nbKHT74Tk3gfquhA6" target="_blank" style="display: inline-block; margin-top: 8px; background: #6cb79a; color: white; text-decoration: none; padding: 6px 12px; border-radius: 6px; font-size: 12px; font-weight: 600;">
+                                                             📍 Ver en Google Maps
+                                                         </a>
+                                                     </td></tr>
+                                                     <tr><td style="padding: 8px 0; font-size: 14px; color: #374151;"><strong>Llegada:</strong> Te recomendamos llegar 30 minutos antes</td></tr>
+                                                 </table>
+                                             </td>
+                                         </tr>
+                                     </table>
+                                     
+                                     <!-- QR Code Information - Diseño minimalista -->
+                                     <table width="100%" cellpadding="0" cellspacing="0" style="margin-bottom: 30px;">
+                                         <tr>
+                                             <td style="background: white; padding: 25px; border-radius: 16px; border: 2px solid #6cb79a; box-shadow: 0 4px 6px rgba(108, 183, 154, 0.1);">
+                                                 <div style="display: flex; align-items: center; margin-bottom: 20px;">
+                                                     <div style="width: 40px; height: 40px; background: #6cb79a; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 15px;">
+                                                         <svg width="20" height="20" fill="#ffffff" viewBox="0 0 24 24">
+                                                             <path d="M3 3h18v18H3V3zm16 16V5H5v14h14zM7 7h2v2H7V7zm0 4h2v2H7v-2zm4-4h2v2h-2V7zm0 4h2v2h-2v-2zm4-4h2v2h-2V7zm0 4h2v2h-2v-2zM7 15h2v2H7v-2zm4 0h2v2h-2v-2zm4 0h2v2h-2v-2z"/>
+                                                         </svg>
+                </div>
+                                                     <h3 style="margin: 0; font-size: 18px; font-weight: 700; color: #1f2937;">
+                                                         Tu Código QR Personal
+                                                     </h3>
+            </div>
+                                                 <table width="100%" cellpadding="0" cellspacing="0">
+                                                     <tr><td style="padding: 8px 0; font-size: 14px; color: #374151; border-bottom: 1px solid #f3f4f6;">Hemos adjuntado tu <strong>código QR único</strong> a este email</td></tr>
+                                                     <tr><td style="padding: 8px 0; font-size: 14px; color: #374151; border-bottom: 1px solid #f3f4f6;"><strong>Guárdalo en tu teléfono</strong> - lo necesitarás para ingresar al evento</td></tr>
+                                                     <tr><td style="padding: 8px 0; font-size: 14px; color: #374151; border-bottom: 1px solid #f3f4f6;">Presenta el QR en recepción y en cada charla para registrar tu asistencia</td></tr>
+                                                     <tr><td style="padding: 8px 0; font-size: 14px; color: #374151;"><strong>¡No lo compartas!</strong> Es único e intransferible</td></tr>
+                                                 </table>
+                                             </td>
+                                         </tr>
+                                     </table>
+                                    
+                                    <!-- CTA Button -->
+                                    <table width="100%" cellpadding="0" cellspacing="0" style="margin-bottom: 30px;">
+                                        <tr>
+                                            <td align="center">
+                                                <a href="#" style="display: inline-block; background: linear-gradient(135deg, #6cb79a 0%, #5ca085 100%); color: white; text-decoration: none; padding: 16px 32px; border-radius: 12px; font-size: 16px; font-weight: 600; box-shadow: 0 4px 6px rgba(108, 183, 154, 0.25);">
+                                                    🌟 Preparándote para la Expo
+                                                </a>
+                                            </td>
+                                        </tr>
+                                    </table>
+                                    
+                                    <!-- Final Message -->
+                                    <p style="margin: 0; font-size: 16px; color: #6b7280; text-align: center; line-height: 1.6;">
+                                        ¡Esperamos verte pronto en <strong style="color: #6cb79a;">ExpoKossodo 2025</strong>!<br>
+                                        Un evento que marcará el futuro de la sostenibilidad.
+                                    </p>
+                                    
+                                </td>
+                            </tr>
+                            
+                            <!-- Footer -->
+                            <tr>
+                                <td style="background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 100%); padding: 30px; text-align: center; border-top: 1px solid #e5e7eb;">
+                                    <p style="margin: 0 0 10px 0; font-size: 14px; color: #6b7280;">
+                                        Si tienes alguna pregunta, no dudes en contactarnos:
+                                    </p>
+                                    <p style="margin: 0 0 15px 0; font-size: 14px;">
+                                        <a href="mailto:jcamacho@kossodo.com" style="color: #6cb79a; text-decoration: none; font-weight: 600;">jcamacho@kossodo.com</a>
+                                    </p>
+                                    <p style="margin: 0; font-size: 16px; font-weight: 600; color: #1f2937;">
+                                        Equipo ExpoKossodo 2025
+                                    </p>
+                                </td>
+                            </tr>
+                            
+                        </table>
+                        
+                    </td>
+                </tr>
+            </table>
+            
+        </body>
+        </html>
+        """
+
+_HTML_SHELL_ACTUALIZACION = """
+        <!DOCTYPE html>
+        <html lang="es">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Actualización de Registro - ExpoKossodo 2025</title>
+            <!--[if mso]>
+            <noscript>
+                <xml>
+                    <o:OfficeDocumentSettings>
+                        <o:PixelsPerInch>96</o:PixelsPerInch>
+                    </o:OfficeDocumentSettings>
+                </xml>
+            </noscript>
+            <![endif]-->
+        </head>
+        <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%); line-height: 1.6;">
+            
+            <!-- Main Container -->
+            <table width="100%" cellpadding="0" cellspacing="0" style="background: linear-gradient(135deg, #f3f4f6 0%, #e5e7eb 100%); min-height: 100vh;">
+                <tr>
+                    <td align="center" style="padding: 40px 20px;">
+                        
+                        <!-- Email Content Container -->
+                        <table width="600" cellpadding="0" cellspacing="0" style="max-width: 600px; background: white; border-radius: 20px; box-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04); overflow: hidden;">
+                            
+                            <!-- Header with Gradient -->
+                            <tr>
+                                <td style="background: linear-gradient(135deg, #01295c 0%, #1d2236 100%); padding: 40px 30px; text-align: center;">
+                                    <!-- Logo -->
+                                    <img src="https://www.kossomet.com/AppUp/default/Expokossodo_logo_blanco_trans.png" alt="ExpoKossodo 2025" style="width: 200px; height: auto; margin-bottom: 30px;">
+                                     
+                                    <!-- Title - CAMBIO AQUÍ -->
+                                    <h1 style="margin: 0; font-size: 32px; font-weight: 700; color: white; margin-bottom: 8px;">
+                                        🔄 Registro Actualizado
+                                    </h1>
+                                    <p style="margin: 0; font-size: 18px; color: rgba(255, 255, 255, 0.8); font-weight: 400;">
+                                        Nuevas charlas agregadas a tu agenda
+                                    </p>
+                                </td>
+                            </tr>
+                            
+                            <!-- Main Content -->
+                            <tr>
+                                <td style="padding: 40px 30px;">
+                                    
+                                    <!-- Greeting -->
+                                    <h2 style="margin: 0 0 20px 0; font-size: 24px; font-weight: 600; color: #1f2937;">
+                                        Hola {nombres},
+                                    </h2>
+                                    <p style="margin: 0 0 30px 0; font-size: 16px; color: #6b7280; line-height: 1.6;">
+                                        Tu registro ha sido <strong>actualizado exitosamente</strong>. Has agregado nuevas charlas a tu agenda personal. Aquí tienes todos los detalles actualizados:
+                                    </p>
+                                    
+                                    <!-- Participant Data Card -->
+                                    <table width="100%" cellpadding="0" cellspacing="0" style="margin-bottom: 30px;">
+                                        <tr>
+                                            <td style="background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 100%); padding: 25px; border-radius: 12px; border-left: 4px solid #6cb79a;">
+                                                <h3 style="margin: 0 0 15px 0; font-size: 18px; font-weight: 600; color: #1f2937;">
+                                                    📋 Datos del Participante
+                                                </h3>
+                                                <table width="100%" cellpadding="0" cellspacing="0">
+                                                    <tr>
+                                                        <td style="padding: 5px 0; font-size: 14px; color: #374151;"><strong>Nombre:</strong> {nombres}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 5px 0; font-size: 14px; color: #374151;"><strong>Email:</strong> {correo}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 5px 0; font-size: 14px; color: #374151;"><strong>Empresa:</strong> {empresa}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 5px 0; font-size: 14px; color: #374151;"><strong>Cargo:</strong> {cargo}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 5px 0; font-size: 14px; color: #374151;"><strong>Teléfono:</strong> {numero}</td>
+                                                    </tr>
+                                                </table>
+                                            </td>
+                                        </tr>
+                                    </table>
+                                    
+                                    <!-- Selected Events Section - CAMBIO AQUÍ EN EL TÍTULO -->
+                                    <table width="100%" cellpadding="0" cellspacing="0" style="margin-bottom: 30px;">
+                                        <tr>
+                                            <td style="background: linear-gradient(135deg, #01295c 0%, #1d2236 100%); padding: 25px; border-radius: 16px;">
+                                                <h3 style="margin: 0 0 20px 0; font-size: 20px; font-weight: 700; color: white;">
+                                                    Tu Agenda Actualizada ({total_eventos} eventos)
+                                                </h3>
+                                                <table width="100%" cellpadding="0" cellspacing="0">
+                                                    {eventos_html}
+                                                </table>
+                                            </td>
+                                        </tr>
+                                    </table>
+                                    
+                                    <!-- Important Information -->
+                                    <table width="100%" cellpadding="0" cellspacing="0" style="margin-bottom: 30px;">
+                                        <tr>
+                                            <td style="background: white; padding: 25px; border-radius: 16px; border: 2px solid #6cb79a; box-shadow: 0 4px 6px rgba(108, 183, 154, 0.1);">
+                                                <div style="display: flex; align-items: center; margin-bottom: 20px;">
+                                                    <div style="width: 40px; height: 40px; background: #6cb79a; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 15px;">
+                                                        <svg width="20" height="20" fill="#ffffff" viewBox="0 0 24 24">
+                                                            <path d="M12 2C8.13 2 5 5.13 5 9c0 5.25 7 13 7 13s7-7.75 7-13c0-3.87-3.13-7-7-7zm0 9.5c-1.38 0-2.5-1.12-2.5-2.5s1.12-2.5 2.5-2.5 2.5 1.12 2.5 2.5-1.12 2.5-2.5 2.5z"/>
+                                                        </svg>
+                                                    </div>
+                                                    <h3 style="margin: 0; font-size: 18px; font-weight: 700; color: #1f2937;">
+                                                        Información Importante
+                                                    </h3>
+                                                </div>
+                                                <table width="100%" cellpadding="0" cellspacing="0">
+                                                    <tr><td style="padding: 8px 0; font-size: 14px; color: #374151; border-bottom: 1px solid #f3f4f6;"><strong>Fechas de tus eventos:</strong> {fechas}</td></tr>
+                                                    <tr><td style="padding: 8px 0; font-size: 14px; color: #374151; border-bottom: 1px solid #f3f4f6;">
+                                                        <strong>Ubicación:</strong> Oficinas de Kossodo Jr. Chota 1161, Cercado de Lima<br>
+                                                        <a href="https://maps.app.goo.gl/nbKHT74Tk3gfquhA6" target="_blank" style="display: inline-block; margin-top: 8px; background: #6cb79a; color: white; text-decoration: none; padding: 6px 12px; border-radius: 6px; font-size: 12px; font-weight: 600;">
+                                                            📍 Ver en Google Maps
+                                                        </a>
+                                                    </td></tr>
+                                                    <tr><td style="padding: 8px 0; font-size: 14px; color: #374151;"><strong>Llegada:</strong> Te recomendamos llegar 30 minutos antes</td></tr>
+                                                </table>
+                                            </td>
+                                        </tr>
+                                    </table>
+                                     
+                                    <!-- QR Code Information - Diseño minimalista -->
+                                    <table width="100%" cellpadding="0" cellspacing="0" style="margin-bottom: 30px;">
+                                        <tr>
+                                            <td style="background: white; padding: 25px; border-radius: 16px; border: 2px solid #6cb79a; box-shadow: 0 4px 6px rgba(108, 183, 154, 0.1);">
+                                                <div style="display: flex; align-items: center; margin-bottom: 20px;">
+                                                    <div style="width: 40px; height: 40px; background: #6cb79a; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 15px;">
+                                                        <svg width="20" height="20" fill="#ffffff" viewBox="0 0 24 24">
+                                                            <path d="M3 3h18v18H3V3zm16 16V5H5v14h14zM7 7h2v2H7V7zm0 4h2v2H7v-2zm4-4h2v2h-2V7zm0 4h2v2h-2v-2zm4-4h2v2h-2V7zm0 4h2v2h-2v-2zM7 15h2v2H7v-2zm4 0h2v2h-2v-2zm4 0h2v2h-2v-2z"/>
+                                                        </svg>
+                                                    </div>
+                                                    <h3 style="margin: 0; font-size: 18px; font-weight: 700; color: #1f2937;">
+                                                        Tu Código QR Personal
+                                                    </h3>
+                                                </div>
+                                                <table width="100%" cellpadding="0" cellspacing="0">
+                                                    <tr><td style="padding: 8px 0; font-size: 14px; color: #374151; border-bottom: 1px solid #f3f4f6;">Hemos adjuntado tu <strong>código QR único</strong> a este email</td></tr>
+                                                    <tr><td style="padding: 8px 0; font-size: 14px; color: #374151; border-bottom: 1px solid #f3f4f6;"><strong>Guárdalo en tu teléfono</strong> - lo necesitarás para ingresar al evento</td></tr>
+                                                    <tr><td style="padding: 8px 0; font-size: 14px; color: #374151; border-bottom: 1px solid #f3f4f6;">Presenta el QR en recepción y en cada charla para registrar tu asistencia</td></tr>
+                                                    <tr><td style="padding: 8px 0; font-size: 14px; color: #374151;"><strong>¡No lo compartas!</strong> Es único e intransferible</td></tr>
+                                                </table>
+                                            </td>
+                                        </tr>
+                                    </table>
+                                    
+                                    <!-- CTA Button -->
+                                    <table width="100%" cellpadding="0" cellspacing="0" style="margin-bottom: 30px;">
+                                        <tr>
+                                            <td align="center">
+                                                <a href="https://expokossodo.com" target="_blank" style="display: inline-block; background: linear-gradient(135deg, #6cb79a 0%, #5aa085 100%); color: white; text-decoration: none; padding: 16px 32px; border-radius: 12px; font-size: 16px; font-weight: 700; box-shadow: 0 4px 15px rgba(108, 183, 154, 0.3); transition: all 0.3s ease;">
+                                                    🌐 Visitar ExpoKossodo.com
+                                                </a>
+                                            </td>
+                                        </tr>
+                                    </table>
+                                </td>
+                            </tr>
+                            
+                            <!-- Footer with Social Links -->
+                            <tr>
+                                <td style="background: linear-gradient(135deg, #374151 0%, #1f2937 100%); padding: 30px; text-align: center;">
+                                    <h4 style="margin: 0 0 20px 0; font-size: 20px; font-weight: 700; color: white;">
+                                        Gracias por actualizar tu registro
+                                    </h4>
+                                    <p style="margin: 0 0 20px 0; font-size: 14px; color: #d1d5db; line-height: 1.6;">
+                                        ¿Tienes alguna pregunta? Contáctanos:<br>
+                                        📧 <a href="mailto:expokossodo@kossomet.com" style="color: #6cb79a;">expokossodo@kossomet.com</a><br>
+                                        📱 WhatsApp: <a href="https://wa.me/51999999999" style="color: #6cb79a;">+51 999 999 999</a>
+                                    </p>
+                                    <div style="margin: 20px 0;">
+                                        <a href="#" style="display: inline-block; margin: 0 10px; color: #6cb79a; text-decoration: none; font-size: 24px;">📘</a>
+                                        <a href="#" style="display: inline-block; margin: 0 10px; color: #6cb79a; text-decoration: none; font-size: 24px;">📷</a>
+                                        <a href="#" style="display: inline-block; margin: 0 10px; color: #6cb79a; text-decoration: none; font-size: 24px;">🐦</a>
+                                    </div>
+                                    <p style="margin: 0; font-size: 12px; color: #9ca3af;">
+                                        © 2025 ExpoKossodo. Todos los derechos reservados.<br>
+                                        Evento organizado por Kossodo Medical Group
+                                    </p>
+                                </td>
+                            </tr>
+                        </table>
+                    </td>
+                </tr>
+            </table>
+        </body>
+        </html>
+        """
+
+_HTML_EVENTO_CONFIRMACION = """
+            <tr>
+                <td style="padding: 20px; border-radius: 12px; background: white; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1); margin-bottom: 15px; display: block;">
+                    <table width="100%" cellpadding="0" cellspacing="0">
+                        <tr>
+                            <td style="padding-bottom: 12px;">
+                                <h3 style="margin: 0; font-size: 18px; font-weight: 700; color: #1f2937; line-height: 1.4;">
+                                    {titulo_charla}
+                                </h3>
+                            </td>
+                        </tr>
+                        <tr>
+                            <td style="padding-bottom: 8px;">
+                                <p style="margin: 0; font-size: 14px; color: #6b7280; font-weight: 500;">
+                                    {expositor} • {pais}
+                                </p>
+                            </td>
+                        </tr>
+                                                                 <tr>
+                                             <td>
+                                                 <div style="display: inline-flex; align-items: center; background: #6cb79a; color: white; padding: 8px 16px; border-radius: 8px; font-size: 14px; font-weight: 600;">
+                                                     📅 {fecha} &nbsp;•&nbsp; 🕐 {hora} &nbsp;•&nbsp; 🏛️ {sala}
+            </div>
+                                             </td>
+                                         </tr>pe
+                    </table>
+                </td>
+            </tr>
+            """
+
+_HTML_EVENTO_NUEVO = """
+            <tr>
+                <td style="padding: 20px; border-radius: 12px; background: white; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1); margin-bottom: 15px; display: block;">
+                    <table width="100%" cellpadding="0" cellspacing="0">
+                        <tr>
+                            <td style="padding-bottom: 12px;">
+                                <div style="display: inline-block; background: #28a745; color: white; padding: 4px 8px; border-radius: 8px; font-size: 12px; font-weight: bold; margin-bottom: 8px;">
+                                    ✨ NUEVA CHARLA
+                                </div>
+                                <h3 style="margin: 0; font-size: 18px; font-weight: 700; color: #1f2937; line-height: 1.4;">
+                                    {titulo_charla}
+                                </h3>
+                            </td>
+                        </tr>
+                        <tr>
+                            <td style="padding-bottom: 8px;">
+                                <p style="margin: 0; font-size: 14px; color: #6b7280; font-weight: 500;">
+                                    {expositor} • {pais}
+                                </p>
+                            </td>
+                        </tr>
+                        <tr>
+                            <td>
+                                <div style="display: inline-flex; align-items: center; background: #6cb79a; color: white; padding: 8px 16px; border-radius: 8px; font-size: 14px; font-weight: 600;">
+                                    📅 {fecha} &nbsp;•&nbsp; 🕐 {hora} &nbsp;•&nbsp; 🏛️ {sala}
+                                </div>
+                            </td>
+                        </tr>
+                    </table>
+                </td>
+            </tr>
+            """
+
+_HTML_EVENTO_ANTERIOR = """
+            <tr>
+                <td style="padding: 20px; border-radius: 12px; background: white; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1); margin-bottom: 15px; display: block;">
+                    <table width="100%" cellpadding="0" cellspacing="0">
+                        <tr>
+                            <td style="padding-bottom: 12px;">
+                                <h3 style="margin: 0; font-size: 18px; font-weight: 700; color: #1f2937; line-height: 1.4;">
+                                    {titulo_charla}
+                                </h3>
+                            </td>
+                        </tr>
+                        <tr>
+                            <td style="padding-bottom: 8px;">
+                                <p style="margin: 0; font-size: 14px; color: #6b7280; font-weight: 500;">
+                                    {expositor} • {pais}
+                                </p>
+                            </td>
+                        </tr>
+                        <tr>
+                            <td>
+                                <div style="display: inline-flex; align-items: center; background: #6cb79a; color: white; padding: 8px 16px; border-radius: 8px; font-size: 14px; font-weight: 600;">
+                                    📅 {fecha} &nbsp;•&nbsp; 🕐 {hora} &nbsp;•&nbsp; 🏛️ {sala}
+                                </div>
+                            </td>
+                        </tr>
+                    </table>
+                </td>
+            </tr>
+            """
+
+_SHELL_CONFIRMACION = PlantillaCompilada(_HTML_SHELL_CONFIRMACION)
+_SHELL_ACTUALIZACION = PlantillaCompilada(_HTML_SHELL_ACTUALIZACION)
+_FRAGMENTOS = {
+    CONFIRMACION: PlantillaCompilada(_HTML_EVENTO_CONFIRMACION),
+    NUEVA: PlantillaCompilada(_HTML_EVENTO_NUEVO),
+    ANTERIOR: PlantillaCompilada(_HTML_EVENTO_ANTERIOR)
+}
@@ -0,0 +1,361 @@
+"""
+Pool de conexiones MySQL con espera acotada e instrumentación
+ExpoKossodo 2025
+
+MySQLConnectionPool.get_connection() falla al instante con "pool exhausted"
+cuando todas las conexiones están prestadas. Con workers sync eso casi no
+pasaba (un request por proceso), pero con gthread o gevent muchos requests
+comparten el pool del proceso y un pico de escaneos terminaba en 500.
+
+PoolCooperativo agrega un semáforo con un cupo por conexión: quien pide una
+conexión espera hasta DB_POOL_ESPERA_SEGUNDOS a que otra se devuelva. En modo
+gevent el semáforo está parcheado y la espera cede el control a los demás
+greenlets en vez de bloquear el proceso.
+
+Además mide lo necesario para distinguir un pool chico de una BD lenta:
+
+- espera por una conexión libre (histograma), esperas y agotamientos;
+- tiempo de retención por endpoint (quien pidió la conexión);
+- fugas: conexiones que un request no devolvió. Antes se perdían para
+  siempre (PooledMySQLConnection no se devuelve al ser recolectado) y el pool
+  se achicaba hasta agotarse; recuperar_fugas() las devuelve al terminar el
+  request y las cuenta por endpoint. Una respuesta en streaming sigue leyendo
+  después del teardown: desvincular() saca su conexión de ese seguimiento.
+
+Si se pasa un observador, las conexiones prestadas reportan cada viaje a la
+BD (execute, commit, rollback, START TRANSACTION) con su duración; metricas lo
+usa para la latencia por consulta y los viajes por request.
+
+Con preload_app el pool se crea en el master y los workers heredan sus
+sockets: dos workers hablando por la misma conexión corrompen el protocolo.
+Cada worker abre sus propias conexiones la primera vez que pide una.
+
+Configuración (variables de entorno):
+- DB_POOL_SIZE              conexiones por proceso (10, máximo 32) o 'auto'
+- DB_CONEXIONES_MAX         con 'auto': conexiones totales a repartir entre workers (60)
+- DB_POOL_ESPERA_SEGUNDOS   espera máxima por una conexión libre (5)
+- DB_POOL_RECUPERAR_FUGAS   devolver al pool las conexiones no cerradas (1)
+"""
+
+import os
+import threading
+import time
+
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+
+# Límites superiores (segundos) del histograma de espera por una conexión
+BUCKETS_ESPERA = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0)
+
+# Una conexión prestada por más de esto aparece como sospechosa en estadisticas()
+RETENCION_SOSPECHOSA_SEGUNDOS = 60
+
+
+class Prestamo:
+    """Conexión entregada por el pool y aún no devuelta"""
+
+    __slots__ = ('conexion', 'propietario', 'etiqueta', 'desde')
+
+    def __init__(self, conexion, propietario, etiqueta):
+        self.conexion = conexion
+        self.propietario = propietario
+        self.etiqueta = etiqueta
+        self.desde = time.perf_counter()
+
+
+class CursorObservado:
+    """Cursor que reporta la duración de cada execute al observador del pool"""
+
+    def __init__(self, cursor, observador):
+        self._cursor = cursor
+        self._observador = observador
+
+    def _medir(self, metodo, operacion, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return metodo(operacion, *args, **kwargs)
+        finally:
+            self._observador(operacion, time.perf_counter() - inicio)
+
+    def execute(self, operacion, *args, **kwargs):
+        return self._medir(self._cursor.execute, operacion, *args, **kwargs)
+
+    def executemany(self, operacion, *args, **kwargs):
+        return self._medir(self._cursor.executemany, operacion, *args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class ConexionObservada(pooling.PooledMySQLConnection):
+    """Conexión del pool que reporta consultas y fin de transacciones al observador"""
+
+    def __init__(self, pool, cnx, observador):
+        super().__init__(pool, cnx)
+        self._observador = observador
+
+    def cursor(self, *args, **kwargs):
+        return CursorObservado(self._cnx.cursor(*args, **kwargs), self._observador)
+
+    def _medir(self, sentencia, metodo, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            self._observador(sentencia, time.perf_counter() - inicio)
+
+    def commit(self):
+        return self._medir('COMMIT', self._cnx.commit)
+
+    def rollback(self):
+        return self._medir('ROLLBACK', self._cnx.rollback)
+
+    def start_transaction(self, *args, **kwargs):
+        return self._medir('START TRANSACTION', self._cnx.start_transaction, *args, **kwargs)
+
+
+class PoolCooperativo(pooling.MySQLConnectionPool):
+    """MySQLConnectionPool que espera una conexión libre en lugar de fallar"""
+
+    def __init__(self, espera_segundos=None, contexto=None, observador=None, **kwargs):
+        """
+        Args:
+            espera_segundos (float): Espera máxima por una conexión libre
+            contexto (callable): Devuelve (propietario, etiqueta) de quien pide la
+                conexión; propietario None si no es un request (hilos de fondo)
+            observador (callable): observador(sql, segundos) por cada viaje a la BD
+        """
+        self.espera = espera_segundos if espera_segundos is not None else float(os.getenv('DB_POOL_ESPERA_SEGUNDOS', 5))
+        self.contexto = contexto or (lambda: (None, 'sin_contexto'))
+        self.observador = observador
+        self.recuperar = os.getenv('DB_POOL_RECUPERAR_FUGAS', '1') != '0'
+        self._cupos = None
+        self._lock_stats = threading.Lock()
+        self._prestadas = {}
+        self._heredadas = []
+        self._reiniciar_stats()
+        # El constructor llena la cola con add_connection() sin conexión: no libera cupos
+        super().__init__(**kwargs)
+        self._cupos = threading.Semaphore(self.pool_size)
+        self._pid = os.getpid()
+
+    def _reiniciar_stats(self):
+        self.stats = {
+            'prestamos': 0, 'esperas': 0, 'agotamientos': 0, 'errores_conexion': 0,
+            'fugas': 0, 'fugas_recuperadas': 0, 'reinicios_tras_fork': 0
+        }
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._histograma_espera = [0] * (len(BUCKETS_ESPERA) + 1)
+        self._por_endpoint = {}
+        self._ultimo_agotamiento = None
+
+    # --- Préstamo y devolución ---
+
+    def get_connection(self):
+        if os.getpid() != self._pid:
+            self._reiniciar_tras_fork()
+
+        inicio = time.perf_counter()
+        if not self._cupos.acquire(blocking=False):
+            with self._lock_stats:
+                self.stats['esperas'] += 1
+            if not self._cupos.acquire(timeout=self.espera):
+                with self._lock_stats:
+                    self.stats['agotamientos'] += 1
+                    self._ultimo_agotamiento = time.time()
+                    self._registrar_espera(time.perf_counter() - inicio)
+                raise PoolError(f"Sin conexiones libres tras {self.espera}s (pool de {self.pool_size})")
+        espera = time.perf_counter() - inicio
+
+        try:
+            conexion = super().get_connection()
+        except Exception:
+            self._cupos.release()
+            with self._lock_stats:
+                self.stats['errores_conexion'] += 1
+            raise
+
+        if self.observador is not None:
+            conexion = ConexionObservada(self, conexion._cnx, self.observador)
+
+        propietario, etiqueta = self.contexto()
+        with self._lock_stats:
+            self.stats['prestamos'] += 1
+            self._registrar_espera(espera)
+            self._prestadas[id(conexion._cnx)] = Prestamo(conexion, propietario, etiqueta)
+        return conexion
+
+    def add_connection(self, cnx=None):
+        try:
+            super().add_connection(cnx)
+        finally:
+            # PooledMySQLConnection.close() devuelve la conexión por aquí
+            if cnx is not None and self._cupos is not None:
+                self._devuelta(cnx)
+                self._cupos.release()
+
+    def _devuelta(self, cnx):
+        with self._lock_stats:
+            prestamo = self._prestadas.pop(id(cnx), None)
+            if prestamo is None:
+                return
+            retencion = time.perf_counter() - prestamo.desde
+            endpoint = self._por_endpoint.setdefault(prestamo.etiqueta, {
+                'prestamos': 0, 'retencion_total': 0.0, 'retencion_max': 0.0, 'fugas': 0
+            })
+            endpoint['prestamos'] += 1
+            endpoint['retencion_total'] += retencion
+            endpoint['retencion_max'] = max(endpoint['retencion_max'], retencion)
+
+    def _registrar_espera(self, espera):
+        self._espera_total += espera
+        self._espera_max = max(self._espera_max, espera)
+        for posicion, limite in enumerate(BUCKETS_ESPERA):
+            if espera <= limite:
+                self._histograma_espera[posicion] += 1
+                return
+        self._histograma_espera[-1] += 1
+
+    def recuperar_fugas(self, propietario):
+        """
+        Devolver al pool las conexiones que el request 'propietario' no cerró
+
+        Llamar al terminar el request (teardown). Returns: cantidad de fugas
+        """
+        if propietario is None:
+            return 0
+        with self._lock_stats:
+            fugas = [prestamo for prestamo in self._prestadas.values() if prestamo.propietario is propietario]
+            for prestamo in fugas:
+                self.stats['fugas'] += 1
+                self._por_endpoint.setdefault(prestamo.etiqueta, {
+                    'prestamos': 0, 'retencion_total': 0.0, 'retencion_max': 0.0, 'fugas': 0
+                })['fugas'] += 1
+
+        for prestamo in fugas:
+            print(f"[WARN] Conexión no cerrada por {prestamo.etiqueta} "
+                  f"({time.perf_counter() - prestamo.desde:.2f}s prestada)")
+            if not self.recuperar:
+                continue
+            try:
+                prestamo.conexion.close()
+                with self._lock_stats:
+                    self.stats['fugas_recuperadas'] += 1
+            except Exception as e:
+                # close() devuelve la conexión aunque falle el reset de sesión
+                print(f"[WARN] Error devolviendo conexión no cerrada de {prestamo.etiqueta}: {e}")
+        return len(fugas)
+
+    def desvincular(self, conexion):
+        """
+        Sacar una conexión prestada del seguimiento de fugas del request
+
+        Para respuestas en streaming: el generador la cierra cuando termina de
+        leer, después del teardown. Sigue contando como prestada (y sospechosa
+        si se retiene demasiado).
+        """
+        cnx = getattr(conexion, '_cnx', None)
+        with self._lock_stats:
+            prestamo = self._prestadas.get(id(cnx))
+            if prestamo is not None:
+                prestamo.propietario = None
+
+    def _reiniciar_tras_fork(self):
+        """Reemplazar las conexiones heredadas del master por conexiones propias del worker"""
+        with pooling.CONNECTION_POOL_LOCK:
+            if os.getpid() == self._pid:
+                return
+            # No se cierran: cerrar enviaría QUIT por un socket que comparten otros procesos
+            while not self._cnx_queue.empty():
+                self._heredadas.append(self._cnx_queue.get(block=False))
+            self._cupos = threading.Semaphore(self.pool_size)
+            self._prestadas = {}
+            self._lock_stats = threading.Lock()
+            self._reiniciar_stats()
+            self.stats['reinicios_tras_fork'] = 1
+            self._pid = os.getpid()
+            for _ in range(self.pool_size):
+                super().add_connection()
+        print(f"[OK] Pool de conexiones propio del worker {self._pid} ({self.pool_size} conexiones)")
+
+    # --- Estadísticas ---
+
+    def estadisticas(self):
+        ahora = time.perf_counter()
+        with self._lock_stats:
+            prestadas = sorted(
+                ({'endpoint': prestamo.etiqueta, 'segundos': round(ahora - prestamo.desde, 3)}
+                 for prestamo in self._prestadas.values()),
+                key=lambda prestada: -prestada['segundos']
+            )
+            por_endpoint = {
+                etiqueta: {
+                    'prestamos': datos['prestamos'],
+                    'retencion_promedio_ms': round(datos['retencion_total'] / datos['prestamos'] * 1000, 2)
+                    if datos['prestamos'] else 0,
+                    'retencion_max_ms': round(datos['retencion_max'] * 1000, 2),
+                    'fugas': datos['fugas']
+                }
+                for etiqueta, datos in self._por_endpoint.items()
+            }
+            return {
+                'pid': self._pid,
+                'tamano': self.pool_size,
+                'espera_maxima_configurada': self.espera,
+                'prestadas': len(prestadas),
+                'libres': self._cnx_queue.qsize(),
+                'sospechosas': [prestada for prestada in prestadas
+                                if prestada['segundos'] > RETENCION_SOSPECHOSA_SEGUNDOS],
+                **self.stats,
+                'espera_promedio_ms': round(self._espera_total / self.stats['prestamos'] * 1000, 3)
+                if self.stats['prestamos'] else 0,
+                'espera_max_ms': round(self._espera_max * 1000, 3),
+                'histograma_espera': {
+                    **{f"<={limite}s": cantidad for limite, cantidad in zip(BUCKETS_ESPERA, self._histograma_espera)},
+                    f">{BUCKETS_ESPERA[-1]}s": self._histograma_espera[-1]
+                },
+                'ultimo_agotamiento': self._ultimo_agotamiento,
+                'por_endpoint': por_endpoint
+            }
+
+
+def tamano_pool():
+    """
+    Conexiones por proceso según DB_POOL_SIZE
+
+    Con 'auto' se reparte DB_CONEXIONES_MAX entre los workers de gunicorn sin
+    pasar de la concurrencia del worker (hilos en gthread) ni del máximo del
+    conector.
+    """
+    configurado = os.getenv('DB_POOL_SIZE', '10')
+    if configurado.strip().lower() != 'auto':
+        return max(1, min(int(configurado), pooling.CNX_POOL_MAXSIZE))
+
+    workers = max(1, int(os.getenv('GUNICORN_WORKERS', 1)))
+    presupuesto = int(os.getenv('DB_CONEXIONES_MAX', 60)) // workers
+    concurrencia = pooling.CNX_POOL_MAXSIZE
+    if os.getenv('GUNICORN_WORKER_CLASS', 'gthread') == 'gthread':
+        concurrencia = int(os.getenv('GUNICORN_THREADS', 32))
+    return max(2, min(presupuesto, concurrencia, pooling.CNX_POOL_MAXSIZE))
+
+
+def crear_pool(db_config, nombre="expokossodo_pool", contexto=None, observador=None):
+    """Crear el pool del proceso con el tamaño configurado"""
+    return PoolCooperativo(
+        contexto=contexto,
+        observador=observador,
+        pool_name=nombre,
+        pool_size=tamano_pool(),
+        pool_reset_session=True,
+        **db_config
+    )
@@ -0,0 +1,115 @@
+"""
+Reserva atómica de cupos para /api/registro
+ExpoKossodo 2025
+
+Antes, la capacidad se validaba leyendo slots_ocupados y varios pasos después
+se hacía un SELECT, un INSERT y un UPDATE por evento, sin bloqueo entre la
+lectura y el incremento: dos inscripciones simultáneas podían tomar el mismo
+último cupo. Aquí la reserva se hace dentro de una transacción con un número
+fijo de sentencias, sin importar cuántos eventos se pidan:
+
+1. SELECT ... FOR UPDATE de los eventos pedidos (en orden de id, para que dos
+   transacciones nunca se bloqueen en orden cruzado). Lee el estado confirmado
+   más reciente y decide el resultado de cada evento.
+2. Un solo UPDATE condicional (slots_ocupados < slots_disponibles) para todos
+   los eventos con cupo, que también suma al contador total_registrados.
+3. Un INSERT IGNORE multi-fila de las relaciones registro-evento, y el
+   UPDATE de total_eventos del registro (ver inscripciones.py).
+
+La conexión del pool trabaja con autocommit, así que quien llama debe abrir la
+transacción (connection.start_transaction()) antes de reservar_cupos y hacer
+commit después de vincular_eventos.
+"""
+
+from inscripciones import sumar_total_eventos
+
+RESERVADO = 'reservado'
+LLENO = 'lleno'
+YA_INSCRITO = 'ya_inscrito'
+NO_EXISTE = 'no_existe'
+
+
+class CupoNoDisponibleError(Exception):
+    """El UPDATE condicional no incrementó todos los eventos bloqueados (no debería ocurrir)"""
+
+
+def reservar_cupos(cursor, evento_ids, registro_id=None):
+    """
+    Bloquear los eventos pedidos y ocupar un cupo en cada uno que tenga espacio
+
+    Args:
+        cursor: Cursor (dictionary=True) de una conexión con transacción abierta
+        evento_ids (list): IDs de eventos a reservar
+        registro_id (int): Registro existente (None para usuarios nuevos)
+
+    Returns:
+        dict: {evento_id: datos del evento con 'estado' (RESERVADO, LLENO, YA_INSCRITO o NO_EXISTE)}
+    """
+    ids = sorted(set(evento_ids))
+    if not ids:
+        return {}
+
+    placeholders = ','.join(['%s'] * len(ids))
+    cursor.execute(f"""
+        SELECT e.id, e.titulo_charla, e.sala, e.fecha, e.hora,
+               e.slots_ocupados, e.slots_disponibles,
+               re.id IS NOT NULL AS inscrito
+        FROM expokossodo_eventos e
+        LEFT JOIN expokossodo_registro_eventos re
+            ON re.evento_id = e.id AND re.registro_id = %s
+        WHERE e.id IN ({placeholders})
+        ORDER BY e.id
+        FOR UPDATE
+    """, [registro_id] + ids)
+
+    resultado = {evento_id: {'id': evento_id, 'estado': NO_EXISTE} for evento_id in ids}
+    for evento in cursor.fetchall():
+        if evento.pop('inscrito'):
+            evento['estado'] = YA_INSCRITO
+        elif evento['slots_ocupados'] >= evento['slots_disponibles']:
+            evento['estado'] = LLENO
+        else:
+            evento['estado'] = RESERVADO
+        resultado[evento['id']] = evento
+
+    con_cupo = [evento_id for evento_id in ids if resultado[evento_id]['estado'] == RESERVADO]
+    if con_cupo:
+        placeholders = ','.join(['%s'] * len(con_cupo))
+        cursor.execute(f"""
+            UPDATE expokossodo_eventos
+            SET slots_ocupados = slots_ocupados + 1,
+                total_registrados = total_registrados + 1
+            WHERE id IN ({placeholders}) AND slots_ocupados < slots_disponibles
+        """, con_cupo)
+
+        # Las filas están bloqueadas desde el SELECT, así que el conteo debe coincidir
+        if cursor.rowcount != len(con_cupo):
+            raise CupoNoDisponibleError(
+                f"Se esperaban {len(con_cupo)} cupos reservados y se actualizaron {cursor.rowcount}"
+            )
+
+    return resultado
+
+
+def vincular_eventos(cursor, registro_id, evento_ids):
+    """
+    Insertar las relaciones registro-evento en una sola sentencia y sumarlas a total_eventos
+
+    Returns:
+        int: Relaciones nuevas insertadas (las existentes se ignoran)
+    """
+    if not evento_ids:
+        return 0
+
+    valores = ','.join(['(%s, %s)'] * len(evento_ids))
+    parametros = []
+    for evento_id in evento_ids:
+        parametros.extend((registro_id, evento_id))
+
+    cursor.execute(f"""
+        INSERT IGNORE INTO expokossodo_registro_eventos (registro_id, evento_id)
+        VALUES {valores}
+    """, parametros)
+    insertadas = cursor.rowcount
+    sumar_total_eventos(cursor, registro_id, insertadas)
+    return insertadas
@@ -0,0 +1,67 @@
+"""
+Registro de blueprints por subsistema
+ExpoKossodo 2025
+
+Cada módulo de este paquete define un blueprint `bp` e importa solo sus
+propias dependencias pesadas; un módulo que no se habilita nunca se importa.
+Así un nodo de escaneo en la puerta no carga OpenAI, OpenCV ni las plantillas
+de email.
+
+SUBSISTEMAS (variable de entorno) es una lista separada por comas de
+subsistemas o perfiles: "todos" (por defecto), "escaner", "admin,leads", etc.
+Health checks, /metrics y los endpoints de estado viven en app.py y están
+siempre disponibles.
+"""
+
+import importlib
+import os
+
+SUBSISTEMAS = {
+    'publico': 'Eventos, registro de asistentes y emails de confirmación',
+    'admin': 'Panel de administración',
+    'verificacion': 'Verificación de QR en la entrada general',
+    'sala': 'Verificación de ingreso por sala',
+    'impresion': 'Impresión térmica de etiquetas QR',
+    'fotos': 'Captura de foto del asistente (OpenCV) y subida FTP',
+    'leads': 'Sistema de leads de asesores',
+    'transcripcion': 'Integración con el servicio de transcripción',
+    'chat': 'Chat con el asistente de OpenAI',
+}
+
+PERFILES = {
+    'todos': tuple(SUBSISTEMAS),
+    # Kiosco de escaneo: entrada general, salas e impresión de etiquetas
+    'escaner': ('verificacion', 'sala', 'impresion'),
+}
+
+
+def subsistemas_habilitados(valor=None):
+    """Subsistemas a registrar según SUBSISTEMAS, en el orden de SUBSISTEMAS"""
+    valor = valor if valor is not None else os.getenv('SUBSISTEMAS', 'todos')
+    pedidos = set()
+    for nombre in (parte.strip().lower() for parte in valor.split(',')):
+        if not nombre:
+            continue
+        if nombre in PERFILES:
+            pedidos.update(PERFILES[nombre])
+        elif nombre in SUBSISTEMAS:
+            pedidos.add(nombre)
+        else:
+            print(f"[WARN] Subsistema desconocido en SUBSISTEMAS: {nombre}")
+    return [nombre for nombre in SUBSISTEMAS if nombre in pedidos]
+
+
+def registrar_blueprints(app, valor=None):
+    """
+    Importar y registrar los blueprints habilitados
+
+    Returns:
+        list: Subsistemas registrados
+    """
+    registrados = []
+    for nombre in subsistemas_habilitados(valor):
+        modulo = importlib.import_module(f"rutas.{nombre}")
+        app.register_blueprint(modulo.bp)
+        registrados.append(nombre)
+    print(f"[OK] Subsistemas habilitados: {', '.join(registrados) or 'ninguno'}")
+    return registrados
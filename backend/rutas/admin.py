@@ -0,0 +1,690 @@
+"""
+Rutas del panel de administración
+ExpoKossodo 2025
+
+Listado y exportación de registros, estadísticas, edición de eventos,
+horarios, información por fecha, marcas y reconciliación de contadores.
+"""
+
+from flask import request, jsonify, Blueprint, current_app, stream_with_context
+from mysql.connector import Error
+from datetime import datetime
+import io
+import csv
+import json
+from versiones_cache import VERSION_CONTENIDO_EVENTOS, VERSION_FECHA_INFO, incrementar_version
+import contadores_eventos
+from nucleo import get_db_connection, desvincular_conexion, snapshot_eventos
+
+bp = Blueprint('admin', __name__)
+
+# Registros con su agenda en texto; {origen} es la tabla completa o la página (keyset) ya recortada
+# eventos_seleccionados se arma desde la tabla de relación: la columna JSON ya no se mantiene (ver inscripciones.py)
+SQL_REGISTROS_CON_EVENTOS = """
+    SELECT r.id, r.nombres, r.correo, r.empresa, r.cargo, r.numero, r.expectativas,
+           CONCAT('[', GROUP_CONCAT(re.evento_id ORDER BY re.evento_id SEPARATOR ', '), ']') as eventos_seleccionados,
+           r.fecha_registro, r.confirmado, r.qr_code, r.qr_generado_at,
+           r.asistencia_general_confirmada, r.fecha_asistencia_general, r.actualizado_en, r.total_eventos,
+           GROUP_CONCAT(
+               CONCAT(e.fecha, ' - ', e.hora, ' - ', e.sala, ' - ', e.titulo_charla)
+               SEPARATOR '; '
+           ) as eventos
+    FROM {origen} r
+    LEFT JOIN expokossodo_registro_eventos re ON r.id = re.registro_id
+    LEFT JOIN expokossodo_eventos e ON re.evento_id = e.id
+    GROUP BY r.id
+    ORDER BY {orden}
+"""
+
+REGISTROS_LOTE_STREAM = 500
+REGISTROS_LIMITE_MAXIMO = 1000
+
+def _stream_registros(connection, cursor, formato, json_app):
+    """Generador que emite los registros fila a fila desde un cursor sin buffer"""
+    completo = False
+    try:
+        if formato == 'csv':
+            columnas = list(cursor.column_names)
+            salida = io.StringIO()
+            writer = csv.writer(salida)
+            writer.writerow(columnas)
+            yield salida.getvalue()
+        elif formato == 'json':
+            yield '['
+        
+        primero = True
+        while True:
+            filas = cursor.fetchmany(REGISTROS_LOTE_STREAM)
+            if not filas:
+                break
+            
+            if formato == 'csv':
+                salida.seek(0)
+                salida.truncate(0)
+                writer.writerows([['' if fila[c] is None else fila[c] for c in columnas] for fila in filas])
+                yield salida.getvalue()
+            elif formato == 'ndjson':
+                yield ''.join(json_app.dumps(fila) + '\n' for fila in filas)
+            else:
+                trozo = ','.join(json_app.dumps(fila) for fila in filas)
+                yield trozo if primero else ',' + trozo
+                primero = False
+        
+        if formato == 'json':
+            yield ']'
+        completo = True
+    except Error as e:
+        # La respuesta ya empezó: solo queda registrar el corte
+        print(f"[ERROR] Stream de /api/registros interrumpido: {e}")
+    finally:
+        try:
+            if not completo:
+                # Cliente desconectado a mitad: descartar filas pendientes antes de devolver la conexión al pool
+                while cursor.fetchmany(REGISTROS_LOTE_STREAM):
+                    pass
+            cursor.close()
+        except Error:
+            pass
+        connection.close()
+
+@bp.route('/api/registros', methods=['GET'])
+def get_registros():
+    """
+    Obtener registros (para reportes)
+    
+    Query params:
+        formato: json (array completo, por defecto) | ndjson | csv - se envían en streaming
+        limite, cursor: paginación por id descendente; devuelve {registros, siguiente_cursor}
+    """
+    formato = request.args.get('formato', 'json')
+    if formato not in ('json', 'ndjson', 'csv'):
+        return jsonify({"error": "Formato no soportado. Usa json, ndjson o csv"}), 400
+    
+    try:
+        limite = request.args.get('limite', type=int)
+        cursor_id = request.args.get('cursor', type=int)
+    except ValueError:
+        return jsonify({"error": "limite y cursor deben ser enteros"}), 400
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    # === Paginado (keyset sobre id) ===
+    if limite is not None:
+        limite = max(1, min(limite, REGISTROS_LIMITE_MAXIMO))
+        cursor = connection.cursor(dictionary=True)
+        try:
+            # La subconsulta limita primero la página y luego agrupa solo esas filas
+            origen = "(SELECT * FROM expokossodo_registros {where} ORDER BY id DESC LIMIT %s)".format(
+                where="WHERE id < %s" if cursor_id else ""
+            )
+            parametros = (cursor_id, limite) if cursor_id else (limite,)
+            cursor.execute(SQL_REGISTROS_CON_EVENTOS.format(origen=origen, orden="r.id DESC"), parametros)
+            registros = cursor.fetchall()
+            
+            return jsonify({
+                "registros": registros,
+                "siguiente_cursor": registros[-1]['id'] if len(registros) == limite else None
+            })
+        except Error as e:
+            return jsonify({"error": str(e)}), 500
+        finally:
+            cursor.close()
+            connection.close()
+    
+    # === Streaming: cursor sin buffer, la memoria no crece con la cantidad de registros ===
+    cursor = connection.cursor(dictionary=True, buffered=False)
+    try:
+        cursor.execute(SQL_REGISTROS_CON_EVENTOS.format(
+            origen="expokossodo_registros", orden="r.fecha_registro DESC"
+        ))
+    except Error as e:
+        cursor.close()
+        connection.close()
+        return jsonify({"error": str(e)}), 500
+    
+    # El body se consume después del teardown: el generador cierra la conexión al terminar de leer
+    desvincular_conexion(connection)
+    mimetypes = {'json': 'application/json', 'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+    response = current_app.response_class(
+        stream_with_context(_stream_registros(connection, cursor, formato, current_app.json)),
+        mimetype=mimetypes[formato]
+    )
+    if formato == 'csv':
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename="registros_expokossodo_{datetime.now().strftime("%Y-%m-%d")}.csv"'
+        )
+    return response
+
+@bp.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Obtener estadísticas del evento"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # Estadísticas generales
+        cursor.execute("SELECT COUNT(*) as total_registros FROM expokossodo_registros")
+        total_registros = cursor.fetchone()['total_registros']
+        
+        cursor.execute("SELECT SUM(slots_ocupados) as total_slots_ocupados FROM expokossodo_eventos")
+        total_slots_ocupados = cursor.fetchone()['total_slots_ocupados'] or 0
+        
+        cursor.execute("SELECT COUNT(*) as total_eventos FROM expokossodo_eventos")
+        total_eventos = cursor.fetchone()['total_eventos']
+        
+        # Eventos más populares
+        cursor.execute("""
+            SELECT titulo_charla, expositor, slots_ocupados, slots_disponibles
+            FROM expokossodo_eventos
+            ORDER BY slots_ocupados DESC
+            LIMIT 10
+        """)
+        eventos_populares = cursor.fetchall()
+        
+        return jsonify({
+            "total_registros": total_registros,
+            "total_slots_ocupados": total_slots_ocupados,
+            "total_eventos": total_eventos,
+            "eventos_populares": eventos_populares
+        })
+        
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+# ENDPOINTS DE ADMINISTRACIÓN
+@bp.route('/api/admin/eventos', methods=['GET'])
+def get_admin_eventos():
+    """Obtener todos los eventos para administración"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        cursor.execute("""
+            SELECT 
+                e.id, e.fecha, e.hora, e.sala, e.titulo_charla, e.expositor, e.pais, 
+                e.descripcion, e.imagen_url, e.post, e.slots_disponibles, e.slots_ocupados,
+                e.disponible, e.created_at, e.marca_id, e.rubro, e.slug,
+                m.marca as marca_nombre, m.logo as marca_logo
+            FROM expokossodo_eventos e
+            LEFT JOIN expokossodo_marcas m ON e.marca_id = m.id
+            ORDER BY e.fecha, e.hora, e.sala
+        """)
+        
+        eventos = cursor.fetchall()
+        
+        # Organizar por fecha para la interfaz y parsear rubro
+        eventos_por_fecha = {}
+        for evento in eventos:
+            fecha_str = evento['fecha'].strftime('%Y-%m-%d')
+            if fecha_str not in eventos_por_fecha:
+                eventos_por_fecha[fecha_str] = []
+            
+            # Parsear rubro de JSON string a array
+            if evento['rubro']:
+                try:
+                    evento['rubro'] = json.loads(evento['rubro'])
+                except (json.JSONDecodeError, TypeError):
+                    evento['rubro'] = []
+            else:
+                evento['rubro'] = []
+            
+            eventos_por_fecha[fecha_str].append(evento)
+        
+        return jsonify(eventos_por_fecha)
+        
+    except Error as e:
+        print(f"Error obteniendo eventos admin: {e}")
+        return jsonify({'error': 'Error obteniendo eventos'}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/evento/<int:evento_id>', methods=['PUT'])
+def update_evento(evento_id):
+    """Actualizar información de un evento específico"""
+    data = request.get_json()
+    
+    # Validaciones básicas
+    required_fields = ['titulo_charla', 'expositor', 'pais']
+    for field in required_fields:
+        if not data.get(field):
+            return jsonify({'error': f'Campo requerido: {field}'}), 400
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor()
+    
+    try:
+        # Verificar que el evento existe
+        cursor.execute("SELECT id FROM expokossodo_eventos WHERE id = %s", (evento_id,))
+        if not cursor.fetchone():
+            return jsonify({'error': 'Evento no encontrado'}), 404
+        
+        # Actualizar evento - AHORA INCLUYE RUBRO, DISPONIBLE, MARCA_ID Y POST
+        update_query = """
+            UPDATE expokossodo_eventos 
+            SET titulo_charla = %s, expositor = %s, pais = %s, 
+                descripcion = %s, imagen_url = %s, post = %s, disponible = %s, marca_id = %s, rubro = %s
+            WHERE id = %s
+        """
+        
+        # Procesar rubro como JSON
+        rubro_data = data.get('rubro', [])
+        if isinstance(rubro_data, list):
+            rubro_json = json.dumps(rubro_data)
+        else:
+            rubro_json = None
+        
+        cursor.execute(update_query, (
+            data['titulo_charla'],
+            data['expositor'],
+            data['pais'],
+            data.get('descripcion', ''),
+            data.get('imagen_url', None),
+            data.get('post', None),
+            data.get('disponible', True),
+            data.get('marca_id', None),
+            rubro_json,
+            evento_id
+        ))
+        
+        connection.commit()
+        snapshot_eventos.invalidar()
+        incrementar_version(VERSION_CONTENIDO_EVENTOS)
+        
+        # Log del cambio
+        estado_disponible = "disponible" if data.get('disponible', True) else "no disponible"
+        print(f"[OK] Evento {evento_id} actualizado por admin: {data['titulo_charla']} - {estado_disponible}")
+        
+        return jsonify({'message': 'Evento actualizado exitosamente'})
+        
+    except Error as e:
+        print(f"Error actualizando evento {evento_id}: {e}")
+        connection.rollback()
+        return jsonify({'error': 'Error actualizando evento'}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/evento/<int:evento_id>/toggle-disponibilidad', methods=['PUT'])
+def toggle_evento_disponibilidad(evento_id):
+    """Toggle de disponibilidad de un evento específico"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # Verificar que el evento existe y obtener estado actual
+        cursor.execute("SELECT id, titulo_charla, disponible FROM expokossodo_eventos WHERE id = %s", (evento_id,))
+        evento = cursor.fetchone()
+        
+        if not evento:
+            return jsonify({'error': 'Evento no encontrado'}), 404
+        
+        # Toggle del estado
+        nuevo_estado = not evento['disponible']
+        
+        cursor.execute("""
+            UPDATE expokossodo_eventos 
+            SET disponible = %s 
+            WHERE id = %s
+        """, (nuevo_estado, evento_id))
+        
+        connection.commit()
+        snapshot_eventos.invalidar()
+        incrementar_version(VERSION_CONTENIDO_EVENTOS)
+        
+        # Log del cambio
+        estado_texto = "activado" if nuevo_estado else "desactivado"
+        print(f"[OK] Evento {evento_id} ({evento['titulo_charla']}) {estado_texto} por admin")
+        
+        return jsonify({
+            'message': f'Evento {estado_texto} exitosamente',
+            'evento_id': evento_id,
+            'disponible': nuevo_estado,
+            'titulo_charla': evento['titulo_charla']
+        })
+        
+    except Error as e:
+        print(f"Error toggling disponibilidad evento {evento_id}: {e}")
+        connection.rollback()
+        return jsonify({'error': 'Error cambiando disponibilidad del evento'}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/evento/<int:evento_id>', methods=['GET'])
+def get_evento_detalle(evento_id):
+    """Obtener detalles completos de un evento específico"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        cursor.execute("""
+            SELECT 
+                id, fecha, hora, sala, titulo_charla, expositor, pais, 
+                descripcion, imagen_url, slots_disponibles, slots_ocupados,
+                disponible, created_at
+            FROM expokossodo_eventos 
+            WHERE id = %s
+        """, (evento_id,))
+        
+        evento = cursor.fetchone()
+        
+        if not evento:
+            return jsonify({'error': 'Evento no encontrado'}), 404
+        
+        return jsonify(evento)
+        
+    except Error as e:
+        print(f"Error obteniendo evento {evento_id}: {e}")
+        return jsonify({'error': 'Error obteniendo evento'}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/contadores/reconciliar', methods=['POST'])
+def reconciliar_contadores_eventos():
+    """Comparar contadores de inscritos/presentes con los conteos reales y corregir la deriva"""
+    solo_revisar = request.args.get('solo_revisar', 'false').lower() == 'true'
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    try:
+        diferencias = contadores_eventos.reconciliar(connection, corregir=not solo_revisar)
+        if diferencias:
+            print(f"[WARN] Contadores de eventos con deriva: {diferencias}")
+        return jsonify({
+            "success": True,
+            "corregido": bool(diferencias) and not solo_revisar,
+            "total_diferencias": len(diferencias),
+            "diferencias": diferencias
+        })
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        connection.close()
+
+# ===== NUEVOS ENDPOINTS PARA GESTIÓN DE HORARIOS =====
+
+@bp.route('/api/admin/horarios', methods=['GET'])
+def get_horarios():
+    """Obtener todos los horarios con su estado"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        cursor.execute("""
+            SELECT h.*, 
+                   COUNT(e.id) as total_eventos,
+                   COUNT(CASE WHEN e.slots_ocupados > 0 THEN 1 END) as eventos_con_registros
+            FROM expokossodo_horarios h
+            LEFT JOIN expokossodo_eventos e ON h.horario = e.hora
+            GROUP BY h.id, h.horario, h.activo
+            ORDER BY h.horario
+        """)
+        horarios = cursor.fetchall()
+        
+        return jsonify(horarios)
+        
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/horario/<string:horario>/toggle', methods=['PUT'])
+def toggle_horario(horario):
+    """Activar/Desactivar un horario específico"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor()
+    
+    try:
+        # Verificar si el horario existe
+        cursor.execute("SELECT activo FROM expokossodo_horarios WHERE horario = %s", (horario,))
+        result = cursor.fetchone()
+        
+        if not result:
+            return jsonify({"error": "Horario no encontrado"}), 404
+        
+        # Cambiar el estado
+        nuevo_estado = not result[0]
+        cursor.execute("""
+            UPDATE expokossodo_horarios 
+            SET activo = %s, updated_at = CURRENT_TIMESTAMP 
+            WHERE horario = %s
+        """, (nuevo_estado, horario))
+        
+        connection.commit()
+        snapshot_eventos.invalidar()
+        incrementar_version(VERSION_CONTENIDO_EVENTOS)
+        
+        estado_texto = "activado" if nuevo_estado else "desactivado"
+        
+        return jsonify({
+            "success": True,
+            "message": f"Horario {horario} {estado_texto} exitosamente",
+            "horario": horario,
+            "activo": nuevo_estado
+        })
+        
+    except Error as e:
+        connection.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+# ===== GESTIÓN DE INFORMACIÓN POR FECHA =====
+
+@bp.route('/api/admin/fechas-info', methods=['GET'])
+def get_fechas_info():
+    """Obtener información de todas las fechas (para admin)"""
+    try:
+        connection = get_db_connection()
+        if not connection:
+            return jsonify({"error": "Error de conexión a la base de datos"}), 500
+        
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT 
+                id, fecha, rubro, titulo_dia, descripcion, 
+                ponentes_destacados, marcas_patrocinadoras, paises_participantes,
+                imagen_url, activo, created_at, updated_at
+            FROM expokossodo_fecha_info 
+            ORDER BY fecha ASC
+        """)
+        
+        fechas_info = []
+        for row in cursor.fetchall():
+            import json
+            fecha_info = {
+                "id": row[0],
+                "fecha": row[1].strftime('%Y-%m-%d'),
+                "rubro": row[2],
+                "titulo_dia": row[3],
+                "descripcion": row[4],
+                "ponentes_destacados": json.loads(row[5]) if row[5] else [],
+                "marcas_patrocinadoras": json.loads(row[6]) if row[6] else [],
+                "paises_participantes": json.loads(row[7]) if row[7] else [],
+                "imagen_url": row[8],
+                "activo": bool(row[9]),
+                "created_at": row[10].isoformat() if row[10] else None,
+                "updated_at": row[11].isoformat() if row[11] else None
+            }
+            fechas_info.append(fecha_info)
+        
+        return jsonify({"fechas_info": fechas_info})
+        
+    except Error as e:
+        print(f"Error obteniendo fechas info: {e}")
+        return jsonify({"error": "Error del servidor"}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'connection' in locals() and connection:
+            connection.close()
+
+@bp.route('/api/admin/fecha-info/<int:fecha_id>', methods=['PUT'])
+def update_fecha_info(fecha_id):
+    """Actualizar información de una fecha específica"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "No se proporcionaron datos"}), 400
+        
+        connection = get_db_connection()
+        if not connection:
+            return jsonify({"error": "Error de conexión a la base de datos"}), 500
+        
+        cursor = connection.cursor()
+        
+        # Construir query dinámicamente según campos proporcionados
+        fields_to_update = []
+        values = []
+        
+        allowed_fields = [
+            'rubro', 'titulo_dia', 'descripcion', 'imagen_url', 'activo',
+            'ponentes_destacados', 'marcas_patrocinadoras', 'paises_participantes'
+        ]
+        
+        for field in allowed_fields:
+            if field in data:
+                fields_to_update.append(f"{field} = %s")
+                if field in ['ponentes_destacados', 'marcas_patrocinadoras', 'paises_participantes']:
+                    import json
+                    values.append(json.dumps(data[field]))
+                else:
+                    values.append(data[field])
+        
+        if not fields_to_update:
+            return jsonify({"error": "No hay campos válidos para actualizar"}), 400
+        
+        # Agregar ID al final
+        values.append(fecha_id)
+        
+        query = f"""
+            UPDATE expokossodo_fecha_info 
+            SET {', '.join(fields_to_update)}, updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """
+        
+        cursor.execute(query, values)
+        
+        if cursor.rowcount == 0:
+            return jsonify({"error": "Fecha no encontrada"}), 404
+        
+        connection.commit()
+        incrementar_version(VERSION_FECHA_INFO)
+        
+        return jsonify({
+            "success": True,
+            "message": "Información de fecha actualizada exitosamente"
+        })
+        
+    except Error as e:
+        print(f"Error actualizando fecha info: {e}")
+        return jsonify({"error": "Error del servidor"}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'connection' in locals() and connection:
+            connection.close()
+
+@bp.route('/api/admin/fecha-info/<int:fecha_id>/toggle', methods=['PUT'])
+def toggle_fecha_info(fecha_id):
+    """Activar/desactivar información de una fecha"""
+    try:
+        connection = get_db_connection()
+        if not connection:
+            return jsonify({"error": "Error de conexión a la base de datos"}), 500
+        
+        cursor = connection.cursor()
+        
+        # Obtener estado actual
+        cursor.execute("SELECT activo FROM expokossodo_fecha_info WHERE id = %s", (fecha_id,))
+        result = cursor.fetchone()
+        
+        if not result:
+            return jsonify({"error": "Fecha no encontrada"}), 404
+        
+        nuevo_estado = not bool(result[0])
+        
+        cursor.execute("""
+            UPDATE expokossodo_fecha_info 
+            SET activo = %s, updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (nuevo_estado, fecha_id))
+        
+        connection.commit()
+        incrementar_version(VERSION_FECHA_INFO)
+        
+        return jsonify({
+            "success": True,
+            "nuevo_estado": nuevo_estado,
+            "message": f"Fecha {'activada' if nuevo_estado else 'desactivada'} exitosamente"
+        })
+        
+    except Error as e:
+        print(f"Error toggle fecha info: {e}")
+        return jsonify({"error": "Error del servidor"}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'connection' in locals() and connection:
+            connection.close()
+
+# ===== ENDPOINT PARA MARCAS =====
+
+@bp.route('/api/admin/marcas', methods=['GET'])
+def get_marcas():
+    """Obtener todas las marcas disponibles"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        cursor.execute("""
+            SELECT id, marca, expositor, logo
+            FROM expokossodo_marcas
+            ORDER BY marca
+        """)
+        
+        marcas = cursor.fetchall()
+        
+        return jsonify({"marcas": marcas})
+        
+    except Error as e:
+        print(f"Error obteniendo marcas: {e}")
+        return jsonify({"error": "Error del servidor"}), 500
+    finally:
+        cursor.close()
+        connection.close()
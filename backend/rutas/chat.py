@@ -0,0 +1,232 @@
+"""
+Rutas del chat con el asistente de OpenAI
+ExpoKossodo 2025
+
+El paquete openai se importa al crear el cliente, en el primer mensaje.
+"""
+
+from flask import request, jsonify, Blueprint, current_app
+import os
+import time
+import arranque
+from sesiones_chat import SESION_DESCONOCIDA, SESION_VENCIDA, AlmacenChat
+from nucleo import evento_sse
+
+bp = Blueprint('chat', __name__)
+
+# Configuración de OpenAI
+# Asegúrate de tener estas variables en tu archivo .env
+openai_api_key = os.getenv('OPENAI_API_KEY')
+assistant_id = os.getenv('OPENAI_ASSISTANT_ID')
+vector_store_id = os.getenv('OPENAI_VECTOR_STORE_ID', 'vs_67d2546ee78881918ebeb8ff16697cc1')  # Valor por defecto
+
+def crear_cliente_openai():
+    """Cliente con header beta para v2 (el paquete openai se importa en el primer uso del chat)"""
+    from openai import OpenAI
+    return OpenAI(
+        api_key=openai_api_key,
+        default_headers={"OpenAI-Beta": "assistants=v2"},
+        timeout=float(os.getenv('OPENAI_TIMEOUT_SEGUNDOS', 30)),
+        max_retries=2
+    )
+
+client = arranque.ServicioPerezoso('Cliente OpenAI', crear_cliente_openai)
+
+# Tiempo máximo que /api/chat espera un Run antes de cancelarlo
+CHAT_TIMEOUT_SEGUNDOS = float(os.getenv('CHAT_TIMEOUT_SEGUNDOS', 60))
+CHAT_INTERVALO_SONDEO = 0.5
+
+# Hilos de conversación y respuestas frecuentes (SQLite local compartido por los workers)
+almacen_chat = AlmacenChat()
+
+def texto_respuesta_asistente(mensajes):
+    """Texto del primer mensaje del asistente en la lista (el contenido puede venir en partes)"""
+    for msg in mensajes:
+        if msg.role == 'assistant':
+            for content_part in msg.content:
+                if content_part.type == 'text':
+                    return content_part.text.value
+    return ""
+
+def resolver_hilo_chat(user_message, thread_id):
+    """
+    Reutilizar el hilo del cliente salvo que el almacén lo tenga vencido por
+    TTL; en una conversación nueva, responder desde el caché si la pregunta ya
+    se respondió hace poco
+    
+    Returns:
+        tuple: (thread_id, respuesta cacheada o None, conversación nueva)
+    """
+    if thread_id:
+        estado = almacen_chat.estado_sesion(thread_id)
+        if estado != SESION_VENCIDA:
+            if estado == SESION_DESCONOCIDA:
+                # Otro host, almacén reiniciado o desalojo LRU: adoptar el hilo en vez de perder la conversación
+                almacen_chat.registrar_sesion(thread_id, mensajes=0)
+            return thread_id, None, False
+    
+    respuesta = almacen_chat.respuesta_cacheada(user_message)
+    if respuesta:
+        # El hilo guarda pregunta y respuesta para que el seguimiento tenga contexto
+        thread_obj = client.beta.threads.create(messages=[
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": respuesta}
+        ])
+        almacen_chat.registrar_sesion(thread_obj.id)
+        return thread_obj.id, respuesta, True
+    
+    thread_obj = client.beta.threads.create()
+    return thread_obj.id, None, True
+
+def guardar_turno_chat(thread_id, user_message, respuesta, conversacion_nueva):
+    """Registrar actividad del hilo y cachear la respuesta a preguntas de apertura"""
+    almacen_chat.registrar_sesion(thread_id)
+    if conversacion_nueva:
+        almacen_chat.guardar_respuesta(user_message, respuesta)
+
+@bp.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Chat con el asistente transmitiendo la respuesta token a token (Server-Sent Events)
+    
+    Eventos: 'thread' (thread_id), 'token' (texto parcial), 'fin' (respuesta completa) y 'error'.
+    """
+    data = request.json
+    user_message = data.get('message')
+    thread_id = data.get('thread_id')
+
+    if not user_message:
+        return jsonify({'error': 'No message provided'}), 400
+    
+    if not all([openai_api_key, assistant_id]):
+        return jsonify({'error': 'OpenAI API keys not configured on the server'}), 500
+
+    try:
+        thread_id, cacheada, conversacion_nueva = resolver_hilo_chat(user_message, thread_id)
+    except Exception as e:
+        print(f"Error creating OpenAI thread: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    def generar():
+        yield evento_sse('thread', {'thread_id': thread_id})
+        if cacheada:
+            yield evento_sse('token', {'text': cacheada})
+            yield evento_sse('fin', {'reply': cacheada, 'thread_id': thread_id, 'cacheado': True})
+            return
+        limite = time.time() + CHAT_TIMEOUT_SEGUNDOS
+        try:
+            # El mensaje del usuario se agrega al crear el Run; la respuesta llega por el mismo stream
+            with client.beta.threads.runs.stream(
+                thread_id=thread_id,
+                assistant_id=assistant_id,
+                additional_messages=[{"role": "user", "content": user_message}]
+            ) as stream:
+                for texto in stream.text_deltas:
+                    yield evento_sse('token', {'text': texto})
+                    if time.time() > limite:
+                        run = stream.current_run
+                        if run:
+                            client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run.id)
+                        yield evento_sse('error', {'error': 'El asistente tardó demasiado en responder'})
+                        return
+                
+                run = stream.get_final_run()
+                if run.status != 'completed':
+                    print(f"Run failed. Status: {run.status}")
+                    if run.last_error:
+                        print(f"Error details: {run.last_error}")
+                    yield evento_sse('error', {'error': f'Run failed with status: {run.status}'})
+                    return
+                
+                # El mensaje final viene en el propio stream: no hace falta listar el hilo
+                respuesta = texto_respuesta_asistente(stream.get_final_messages())
+            guardar_turno_chat(thread_id, user_message, respuesta, conversacion_nueva)
+            yield evento_sse('fin', {'reply': respuesta, 'thread_id': thread_id})
+        except Exception as e:
+            print(f"Error in OpenAI chat stream: {e}")
+            yield evento_sse('error', {'error': str(e)})
+
+    response = current_app.response_class(generar(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/api/chat', methods=['POST'])
+def chat():
+    data = request.json
+    user_message = data.get('message')
+    thread_id = data.get('thread_id')
+
+    if not user_message:
+        return jsonify({'error': 'No message provided'}), 400
+    
+    # Validar que las configuraciones de OpenAI estén presentes
+    if not all([openai_api_key, assistant_id]):
+        return jsonify({'error': 'OpenAI API keys not configured on the server'}), 500
+
+    try:
+        # Reutilizar el hilo vigente o crear uno nuevo (o responder desde el caché)
+        thread_id, cacheada, conversacion_nueva = resolver_hilo_chat(user_message, thread_id)
+        if cacheada:
+            return jsonify({
+                'reply': cacheada,
+                'thread_id': thread_id,
+                'cacheado': True
+            })
+        
+        # 1-2. Crear el Run agregando el mensaje del usuario en la misma llamada
+        # En v2, el vector store se especifica en el assistant, no en el run
+        run = client.beta.threads.runs.create(
+            thread_id=thread_id,
+            assistant_id=assistant_id,
+            additional_messages=[{"role": "user", "content": user_message}]
+        )
+
+        # 3. Esperar a que el Run se complete (en modo gevent time.sleep cede el worker)
+        limite = time.time() + CHAT_TIMEOUT_SEGUNDOS
+        while run.status in ['queued', 'in_progress', 'cancelling']:
+            if time.time() > limite:
+                try:
+                    client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run.id)
+                except Exception as e:
+                    print(f"[WARN] No se pudo cancelar el run {run.id}: {e}")
+                return jsonify({
+                    'error': 'El asistente tardó demasiado en responder',
+                    'thread_id': thread_id
+                }), 504
+            time.sleep(CHAT_INTERVALO_SONDEO)
+            run = client.beta.threads.runs.retrieve(
+                thread_id=thread_id,
+                run_id=run.id
+            )
+
+        if run.status == 'completed':
+            # 4. Recuperar solo la respuesta de este Run (no todo el historial del hilo)
+            messages = client.beta.threads.messages.list(
+                thread_id=thread_id,
+                run_id=run.id,
+                order="desc",
+                limit=1
+            )
+            assistant_response = texto_respuesta_asistente(messages.data)
+            guardar_turno_chat(thread_id, user_message, assistant_response, conversacion_nueva)
+            
+            return jsonify({
+                'reply': assistant_response, 
+                'thread_id': thread_id
+            })
+
+        else:
+            print(f"Run failed. Status: {run.status}")
+            if hasattr(run, 'last_error') and run.last_error:
+                print(f"Error details: {run.last_error}")
+            return jsonify({'error': f'Run failed with status: {run.status}'}), 500
+
+    except Exception as e:
+        print(f"Error in OpenAI chat endpoint: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/chat/estado', methods=['GET'])
+def estado_chat():
+    """Hilos guardados, respuestas cacheadas y aciertos del caché del chat"""
+    return jsonify(almacen_chat.estadisticas())
@@ -0,0 +1,240 @@
+"""
+Rutas de captura de foto del asistente y subida por FTP
+ExpoKossodo 2025
+
+OpenCV se importa con la primera captura (arranque.ServicioPerezoso): los
+nodos sin cámara no lo cargan aunque el subsistema esté habilitado.
+"""
+
+from flask import request, jsonify, Blueprint
+import os
+import io
+import re
+import threading
+import importlib
+import ftplib
+from concurrencia import ejecutar_bloqueante
+import metricas
+import arranque
+
+bp = Blueprint('fotos', __name__)
+
+# OpenCV se importa recién al capturar la primera foto (es opcional y pesado de importar)
+opencv = arranque.ServicioPerezoso('OpenCV', lambda: importlib.import_module('cv2'), reintento_segundos=float('inf'))
+
+# ===== FUNCIONES DE CAPTURA DE FOTO Y FTP =====
+
+def capturar_foto_rapida(camera_index=0):
+    """Captura una foto rápidamente de la cámara y retorna los bytes de la imagen"""
+    cv2 = opencv.obtener()
+    if cv2 is None:
+        print("[FOTO] OpenCV no está disponible - captura de foto deshabilitada")
+        return None
+        
+    try:
+        cap = cv2.VideoCapture(camera_index)
+        
+        if not cap.isOpened():
+            print(f"[FOTO] No se pudo abrir la cámara {camera_index}")
+            return None
+        
+        # OPTIMIZACIÓN: Configuraciones para velocidad máxima + menor resolución
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        cap.set(cv2.CAP_PROP_FPS, 30)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 480)   # Reducir de 640 a 480
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 360)  # Reducir de 480 a 360
+        cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, 0.25)  # Auto-exposición rápida
+        
+        # PRE-CALENTAMIENTO: Descartar primeros frames (cámara se estabiliza)
+        for _ in range(3):
+            cap.read()  # Descartar frames iniciales
+        
+        # Capturar frame final optimizado
+        ret, frame = cap.read()
+        cap.release()
+        
+        if ret:
+            # OPTIMIZACIÓN: Compresión agresiva para subida FTP más rápida
+            # Calidad 60 (vs 85) = ~40-50% menos tamaño, velocidad 2x más rápida
+            _, buffer = cv2.imencode('.jpg', frame, [
+                cv2.IMWRITE_JPEG_QUALITY, 60,  # Reducir calidad para menor tamaño
+                cv2.IMWRITE_JPEG_OPTIMIZE, 1   # Optimización adicional
+            ])
+            print(f"[FOTO-OPTIMIZADA] Imagen comprimida: {len(buffer.tobytes())/1024:.1f}KB")
+            return buffer.tobytes()
+        
+        print("[FOTO] No se pudo capturar frame de la cámara")
+        return None
+        
+    except Exception as e:
+        print(f"[FOTO] Error capturando foto: {str(e)}")
+        return None
+
+def sanitizar_nombre_archivo(nombre):
+    """Convierte el nombre a un formato válido para archivo"""
+    # Eliminar caracteres especiales y acentos
+    nombre = re.sub(r'[àáäâ]', 'a', nombre.lower())
+    nombre = re.sub(r'[èéëê]', 'e', nombre)
+    nombre = re.sub(r'[ìíïî]', 'i', nombre)
+    nombre = re.sub(r'[òóöô]', 'o', nombre)
+    nombre = re.sub(r'[ùúüû]', 'u', nombre)
+    nombre = re.sub(r'[ñ]', 'n', nombre)
+    
+    # Reemplazar espacios por underscore y eliminar caracteres no alfanuméricos
+    nombre = re.sub(r'[^a-z0-9\s]', '', nombre)
+    nombre = nombre.replace(' ', '_')
+    
+    # Capitalizar primera letra de cada palabra
+    nombre = '_'.join(word.capitalize() for word in nombre.split('_'))
+    
+    return nombre + '.jpg'
+
+def subir_foto_ftp(imagen_bytes, nombre_archivo):
+    """Sube una foto al servidor FTP con timeouts optimizados"""
+    try:
+        # Obtener credenciales del .env
+        ftp_host = os.getenv('FTP_HOST', 'ftp.kossomet.com')
+        ftp_user = os.getenv('FTP_USER', 'marketing@kossomet.com')
+        ftp_pass = os.getenv('FTP_PASS', '#k55d.202$INT')
+        
+        print(f"[FTP-OPTIMIZADO] Conectando con timeout agresivo a {ftp_host}...")
+        
+        # OPTIMIZACIÓN: Conectar al FTP con timeout agresivo
+        ftp = ftplib.FTP(ftp_host, timeout=8)  # Timeout conexión: 8s (vs default 60s)
+        ftp.login(ftp_user, ftp_pass)
+        
+        # Cambiar al directorio destino
+        ftp.cwd('/public_html/clientexpokossodo/')
+        
+        # OPTIMIZACIÓN: Medir tiempo de subida y configurar modo binario optimizado
+        import time
+        start_time = time.time()
+        
+        bio = io.BytesIO(imagen_bytes)
+        ftp.storbinary(f'STOR {nombre_archivo}', bio, blocksize=8192)  # Buffer optimizado
+        ftp.quit()
+        
+        upload_time = time.time() - start_time
+        
+        # Retornar URL pública (incluyendo public_html en la URL)
+        url = f"https://www.kossomet.com/public_html/clientexpokossodo/{nombre_archivo}"
+        size_kb = len(imagen_bytes) / 1024
+        print(f"[FTP-OPTIMIZADO] ✅ Subida exitosa: {size_kb:.1f}KB en {upload_time:.2f}s")
+        print(f"[FTP-OPTIMIZADO] 📸 URL: {url}")
+        return url
+        
+    except Exception as e:
+        print(f"[FTP] Error subiendo foto: {str(e)}")
+        return None
+
+@metricas.registro.tarea_en_curso('foto')
+def capturar_y_subir_foto_async(registro_id, nombres):
+    """Función asíncrona para capturar y subir foto en background"""
+    try:
+        print(f"[FOTO] Iniciando captura para {nombres} (ID: {registro_id})")
+        
+        # Capturar foto (con gevent este hilo es un greenlet: la cámara va al pool de hilos)
+        imagen_bytes = ejecutar_bloqueante(capturar_foto_rapida)
+        if not imagen_bytes:
+            print(f"[FOTO] No se pudo capturar foto para {nombres}")
+            return
+        
+        # Generar nombre de archivo
+        nombre_archivo = sanitizar_nombre_archivo(nombres)
+        
+        # Subir al FTP
+        url = subir_foto_ftp(imagen_bytes, nombre_archivo)
+        if url:
+            print(f"[FOTO] Foto de {nombres} subida exitosamente")
+            print(f"[FOTO] URL: {url}")
+        else:
+            print(f"[FOTO] Error subiendo foto de {nombres}")
+            
+    except Exception as e:
+        print(f"[FOTO] Error en proceso de captura: {str(e)}")
+
+@bp.route('/api/verificar/capturar-foto', methods=['POST'])
+def capturar_foto_endpoint():
+    """Endpoint para capturar foto y subirla al FTP"""
+    data = request.get_json()
+    
+    registro_id = data.get('registro_id')
+    nombres = data.get('nombres')
+    
+    if not registro_id or not nombres:
+        return jsonify({"error": "registro_id y nombres son requeridos"}), 400
+    
+    # Ejecutar en background para no bloquear
+    thread = threading.Thread(
+        target=capturar_y_subir_foto_async,
+        args=(registro_id, nombres)
+    )
+    thread.daemon = True
+    thread.start()
+    
+    # Retornar inmediatamente
+    return jsonify({
+        "success": True,
+        "message": "Captura de foto iniciada"
+    })
+
+@bp.route('/api/verificar/capturar-foto-sync', methods=['POST'])
+def capturar_foto_sync_endpoint():
+    """
+    Endpoint SÍNCRONO para capturar foto, subirla al FTP y retornar URL confirmada.
+    Este endpoint espera hasta que la foto esté completamente subida antes de responder.
+    """
+    try:
+        data = request.get_json()
+        
+        registro_id = data.get('registro_id')
+        nombres = data.get('nombres')
+        
+        if not registro_id or not nombres:
+            return jsonify({
+                "success": False,
+                "error": "registro_id y nombres son requeridos"
+            }), 400
+        
+        print(f"[FOTO-SYNC] Iniciando captura síncrona para {nombres} (ID: {registro_id})")
+        
+        # Capturar foto (OpenCV bloquea fuera de los sockets de Python: en gevent va al pool de hilos)
+        imagen_bytes = ejecutar_bloqueante(capturar_foto_rapida)
+        if not imagen_bytes:
+            print(f"[FOTO-SYNC] No se pudo capturar foto para {nombres}")
+            return jsonify({
+                "success": False,
+                "error": "No se pudo capturar foto de la cámara"
+            }), 500
+        
+        # Generar nombre de archivo
+        nombre_archivo = sanitizar_nombre_archivo(nombres)
+        
+        # Subir al FTP y esperar confirmación
+        url = subir_foto_ftp(imagen_bytes, nombre_archivo)
+        if url:
+            print(f"[FOTO-SYNC] Foto de {nombres} subida exitosamente")
+            print(f"[FOTO-SYNC] URL confirmada: {url}")
+            
+            # Retornar URL confirmada
+            return jsonify({
+                "success": True,
+                "message": "Foto capturada y subida exitosamente",
+                "photo_url": url,
+                "filename": nombre_archivo,
+                "registro_id": registro_id,
+                "nombres": nombres
+            })
+        else:
+            print(f"[FOTO-SYNC] Error subiendo foto de {nombres}")
+            return jsonify({
+                "success": False,
+                "error": "Error subiendo foto al servidor FTP"
+            }), 500
+            
+    except Exception as e:
+        print(f"[FOTO-SYNC] Error en captura síncrona: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": f"Error interno: {str(e)}"
+        }), 500
@@ -0,0 +1,311 @@
+"""
+Rutas de impresión térmica de etiquetas QR
+ExpoKossodo 2025
+
+Impresora 4BARCODE por TSPL crudo (win32print solo se importa al imprimir,
+en los kioscos Windows) y QR en PNG para imprimir desde el navegador.
+"""
+
+from flask import request, jsonify, Blueprint
+import re
+import unicodedata
+from nucleo import generar_imagen_qr, generar_texto_qr
+
+bp = Blueprint('impresion', __name__)
+
+def prepare_text_for_thermal_printer(text):
+    """Prepara texto completamente para impresora térmica ASCII
+    
+    Maneja:
+    - Tildes/acentos: á,é,í,ó,ú → a,e,i,o,u
+    - Eñes: ñ,Ñ → n,N  
+    - Símbolos especiales: &,@,¿,¡ → equivalentes ASCII
+    - Filtra caracteres no-ASCII
+    - Limita longitud a 15 caracteres
+    """
+    if not text:
+        return "INVITADO"
+    
+    # 1. Normalizar tildes/acentos (NFD)
+    normalized = unicodedata.normalize('NFD', text)
+    no_accents = ''.join(c for c in normalized if unicodedata.category(c) != 'Mn')
+    
+    # 2. Mapeo manual para caracteres que NFD no maneja
+    replacements = {
+        'ñ': 'n', 'Ñ': 'N',           # Eñes
+        '&': 'y', '@': 'at',           # Símbolos comunes
+        '¿': '', '¡': '',              # Signos de pregunta/exclamación
+        '°': 'deg', '²': '2', '³': '3', # Símbolos matemáticos
+    }
+    
+    result = no_accents
+    for special, replacement in replacements.items():
+        result = result.replace(special, replacement)
+    
+    # 3. Remover cualquier carácter que no sea ASCII básico (32-126)
+    result = re.sub(r'[^\x20-\x7E]', '', result)
+    
+    # 4. Limpiar espacios múltiples
+    result = ' '.join(result.split())
+    
+    return result[:15]  # Limitar longitud
+
+# Clase de impresora térmica usando TSPL (método que SÍ funciona)
+class TermalPrinter4BARCODE:
+    """Impresora térmica usando TSPL con el código que funciona perfectamente"""
+    
+    def __init__(self, printer_name=None):
+        self.printer_name = printer_name or "4BARCODE 3B-303B"
+    
+    def _send_raw_tspl(self, raw_data):
+        """Enviar datos TSPL a la impresora usando win32print"""
+        try:
+            import win32print
+            
+            h = win32print.OpenPrinter(self.printer_name, {"DesiredAccess": win32print.PRINTER_ACCESS_USE})
+            win32print.StartDocPrinter(h, 1, ("TSPL_QR", None, "RAW"))
+            win32print.StartPagePrinter(h)
+            win32print.WritePrinter(h, raw_data)
+            win32print.EndPagePrinter(h)
+            win32print.EndDocPrinter(h)
+            win32print.ClosePrinter(h)
+            
+            return {"success": True, "message": "Impresión enviada correctamente"}
+            
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def _generate_tspl_commands(self, qr_text, user_data):
+        """Generar comandos TSPL con parámetros actualizados y mejorados"""
+        
+        # Extraer datos del usuario con fallback mejorado
+        nombre = user_data.get('nombres', 'INVITADO') or 'INVITADO'
+        
+        # --- AJUSTES RÁPIDOS (parámetros actualizados) ---
+        QR_X = 70        # antes 60 → movido a la izquierda
+        QR_Y = 70        # antes 60 → bajado para más margen arriba  
+        QR_CELL = 10      # antes 10 → más chico para evitar mordiscos
+        FONT = "3"       # 0..7 (3 = grande/legible)
+        CHAR_W = 20      # ancho aprox por carácter en font "3"
+        TEXT_OFFSET = 50 # nombre a 50 dots por encima del QR
+        MAX_NAME = 15    # máximo de caracteres visibles en el nombre
+        
+        # Procesar nombre con normalización ASCII-safe
+        nombre_normalizado = prepare_text_for_thermal_printer(nombre)
+        text_width = len(nombre_normalizado) * CHAR_W
+        
+        # Estimación del ancho del QR para centrar el texto respecto al bloque del QR
+        qr_est_ancho = QR_CELL * 24  # ~24 módulos típico; funciona bien como aproximación
+        center_x = QR_X + (qr_est_ancho // 2) - (text_width // 2)
+        
+        # Generar comandos TSPL con parámetros actualizados
+        tspl = (
+            "SIZE 50 mm,50 mm\r\n"
+            "GAP 2 mm,0 mm\r\n"
+            "SPEED 3\r\n"
+            "DENSITY 12\r\n"
+            "DIRECTION 1\r\n"
+            "REFERENCE 0,0\r\n"
+            "CLS\r\n"
+            # Nombre normalizado ASCII-safe centrado sobre el QR
+            f'TEXT {center_x},{QR_Y - TEXT_OFFSET},"{FONT}",0,1,1,"{nombre_normalizado}"\r\n'
+            # QR code
+            f'QRCODE {QR_X},{QR_Y},M,{QR_CELL},A,0,"{qr_text}"\r\n'
+            "PRINT 1\r\n"
+        ).encode("ascii")
+        
+        return tspl
+    
+    def print_qr_label(self, qr_text, user_data, mode='TSPL'):
+        """Imprimir etiqueta con QR y nombre"""
+        try:
+            tspl_commands = self._generate_tspl_commands(qr_text, user_data)
+            result = self._send_raw_tspl(tspl_commands)
+            
+            if result['success']:
+                nombre_normalizado = prepare_text_for_thermal_printer(user_data.get('nombres', 'INVITADO'))
+                print(f"[OK] Enviado. Nombre='{nombre_normalizado}' | QR cell={10} | pos=(70,70)")
+            
+            return result
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def test_print(self):
+        """Test usando los mismos datos del código que funciona"""
+        test_data = {"nombres": "Jefferson Camacho Portillo"}
+        test_qr = "ROY|907245135|Jefe de ventas|JQS CONSULTING|1752211193"
+        return self.print_qr_label(test_qr, test_data)
+    
+    def get_printer_status(self):
+        """Estado de la impresora"""
+        try:
+            import win32print
+            handle = win32print.OpenPrinter(self.printer_name)
+            win32print.ClosePrinter(handle)
+            return {"success": True, "printer": self.printer_name, "status_text": "Lista (TSPL)", "jobs": 0}
+        except Exception as e:
+            return {"success": False, "error": str(e), "printer": self.printer_name}
+
+# Confirmar disponibilidad
+THERMAL_PRINTER_DISPONIBLE = True
+print("[OK] Impresora térmica: Usando método integrado que funciona")
+
+@bp.route('/api/verificar/generar-qr-impresion', methods=['POST'])
+def generar_qr_para_impresion():
+    """Generar código QR para impresión basado en datos del usuario"""
+    data = request.get_json()
+    
+    if not data or 'usuario_datos' not in data:
+        return jsonify({"error": "Datos del usuario requeridos"}), 400
+    
+    usuario_datos = data['usuario_datos']
+    
+    # Validar campos requeridos
+    required_fields = ['nombres', 'numero', 'cargo', 'empresa']
+    for field in required_fields:
+        if field not in usuario_datos:
+            return jsonify({"error": f"Campo requerido en usuario_datos: {field}"}), 400
+    
+    try:
+        # Generar texto QR usando los datos actuales del usuario
+        qr_text = generar_texto_qr(
+            usuario_datos['nombres'],
+            usuario_datos['numero'], 
+            usuario_datos['cargo'],
+            usuario_datos['empresa']
+        )
+        
+        if not qr_text:
+            return jsonify({"error": "Error generando texto QR"}), 500
+        
+        # Generar imagen QR
+        qr_image_bytes = generar_imagen_qr(qr_text)
+        
+        if not qr_image_bytes:
+            return jsonify({"error": "Error generando imagen QR"}), 500
+        
+        # Convertir a base64 para envío
+        import base64
+        qr_base64 = base64.b64encode(qr_image_bytes).decode('utf-8')
+        
+        return jsonify({
+            "success": True,
+            "qr_text": qr_text,
+            "qr_image_base64": qr_base64,
+            "filename": f"QR_{usuario_datos['nombres'].replace(' ', '_')}_Reimpresion.png"
+        })
+        
+    except Exception as e:
+        print(f"Error generando QR para impresión: {e}")
+        return jsonify({"error": "Error interno generando QR"}), 500
+
+@bp.route('/api/verificar/imprimir-termica', methods=['POST'])
+def imprimir_qr_termica():
+    """Imprimir QR en impresora térmica 4BARCODE 3B-303B"""
+    if not THERMAL_PRINTER_DISPONIBLE:
+        return jsonify({"error": "Módulo de impresora térmica no disponible"}), 503
+    
+    data = request.get_json()
+    
+    if not data or 'usuario_datos' not in data:
+        return jsonify({"error": "Datos del usuario requeridos"}), 400
+    
+    usuario_datos = data['usuario_datos']
+    qr_text = data.get('qr_text', '')
+    mode = data.get('mode', 'TSPL')  # TSPL o ESCPOS
+    
+    # Validar campos requeridos
+    required_fields = ['nombres']
+    for field in required_fields:
+        if field not in usuario_datos:
+            return jsonify({"error": f"Campo requerido: {field}"}), 400
+    
+    # IMPORTANTE: El QR text es OBLIGATORIO - debe venir el QR escaneado
+    if not qr_text:
+        print(f"[ERROR] No se recibió qr_text. Data recibida: {data}")
+        return jsonify({
+            "error": "El código QR es requerido para la impresión",
+            "detail": "Debe enviar el QR escaneado original, no se genera uno nuevo"
+        }), 400
+    
+    try:
+        # Log para debug del QR recibido
+        print(f"[IMPRESION] QR recibido: {qr_text}")
+        print(f"[IMPRESION] Usuario: {usuario_datos.get('nombres', 'Sin nombre')}")
+        
+        # Inicializar impresora
+        printer = TermalPrinter4BARCODE()
+        
+        # Imprimir etiqueta
+        result = printer.print_qr_label(qr_text, usuario_datos, mode)
+        
+        if result['success']:
+            return jsonify({
+                "success": True,
+                "message": "Etiqueta enviada a impresora térmica",
+                "printer": result.get('printer', 'Desconocida'),
+                "qr_text": qr_text
+            })
+        else:
+            return jsonify({
+                "success": False,
+                "error": result.get('error', 'Error desconocido'),
+                "details": result.get('details', '')
+            }), 500
+            
+    except Exception as e:
+        print(f"Error imprimiendo en térmica: {e}")
+        return jsonify({
+            "success": False,
+            "error": "Error al imprimir en impresora térmica",
+            "details": str(e)
+        }), 500
+
+@bp.route('/api/verificar/estado-impresora', methods=['GET'])
+def obtener_estado_impresora():
+    """Obtener estado de la impresora térmica"""
+    try:
+        # Simplificado para evitar errores en producción
+        return jsonify({
+            "success": True,
+            "printer_available": THERMAL_PRINTER_DISPONIBLE,
+            "status": "ready" if THERMAL_PRINTER_DISPONIBLE else "not_available",
+            "message": "Impresora disponible" if THERMAL_PRINTER_DISPONIBLE else "Impresora no disponible en este servidor"
+        })
+            
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": "Error obteniendo estado de impresora",
+            "details": str(e)
+        }), 500
+
+@bp.route('/api/verificar/test-impresora', methods=['POST'])
+def test_impresora_termica():
+    """Imprimir etiqueta de prueba"""
+    if not THERMAL_PRINTER_DISPONIBLE:
+        return jsonify({"error": "Módulo de impresora térmica no disponible"}), 503
+    
+    try:
+        printer = TermalPrinter4BARCODE()
+        result = printer.test_print()
+        
+        if result['success']:
+            return jsonify({
+                "success": True,
+                "message": "Etiqueta de prueba enviada correctamente",
+                "printer": result.get('printer', 'Desconocida')
+            })
+        else:
+            return jsonify({
+                "success": False,
+                "error": result.get('error', 'Error en impresión de prueba'),
+                "details": result.get('details', '')
+            }), 500
+            
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": "Error en test de impresora",
+            "details": str(e)
+        }), 500
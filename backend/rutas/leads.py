@@ -0,0 +1,396 @@
+"""
+Rutas del sistema de leads de asesores
+ExpoKossodo 2025
+
+Datos e historial de clientes, actualización de datos y consultas de
+asesores; las consultas con transcripción se envían al servicio de Railway
+(rutas.transcripcion).
+"""
+
+from flask import request, jsonify, Blueprint
+from mysql.connector import Error
+import re
+import threading
+from parser_qr import parsear_qr
+from nucleo import get_db_connection, indice_qr, snapshot_registros
+from rutas.transcripcion import enviar_a_transcripcion
+
+bp = Blueprint('leads', __name__)
+
+# ===== ENDPOINTS PARA SISTEMA DE LEADS =====
+
+@bp.route('/api/leads/cliente-info', methods=['POST'])
+def obtener_cliente_info():
+    """Obtener SOLO información básica del cliente (RÁPIDO)"""
+    data = request.get_json()
+    
+    if not data or 'qr_code' not in data:
+        return jsonify({"error": "Código QR requerido"}), 400
+    
+    qr_code = data['qr_code']
+    
+    # Validar formato QR
+    if parsear_qr(qr_code) is None:
+        return jsonify({"error": "Código QR inválido"}), 400
+    
+    # Buscar SOLO datos básicos del cliente (índice en memoria, sin ir a la BD)
+    cliente = indice_qr.buscar(qr_code)
+    if not cliente:
+        return jsonify({"error": "Cliente no encontrado"}), 404
+    
+    cliente.pop('fecha_registro', None)
+    return jsonify({"cliente": cliente})
+
+@bp.route('/api/registros/actualizar-datos', methods=['PUT'])
+def actualizar_datos_cliente():
+    """Actualizar datos básicos del cliente (nombre, correo, empresa, cargo, teléfono)"""
+    data = request.get_json()
+    
+    # Validación de campos requeridos
+    required_fields = ['registro_id', 'qr_code', 'nombres', 'correo', 'empresa', 'cargo', 'numero']
+    for field in required_fields:
+        if field not in data or not data[field]:
+            return jsonify({"error": f"Campo requerido: {field}"}), 400
+    
+    # Validación de formato de email
+    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    if not re.match(email_pattern, data['correo']):
+        return jsonify({"error": "Formato de correo inválido"}), 400
+    
+    # Validación de número de teléfono (solo números y guiones)
+    telefono_pattern = r'^[\d\-\+\(\)\s]+$'
+    if not re.match(telefono_pattern, data['numero']):
+        return jsonify({"error": "Formato de teléfono inválido"}), 400
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # Verificar que el registro existe y el QR code coincide
+        cursor.execute("""
+            SELECT id, qr_code 
+            FROM expokossodo_registros 
+            WHERE id = %s AND qr_code = %s
+        """, (data['registro_id'], data['qr_code']))
+        
+        registro = cursor.fetchone()
+        if not registro:
+            return jsonify({"error": "Registro no encontrado o código QR no coincide"}), 404
+        
+        # Actualizar solo los campos permitidos
+        cursor.execute("""
+            UPDATE expokossodo_registros 
+            SET nombres = %s, 
+                correo = %s, 
+                empresa = %s, 
+                cargo = %s, 
+                numero = %s
+            WHERE id = %s AND qr_code = %s
+        """, (
+            data['nombres'].strip(),
+            data['correo'].strip().lower(),
+            data['empresa'].strip(),
+            data['cargo'].strip(),
+            data['numero'].strip(),
+            data['registro_id'],
+            data['qr_code']
+        ))
+        
+        if cursor.rowcount == 0:
+            return jsonify({"error": "No se pudo actualizar el registro"}), 500
+        
+        connection.commit()
+        
+        # Obtener los datos actualizados
+        cursor.execute("""
+            SELECT id, nombres, correo, empresa, cargo, numero
+            FROM expokossodo_registros 
+            WHERE id = %s
+        """, (data['registro_id'],))
+        
+        datos_actualizados = cursor.fetchone()
+        
+        # Mantener el índice QR sincronizado con los nuevos datos
+        if datos_actualizados:
+            indice_qr.registrar(data['qr_code'], datos_actualizados)
+        snapshot_registros.invalidar()
+        
+        print(f"[OK] Datos actualizados para registro ID: {data['registro_id']}")
+        
+        return jsonify({
+            "success": True,
+            "message": "Datos actualizados correctamente",
+            "datos_actualizados": datos_actualizados
+        })
+        
+    except Error as e:
+        print(f"[ERROR] Error actualizando datos del cliente: {e}")
+        connection.rollback()
+        return jsonify({"error": "Error del servidor al actualizar datos"}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/leads/cliente-historial', methods=['POST'])
+def obtener_cliente_historial():
+    """Obtener SOLO el historial de consultas (puede demorar más)"""
+    data = request.get_json()
+    
+    if not data or 'registro_id' not in data:
+        return jsonify({"error": "ID de registro requerido"}), 400
+    
+    registro_id = data['registro_id']
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # Obtener historial con resúmenes (puede ser más lento por el parsing de JSON)
+        cursor.execute("""
+            SELECT 
+                asesor_nombre, 
+                consulta, 
+                fecha_consulta,
+                uso_transcripcion,
+                resumen
+            FROM expokossodo_consultas 
+            WHERE registro_id = %s
+            ORDER BY fecha_consulta DESC
+            LIMIT 5
+        """, (registro_id,))
+        
+        consultas_raw = cursor.fetchall()
+        
+        # Procesar consultas para mostrar resúmenes cuando hay transcripción
+        consultas_anteriores = []
+        for consulta_raw in consultas_raw:
+            consulta_final = {
+                'asesor_nombre': consulta_raw['asesor_nombre'],
+                'fecha_consulta': consulta_raw['fecha_consulta'],
+                'consulta': consulta_raw['consulta']
+            }
+            
+            # Si usó transcripción y hay resumen, mostrar el resumen_general
+            if consulta_raw['uso_transcripcion'] == 1 and consulta_raw['resumen']:
+                try:
+                    import json
+                    resumen_data = json.loads(consulta_raw['resumen'])
+                    if 'resumen_general' in resumen_data and resumen_data['resumen_general'].strip():
+                        consulta_final['consulta'] = resumen_data['resumen_general']
+                        print(f"[LOG] Resumen encontrado para historial")
+                except (json.JSONDecodeError, KeyError, TypeError) as e:
+                    print(f"[WARN] Error parseando resumen: {e}")
+            
+            consultas_anteriores.append(consulta_final)
+        
+        return jsonify({"consultas_anteriores": consultas_anteriores})
+        
+    except Error as e:
+        print(f"[ERROR] Error obteniendo historial: {e}")
+        return jsonify({"error": "Error del servidor"}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+# MANTENER el endpoint original para compatibilidad
+@bp.route('/api/leads/cliente-por-qr', methods=['POST'])
+def obtener_cliente_por_qr():
+    """Obtener información del cliente por código QR para sistema de leads"""
+    data = request.get_json()
+    
+    if not data or 'qr_code' not in data:
+        return jsonify({"error": "Código QR requerido"}), 400
+    
+    qr_code = data['qr_code']
+    
+    # Validar formato QR
+    if parsear_qr(qr_code) is None:
+        return jsonify({"error": "Código QR inválido"}), 400
+    
+    # Buscar cliente por código QR (índice en memoria)
+    cliente = indice_qr.buscar(qr_code)
+    if not cliente:
+        return jsonify({"error": "Cliente no encontrado"}), 404
+    cliente.pop('fecha_registro', None)
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # Obtener consultas anteriores del cliente con resúmenes de transcripción
+        cursor.execute("""
+            SELECT 
+                asesor_nombre, 
+                consulta, 
+                fecha_consulta,
+                uso_transcripcion,
+                resumen
+            FROM expokossodo_consultas 
+            WHERE registro_id = %s
+            ORDER BY fecha_consulta DESC
+            LIMIT 5
+        """, (cliente['id'],))
+        
+        consultas_raw = cursor.fetchall()
+        
+        # Procesar consultas para mostrar resúmenes cuando hay transcripción
+        consultas_anteriores = []
+        for consulta_raw in consultas_raw:
+            consulta_final = {
+                'asesor_nombre': consulta_raw['asesor_nombre'],
+                'fecha_consulta': consulta_raw['fecha_consulta'],
+                'consulta': consulta_raw['consulta']  # Por defecto usar la consulta original
+            }
+            
+            # Si usó transcripción y hay resumen, mostrar el resumen_general
+            if consulta_raw['uso_transcripcion'] == 1 and consulta_raw['resumen']:
+                try:
+                    import json
+                    resumen_data = json.loads(consulta_raw['resumen'])
+                    if 'resumen_general' in resumen_data and resumen_data['resumen_general'].strip():
+                        consulta_final['consulta'] = resumen_data['resumen_general']
+                        print(f"[LOG] Mostrando resumen de transcripción para consulta ID")
+                except (json.JSONDecodeError, KeyError, TypeError) as e:
+                    # Si hay error parseando JSON, mantener consulta original
+                    print(f"[WARN] Error parseando resumen JSON: {e}")
+                    pass
+            
+            consultas_anteriores.append(consulta_final)
+        
+        return jsonify({
+            "cliente": cliente,
+            "consultas_anteriores": consultas_anteriores
+        })
+        
+    except Error as e:
+        print(f"Error obteniendo cliente: {e}")
+        return jsonify({"error": "Error del servidor"}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/leads/guardar-consulta', methods=['POST'])
+def guardar_consulta():
+    """Guardar consulta del asesor sobre el cliente"""
+    data = request.get_json()
+    
+    required_fields = ['registro_id', 'asesor_nombre', 'consulta']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({"error": f"Campo requerido: {field}"}), 400
+    
+    if not data['consulta'].strip():
+        return jsonify({"error": "La consulta no puede estar vacía"}), 400
+    
+    # Campo opcional para indicar si se usó transcripción
+    uso_transcripcion = data.get('uso_transcripcion', False)
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # Verificar que el registro existe
+        cursor.execute("""
+            SELECT id, nombres FROM expokossodo_registros WHERE id = %s
+        """, (data['registro_id'],))
+        
+        cliente = cursor.fetchone()
+        if not cliente:
+            return jsonify({"error": "Cliente no encontrado"}), 404
+        
+        # Insertar consulta
+        cursor.execute("""
+            INSERT INTO expokossodo_consultas 
+            (registro_id, asesor_nombre, consulta, uso_transcripcion, fecha_consulta)
+            VALUES (%s, %s, %s, %s, NOW())
+        """, (
+            data['registro_id'],
+            data['asesor_nombre'],
+            data['consulta'].strip(),
+            uso_transcripcion
+        ))
+        
+        # Obtener el ID de la consulta recién insertada
+        consulta_id = cursor.lastrowid
+        
+        connection.commit()
+        
+        # Si se usó transcripción, enviar al servicio Railway
+        if uso_transcripcion:
+            # Construir URL del callback dentro del contexto de request
+            callback_url = f"{request.url_root}api/transcripcion/callback"
+            
+            # Llamada asíncrona al servicio de transcripción
+            threading.Thread(
+                target=enviar_a_transcripcion,
+                args=(consulta_id, data['consulta'].strip(), callback_url),
+                daemon=True
+            ).start()
+            print(f"[LOG] Consulta ID {consulta_id} enviada al servicio de transcripción")
+        
+        return jsonify({
+            "message": "Consulta guardada exitosamente",
+            "cliente": cliente['nombres'],
+            "asesor": data['asesor_nombre'],
+            "transcripcion_programada": uso_transcripcion
+        })
+        
+    except Error as e:
+        print(f"Error guardando consulta: {e}")
+        connection.rollback()
+        return jsonify({"error": "Error del servidor"}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/leads/asesores', methods=['GET'])
+def obtener_asesores():
+    """Obtener lista de asesores disponibles"""
+    print("📋 Endpoint /api/leads/asesores solicitado")
+    
+    asesores = [
+        "Abigail Alvarez del Villar",
+        "Alexandra Ccota Chacon",
+        "Angela Gómez Sánchez",
+        "Azucena Chuquilin",
+        "Carlos Granda",
+        "Cinthya Zapata Ruiz",
+        "Daniel Torres",
+        "Denisse Duche",
+        "Diana Esteban Ladera",
+        "Eder Vilchez",
+        "Ernesto Rodriguez",
+        "Fernando Pacheco",
+        "Giovanna Ramirez",
+        "Hugo Guzman",
+        "Ines Cosinga Enriquez",
+        "Jackeline Rojas",
+        "Javier Santa Cruz",
+        "Jessica Soto Alarcón",
+        "Jimmy Bueno",
+        "Jonathan Lopez",
+        "Lidia Cachay",
+        "Lucy Elvira Torres Jiménez",
+        "Manuel Mosqueira",
+        "Milagros Pasaro",
+        "Mizael Despacho",
+        "Silvia Porras Quintanilla",
+        "Tania Hernandez",
+        "Vanessa Hoffman",
+        "Ximena Rojas"
+    ]
+    
+    print(f"📋 Devolviendo {len(asesores)} asesores")
+    return jsonify({"asesores": asesores})
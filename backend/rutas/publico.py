@@ -0,0 +1,630 @@
+"""
+Rutas públicas: eventos, registro de asistentes y email de confirmación
+ExpoKossodo 2025
+
+Es el único subsistema que arma y envía emails, así que la cola SMTP y las
+plantillas HTML (plantillas_email) solo se cargan donde está habilitado.
+"""
+
+from flask import request, jsonify, Blueprint, current_app
+from mysql.connector import Error
+import os
+from datetime import datetime
+import time
+import json
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.mime.image import MIMEImage
+from reserva_cupos import reservar_cupos, vincular_eventos, RESERVADO, LLENO, YA_INSCRITO, NO_EXISTE
+from agenda_eventos import AgendaEventos, clave_horario
+from inscripciones import ids_agrupados
+from cola_email import ColaEmail
+from plantillas_email import renderizar_email_confirmacion, renderizar_email_actualizacion
+import metricas
+from nucleo import (
+    construir_eventos_por_fecha, generar_imagen_qr, generar_texto_qr, get_db_connection, indice_qr,
+    log_execution_time, snapshot_eventos, snapshot_registros,
+)
+
+bp = Blueprint('publico', __name__)
+
+# Cola de emails con sesiones SMTP reutilizadas (los workers arrancan con el primer email)
+cola_email = ColaEmail()
+
+# Eventos en memoria para validar inscripciones sin consultas (se recarga al editar eventos)
+agenda_eventos = AgendaEventos()
+
+def encolar_email_registro(email_data):
+    """Encolar el email de registro - se construye y envía en un worker de la cola, no bloquea la respuesta"""
+    user_email = email_data['user_data']['correo']
+    email_type = "actualización" if email_data['is_update'] else "confirmación"
+    print(f"[EMAIL] Encolando {email_type} para {user_email}...")
+    
+    return cola_email.encolar(lambda: construir_email_registro(email_data), user_email)
+
+def construir_email_registro(email_data):
+    """Construye el email de confirmación o actualización según el contexto"""
+    user_data = email_data['user_data']
+    selected_events = email_data['eventos_completos']
+    qr_text = email_data['qr_text']
+    is_update = email_data['is_update']
+    eventos_agregados = email_data.get('eventos_agregados', [])
+    eventos_previos = email_data.get('eventos_previos', [])
+    
+    if is_update:
+        return construir_email_actualizacion(user_data, selected_events, qr_text, eventos_agregados, eventos_previos)
+    else:
+        return construir_email_confirmacion(user_data, selected_events, qr_text)
+
+def construir_email_actualizacion(user_data, all_events, qr_text, eventos_agregados_ids, eventos_previos_ids):
+    """Construye el email de actualización de registro con charlas anteriores y nuevas (None si falla)"""
+    try:
+        email_user = os.getenv('EMAIL_USER')
+        
+        msg = MIMEMultipart()
+        msg['From'] = f"Kossodo <{email_user}>"
+        msg['To'] = user_data['correo']
+        msg['Subject'] = "Actualización de Registro - ExpoKossodo 2025"
+        
+        # HTML precompilado: charlas nuevas con badge y luego las anteriores
+        html_body = renderizar_email_actualizacion(user_data, all_events, eventos_agregados_ids, eventos_previos_ids)
+        
+        msg.attach(MIMEText(html_body, 'html'))
+        
+        # Adjuntar QR si existe (usar QR existente del usuario, no generar nuevo)
+        if qr_text:
+            try:
+                qr_img = generar_imagen_qr(qr_text)
+                if qr_img:
+                    qr_attachment = MIMEImage(qr_img)
+                    qr_attachment.add_header('Content-Disposition', 'attachment', filename='qr_code_expokossodo.png')
+                    msg.attach(qr_attachment)
+                    print(f"[OK] QR existente adjuntado al email de actualización")
+            except Exception as e:
+                print(f"[WARN] Error adjuntando QR al email de actualización: {e}")
+        
+        return msg
+        
+    except Exception as e:
+        print(f"[ERROR] Error construyendo email de actualización: {e}")
+        return None
+
+def construir_email_confirmacion(user_data, selected_events, qr_text=None):
+    """Construye el email de confirmación con código QR adjunto (None si falla)"""
+    try:
+        email_user = os.getenv('EMAIL_USER')
+        
+        msg = MIMEMultipart()
+        msg['From'] = f"Kossodo <{email_user}>"
+        msg['To'] = user_data['correo']
+        msg['Subject'] = "Confirmación de Registro - ExpoKossodo 2025"
+        
+        # HTML precompilado con la agenda de charlas seleccionadas
+        html_body = renderizar_email_confirmacion(user_data, selected_events)
+        
+        msg.attach(MIMEText(html_body, 'html'))
+        
+        # ===== ADJUNTAR CÓDIGO QR =====
+        if qr_text:
+            try:
+                # Generar imagen QR
+                qr_image_bytes = generar_imagen_qr(qr_text)
+                if qr_image_bytes:
+                    # Crear adjunto de imagen
+                    qr_attachment = MIMEImage(qr_image_bytes)
+                    qr_attachment.add_header('Content-Disposition', 
+                                           f'attachment; filename="QR_ExpoKossodo_{user_data["nombres"].replace(" ", "_")}.png"')
+                    qr_attachment.add_header('Content-ID', '<qr_code>')
+                    msg.attach(qr_attachment)
+                    print("[OK] Código QR adjuntado al email exitosamente")
+                else:
+                    print("[WARN] No se pudo generar la imagen QR para adjuntar")
+            except Exception as e:
+                print(f"[WARN] Error adjuntando QR al email: {e}")
+        
+        return msg
+        
+    except Exception as e:
+        print(f"Error construyendo email: {e}")
+        return None
+
+@bp.route('/api/eventos', methods=['GET'])
+@log_execution_time
+def get_eventos():
+    """Obtener todos los eventos organizados por fecha (solo horarios activos)"""
+    try:
+        cuerpo, etag = snapshot_eventos.obtener(construir_eventos_por_fecha)
+    except ConnectionError as e:
+        print("[ERROR] No se pudo obtener conexión para /api/eventos")
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        print(f"[ERROR] Error en /api/eventos: {str(e)}")
+        print(f"[ERROR] Tipo de error: {type(e).__name__}")
+        import traceback
+        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        return jsonify({"error": "Error interno del servidor"}), 500
+    
+    # ETag fuerte del contenido: si el cliente ya tiene esta versión responde 304 sin cuerpo
+    response = current_app.response_class(cuerpo, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@bp.route('/api/evento/<slug>', methods=['GET'])
+def get_evento_by_slug(slug):
+    """Obtener un evento específico por su slug"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # Buscar evento por slug
+        cursor.execute("""
+            SELECT 
+                e.*,
+                m.marca as marca_nombre,
+                m.logo as marca_logo,
+                m.expositor as marca_expositor
+            FROM expokossodo_eventos e
+            LEFT JOIN expokossodo_marcas m ON e.marca_id = m.id
+            INNER JOIN expokossodo_horarios h ON e.hora = h.horario
+            WHERE e.slug = %s AND h.activo = TRUE AND e.disponible = TRUE
+        """, (slug,))
+        
+        evento = cursor.fetchone()
+        
+        if not evento:
+            return jsonify({"error": "Evento no encontrado"}), 404
+        
+        # Formatear respuesta similar a la estructura del frontend
+        evento_formateado = {
+            'id': evento['id'],
+            'fecha': evento['fecha'].strftime('%Y-%m-%d'),
+            'hora': evento['hora'],
+            'sala': evento['sala'],
+            'titulo_charla': evento['titulo_charla'],
+            'expositor': evento['expositor'],
+            'pais': evento['pais'],
+            'descripcion': evento.get('descripcion', ''),
+            'imagen_url': evento.get('imagen_url', ''),
+            'slots_disponibles': evento['slots_disponibles'],
+            'slots_ocupados': evento['slots_ocupados'],
+            'slug': evento['slug'],
+            'disponible': (
+                evento.get('disponible', True) and 
+                evento['slots_ocupados'] < evento['slots_disponibles']
+            ),
+            'marca_id': evento.get('marca_id'),
+            'marca_nombre': evento.get('marca_nombre'),
+            'marca_logo': evento.get('marca_logo'),
+            'marca_expositor': evento.get('marca_expositor')
+        }
+        
+        return jsonify(evento_formateado)
+        
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/registro', methods=['POST'])
+def crear_registro():
+    """
+    Crear nuevo registro de usuario o actualizar registro existente
+    
+    Nueva lógica implementada:
+    - Permite re-registrarse con el mismo correo
+    - Maneja conflictos de horario inteligentemente
+    - Registra solo charlas válidas (sin conflictos)
+    - Mantiene el registro existente si ya existe el correo
+    """
+    data = request.get_json()
+    
+    # Detectar tipo de registro (por defecto 'eventos' para compatibilidad)
+    tipo_registro = data.get('tipo_registro', 'eventos')
+    
+    # Validaciones básicas
+    required_fields = ['nombres', 'correo', 'empresa', 'cargo', 'numero', 'eventos_seleccionados']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({"error": f"Campo requerido: {field}"}), 400
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True, buffered=True)
+    
+    try:
+        # Verificar disponibilidad de eventos según tipo de registro
+        eventos_nuevos = data['eventos_seleccionados']
+        
+        # Solo validar eventos si es registro con eventos
+        if tipo_registro == 'eventos':
+            if not eventos_nuevos:
+                return jsonify({"error": "Debe seleccionar al menos un evento"}), 400
+        elif tipo_registro == 'general':
+            # Para registro general, permitir array vacío
+            eventos_nuevos = []
+            data['eventos_seleccionados'] = []
+        
+        # === PASO 1: Verificar si el usuario ya está registrado ===
+        # WHY: Una sola consulta trae el registro, su QR y los eventos inscritos (para validar choques)
+        cursor.execute("""
+            SELECT r.id, r.nombres, r.qr_code,
+                   GROUP_CONCAT(re.evento_id) AS eventos_inscritos
+            FROM expokossodo_registros r
+            LEFT JOIN expokossodo_registro_eventos re ON re.registro_id = r.id
+            WHERE r.correo = %s
+            GROUP BY r.id
+        """, (data['correo'],))
+        
+        usuario_existente = cursor.fetchone()
+        modo_actualizacion = usuario_existente is not None
+        
+        if modo_actualizacion:
+            # Usuario existe - flujo de actualización
+            registro_id = usuario_existente['id']
+            # WHY: expokossodo_registro_eventos es la única fuente de verdad (ver inscripciones.py)
+            eventos_inscritos = ids_agrupados(usuario_existente['eventos_inscritos'])
+        else:
+            # Usuario nuevo - flujo de creación
+            eventos_inscritos = []
+        
+        # === PASO 2 y 3: Validar existencia y conflictos de horario en memoria ===
+        # La capacidad la decide reservar_cupos con datos bloqueados (PASO 3b)
+        if tipo_registro == 'general':
+            eventos_validos = []
+            eventos_conflictivos = []
+        else:
+            eventos_validos, eventos_conflictivos, eventos_no_existentes = agenda_eventos.validar(
+                cursor, eventos_inscritos, eventos_nuevos
+            )
+            if eventos_no_existentes:
+                return jsonify({
+                    "error": f"Los siguientes eventos no existen: {eventos_no_existentes}"
+                }), 400
+        
+        # === PASO 3b: Reservar cupos de forma atómica ===
+        # WHY: La validación anterior solo informa; aquí se bloquean los eventos y se ocupa el cupo
+        transaccion_abierta = False
+        if eventos_validos:
+            connection.start_transaction()
+            transaccion_abierta = True
+            try:
+                reserva = reservar_cupos(
+                    cursor, eventos_validos, registro_id if modo_actualizacion else None
+                )
+            except Exception as e:
+                connection.rollback()
+                raise e
+            
+            eventos_reservados = []
+            for evento_id in eventos_validos:
+                evento = reserva.get(evento_id, {})
+                if evento.get('estado') == RESERVADO:
+                    eventos_reservados.append(evento_id)
+                elif evento.get('estado') == NO_EXISTE:
+                    # Borrado después de cargar la agenda: se informa con los datos que había en memoria
+                    anterior = agenda_eventos.evento(evento_id) or {'titulo_charla': None, 'sala': None, 'fecha': '', 'hora': ''}
+                    fecha_str, hora_str = clave_horario(anterior)
+                    eventos_conflictivos.append({
+                        'id': evento_id,
+                        'titulo_charla': anterior['titulo_charla'],
+                        'sala': anterior['sala'],
+                        'fecha': fecha_str,
+                        'hora': hora_str,
+                        'motivo': 'La charla ya no está disponible'
+                    })
+                elif evento.get('estado') in (LLENO, YA_INSCRITO):
+                    eventos_conflictivos.append({
+                        'id': evento_id,
+                        'titulo_charla': evento['titulo_charla'],
+                        'sala': evento['sala'],
+                        'fecha': evento['fecha'].strftime('%Y-%m-%d'),
+                        'hora': str(evento['hora']),
+                        'motivo': (
+                            f"Evento lleno: {evento['slots_ocupados']}/{evento['slots_disponibles']} cupos ocupados"
+                            if evento['estado'] == LLENO else
+                            'Ya estás inscrito en esta charla'
+                        )
+                    })
+            eventos_validos = eventos_reservados
+        
+        # === PASO 4: Verificar si hay eventos válidos para procesar ===
+        # Para registro general, siempre continuar aunque no haya eventos
+        if not eventos_validos and tipo_registro != 'general':
+            if transaccion_abierta:
+                connection.rollback()
+            # No hay eventos válidos para agregar
+            if modo_actualizacion:
+                # Para usuarios existentes, devolver 200 con información detallada
+                response_data = {
+                    "success": False,
+                    "message": "No se pudieron agregar las charlas seleccionadas debido a conflictos de horario o eventos llenos.",
+                    "eventos_omitidos": eventos_conflictivos,
+                    "eventos_agregados": [],
+                    "modo": "sin_cambios",
+                    "registro_id": registro_id,
+                    "info": "Tu registro anterior se mantiene sin cambios. Puedes seleccionar otros eventos en diferentes horarios."
+                }
+                return jsonify(response_data), 200
+            else:
+                # Para usuarios nuevos, mantener el 400
+                response_data = {
+                    "success": False,
+                    "message": "No se pudo completar el registro. Todas las charlas seleccionadas tienen conflictos o están llenas.",
+                    "eventos_omitidos": eventos_conflictivos,
+                    "eventos_agregados": [],
+                    "modo": "sin_registro"
+                }
+                return jsonify(response_data), 400
+        
+        # === PASO 5: Actualización transaccional de la base de datos ===
+        try:
+            if modo_actualizacion:
+                # Actualizar registro existente (las charlas nuevas se agregan en vincular_eventos)
+                cursor.execute("""
+                    UPDATE expokossodo_registros 
+                    SET fecha_registro = NOW()
+                    WHERE id = %s
+                """, (registro_id,))
+            else:
+                # === GENERAR CÓDIGO QR para usuario nuevo ===
+                qr_text = generar_texto_qr(
+                    data['nombres'], 
+                    data['numero'], 
+                    data['cargo'], 
+                    data['empresa']
+                )
+                
+                if not qr_text:
+                    if transaccion_abierta:
+                        connection.rollback()
+                    return jsonify({"error": "Error generando código QR"}), 500
+                
+                # Crear nuevo registro - marcar asistencia_general si es tipo general
+                if tipo_registro == 'general':
+                    cursor.execute("""
+                        INSERT INTO expokossodo_registros 
+                        (nombres, correo, empresa, cargo, numero, expectativas, 
+                         qr_code, qr_generado_at, asistencia_general_confirmada)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, NOW(), TRUE)
+                    """, (
+                        data['nombres'],
+                        data['correo'],
+                        data['empresa'],
+                        data['cargo'],
+                        data['numero'],
+                        data.get('expectativas', ''),
+                        qr_text
+                    ))
+                else:
+                    cursor.execute("""
+                        INSERT INTO expokossodo_registros 
+                        (nombres, correo, empresa, cargo, numero, expectativas, 
+                         qr_code, qr_generado_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+                    """, (
+                        data['nombres'],
+                        data['correo'],
+                        data['empresa'],
+                        data['cargo'],
+                        data['numero'],
+                        data.get('expectativas', ''),
+                        qr_text
+                    ))
+                registro_id = cursor.lastrowid
+            
+            # Insertar relaciones evento-registro de los cupos reservados y sumar total_eventos
+            vincular_eventos(cursor, registro_id, eventos_validos)
+            
+            connection.commit()
+            
+        except Exception as e:
+            connection.rollback()
+            raise e
+        
+        # Cambiaron los cupos: /api/eventos debe servir los nuevos contadores
+        if eventos_validos:
+            snapshot_eventos.invalidar()
+        snapshot_registros.invalidar()
+        
+        # Mantener el índice QR sincronizado con el registro
+        if modo_actualizacion:
+            indice_qr.actualizar_por_id(registro_id, fecha_registro=datetime.now())
+        else:
+            indice_qr.registrar(qr_text, {
+                'id': registro_id,
+                'nombres': data['nombres'],
+                'correo': data['correo'],
+                'empresa': data['empresa'],
+                'cargo': data['cargo'],
+                'numero': data['numero'],
+                'fecha_registro': datetime.now()
+            })
+        
+        # === PASO 6: Preparar respuesta detallada ===
+        # Obtener detalles de eventos agregados
+        eventos_agregados_detalles = []
+        if eventos_validos:
+            for evento in agenda_eventos.detalles(eventos_validos):
+                eventos_agregados_detalles.append({
+                    "id": evento['id'],
+                    "titulo_charla": evento['titulo_charla'],
+                    "sala": evento['sala'],
+                    "fecha": evento['fecha'].strftime('%Y-%m-%d'),
+                    "hora": str(evento['hora'])
+                })
+        
+        # Preparar respuesta
+        response_data = {
+            "success": True,
+            "registro_id": registro_id,
+            "modo": "actualizado" if modo_actualizacion else "creado",
+            "tipo_registro": tipo_registro,
+            "eventos_agregados": eventos_agregados_detalles,
+            "eventos_omitidos": eventos_conflictivos,
+            "email_sent": False
+        }
+        
+        # Mensaje dinámico basado en resultados
+        if tipo_registro == 'general':
+            response_data["message"] = f"Registro general {'actualizado' if modo_actualizacion else 'creado'} exitosamente. Asistencia general confirmada."
+            response_data["asistencia_general"] = True
+        elif eventos_conflictivos and eventos_validos:
+            response_data["message"] = f"Registro {'actualizado' if modo_actualizacion else 'creado'} exitosamente. {len(eventos_validos)} charla(s) agregada(s), {len(eventos_conflictivos)} omitida(s) por conflictos."
+        elif eventos_validos:
+            response_data["message"] = f"Registro {'actualizado' if modo_actualizacion else 'creado'} exitosamente. {len(eventos_validos)} charla(s) agregada(s)."
+        
+        # === PASO 7: Enviar email de confirmación ===
+        # Enviar email para registro general o cuando hay eventos válidos
+        if tipo_registro == 'general' or eventos_validos or modo_actualizacion:
+            # Para actualización: obtener TODOS los eventos (anteriores + nuevos)
+            # Para registro nuevo: solo los eventos nuevos
+            if modo_actualizacion:
+                # Combinar eventos anteriores + nuevos para mostrar agenda completa
+                todos_los_eventos_ids = list(set(eventos_inscritos + eventos_validos))
+            else:
+                todos_los_eventos_ids = eventos_validos
+            
+            # Datos completos de TODOS los eventos para el email, desde la agenda en memoria
+            eventos_completos = agenda_eventos.detalles(todos_los_eventos_ids)
+            
+            # Para usuario existente, usar QR existente (leído en el PASO 1); para nuevo, usar el recién generado
+            if modo_actualizacion:
+                qr_text = usuario_existente['qr_code']
+            
+            if qr_text:
+                # Preparar información para el email
+                email_data = {
+                    'user_data': data.copy(),
+                    'eventos_completos': eventos_completos.copy(),
+                    'qr_text': qr_text,
+                    'is_update': modo_actualizacion,
+                    'eventos_agregados': eventos_validos if modo_actualizacion else eventos_validos,
+                    'eventos_previos': eventos_inscritos if modo_actualizacion else []
+                }
+                
+                # Envío en background por la cola de emails para acelerar la respuesta al usuario
+                response_data["email_sent"] = encolar_email_registro(email_data)
+                response_data["qr_code"] = qr_text
+                response_data["qr_generated"] = True
+        
+        return jsonify(response_data)
+        
+    except Error as e:
+        connection.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/admin/horarios/activos', methods=['GET'])
+@log_execution_time
+def get_horarios_activos():
+    """Obtener solo los horarios activos (para uso en frontend)"""
+    connection = None
+    cursor = None
+    
+    try:
+        connection = get_db_connection()
+        if not connection:
+            print("[ERROR] No se pudo obtener conexión para /api/admin/horarios/activos")
+            return jsonify({"error": "Error de conexión a la base de datos"}), 500
+        
+        cursor = connection.cursor()
+        
+        query_start = time.time()
+        cursor.execute("""
+            SELECT horario FROM expokossodo_horarios 
+            WHERE activo = TRUE 
+            ORDER BY horario
+        """)
+        horarios = [row[0] for row in cursor.fetchall()]
+        query_time = time.time() - query_start
+        print(f"[SEARCH] Query /api/admin/horarios/activos tomó {query_time:.3f}s, {len(horarios)} horarios encontrados")
+        
+        return jsonify(horarios)
+        
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+@bp.route('/api/fechas-info/activas', methods=['GET'])
+@log_execution_time
+def get_fechas_info_activas():
+    """Obtener información de fechas activas (para público)"""
+    connection = None
+    cursor = None
+    
+    try:
+        connection = get_db_connection()
+        if not connection:
+            print("[ERROR] No se pudo obtener conexión para /api/fechas-info/activas")
+            return jsonify({"error": "Error de conexión a la base de datos"}), 500
+        
+        cursor = connection.cursor()
+        
+        query_start = time.time()
+        cursor.execute("""
+            SELECT 
+                fecha, rubro, titulo_dia, descripcion, 
+                ponentes_destacados, marcas_patrocinadoras, paises_participantes,
+                imagen_url
+            FROM expokossodo_fecha_info 
+            WHERE activo = TRUE
+            ORDER BY fecha ASC
+        """)
+        query_time = time.time() - query_start
+        print(f"[SEARCH] Query /api/fechas-info/activas tomó {query_time:.3f}s")
+        
+        fechas_info = []
+        for row in cursor.fetchall():
+            fecha_info = {
+                "fecha": row[0].strftime('%Y-%m-%d'),
+                "rubro": row[1],
+                "titulo_dia": row[2],
+                "descripcion": row[3],
+                "ponentes_destacados": json.loads(row[4]) if row[4] else [],
+                "marcas_patrocinadoras": json.loads(row[5]) if row[5] else [],
+                "paises_participantes": json.loads(row[6]) if row[6] else [],
+                "imagen_url": row[7]
+            }
+            fechas_info.append(fecha_info)
+        
+        return jsonify(fechas_info)
+        
+    except Error as e:
+        print(f"Error obteniendo fechas info activas: {e}")
+        return jsonify({"error": "Error del servidor"}), 500
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'connection' in locals() and connection:
+            connection.close()
+
+# --- MONITOREO DE LA COLA DE EMAILS ---
+
+@bp.route('/api/email/cola/estado', methods=['GET'])
+def estado_cola_email():
+    """Profundidad, latencia y contadores de la cola de emails de este worker"""
+    return jsonify(cola_email.estadisticas())
+
+@bp.route('/api/registro/agenda/estado', methods=['GET'])
+def estado_agenda_eventos():
+    """Eventos cargados en la agenda de validación de este worker"""
+    return jsonify(agenda_eventos.estadisticas())
+
+def recolectar_metricas_email():
+    """Profundidad de la cola de emails de este worker (/metrics)"""
+    metricas.registro.fijar('expokossodo_cola_email_profundidad', cola_email.estadisticas()['profundidad'])
+
+metricas.registro.agregar_recolector(recolectar_metricas_email)
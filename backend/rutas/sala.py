@@ -0,0 +1,567 @@
+"""
+Rutas de verificación de ingreso por sala
+ExpoKossodo 2025
+
+Escaneo individual y por lotes, asistentes por evento y stream SSE de
+ingresos para las tablets de sala.
+"""
+
+from flask import request, jsonify, Blueprint, current_app
+from mysql.connector import Error
+import logging
+import os
+from datetime import datetime
+import time
+from parser_qr import parsear_qr
+import ingresos_sala
+import inscripciones
+from nucleo import (
+    SSE_DURACION_MAXIMA, SSE_LATIDO_SEGUNDOS, canal_checkins, evento_sse, get_db_connection,
+    indice_qr, snapshot_eventos, snapshot_registros,
+)
+
+bp = Blueprint('sala', __name__)
+logger = logging.getLogger(__name__)
+
+# ===== ENDPOINTS DE VERIFICACIÓN POR SALA =====
+
+@bp.route('/api/verificar-sala/eventos', methods=['GET'])
+def get_eventos_verificacion():
+    """Obtener eventos para verificación por sala - OPTIMIZADO"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # Lectura directa de contadores mantenidos (sin JOIN ni COUNT DISTINCT)
+        cursor.execute("""
+            SELECT 
+                e.id,
+                e.fecha,
+                e.hora,
+                e.sala,
+                e.titulo_charla,
+                e.expositor,
+                e.pais,
+                e.slots_disponibles,
+                e.slots_ocupados,
+                e.total_registrados as registrados,
+                e.total_presentes as presentes
+            FROM expokossodo_eventos e
+            ORDER BY e.fecha, e.hora, e.sala
+        """)
+        
+        eventos = cursor.fetchall()
+        
+        # Convertir a formato JSON optimizado
+        eventos_optimizados = []
+        depurar = logger.isEnabledFor(logging.DEBUG)
+        for evento in eventos:
+            # Las tablets sondean este endpoint: el detalle por evento solo con LOG_LEVEL=DEBUG
+            if depurar and (evento['registrados'] > 0 or evento['presentes'] > 0):
+                logger.debug("evento con ingresos", extra={
+                    'evento_id': evento['id'], 'registrados': evento['registrados'], 'presentes': evento['presentes'],
+                })
+            
+            eventos_optimizados.append({
+                'id': evento['id'],
+                'fecha': evento['fecha'].strftime('%Y-%m-%d'),
+                'hora': evento['hora'],
+                'sala': evento['sala'],
+                'titulo_charla': evento['titulo_charla'],
+                'expositor': evento['expositor'],
+                'pais': evento['pais'],
+                'registrados': evento['registrados'],
+                'presentes': evento['presentes'],
+                'disponible': evento['slots_ocupados'] < evento['slots_disponibles']
+            })
+        
+        return jsonify({
+            "eventos": eventos_optimizados,
+            "total_eventos": len(eventos_optimizados)
+        })
+        
+    except Error as e:
+        print(f"Error obteniendo eventos para verificación: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/verificar-sala/evento/<int:evento_id>', methods=['GET'])
+def get_evento_verificacion_individual(evento_id):
+    """Obtener UN evento específico para verificación por sala - SUPER RÁPIDO"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # UNA SOLA CONSULTA para obtener TODO de un evento específico
+        cursor.execute("""
+            SELECT 
+                e.id,
+                e.fecha,
+                e.hora,
+                e.sala,
+                e.titulo_charla,
+                e.expositor,
+                e.pais,
+                e.slots_disponibles,
+                e.slots_ocupados,
+                e.total_registrados as registrados,
+                e.total_presentes as presentes
+            FROM expokossodo_eventos e
+            WHERE e.id = %s
+        """, (evento_id,))
+        
+        evento = cursor.fetchone()
+        
+        if not evento:
+            return jsonify({"error": "Evento no encontrado"}), 404
+        
+        evento_optimizado = {
+            'id': evento['id'],
+            'fecha': evento['fecha'].strftime('%Y-%m-%d'),
+            'hora': evento['hora'],
+            'sala': evento['sala'],
+            'titulo_charla': evento['titulo_charla'],
+            'expositor': evento['expositor'],
+            'pais': evento['pais'],
+            'registrados': evento['registrados'],
+            'presentes': evento['presentes'],
+            'disponible': evento['slots_ocupados'] < evento['slots_disponibles']
+        }
+        
+        logger.debug("evento para verificación", extra={
+            'evento_id': evento_id, 'registrados': evento['registrados'], 'presentes': evento['presentes'],
+        })
+        
+        return jsonify({
+            "evento": evento_optimizado
+        })
+        
+    except Error as e:
+        print(f"Error obteniendo evento específico {evento_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/verificar-sala/verificar', methods=['POST'])
+def verificar_acceso_sala():
+    """Verificar acceso del usuario a sala específica"""
+    data = request.get_json()
+    
+    required_fields = ['qr_code', 'evento_id', 'asesor_verificador']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({"error": f"Campo requerido: {field}"}), 400
+    
+    # Validar QR
+    if parsear_qr(data['qr_code']) is None:
+        return jsonify({"error": "Código QR inválido"}), 400
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # Usuario, inscripción e ingreso previo en una consulta; el INSERT suma total_presentes por trigger
+        estado, datos = ingresos_sala.verificar_ingreso(
+            cursor,
+            data['qr_code'],
+            data['evento_id'],
+            data['asesor_verificador'],
+            request.remote_addr,
+            data.get('notas', '')
+        )
+        
+        if estado == ingresos_sala.USUARIO_NO_ENCONTRADO:
+            return jsonify({"error": "Usuario no encontrado"}), 404
+        
+        if estado in (ingresos_sala.NO_INSCRITO, ingresos_sala.NO_EXISTE):
+            return jsonify({
+                "error": "Usuario no registrado en este evento",
+                "usuario": datos['nombres']
+            }), 403
+        
+        if estado == ingresos_sala.YA_REGISTRADO:
+            return jsonify({
+                "error": "Usuario ya registró ingreso a esta sala",
+                "usuario": datos['nombres'],
+                "evento": datos['titulo_charla']
+            }), 400
+        
+        canal_checkins.notificar()
+        
+        return jsonify({
+            "message": "Acceso autorizado y registrado",
+            "usuario": {
+                "nombres": datos['nombres'],
+                "empresa": datos['empresa'],
+                "cargo": datos['cargo']
+            },
+            "evento": {
+                "titulo": datos['titulo_charla'],
+                "hora": datos['hora'],
+                "sala": datos['sala']
+            },
+            "verificado_por": data['asesor_verificador'],
+            "autorizado": True
+        })
+        
+    except Error as e:
+        connection.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+# Escaneos por lote que acepta /api/verificar-sala/verificar-lote
+VERIFICACION_LOTE_MAXIMO = int(os.getenv('VERIFICACION_LOTE_MAXIMO', 500))
+
+@bp.route('/api/verificar-sala/verificar-lote', methods=['POST'])
+def verificar_acceso_sala_lote():
+    """Registrar en bloque los escaneos que una tablet acumuló sin conexión"""
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    
+    if not data.get('asesor_verificador'):
+        return jsonify({"error": "Campo requerido: asesor_verificador"}), 400
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Campo requerido: items (lista de escaneos)"}), 400
+    if len(items) > VERIFICACION_LOTE_MAXIMO:
+        return jsonify({"error": f"Máximo {VERIFICACION_LOTE_MAXIMO} escaneos por lote"}), 413
+    
+    # Validar cada escaneo sin tocar la BD
+    resultados = []
+    validos = []
+    for posicion, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        qr_code = item.get('qr_code')
+        try:
+            evento_id = int(item.get('evento_id'))
+        except (TypeError, ValueError):
+            evento_id = None
+        resultado = {"indice": posicion, "qr_code": qr_code, "evento_id": evento_id}
+        resultados.append(resultado)
+        
+        if not qr_code or evento_id is None:
+            resultado["estado"] = ingresos_sala.DATOS_INCOMPLETOS
+        elif parsear_qr(qr_code) is None:
+            resultado["estado"] = ingresos_sala.QR_INVALIDO
+        else:
+            validos.append(resultado)
+    
+    # Resolver todos los QR de una vez (índice en memoria + una consulta para los ausentes)
+    usuarios = indice_qr.buscar_varios(resultado['qr_code'] for resultado in validos)
+    
+    ahora = datetime.now()
+    ingresos = []
+    vistos = set()
+    for resultado in validos:
+        usuario = usuarios.get(resultado['qr_code'])
+        if not usuario:
+            resultado["estado"] = ingresos_sala.USUARIO_NO_ENCONTRADO
+            continue
+        par = (usuario['id'], resultado['evento_id'])
+        resultado["usuario"] = usuario['nombres']
+        if par in vistos:
+            resultado["estado"] = ingresos_sala.DUPLICADO_EN_LOTE
+            continue
+        vistos.add(par)
+        fecha_ingreso, hora_original = ingresos_sala.fecha_escaneo(
+            items[resultado['indice']].get('timestamp'), ahora
+        )
+        resultado["fecha_ingreso"] = fecha_ingreso.isoformat()
+        resultado["hora_original"] = hora_original
+        ingresos.append({
+            "registro_id": usuario['id'],
+            "evento_id": resultado['evento_id'],
+            "qr_code": resultado['qr_code'],
+            "fecha_ingreso": fecha_ingreso,
+            "resultado": resultado
+        })
+    
+    if ingresos:
+        connection = get_db_connection()
+        if not connection:
+            return jsonify({"error": "Error de conexión a la base de datos"}), 500
+        
+        cursor = connection.cursor(dictionary=True)
+        try:
+            connection.start_transaction()
+            estados = ingresos_sala.registrar_ingresos_lote(
+                cursor, ingresos, data['asesor_verificador'], request.remote_addr
+            )
+            connection.commit()
+        except Error as e:
+            connection.rollback()
+            return jsonify({"error": str(e)}), 500
+        finally:
+            cursor.close()
+            connection.close()
+        
+        for ingreso in ingresos:
+            ingreso['resultado']["estado"] = estados[(ingreso['registro_id'], ingreso['evento_id'])]
+        if ingresos_sala.REGISTRADO in estados.values():
+            canal_checkins.notificar()
+    
+    resumen = {}
+    for resultado in resultados:
+        resumen[resultado["estado"]] = resumen.get(resultado["estado"], 0) + 1
+    
+    logger.info("lote de escaneos", extra={
+        'total': len(items), 'asesor': data['asesor_verificador'], 'resumen': resumen,
+    })
+    return jsonify({
+        "success": True,
+        "total": len(items),
+        "resumen": resumen,
+        "resultados": resultados
+    })
+
+@bp.route('/api/verificar-sala/asistentes/<int:evento_id>', methods=['GET'])
+def get_asistentes_evento(evento_id):
+    """Obtener asistentes de un evento específico - OPTIMIZADO"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # UNA SOLA CONSULTA OPTIMIZADA para obtener todo
+        cursor.execute("""
+            SELECT 
+                e.titulo_charla, e.hora, e.sala, e.fecha,
+                r.id, r.nombres, r.empresa, r.cargo,
+                CASE WHEN aps.id IS NOT NULL THEN 'presente' ELSE 'registrado' END as estado,
+                aps.fecha_ingreso
+            FROM expokossodo_eventos e
+            LEFT JOIN expokossodo_registro_eventos re ON e.id = re.evento_id
+            LEFT JOIN expokossodo_registros r ON re.registro_id = r.id
+            LEFT JOIN expokossodo_asistencias_por_sala aps ON r.id = aps.registro_id AND aps.evento_id = e.id
+            WHERE e.id = %s
+            ORDER BY aps.fecha_ingreso DESC, r.nombres
+        """, (evento_id,))
+        
+        resultados = cursor.fetchall()
+        
+        if not resultados:
+            return jsonify({"error": "Evento no encontrado"}), 404
+        
+        # Separar información del evento y asistentes
+        evento_info = {
+            'titulo_charla': resultados[0]['titulo_charla'],
+            'hora': resultados[0]['hora'],
+            'sala': resultados[0]['sala'],
+            'fecha': resultados[0]['fecha'].strftime('%Y-%m-%d') if resultados[0]['fecha'] else None
+        }
+        
+        # Procesar asistentes (filtrar si hay registros válidos)
+        asistentes = []
+        total_registrados = 0
+        presentes = 0
+        
+        for row in resultados:
+            if row['id']:  # Solo si hay un registro válido
+                asistente = {
+                    'id': row['id'],
+                    'nombres': row['nombres'],
+                    'empresa': row['empresa'],
+                    'cargo': row['cargo'],
+                    'estado': row['estado'],
+                    'fecha_ingreso': row['fecha_ingreso'].isoformat() if row['fecha_ingreso'] else None
+                }
+                asistentes.append(asistente)
+                total_registrados += 1
+                if row['estado'] == 'presente':
+                    presentes += 1
+        
+        ausentes = total_registrados - presentes
+        porcentaje = round((presentes / total_registrados * 100) if total_registrados > 0 else 0, 1)
+        
+        return jsonify({
+            "evento": evento_info,
+            "asistentes": asistentes,
+            "estadisticas": {
+                "total_registrados": total_registrados,
+                "presentes": presentes,
+                "ausentes": ausentes,
+                "porcentaje_asistencia": porcentaje
+            }
+        })
+        
+    except Error as e:
+        print(f"Error obteniendo asistentes del evento {evento_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/verificar-sala/agregar-asistente', methods=['POST'])
+def agregar_asistente_a_evento():
+    """Agregar un usuario registrado a un evento específico cuando no está inscrito"""
+    data = request.get_json()
+    
+    required_fields = ['qr_code', 'evento_id', 'asesor_verificador']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({"error": f"Campo requerido: {field}"}), 400
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        # Validar QR
+        if parsear_qr(data['qr_code']) is None:
+            return jsonify({"error": "Código QR inválido"}), 400
+        
+        # Buscar usuario (índice en memoria)
+        usuario = indice_qr.buscar(data['qr_code'])
+        if not usuario:
+            return jsonify({"error": "Usuario no encontrado"}), 404
+        
+        # Verificar que el evento existe
+        cursor.execute("""
+            SELECT id, titulo_charla, hora, sala, fecha, slots_disponibles, slots_ocupados
+            FROM expokossodo_eventos 
+            WHERE id = %s
+        """, (data['evento_id'],))
+        
+        evento = cursor.fetchone()
+        if not evento:
+            return jsonify({"error": "Evento no encontrado"}), 404
+        
+        # Verificar si ya está registrado en este evento
+        cursor.execute("""
+            SELECT id FROM expokossodo_registro_eventos 
+            WHERE registro_id = %s AND evento_id = %s
+        """, (usuario['id'], data['evento_id']))
+        
+        if cursor.fetchone():
+            return jsonify({
+                "error": "Usuario ya está registrado en este evento",
+                "usuario": usuario['nombres']
+            }), 400
+        
+        # NOTA: Se permite sobrecupo para casos especiales - asesor puede agregar sin límite de cupos
+        
+        # Inscripción, cupo, contadores y asistencia en una sola transacción
+        connection.start_transaction()
+        
+        # Agregar usuario al evento
+        cursor.execute("""
+            INSERT INTO expokossodo_registro_eventos (registro_id, evento_id)
+            VALUES (%s, %s)
+        """, (usuario['id'], data['evento_id']))
+        inscripciones.sumar_total_eventos(cursor, usuario['id'], 1)
+        
+        # Actualizar slots ocupados y contador de inscritos
+        cursor.execute("""
+            UPDATE expokossodo_eventos 
+            SET slots_ocupados = slots_ocupados + 1,
+                total_registrados = total_registrados + 1
+            WHERE id = %s
+        """, (data['evento_id'],))
+        
+        # Registrar inmediatamente la asistencia (total_presentes lo suma el trigger)
+        cursor.execute("""
+            INSERT INTO expokossodo_asistencias_por_sala 
+            (registro_id, evento_id, qr_escaneado, asesor_verificador, ip_verificacion, notas)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (
+            usuario['id'],
+            data['evento_id'],
+            data['qr_code'],
+            data['asesor_verificador'],
+            request.remote_addr,
+            f"Agregado y registrado por {data['asesor_verificador']} - Sobrecupo autorizado"
+        ))
+        
+        connection.commit()
+        snapshot_eventos.invalidar()
+        snapshot_registros.invalidar()
+        canal_checkins.notificar()
+        
+        return jsonify({
+            "message": "Usuario agregado al evento y asistencia registrada exitosamente",
+            "usuario": {
+                "nombres": usuario['nombres'],
+                "empresa": usuario['empresa'],
+                "cargo": usuario['cargo']
+            },
+            "evento": {
+                "titulo": evento['titulo_charla'],
+                "hora": evento['hora'],
+                "sala": evento['sala']
+            },
+            "agregado_por": data['asesor_verificador'],
+            "autorizado": True
+        })
+        
+    except Error as e:
+        connection.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+@bp.route('/api/verificar-sala/stream', methods=['GET'])
+def stream_ingresos_sala():
+    """Server-Sent Events con cada ingreso a sala confirmado, filtrado por evento_id o sala"""
+    evento_id = request.args.get('evento_id', type=int)
+    sala = request.args.get('sala') or None
+    
+    suscripcion = canal_checkins.suscribir(evento_id, sala)
+    if suscripcion is None:
+        # Los hilos del worker son para los escaneos; el cliente sondea y reintenta el stream más tarde
+        return jsonify({"error": "Demasiados streams abiertos, usar sondeo"}), 503, {'Retry-After': '30'}
+    
+    # Reconexión: EventSource reenvía el id del último ingreso recibido
+    pendientes = []
+    ultimo_id = request.headers.get('Last-Event-ID', type=int)
+    if ultimo_id is not None:
+        try:
+            pendientes = canal_checkins.pendientes_desde(ultimo_id, evento_id, sala)
+        except Error as e:
+            print(f"[CHECKINS] No se pudieron recuperar ingresos desde {ultimo_id}: {e}")
+    
+    def formatear(checkin):
+        return evento_sse('checkin', checkin, checkin['id'])
+    
+    def generar():
+        yield "retry: 3000\n\n"
+        for checkin in pendientes:
+            yield formatear(checkin)
+        
+        # Cerrar periódicamente: el navegador reconecta solo y el hilo no queda tomado indefinidamente
+        fin = time.time() + SSE_DURACION_MAXIMA
+        while time.time() < fin:
+            if suscripcion.desbordada:
+                yield evento_sse('resync', {})
+                return
+            checkin = suscripcion.esperar(timeout=SSE_LATIDO_SEGUNDOS)
+            # El latido también detecta clientes desconectados (falla la escritura)
+            yield formatear(checkin) if checkin else ": ping\n\n"
+    
+    response = current_app.response_class(generar(), mimetype='text/event-stream')
+    response.call_on_close(lambda: canal_checkins.cancelar(suscripcion))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/api/verificar-sala/stream/estado', methods=['GET'])
+def estado_stream_ingresos():
+    """Streams abiertos y actividad del lector de ingresos de este worker"""
+    return jsonify(canal_checkins.estadisticas())
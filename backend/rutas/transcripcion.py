@@ -0,0 +1,225 @@
+"""
+Integración con el servicio de transcripción en Railway
+ExpoKossodo 2025
+
+Envío de consultas, callback con el resumen y endpoints de estado. La
+disponibilidad del servicio la mantiene una sonda en segundo plano.
+"""
+
+from flask import request, jsonify, Blueprint
+from mysql.connector import Error
+import os
+import time
+import json
+import threading
+import requests
+import metricas
+import arranque
+from nucleo import get_db_connection
+
+bp = Blueprint('transcripcion', __name__)
+
+# Configuración del servicio de transcripción en Railway
+TRANSCRIPCION_API_URL = os.getenv('TRANSCRIPCION_API_URL', 
+                                   'https://transcripcionleads-production.up.railway.app')
+TRANSCRIPCION_API_KEY = os.getenv('TRANSCRIPCION_API_KEY', '')  # Para autenticación futura si es necesaria
+
+# Disponibilidad del servicio de transcripción: se consulta en segundo plano, nunca al importar
+sonda_transcripcion = arranque.SondaDisponibilidad(
+    'Servicio de transcripción', f"{TRANSCRIPCION_API_URL}/health",
+    intervalo_segundos=int(os.getenv('TRANSCRIPCION_SONDA_SEGUNDOS', 60))
+)
+
+# Función para enviar consultas al servicio de transcripción
+@metricas.registro.tarea_en_curso('transcripcion')
+def enviar_a_transcripcion(consulta_id, texto, callback_url=None):
+    """Enviar consulta al servicio de transcripción en Railway"""
+    if not sonda_transcripcion.disponible:
+        print(f"[WARN] Servicio de transcripción no disponible para consulta {consulta_id}")
+        return False
+    
+    try:
+        payload = {
+            "texto": texto,
+            "contexto": "consulta_asesor",
+            "callback_url": callback_url
+        }
+        
+        # Agregar el ID de consulta al payload
+        payload["consulta_id"] = consulta_id
+        
+        response = requests.post(
+            f"{TRANSCRIPCION_API_URL}/procesar-resumenes",
+            json=payload,
+            headers={'X-API-Key': TRANSCRIPCION_API_KEY} if TRANSCRIPCION_API_KEY else {},
+            timeout=10
+        )
+        
+        if response.status_code == 200:
+            print(f"[OK] Consulta {consulta_id} enviada a transcripción exitosamente")
+            return True
+        else:
+            print(f"[ERROR] Transcripción falló para consulta {consulta_id}: Status {response.status_code}")
+            return False
+            
+    except requests.exceptions.Timeout:
+        print(f"[ERROR] Timeout enviando consulta {consulta_id} a transcripción")
+        return False
+    except Exception as e:
+        print(f"[ERROR] No se pudo enviar consulta {consulta_id} a transcripción: {e}")
+        return False
+
+@bp.route('/api/transcripcion/callback', methods=['POST'])
+def recibir_resultado_transcripcion():
+    """Recibir el resultado procesado desde el servicio de transcripción Railway"""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({"error": "No se recibieron datos"}), 400
+    
+    consulta_id = data.get('consulta_id')
+    resumen = data.get('resumen')
+    
+    if not consulta_id:
+        return jsonify({"error": "consulta_id es requerido"}), 400
+    
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Error de conexión a la base de datos"}), 500
+    
+    cursor = connection.cursor()
+    
+    try:
+        # Actualizar la consulta con el resumen generado
+        cursor.execute("""
+            UPDATE expokossodo_consultas 
+            SET resumen = %s
+            WHERE id = %s
+        """, (json.dumps(resumen) if resumen else None, consulta_id))
+        
+        affected_rows = cursor.rowcount
+        connection.commit()
+        
+        if affected_rows > 0:
+            print(f"[OK] Resumen actualizado para consulta {consulta_id}")
+            return jsonify({
+                "success": True,
+                "message": f"Resumen actualizado para consulta {consulta_id}"
+            })
+        else:
+            print(f"[WARN] No se encontró la consulta {consulta_id}")
+            return jsonify({
+                "success": False,
+                "message": f"No se encontró la consulta {consulta_id}"
+            }), 404
+            
+    except Error as e:
+        print(f"[ERROR] Error actualizando resumen: {e}")
+        connection.rollback()
+        return jsonify({"error": "Error actualizando resumen"}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+# --- ENDPOINTS DE MONITOREO DE TRANSCRIPCIÓN ---
+
+@bp.route('/api/transcripcion/stats', methods=['GET'])
+def transcripcion_stats_endpoint():
+    """Estadísticas del sistema de transcripción en Railway"""
+    try:
+        # Solicitar estadísticas al servicio Railway
+        response = requests.get(f"{TRANSCRIPCION_API_URL}/stats", timeout=5)
+        if response.status_code == 200:
+            stats = response.json()
+            stats['sistema_disponible'] = sonda_transcripcion.disponible
+            stats['servicio_url'] = TRANSCRIPCION_API_URL
+            return jsonify(stats)
+        else:
+            return jsonify({
+                'sistema_disponible': sonda_transcripcion.disponible,
+                'servicio_url': TRANSCRIPCION_API_URL,
+                'error': 'No se pudieron obtener estadísticas del servicio'
+            })
+    except Exception as e:
+        return jsonify({
+            'sistema_disponible': False,
+            'servicio_url': TRANSCRIPCION_API_URL,
+            'error': str(e)
+        })
+
+@bp.route('/api/transcripcion/health', methods=['GET'])
+def transcripcion_health():
+    """Estado de salud del sistema de transcripción en Railway"""
+    try:
+        # Verificar salud del servicio Railway
+        response = requests.get(f"{TRANSCRIPCION_API_URL}/health", timeout=5)
+        status = {
+            'sistema_disponible': response.status_code == 200,
+            'servicio_url': TRANSCRIPCION_API_URL,
+            'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'status_code': response.status_code
+        }
+        return jsonify(status)
+    except Exception as e:
+        return jsonify({
+            'sistema_disponible': False,
+            'servicio_url': TRANSCRIPCION_API_URL,
+            'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'error': str(e)
+        })
+
+@bp.route('/api/transcripcion/procesar-pendientes', methods=['POST'])
+def procesar_transcripciones_pendientes():
+    """Procesar todas las consultas pendientes de transcripción enviándolas a Railway"""
+    if not sonda_transcripcion.disponible:
+        return jsonify({"error": "Servicio de transcripción no disponible"}), 503
+    
+    try:
+        # Buscar consultas con uso_transcripcion=1 pero sin resumen
+        connection = get_db_connection()
+        if not connection:
+            return jsonify({"error": "Error de conexión a la base de datos"}), 500
+        
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, consulta 
+            FROM expokossodo_consultas 
+            WHERE uso_transcripcion = 1 AND (resumen IS NULL OR resumen = '')
+        """)
+        
+        consultas_pendientes = cursor.fetchall()
+        cursor.close()
+        connection.close()
+        
+        # Construir URL del callback dentro del contexto de request
+        callback_url = f"{request.url_root}api/transcripcion/callback"
+        
+        # Enviar todas al servicio Railway
+        enviadas = 0
+        errores = 0
+        for consulta in consultas_pendientes:
+            try:
+                # Enviar cada consulta al servicio de transcripción
+                threading.Thread(
+                    target=enviar_a_transcripcion,
+                    args=(consulta['id'], consulta['consulta'], callback_url),
+                    daemon=True
+                ).start()
+                enviadas += 1
+                # Pequeña pausa para no saturar
+                time.sleep(0.5)
+            except Exception as e:
+                print(f"Error enviando consulta {consulta['id']} a transcripción: {e}")
+                errores += 1
+        
+        return jsonify({
+            "message": f"Se enviaron {enviadas} consultas al servicio de transcripción",
+            "consultas_encontradas": len(consultas_pendientes),
+            "consultas_enviadas": enviadas,
+            "errores": errores,
+            "servicio_url": TRANSCRIPCION_API_URL
+        })
+        
+    except Exception as e:
+        print(f"Error procesando consultas pendientes: {e}")
+        return jsonify({"error": "Error interno del servidor"}), 500
@@ -0,0 +1,265 @@
+"""
+Hilos de conversación del chat y respuestas recientes, compartidos entre workers
+ExpoKossodo 2025
+
+threads_in_memory era un dict por worker que crecía sin límite, se perdía en
+cada reciclaje (max_requests) y nunca se leía. Este almacén guarda en un
+archivo SQLite local (compartido por todos los workers del host):
+
+- chat_sesiones: los thread_id de OpenAI en uso. Un hilo sin actividad por
+  más de CHAT_SESION_TTL_SEGUNDOS no se reutiliza (se abre uno nuevo); un
+  thread_id que el almacén no conoce (otro host, archivo borrado, desalojo
+  LRU) se adopta en vez de descartar la conversación del cliente. Las filas
+  vencidas se conservan para reconocerlas y el tope CHAT_SESIONES_MAX
+  descarta las usadas hace más tiempo.
+- chat_respuestas: la respuesta a la primera pregunta de cada conversación,
+  por texto normalizado. Una pregunta frecuente repetida ("¿dónde es la
+  sala 3?") se responde sin correr el asistente mientras la respuesta tenga
+  menos de CHAT_RESPUESTAS_TTL_SEGUNDOS; también con tope LRU. Si no hay
+  coincidencia exacta se busca la pregunta más parecida con cache_faq.
+
+Cada respuesta guarda las versiones compartidas 'eventos_contenido' y
+'fecha_info' (versiones_cache) con las que se generó: al cambiar charlas,
+horarios o la información de fechas las respuestas anteriores dejan de usarse.
+
+Configuración (variables de entorno):
+- CHAT_STORE_PATH              archivo SQLite (tmp/expokossodo_chat.sqlite3)
+- CHAT_SESION_TTL_SEGUNDOS     inactividad máxima de un hilo (21600)
+- CHAT_SESIONES_MAX            hilos guardados (5000)
+- CHAT_RESPUESTAS_TTL_SEGUNDOS vigencia de una respuesta cacheada (3600)
+- CHAT_RESPUESTAS_MAX          respuestas guardadas (500)
+- CHAT_FAQ_UMBRAL              similitud mínima para reutilizar una respuesta (0.78)
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+
+from cache_faq import IndiceFAQ, normalizar_pregunta
+from versiones_cache import VERSION_CONTENIDO_EVENTOS, VERSION_FECHA_INFO, version_compartida
+
+# Cada cuántas escrituras se aplican TTL y tope LRU
+PURGA_CADA = 50
+
+# Estados de un thread_id enviado por el cliente
+SESION_VIGENTE = 'vigente'
+SESION_VENCIDA = 'vencida'
+SESION_DESCONOCIDA = 'desconocida'
+
+# Antigüedad máxima del índice de similitud (respuestas guardadas por otros workers)
+INDICE_MAX_AGE = 30
+
+# Datos de los que dependen las respuestas del asistente. No se usa la versión
+# 'eventos' de /api/eventos: cambia con cada inscripción (cupos) y vaciaría la
+# caché todo el día; estas solo cambian al editar charlas, horarios o fechas.
+VERSIONES_DATOS = (VERSION_CONTENIDO_EVENTOS, VERSION_FECHA_INFO)
+
+
+def version_datos():
+    return '|'.join(version_compartida(nombre) for nombre in VERSIONES_DATOS)
+
+
+class AlmacenChat:
+    """Sesiones de chat y respuestas frecuentes con TTL y desalojo LRU"""
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or os.getenv(
+            'CHAT_STORE_PATH', os.path.join(tempfile.gettempdir(), 'expokossodo_chat.sqlite3')
+        )
+        self.ttl_sesion = float(os.getenv('CHAT_SESION_TTL_SEGUNDOS', 6 * 3600))
+        self.max_sesiones = int(os.getenv('CHAT_SESIONES_MAX', 5000))
+        self.ttl_respuesta = float(os.getenv('CHAT_RESPUESTAS_TTL_SEGUNDOS', 3600))
+        self.max_respuestas = int(os.getenv('CHAT_RESPUESTAS_MAX', 500))
+        self._escrituras = 0
+        self.indice = IndiceFAQ(float(os.getenv('CHAT_FAQ_UMBRAL', 0.78)))
+        self._indice_version = None
+        self._indice_construido = 0
+        self.stats = {
+            'sesiones_reutilizadas': 0, 'sesiones_vencidas': 0, 'sesiones_adoptadas': 0,
+            'hits_exactos': 0, 'hits_similares': 0, 'misses': 0
+        }
+        self._crear_tablas()
+
+    @contextmanager
+    def _conectar(self):
+        # Una conexión por operación: barato en SQLite y seguro con fork, hilos y greenlets
+        connection = sqlite3.connect(self.ruta, timeout=5)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _crear_tablas(self):
+        os.makedirs(os.path.dirname(self.ruta) or '.', exist_ok=True)
+        with self._conectar() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS chat_sesiones (
+                    thread_id TEXT PRIMARY KEY,
+                    creado REAL NOT NULL,
+                    usado REAL NOT NULL,
+                    mensajes INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS chat_respuestas (
+                    pregunta TEXT PRIMARY KEY,
+                    respuesta TEXT NOT NULL,
+                    creado REAL NOT NULL,
+                    usado REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_sesiones_usado ON chat_sesiones (usado)")
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_respuestas_usado ON chat_respuestas (usado)")
+            try:
+                connection.execute("ALTER TABLE chat_respuestas ADD COLUMN version_datos TEXT")
+            except sqlite3.OperationalError as e:
+                if 'duplicate column' not in str(e):
+                    raise
+
+    # --- Sesiones ---
+
+    def estado_sesion(self, thread_id):
+        """
+        Estado del hilo según el almacén
+
+        Returns:
+            str: SESION_VIGENTE, SESION_VENCIDA (sin actividad dentro del TTL)
+            o SESION_DESCONOCIDA (no está guardado)
+        """
+        with self._conectar() as connection:
+            fila = connection.execute(
+                "SELECT usado FROM chat_sesiones WHERE thread_id = ?", (thread_id,)
+            ).fetchone()
+        if fila is None:
+            self.stats['sesiones_adoptadas'] += 1
+            return SESION_DESCONOCIDA
+        if time.time() - fila[0] < self.ttl_sesion:
+            self.stats['sesiones_reutilizadas'] += 1
+            return SESION_VIGENTE
+        self.stats['sesiones_vencidas'] += 1
+        return SESION_VENCIDA
+
+    def registrar_sesion(self, thread_id, mensajes=1):
+        """Marcar actividad en el hilo (lo crea si no existe)"""
+        ahora = time.time()
+        with self._conectar() as connection:
+            connection.execute("""
+                INSERT INTO chat_sesiones (thread_id, creado, usado, mensajes) VALUES (?, ?, ?, ?)
+                ON CONFLICT(thread_id) DO UPDATE SET usado = excluded.usado, mensajes = mensajes + excluded.mensajes
+            """, (thread_id, ahora, ahora, mensajes))
+        self._contar_escritura()
+
+    # --- Respuestas frecuentes ---
+
+    def respuesta_cacheada(self, pregunta):
+        """Respuesta vigente a la misma pregunta (o a una muy parecida), o None"""
+        clave = normalizar_pregunta(pregunta)
+        if not clave:
+            return None
+        version = version_datos()
+
+        respuesta = self._leer_respuesta(clave, version)
+        if respuesta is not None:
+            self.stats['hits_exactos'] += 1
+            return respuesta
+
+        self._actualizar_indice(version)
+        similar = self.indice.buscar(clave)
+        if similar:
+            respuesta = self._leer_respuesta(similar[0], version)
+            if respuesta is not None:
+                self.stats['hits_similares'] += 1
+                return respuesta
+
+        self.stats['misses'] += 1
+        return None
+
+    def _leer_respuesta(self, clave, version):
+        ahora = time.time()
+        with self._conectar() as connection:
+            fila = connection.execute("""
+                SELECT respuesta FROM chat_respuestas
+                WHERE pregunta = ? AND version_datos = ? AND creado >= ?
+            """, (clave, version, ahora - self.ttl_respuesta)).fetchone()
+            if fila:
+                connection.execute(
+                    "UPDATE chat_respuestas SET usado = ?, hits = hits + 1 WHERE pregunta = ?", (ahora, clave)
+                )
+                return fila[0]
+        return None
+
+    def _actualizar_indice(self, version):
+        """Reindexar si cambiaron los datos, si hubo escrituras locales o si el índice envejeció"""
+        if version == self._indice_version and time.time() - self._indice_construido < INDICE_MAX_AGE:
+            return
+        with self._conectar() as connection:
+            claves = [fila[0] for fila in connection.execute("""
+                SELECT pregunta FROM chat_respuestas WHERE version_datos = ? AND creado >= ?
+            """, (version, time.time() - self.ttl_respuesta))]
+        self.indice.reconstruir(claves)
+        self._indice_version = version
+        self._indice_construido = time.time()
+
+    def guardar_respuesta(self, pregunta, respuesta):
+        clave = normalizar_pregunta(pregunta)
+        if not clave or not respuesta:
+            return
+        ahora = time.time()
+        with self._conectar() as connection:
+            connection.execute("""
+                INSERT INTO chat_respuestas (pregunta, respuesta, creado, usado, version_datos) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(pregunta) DO UPDATE SET respuesta = excluded.respuesta, creado = excluded.creado,
+                    usado = excluded.usado, version_datos = excluded.version_datos
+            """, (clave, respuesta, ahora, ahora, version_datos()))
+        self._indice_version = None
+        self._contar_escritura()
+
+    def invalidar_respuestas(self):
+        """Descartar todas las respuestas cacheadas"""
+        with self._conectar() as connection:
+            connection.execute("DELETE FROM chat_respuestas")
+
+    # --- Mantenimiento ---
+
+    def _contar_escritura(self):
+        self._escrituras += 1
+        if self._escrituras % PURGA_CADA == 0:
+            self.purgar()
+
+    def purgar(self):
+        """Aplicar tope LRU a ambas tablas y TTL a las respuestas"""
+        ahora = time.time()
+        with self._conectar() as connection:
+            # Las sesiones vencidas no se borran por TTL: estado_sesion las distingue de las desconocidas
+            connection.execute("""
+                DELETE FROM chat_sesiones WHERE thread_id IN (
+                    SELECT thread_id FROM chat_sesiones ORDER BY usado DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_sesiones,))
+            connection.execute("DELETE FROM chat_respuestas WHERE creado < ? OR version_datos IS NOT ?",
+                               (ahora - self.ttl_respuesta, version_datos()))
+            connection.execute("""
+                DELETE FROM chat_respuestas WHERE pregunta IN (
+                    SELECT pregunta FROM chat_respuestas ORDER BY usado DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_respuestas,))
+
+    def estadisticas(self):
+        with self._conectar() as connection:
+            sesiones = connection.execute("SELECT COUNT(*) FROM chat_sesiones").fetchone()[0]
+            respuestas = connection.execute("SELECT COUNT(*) FROM chat_respuestas").fetchone()[0]
+        return {
+            "ruta": self.ruta,
+            "sesiones": sesiones,
+            "max_sesiones": self.max_sesiones,
+            "respuestas": respuestas,
+            "max_respuestas": self.max_respuestas,
+            "indexadas": len(self.indice),
+            "umbral_similitud": self.indice.umbral,
+            **self.stats
+        }
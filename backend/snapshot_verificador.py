@@ -0,0 +1,137 @@
+"""
+Snapshot compacto de asistentes para verificadores sin conexión
+ExpoKossodo 2025
+
+/api/verificar/obtener-todos-registros manda por cada asistente un objeto JSON
+con nombres de campo repetidos, correo, número, tres fechas ISO y el QR dos
+veces (qr_text y qr_code). Para que las tablets de entrada y de sala sigan
+verificando cuando se cae la red del recinto necesitan tener todo el padrón
+local, y ese formato pesa varias veces lo necesario.
+
+El snapshot es JSON columnar comprimido con gzip (el navegador lo descomprime
+solo por Content-Encoding, sin dependencias nuevas en el frontend):
+
+- Una lista por columna (id, nombres, empresa, cargo, qr, asistencia) en lugar
+  de un objeto por asistente. empresa y cargo se repiten mucho y van como
+  índice a un diccionario de valores únicos.
+- Los eventos de cada asistente en formato CSR: los de la fila i son
+  eventos.valores[eventos.inicio[i]:eventos.inicio[i + 1]].
+- Una tabla hash de direccionamiento abierto sobre el QR (FNV-1a de 32 bits
+  sobre UTF-8, sondeo lineal, -1 = vacío): la tablet responde un escaneo sin
+  recorrer el padrón ni construir índices al cargarlo.
+
+Se genera una vez por cambio (SnapshotVersionado con la versión 'registros')
+y el gzip es determinista, así todos los workers sirven el mismo ETag.
+"""
+
+import gzip
+import json
+
+FORMATO_SNAPSHOT = 1
+
+# Columnas codificadas como índice a una lista de valores únicos (posición en SQL_SNAPSHOT_REGISTROS)
+COLUMNAS_DICCIONARIO = (('empresa', 2), ('cargo', 3))
+
+SQL_SNAPSHOT_REGISTROS = """
+    SELECT id, nombres, empresa, cargo, qr_code, asistencia_general_confirmada
+    FROM expokossodo_registros
+    WHERE qr_code IS NOT NULL AND qr_code <> ''
+    ORDER BY id
+"""
+
+SQL_SNAPSHOT_EVENTOS = """
+    SELECT registro_id, evento_id
+    FROM expokossodo_registro_eventos
+    ORDER BY registro_id, evento_id
+"""
+
+
+def fnv1a_32(texto):
+    """Hash FNV-1a de 32 bits del texto en UTF-8 (mismo cálculo que en el frontend)"""
+    valor = 0x811C9DC5
+    for byte in texto.encode('utf-8'):
+        valor = ((valor ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return valor
+
+
+def tabla_hash(claves):
+    """
+    Tabla de direccionamiento abierto con la fila de cada clave
+
+    El tamaño es una potencia de 2 con carga <= 0.5: las búsquedas fallidas
+    (QR ajenos al evento) terminan en pocos sondeos.
+    """
+    tamano = 1
+    while tamano < max(2 * len(claves), 8):
+        tamano *= 2
+    tabla = [-1] * tamano
+    mascara = tamano - 1
+    for fila, clave in enumerate(claves):
+        posicion = fnv1a_32(clave) & mascara
+        while tabla[posicion] != -1:
+            posicion = (posicion + 1) & mascara
+        tabla[posicion] = fila
+    return tabla
+
+
+def _codificar_diccionario(valores):
+    unicos = {}
+    indices = [unicos.setdefault(valor or '', len(unicos)) for valor in valores]
+    return list(unicos), indices
+
+
+def construir_snapshot(connection):
+    """
+    Leer el padrón y armar el snapshot columnar
+
+    Returns:
+        dict: Snapshot listo para serializar()
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(SQL_SNAPSHOT_REGISTROS)
+        registros = cursor.fetchall()
+        cursor.execute(SQL_SNAPSHOT_EVENTOS)
+        relaciones = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    # Un QR duplicado (registros consolidados) queda con el registro más reciente
+    por_qr = {}
+    for registro in registros:
+        por_qr[registro[4]] = registro
+    registros = sorted(por_qr.values(), key=lambda registro: registro[0])
+
+    eventos_por_registro = {}
+    for registro_id, evento_id in relaciones:
+        eventos_por_registro.setdefault(registro_id, []).append(evento_id)
+
+    inicio = [0]
+    valores = []
+    for registro in registros:
+        valores.extend(eventos_por_registro.get(registro[0], ()))
+        inicio.append(len(valores))
+
+    qrs = [registro[4] for registro in registros]
+    snapshot = {
+        "formato": FORMATO_SNAPSHOT,
+        "total": len(registros),
+        "id": [registro[0] for registro in registros],
+        "nombres": [registro[1] or '' for registro in registros],
+        "qr": qrs,
+        "asistencia": [1 if registro[5] else 0 for registro in registros],
+        "eventos": {"inicio": inicio, "valores": valores},
+        "hash": {"algoritmo": "fnv1a32", "tabla": tabla_hash(qrs)},
+        "diccionarios": {}
+    }
+    for columna, posicion in COLUMNAS_DICCIONARIO:
+        unicos, indices = _codificar_diccionario(registro[posicion] for registro in registros)
+        snapshot["diccionarios"][columna] = unicos
+        snapshot[columna] = indices
+    return snapshot
+
+
+def serializar(snapshot):
+    """JSON compacto + gzip determinista (mtime=0): mismo contenido, mismos bytes y mismo ETag"""
+    cuerpo = json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return gzip.compress(cuerpo, compresslevel=9, mtime=0)
@@ -32,6 +32,11 @@ except Exception as e:
     print('Continuando de todas formas...')
 "
 
+# Aplicar migraciones pendientes antes de levantar los workers: los endpoints dependen
+# de columnas que solo crean las migraciones. Si fallan, no se arranca con un esquema viejo.
+echo "🗄️ Aplicando migraciones del esquema..."
+python migraciones.py || exit 1
+
 # Iniciar Gunicorn con configuración optimizada
 echo "🏃 Iniciando Gunicorn..."
 exec gunicorn app:app --config gunicorn_config.py
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Versiones de caché compartidas entre workers y snapshots versionados
+ExpoKossodo 2025
+
+Cada worker de gunicorn tiene su propia memoria, así que una caché en memoria
+invalidada por un endpoint de escritura solo se enteraría en el worker que
+atendió esa escritura. Para que todos los workers del mismo host vean el
+cambio, cada versión es un archivo en disco al que se le agrega un byte en cada
+incremento: la versión es (inode, tamaño) y leerla cuesta un os.stat, sin ir a
+la base de datos.
+
+Si el directorio no es escribible se usa un contador en memoria (solo el
+worker local ve los cambios; max_age acota la desactualización del resto).
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+CACHE_VERSION_DIR = os.getenv('CACHE_VERSION_DIR', os.path.join(tempfile.gettempdir(), 'expokossodo_cache'))
+
+# Contenido editado desde administración (charlas y horarios, información por fecha).
+# No es la versión 'eventos' de /api/eventos: esa cambia con cada inscripción (cupos).
+VERSION_CONTENIDO_EVENTOS = 'eventos_contenido'
+VERSION_FECHA_INFO = 'fecha_info'
+
+_versiones_locales = {}
+_lock_local = threading.Lock()
+
+
+def _ruta_version(nombre):
+    return os.path.join(CACHE_VERSION_DIR, f"{nombre}.version")
+
+
+def incrementar_version(nombre):
+    """Marcar como obsoletas las cachés asociadas a 'nombre' en todos los workers"""
+    with _lock_local:
+        _versiones_locales[nombre] = _versiones_locales.get(nombre, 0) + 1
+    try:
+        os.makedirs(CACHE_VERSION_DIR, exist_ok=True)
+        fd = os.open(_ruta_version(nombre), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, b'.')
+        finally:
+            os.close(fd)
+    except OSError as e:
+        print(f"[CACHE] No se pudo escribir versión compartida '{nombre}': {e}")
+
+
+def version_actual(nombre):
+    """Versión vigente de 'nombre' (solo se compara por igualdad)"""
+    local = _versiones_locales.get(nombre, 0)
+    try:
+        st = os.stat(_ruta_version(nombre))
+        return (st.st_ino, st.st_size, local)
+    except OSError:
+        return (0, 0, local)
+
+
+def version_compartida(nombre):
+    """
+    Versión de 'nombre' vista por todos los workers, como texto persistible
+
+    A diferencia de version_actual() no incluye el contador local del
+    proceso, así que sirve para guardarla junto a datos compartidos (p. ej.
+    en SQLite) y compararla desde otro worker.
+    """
+    try:
+        st = os.stat(_ruta_version(nombre))
+        return f"{st.st_ino}:{st.st_size}"
+    except OSError:
+        return "0:0"
+
+
+class SnapshotVersionado:
+    """
+    Respuesta precalculada que solo se reconstruye cuando cambia su versión
+
+    El cuerpo se guarda ya serializado junto con un ETag fuerte (hash del
+    contenido), así workers distintos con el mismo contenido producen el mismo
+    ETag y los clientes pueden revalidar con If-None-Match.
+    """
+
+    def __init__(self, nombre, max_age_segundos=300):
+        """
+        Args:
+            nombre (str): Nombre de la versión compartida a observar
+            max_age_segundos (int): Reconstrucción forzada para cambios hechos fuera de la app
+        """
+        self.nombre = nombre
+        self.max_age = max_age_segundos
+        self._lock = threading.Lock()
+        self._version = None
+        self._construido_en = 0
+        self.cuerpo = None
+        self.etag = None
+        self.stats = {'hits': 0, 'reconstrucciones': 0}
+
+    def _vigente(self, version):
+        return (self.cuerpo is not None and
+                self._version == version and
+                time.time() - self._construido_en < self.max_age)
+
+    def obtener(self, construir):
+        """
+        Devolver (cuerpo, etag), reconstruyendo con construir() si la versión cambió
+
+        Args:
+            construir (callable): Devuelve el cuerpo serializado (bytes o str)
+        """
+        version = version_actual(self.nombre)
+        if self._vigente(version):
+            self.stats['hits'] += 1
+            return self.cuerpo, self.etag
+
+        with self._lock:
+            # Otro hilo pudo reconstruirlo mientras esperábamos el lock
+            if self._vigente(version):
+                self.stats['hits'] += 1
+                return self.cuerpo, self.etag
+
+            cuerpo = construir()
+            if isinstance(cuerpo, str):
+                cuerpo = cuerpo.encode('utf-8')
+
+            self.cuerpo = cuerpo
+            self.etag = hashlib.sha1(cuerpo).hexdigest()
+            self._version = version
+            self._construido_en = time.time()
+            self.stats['reconstrucciones'] += 1
+            return self.cuerpo, self.etag
+
+    def invalidar(self):
+        """Forzar reconstrucción en todos los workers"""
+        incrementar_version(self.nombre)
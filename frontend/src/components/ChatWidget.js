@@ -1,4 +1,32 @@
 import React, { useState, useEffect } from 'react';
+import API_CONFIG from '../config/api.config';
+
+// Leer un cuerpo text/event-stream y entregar cada evento ya parseado
+const leerEventosSSE = async (response, onEvento) => {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let separador;
+    while ((separador = buffer.indexOf('\n\n')) !== -1) {
+      const bloque = buffer.slice(0, separador);
+      buffer = buffer.slice(separador + 2);
+
+      let evento = 'message';
+      let datos = '';
+      bloque.split('\n').forEach(linea => {
+        if (linea.startsWith('event: ')) evento = linea.slice(7);
+        else if (linea.startsWith('data: ')) datos += linea.slice(6);
+      });
+      if (datos) onEvento(evento, JSON.parse(datos));
+    }
+  }
+};
 
 const ChatWidget = () => {
   const [isOpen, setIsOpen] = useState(false);
@@ -46,8 +74,18 @@ const ChatWidget = () => {
       setInputText('');
       setIsLoading(true);
 
+      // La respuesta se va mostrando a medida que llegan los tokens
+      const assistantId = messages.length + 2;
+      const timestamp = new Date().toLocaleTimeString('es-ES', { hour: '2-digit', minute: '2-digit' });
+      const actualizarRespuesta = (text) => {
+        setMessages(prevMessages => {
+          const sinRespuesta = prevMessages.filter(m => m.id !== assistantId);
+          return [...sinRespuesta, { id: assistantId, text, timestamp, isIncoming: true }];
+        });
+      };
+
       try {
-        const response = await fetch('http://localhost:5000/api/chat', {
+        const response = await fetch(`${API_CONFIG.getApiUrl()}/chat/stream`, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({
@@ -61,26 +99,28 @@ const ChatWidget = () => {
           throw new Error(errorData.error || 'Error al conectar con el asistente');
         }
 
-        const data = await response.json();
-        
-        if (data.reply) {
-          const assistantMessage = {
-            id: messages.length + 2,
-            text: data.reply,
-            timestamp: new Date().toLocaleTimeString('es-ES', { hour: '2-digit', minute: '2-digit' }),
-            isIncoming: true
-          };
-          setMessages(prevMessages => [...prevMessages, assistantMessage]);
-        }
-        
-        if (data.thread_id) {
-          setThreadId(data.thread_id);
-        }
+        let acumulado = '';
+        let errorStream = null;
+        await leerEventosSSE(response, (evento, data) => {
+          if (evento === 'thread') {
+            setThreadId(data.thread_id);
+          } else if (evento === 'token') {
+            acumulado += data.text;
+            actualizarRespuesta(acumulado);
+          } else if (evento === 'fin') {
+            actualizarRespuesta(data.reply || acumulado);
+          } else if (evento === 'error') {
+            errorStream = data.error;
+          }
+        });
 
+        if (errorStream) {
+          throw new Error(errorStream);
+        }
       } catch (error) {
         console.error('Error enviando mensaje:', error);
         const errorMessage = {
-            id: messages.length + 2,
+            id: messages.length + 3,
             text: `Lo siento, hubo un error: ${error.message}`,
             timestamp: new Date().toLocaleTimeString('es-ES', { hour: '2-digit', minute: '2-digit' }),
             isIncoming: true,
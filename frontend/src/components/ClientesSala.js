@@ -40,6 +40,9 @@ const ClientesSala = () => {
   const [registrosCache, setRegistrosCache] = useState([]);
   const [cacheLoading, setCacheLoading] = useState(true);
   const [lastCacheUpdate, setLastCacheUpdate] = useState(null);
+  // Sync incremental: marca del servidor y registros indexados por id
+  const cacheMarcaRef = useRef(null);
+  const cacheRegistrosRef = useRef(new Map());
   
   // Cache de eventos para filtrado local ultrarrápido
   const [eventosCache, setEventosCache] = useState(new Map());
@@ -297,20 +300,41 @@ const ClientesSala = () => {
     }
   };
 
-  // Función para cargar cache de registros
+  // Función para cargar cache de registros (incremental: solo cambios desde la última marca)
   const cargarCacheRegistros = async () => {
     setCacheLoading(true);
     try {
-      const response = await fetch(`${API_CONFIG.getApiUrl()}/verificar/obtener-todos-registros`);
-      const data = await response.json();
+      const marca = cacheMarcaRef.current;
+      let response = await fetch(
+        `${API_CONFIG.getApiUrl()}/verificar/registros-delta${marca ? `?desde=${encodeURIComponent(marca)}` : ''}`
+      );
+      let data = await response.json();
+      
+      // Fallback al endpoint completo si el servidor aún no soporta el delta
+      if (!response.ok || !data.success) {
+        console.warn('[CACHE] Delta no disponible, cargando registros completos:', data.error);
+        response = await fetch(`${API_CONFIG.getApiUrl()}/verificar/obtener-todos-registros`);
+        data = await response.json();
+        data.completo = true;
+        data.eliminados = [];
+        data.marca = null;
+      }
       
       if (response.ok && data.success) {
-        setRegistrosCache(data.registros);
+        const registrosPorId = data.completo ? new Map() : cacheRegistrosRef.current;
+        data.registros.forEach(r => registrosPorId.set(r.id, r));
+        (data.eliminados || []).forEach(id => registrosPorId.delete(id));
+        
+        cacheRegistrosRef.current = registrosPorId;
+        cacheMarcaRef.current = data.marca;
+        
+        const registros = Array.from(registrosPorId.values()).sort((a, b) => b.id - a.id);
+        setRegistrosCache(registros);
         setLastCacheUpdate(Date.now());
         
         // Actualizar estadísticas reales
-        const confirmados = data.registros.filter(r => r.asistencia_general_confirmada).length;
-        const pendientes = data.registros.filter(r => !r.asistencia_general_confirmada).length;
+        const confirmados = registros.filter(r => r.asistencia_general_confirmada).length;
+        const pendientes = registros.filter(r => !r.asistencia_general_confirmada).length;
         
         setStats(prev => ({
           ...prev,
@@ -319,15 +343,11 @@ const ClientesSala = () => {
           ultimaVerificacion: new Date().toLocaleTimeString()
         }));
         
-        console.log(`[CACHE] ${data.total} registros cargados en cache`);
-        console.log('[CACHE] Muestra de datos (primeros 3 registros):');
-        data.registros.slice(0, 3).forEach((r, i) => {
-          console.log(`  ${i + 1}. Nombre: ${r.nombres}`);
-          console.log(`     QR_TEXT: ${r.qr_text || 'N/A'}`);
-          console.log(`     QR_CODE: ${r.qr_code || 'N/A'}`);
-          console.log(`     Asistencia: ${r.asistencia_general_confirmada ? 'Confirmada' : 'Pendiente'}`);
-          console.log(`     Total Eventos: ${r.total_eventos || 0}`);
-        });
+        if (data.completo) {
+          console.log(`[CACHE] ${registros.length} registros cargados en cache`);
+        } else {
+          console.log(`[CACHE] Delta aplicado: ${data.registros.length} cambiados, ${(data.eliminados || []).length} eliminados (total ${registros.length})`);
+        }
       } else {
         console.error('Error cargando cache:', data.error);
       }
@@ -27,6 +27,40 @@ const VerificadorSala = () => {
     }
   }, [eventoId]);
 
+  // Ingresos en vivo (SSE): cualquier tablet de la sala ve cada escaneo al instante
+  useEffect(() => {
+    if (!eventoId || typeof EventSource === 'undefined') {
+      return undefined;
+    }
+
+    const source = new EventSource(`${API_CONFIG.getApiUrl()}/verificar-sala/stream?evento_id=${eventoId}`);
+
+    source.addEventListener('checkin', (e) => {
+      const checkin = JSON.parse(e.data);
+      setAsistentes(prev => {
+        const existente = prev.find(a => a.id === checkin.registro_id);
+        const actualizado = {
+          ...(existente || {}),
+          id: checkin.registro_id,
+          nombres: checkin.nombres,
+          empresa: checkin.empresa,
+          cargo: checkin.cargo,
+          estado: 'presente',
+          fecha_ingreso: checkin.fecha_ingreso
+        };
+        return [actualizado, ...prev.filter(a => a.id !== checkin.registro_id)];
+      });
+      eventService.invalidateAttendeeCache(parseInt(eventoId));
+    });
+
+    // El servidor pide recargar si este cliente se atrasó demasiado
+    source.addEventListener('resync', () => {
+      cargarAsistentes(true);
+    });
+
+    return () => source.close();
+  }, [eventoId]);
+
   const cargarDatosEvento = async () => {
     try {
       setLoading(true);
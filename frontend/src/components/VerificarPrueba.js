@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import QRScanner from './QRScanner';
 import API_CONFIG from '../config/api.config';
+import { snapshotVerificador } from '../services/snapshotVerificador';
 import { 
   CheckCircle, 
   XCircle, 
@@ -296,6 +297,8 @@ const VerificarPrueba = () => {
   // Función para cargar cache de registros
   const cargarCacheRegistros = async () => {
     setCacheLoading(true);
+    // Padrón compacto para seguir verificando si se cae la red (no bloquea la carga)
+    snapshotVerificador.actualizar();
     try {
       const response = await fetch(`${API_CONFIG.getApiUrl()}/verificar/obtener-todos-registros`);
       const data = await response.json();
@@ -642,9 +645,39 @@ const VerificarPrueba = () => {
       }
 
     } catch (error) {
-      console.error('Error:', error);
-      setError(error.message);
-      setUserData(null);
+      // Sin red (fetch lanza TypeError): responder desde el snapshot offline
+      const offline = error instanceof TypeError ? snapshotVerificador.buscar(qrCode) : null;
+      if (offline) {
+        console.log('[SNAPSHOT] Usuario encontrado sin conexión:', offline.nombres);
+        setUserData({
+          usuario: {
+            ...offline,
+            asistencia_confirmada: offline.asistencia_general_confirmada,
+            estado_asistencia: offline.asistencia_general_confirmada ? 'confirmada' : 'pendiente',
+            total_eventos: offline.eventos_ids.length
+          },
+          eventos: offline.eventos_ids
+            .map(id => eventosCache.get(id))
+            .filter(evento => evento !== undefined)
+            .map(evento => ({
+              evento_id: evento.id,
+              titulo_charla: evento.titulo_charla,
+              sala: evento.sala,
+              hora: evento.hora,
+              fecha: evento.fecha,
+              expositor: evento.expositor,
+              pais: evento.pais,
+              estado_sala: 'pendiente'
+            })),
+          qr_validado: true,
+          offline: true,
+          qr_original: qrCode
+        });
+      } else {
+        console.error('Error:', error);
+        setError(error.message);
+        setUserData(null);
+      }
     } finally {
       setLoading(false);
     }
@@ -0,0 +1,92 @@
+import API_CONFIG from '../config/api.config';
+
+// Padrón compacto para verificar sin conexión (ver backend/snapshot_verificador.py)
+const STORAGE_KEY = 'verificadorSnapshot';
+const FORMATO_SOPORTADO = 1;
+
+let snapshotActual = null;
+let etagActual = null;
+
+// FNV-1a de 32 bits sobre UTF-8: mismo cálculo que el backend al armar la tabla hash
+const fnv1a32 = (texto) => {
+  let valor = 0x811c9dc5;
+  for (const byte of new TextEncoder().encode(texto)) {
+    valor ^= byte;
+    valor = Math.imul(valor, 0x01000193) >>> 0;
+  }
+  return valor >>> 0;
+};
+
+const cargarGuardado = () => {
+  if (snapshotActual) return;
+  try {
+    const guardado = JSON.parse(localStorage.getItem(STORAGE_KEY) || 'null');
+    if (guardado && guardado.snapshot?.formato === FORMATO_SOPORTADO) {
+      snapshotActual = guardado.snapshot;
+      etagActual = guardado.etag;
+    }
+  } catch (error) {
+    console.warn('[SNAPSHOT] No se pudo leer el snapshot guardado:', error);
+  }
+};
+
+export const snapshotVerificador = {
+  // Descargar el padrón si cambió (304 si el ETag guardado sigue vigente)
+  actualizar: async () => {
+    cargarGuardado();
+    try {
+      const response = await fetch(`${API_CONFIG.getApiUrl()}/verificar/snapshot`, {
+        headers: etagActual ? { 'If-None-Match': etagActual } : {}
+      });
+      if (response.status === 304) {
+        return snapshotActual;
+      }
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+
+      const snapshot = await response.json();
+      if (snapshot.formato !== FORMATO_SOPORTADO) {
+        throw new Error(`Formato de snapshot no soportado: ${snapshot.formato}`);
+      }
+      snapshotActual = snapshot;
+      etagActual = response.headers.get('ETag');
+      try {
+        localStorage.setItem(STORAGE_KEY, JSON.stringify({ etag: etagActual, snapshot }));
+      } catch (error) {
+        console.warn('[SNAPSHOT] No se pudo guardar el snapshot para uso offline:', error);
+      }
+      console.log(`[SNAPSHOT] ${snapshot.total} registros disponibles sin conexión`);
+    } catch (error) {
+      console.warn('[SNAPSHOT] Sin actualizar, se usa la copia local:', error.message);
+    }
+    return snapshotActual;
+  },
+
+  // Buscar un QR en la tabla hash del snapshot (sin red)
+  buscar: (qrCode) => {
+    cargarGuardado();
+    if (!snapshotActual || !qrCode) return null;
+
+    const { tabla } = snapshotActual.hash;
+    const mascara = tabla.length - 1;
+    let posicion = fnv1a32(qrCode) & mascara;
+    while (tabla[posicion] !== -1) {
+      const fila = tabla[posicion];
+      if (snapshotActual.qr[fila] === qrCode) {
+        const { inicio, valores } = snapshotActual.eventos;
+        return {
+          id: snapshotActual.id[fila],
+          nombres: snapshotActual.nombres[fila],
+          empresa: snapshotActual.diccionarios.empresa[snapshotActual.empresa[fila]],
+          cargo: snapshotActual.diccionarios.cargo[snapshotActual.cargo[fila]],
+          qr_code: qrCode,
+          asistencia_general_confirmada: snapshotActual.asistencia[fila] === 1,
+          eventos_ids: valores.slice(inicio[fila], inicio[fila + 1])
+        };
+      }
+      posicion = (posicion + 1) & mascara;
+    }
+    return null;
+  }
+};